@@ -1,9 +1,148 @@
+import os
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Metron Hybrid Bot"
     BINANCE_API_KEY: str = ""
     BINANCE_SECRET_KEY: str = ""
+
+    # মার্কেট স্ক্যানার (ওয়াচলিস্ট JSON আকারে env থেকে দেওয়া যায়)
+    SCANNER_EXCHANGE: str = "binance"
+    SCANNER_SYMBOLS: List[str] = ["BTC/USDT"]
+    SCANNER_TIMEFRAMES: List[str] = ["1h"]
+    SCANNER_INTERVAL: float = 2.0          # প্রতি (symbol, timeframe) রিফ্রেশ সেকেন্ড
+    SCANNER_CONCURRENCY: int = 8           # একসাথে সর্বোচ্চ কতগুলো ফেচ চলবে
+    SCANNER_FETCH_TIMEOUT: float = 10.0
+    SCANNER_CANDLES: int = 100
+    # প্রতি এক্সচেঞ্জে সেকেন্ডে সর্বোচ্চ রিকোয়েস্ট ওয়েট (টোকেন বাকেট; services/request_scheduler.py)
+    # Binance: ৬০০০ ওয়েট/মিনিট = ১০০/সেকেন্ড, ২০% হেডরুম রেখে; বাকিগুলোতে প্রতি কলে ওয়েট ১
+    EXCHANGE_RATE_LIMITS: Dict[str, float] = {"binance": 80.0, "kucoin": 8.0, "bybit": 8.0, "gate": 8.0}
+    EXCHANGE_UI_RESERVE: float = 0.25      # ui প্রায়োরিটির কল বাজেটের এই অংশ অর্ডার/ইঞ্জিনের জন্য রেখে দেয়
+    EXCHANGE_RATE_LIMIT_COOLDOWN: float = 10.0  # 429/418 পেলে পুরো এক্সচেঞ্জ এত সেকেন্ড থামে
+    # মেথড অনুযায়ী ফলাফল ক্যাশ (সেকেন্ড); চলমান একই রিকোয়েস্ট সবসময় শেয়ার হয়
+    EXCHANGE_CACHE_TTL: Dict[str, float] = {"fetch_ticker": 1.0, "fetch_tickers": 1.0, "fetch_trades": 1.0,
+                                            "fetch_ohlcv": 1.0, "fetch_time": 5.0}
+
+    # আরবিট্রেজ ইঞ্জিন (ccxt তে Gate.io এর আইডি এখন "gate")
+    ARBITRAGE_EXCHANGES: List[str] = ["binance", "kucoin", "bybit", "gate"]
+    ARBITRAGE_SYMBOLS: List[str] = ["BTC/USDT"]
+    ARBITRAGE_DEPTH: int = 10              # প্রতি পাশে top-N লেভেল
+    ARBITRAGE_POLL_INTERVAL: float = 2.0   # স্ট্রিম না থাকা এক্সচেঞ্জে অর্ডার বুক পোলিং (সেকেন্ড)
+    ARBITRAGE_STALE_SECONDS: float = 15.0  # এর চেয়ে পুরনো কোট হিসাবে ধরা হয় না
+    ARBITRAGE_PUBLISH_INTERVAL: float = 1.0
+    ARBITRAGE_TOP_OPPORTUNITIES: int = 10
+    # টেকার ফি (bps); না থাকলে ডিফল্ট
+    ARBITRAGE_FEES_BPS: Dict[str, float] = {"binance": 10.0, "kucoin": 10.0, "bybit": 10.0, "gate": 20.0}
+    ARBITRAGE_DEFAULT_FEE_BPS: float = 10.0
+
+    # লোকাল অর্ডার বুক (Binance depth diff stream, মাল্টিপ্লেক্স লাগে)
+    ORDER_BOOK_SYMBOLS: List[str] = ["BTC/USDT"]
+    ORDER_BOOK_SNAPSHOT_DEPTH: int = 1000
+    ORDER_BOOK_MAX_LEVELS: int = 5000      # প্রতি পাশে; বেস্ট থেকে দূরেরগুলো ফেলে দেওয়া হয়
+    ORDER_BOOK_IMBALANCE_LEVELS: int = 10
+    ORDER_BOOK_DISTANCES_BPS: List[float] = [10, 25, 50, 100]  # mid থেকে এই দূরত্বের ভেতরের লিকুইডিটি
+    ORDER_BOOK_PUBLISH_INTERVAL: float = 0.5
+    ORDER_BOOK_PUBLISH_DEPTH: int = 20
+    ORDER_BOOK_VOTE_IMBALANCE: float = 0.2  # SignalEngine: top-N ইমব্যালান্স এর বেশি হলে BUY/SELL ভোট
+
+    # লাইভ ট্রেড থেকে ক্যান্ডেল (SCANNER_SYMBOLS × SCANNER_TIMEFRAMES + অতিরিক্ত টাইমফ্রেম)
+    CANDLE_AGGREGATOR: bool = True
+    CANDLE_EXTRA_TIMEFRAMES: List[str] = []  # যেমন ["1s", "1m"]
+    CANDLE_VOLUME_BARS: List[float] = []     # বেস ইউনিটে, যেমন [10] = প্রতি ১০ BTC তে একটি বার
+    CANDLE_TICK_BARS: List[int] = []         # প্রতি N ট্রেডে একটি বার
+    CANDLE_LATE_MS: int = 1000               # বাকেট শেষের পর দেরির ট্রেডের জন্য গ্রেস
+    CANDLE_SIGNAL_INTERVAL: float = 0.5      # নতুন ট্রেড থাকলে সিগন্যাল রিফ্রেশ (বার ক্লোজে সাথে সাথে)
+
+    # Binance combined streams (একটি কানেকশনে অনেক পেয়ার/স্ট্রিম)
+    BINANCE_WS_URL: str = "wss://stream.binance.com:9443"
+    BINANCE_MULTIPLEX: bool = True
+    BINANCE_WS_MAX_STREAMS: int = 200      # প্রতি কানেকশনে (Binance সর্বোচ্চ 1024)
+    BINANCE_WS_CONTROL_RATE: float = 4.0   # SUBSCRIBE/UNSUBSCRIBE প্রতি সেকেন্ডে (Binance সর্বোচ্চ 5)
+
+    # ট্রেড টেপ: since কার্সর + id ডিডুপ, টপিকে শুধু নতুন ট্রেড
+    TRADE_TAPE_INTERVAL: float = 2.0
+    TRADE_TAPE_SIZE: int = 15              # স্ন্যাপশট ও পুরনো ফিডে সাম্প্রতিক এত ট্রেড
+    TRADE_TAPE_FETCH_LIMIT: int = 500      # কার্সর থেকে প্রতি ফেচে সর্বোচ্চ (পুরো পেজ এলে সাথে সাথে আবার)
+    TRADE_TAPE_MAX_LAG_MS: int = 60000     # কার্সর এর চেয়ে পুরনো হলে সাম্প্রতিক থেকে নতুন শুরু
+    TRADE_TAPE_DEDUP: int = 5000           # ডিডুপের জন্য মনে রাখা শেষ ট্রেড id
+
+    # টিক হিস্ট্রি: প্রতি (exchange, pair) মেমোরিতে রিং বাফার (/api/ticks, ws "history")
+    TICK_HISTORY_CAPACITY: int = 50000     # প্রতি সিরিজে টিক (~2.5MB)
+    TICK_HISTORY_MAX_SERIES: int = 200
+    TICK_HISTORY_MAX_POINTS: int = 5000    # প্রতি উত্তরে সর্বোচ্চ টিক (বেশি হলে শেষগুলো, truncated=true)
+
+    # স্ট্রিম রেকর্ড/রিপ্লে: লাইভ raw মেসেজ ফাইলে, পরে নেটওয়ার্ক ছাড়া একই কলব্যাক পথে (লোড টেস্ট)
+    STREAM_RECORD_DIR: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "recordings")
+    STREAM_RECORD_ON_START: bool = False
+    STREAM_RECORD_FLUSH_INTERVAL: float = 1.0
+    STREAM_REPLAY_PATH: str = ""           # দিলে স্টার্টআপে লাইভের বদলে এই রেকর্ডিং চলে
+    STREAM_REPLAY_SPEED: float = 1.0       # 1 = আসল গতি, N = N গুণ দ্রুত, 0 = যত দ্রুত সম্ভব
+    STREAM_REPLAY_LOOP: bool = False
+
+    # ওয়েবসকেট ব্রডকাস্ট হাব
+    WS_CLIENT_QUEUE_SIZE: int = 256        # প্রতি ক্লায়েন্টে সর্বোচ্চ পেন্ডিং মেসেজ
+    WS_OVERFLOW_POLICY: str = "conflate"   # conflate | drop_oldest | drop_new
+    WS_SLOW_CLIENT_SECONDS: float = 10.0   # এর বেশি সময় কিউ ভরা থাকলে ক্লায়েন্ট বের করে দেওয়া
+    WS_SEND_TIMEOUT: float = 5.0
+    # টপিক প্রতি কনফ্লেশন: এই মিলিসেকেন্ডে সর্বোচ্চ একবার পাঠানো হয় (0 = সাথে সাথে)
+    WS_TOPIC_CONFLATION_MS: Dict[str, int] = {"ticker": 250, "trades": 500, "sentiment": 0, "arbitrage": 0, "book": 0}
+    WS_TOPIC_BATCH_MAX: int = 200          # batch টপিকে প্রতি ফ্লাশে সর্বোচ্চ আইটেম
+    WS_MAX_TOPICS_PER_CLIENT: int = 50
+    # সিরিয়ালাইজার: auto (orjson → msgspec → json) | orjson | msgspec | json
+    # msgpack বাইনারি ফ্রেম ক্লায়েন্ট ?format=msgpack দিয়ে চাইতে পারে (msgspec বা msgpack ইন্সটল থাকলে)
+    SERIALIZER: str = "auto"
+
+    # ইন্ডিকেটর স্টেট/রেজাল্ট ক্যাশ: প্রতি (symbol, timeframe, params) একটি এন্ট্রি (প্রতি ওয়ার্কারে)
+    SIGNAL_CACHE_MAX_ENTRIES: int = 512
+    SIGNAL_CACHE_TTL: float = 900.0        # এত সেকেন্ড কেউ না চাইলে এন্ট্রি বাদ
+
+    # সিগন্যাল হিসাব ইভেন্ট লুপের বাইরে: process | thread
+    COMPUTE_MODE: str = "process"
+    COMPUTE_WORKERS: int = 2               # শার্ড সংখ্যা; একই (symbol, timeframe) সবসময় একই ওয়ার্কারে
+    COMPUTE_MAX_PENDING: int = 64          # একসাথে সর্বোচ্চ জব (ব্যাক-প্রেশার)
+
+    # মাল্টি-প্রসেস: all (এক প্রসেসে সব) | ingest (এক্সচেঞ্জ ডাটা টেনে বাসে পাঠায়) | gateway (শুধু ক্লায়েন্ট সার্ভ)
+    # যেমন: PROCESS_ROLE=ingest uvicorn app.main:app --port 8001
+    #       PROCESS_ROLE=gateway uvicorn app.main:app --port 8000 --workers 4
+    PROCESS_ROLE: str = "all"
+    BUS_URL: str = ""                      # "" | unix:///tmp/metron-bus.sock | tcp://host:port | redis://host:6379/0
+    BUS_MAX_BUFFER_BYTES: int = 8 * 1024 * 1024  # এর বেশি পিছিয়ে থাকা গেটওয়ে কেটে দেওয়া (রিকানেক্ট করে)
+    BUS_REDIS_CHANNEL: str = "metron:market"
+    BUS_REDIS_OUTBOX: int = 10000
+
+    # মেট্রিক (/metrics)
+    METRICS_ENABLED: bool = True
+    METRICS_LOOP_LAG_INTERVAL: float = 0.5  # লুপ ল্যাগ স্যাম্পল (সেকেন্ড)
+
+    # লোকাল মার্কেট ডাটা স্টোর (memmap ফাইল)
+    MARKET_DATA_DIR: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "market_data")
+    MARKET_STORE_PAGE_LIMIT: int = 1000    # এক্সচেঞ্জের প্রতি OHLCV পেজে সর্বোচ্চ ক্যান্ডেল
+    MARKET_STORE_MAX_GAP: int = 1000       # এর চেয়ে বড় গ্যাপ হলে শুধু সাম্প্রতিক উইন্ডো আনা হয়
+
+    # ব্যাকটেস্ট
+    BACKTEST_FEE_BPS: float = 10.0         # প্রতি পাশে ফি (0.1%)
+    BACKTEST_SLIPPAGE_BPS: float = 5.0
+    BACKTEST_WORKERS: int = max(1, (os.cpu_count() or 2) - 1)
+    BACKTEST_MAX_COMBINATIONS: int = 5000
+    BACKTEST_MAX_CANDLES: int = 200000
+
+    # পেপার ট্রেডিং: SignalEngine এর ভারডিক্ট বদলালে লোকাল ম্যাচিং এ সিমুলেটেড অর্ডার
+    # (স্ট্র্যাটেজি, রিস্ক ও ফি/স্লিপেজ আসে settings_repo থেকে: strategy, risk.*, execution.*)
+    PAPER_TRADING: bool = True
+    PAPER_SYMBOLS: List[str] = []          # খালি = SCANNER_SYMBOLS সবগুলো
+    PAPER_TIMEFRAME: str = "1h"            # এই টাইমফ্রেমের সেন্টিমেন্টই অর্ডার চালায়
+    PAPER_CAPITAL: float = 10000.0         # শুরুর ক্যাশ (USDT)
+    PAPER_MIN_NOTIONAL: float = 10.0       # এর চেয়ে ছোট রিব্যালান্স অর্ডার বাদ
+    PAPER_BOOK_LEVELS: int = 50            # বুকে ম্যাচিং এ বেস্ট থেকে সর্বোচ্চ এত লেভেল হাঁটা
+    PAPER_FLUSH_INTERVAL: float = 1.0      # ফিল ডিস্কে ব্যাচে (সেকেন্ড)
+    PAPER_FLUSH_BATCH: int = 100           # এতগুলো জমলে ইন্টারভালের আগেই
+    PAPER_RECENT_ORDERS: int = 200         # মেমোরিতে সাম্প্রতিক অর্ডার (/api/paper/orders, স্ন্যাপশট)
+    PAPER_LATENCY_SAMPLES: int = 1000      # প্রতি স্টেজে পার্সেন্টাইলের জন্য শেষ এত স্যাম্পল
+
+    # স্টার্টআপ: সার্ভার সাথে সাথে /health দেয়; মার্কেট, কম্পিউট ও ইন্ডিকেটর ওয়ার্মআপ শেষে /ready
+    STARTUP_MARKETS_TIMEOUT: float = 20.0  # SCANNER_EXCHANGE এর load_markets এর সর্বোচ্চ অপেক্ষা (এরপর ব্যাকগ্রাউন্ডে রিট্রাই)
+    STARTUP_PRELOAD_INDICATORS: bool = True  # লোকাল স্টোরের ক্যান্ডেল দিয়ে ইন্ডিকেটর স্টেট আগে থেকে গরম করা
     
     class Config:
         env_file = ".env"
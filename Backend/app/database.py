@@ -1,37 +1,349 @@
-
-import sqlite3
+import asyncio
+import json
+import logging
 import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
 
 # ডাইনামিক ভাবে ফাইলের পাথ বের করা
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_FILE = os.path.join(BASE_DIR, "bot_data.db")
 
-def init_db():
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    # সেটিংস টেবিল তৈরি করা (যদি না থাকে)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS settings (
-            key TEXT PRIMARY KEY,
-            value TEXT
-        )
-    ''')
-    # ডিফল্ট স্ট্র্যাটেজি সেট করা (যদি না থাকে)
-    cursor.execute("INSERT OR IGNORE INTO settings (key, value) VALUES ('strategy', 'conservative')")
-    conn.commit()
-    conn.close()
-
-def get_strategy():
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute("SELECT value FROM settings WHERE key='strategy'")
-    result = cursor.fetchone()
-    conn.close()
-    return result[0] if result else "conservative"
-
-def set_strategy(new_strategy):
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute("UPDATE settings SET value = ? WHERE key='strategy'", (new_strategy,))
-    conn.commit()
-    conn.close()
+# ============================================================
+# সেটিংস ও স্টেট রিপোজিটরি
+# ------------------------------------------------------------
+# - একটি দীর্ঘস্থায়ী SQLite কানেকশন (WAL মোড), একটি ডেডিকেটেড থ্রেডে —
+#   সব I/O ইভেন্ট লুপের বাইরে, আর এক থ্রেড হওয়ায় লক লাগে না
+# - রিড আসে মেমোরি ক্যাশ থেকে (সিঙ্ক, নন-ব্লকিং) — টিক লুপ কখনো ডিস্কের জন্য থামে না
+# - রাইট আগে ডিস্কে কমিট, তারপর ক্যাশ আপডেট; প্রতিটি পরিবর্তন history টেবিলে থাকে
+# - প্রতিটি কী টাইপড (SettingSpec): ভুল টাইপ/ভ্যালু হলে ValueError, অজানা কী হলে KeyError
+# ============================================================
+
+HISTORY_LIMIT = 100
+
+
+class SettingSpec:
+    """একটি সেটিং এর টাইপ, ডিফল্ট ও (ঐচ্ছিক) অনুমোদিত ভ্যালু"""
+
+    TYPES = {"str": str, "int": int, "float": float, "bool": bool, "json": object}
+
+    def __init__(self, type_: str, default: Any, choices: Optional[Sequence] = None, description: str = ""):
+        if type_ not in self.TYPES:
+            raise ValueError(f"Unknown setting type: {type_}")
+        self.type = type_
+        self.choices = tuple(choices) if choices else None
+        self.description = description
+        self.default = self.coerce(default)
+
+    def coerce(self, value: Any):
+        if self.type == "float" and isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        if self.type != "json":
+            expected = self.TYPES[self.type]
+            # bool হলো int এর সাবক্লাস — আলাদা করে আটকানো
+            if not isinstance(value, expected) or (expected is not bool and isinstance(value, bool)):
+                raise ValueError(f"Expected {self.type}, got {type(value).__name__}")
+        else:
+            json.dumps(value)  # সিরিয়ালাইজ না হলে TypeError
+        if self.choices is not None and value not in self.choices:
+            raise ValueError(f"Value must be one of {list(self.choices)}")
+        return value
+
+    def encode(self, value: Any) -> str:
+        # str সরাসরি (পুরনো 'strategy' রো এর সাথে সামঞ্জস্য), বাকিগুলো JSON
+        return value if self.type == "str" else json.dumps(value)
+
+    def decode(self, raw: Optional[str]):
+        if raw is None:
+            return self.default
+        try:
+            return self.coerce(raw if self.type == "str" else json.loads(raw))
+        except (TypeError, ValueError):
+            logger.warning(f"⚠️ Stored setting is invalid ({raw!r}), using default")
+            return self.default
+
+    def describe(self):
+        return {"type": self.type, "default": self.default, "choices": list(self.choices) if self.choices else None,
+                "description": self.description}
+
+
+# স্ট্র্যাটেজি, রিস্ক ও এক্সিকিউশন সেটিংস — নতুন মডিউল register() দিয়ে নিজের কী যোগ করতে পারে
+SETTING_SPECS: Dict[str, SettingSpec] = {
+    "strategy": SettingSpec("str", "conservative", description="conservative | aggressive | sniper"),
+    "risk.daily_loss_limit_pct": SettingSpec("float", 2.5, description="দিনে সর্বোচ্চ লস (%)"),
+    "risk.max_position_pct": SettingSpec("float", 10.0, description="এক পজিশনে সর্বোচ্চ ক্যাপিটাল (%)"),
+    "risk.sizing_mode": SettingSpec("str", "dynamic", choices=("fixed", "dynamic")),
+    "risk.assets": SettingSpec("json", {"BTC": True, "ETH": True, "SOL": False, "BNB": False}),
+    "execution.mode": SettingSpec("str", "paper", choices=("paper", "live")),
+    "execution.fee_bps": SettingSpec("float", 10.0),
+    "execution.slippage_bps": SettingSpec("float", 5.0),
+}
+
+
+class SettingsRepository:
+    def __init__(self, path: str = DB_FILE, specs: Optional[Dict[str, SettingSpec]] = None):
+        self.path = path
+        self.specs = specs if specs is not None else SETTING_SPECS
+        # এক থ্রেড = SQLite এর জন্য সিরিয়ালাইজড অ্যাক্সেস, কানেকশনও এই থ্রেডেই তৈরি
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._cache: Dict[str, Any] = {}
+        self.reads = 0
+        self.writes = 0
+
+    def register(self, key: str, spec: SettingSpec):
+        self.specs[key] = spec
+        self._cache.setdefault(key, spec.default)
+
+    def _spec(self, key: str) -> SettingSpec:
+        spec = self.specs.get(key)
+        if spec is None:
+            raise KeyError(f"Unknown setting: {key}")
+        return spec
+
+    async def _run(self, fn, *args):
+        if self._executor is None:
+            raise RuntimeError("Settings repository is not started")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    # ---------- লাইফসাইকেল ----------
+    async def start(self):
+        if self._executor is not None:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="settings-db")
+        rows = await self._run(self._open)
+        self._cache = {key: spec.default for key, spec in self.specs.items()}
+        for key, raw in rows:
+            spec = self.specs.get(key)
+            if spec is not None:
+                self._cache[key] = spec.decode(raw)
+        logger.info(f"🗄️ Settings loaded ({len(rows)} stored, WAL)")
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        # সেটিংস টেবিল তৈরি করা (যদি না থাকে) — পুরনো স্কিমার সাথে সামঞ্জস্য রেখে
+        conn.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)")
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(settings)")}
+        if "updated_at" not in columns:
+            conn.execute("ALTER TABLE settings ADD COLUMN updated_at REAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS settings_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT NOT NULL,
+                value TEXT,
+                changed_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_settings_history_key ON settings_history (key, id)")
+        conn.commit()
+        self._conn = conn
+        return conn.execute("SELECT key, value FROM settings").fetchall()
+
+    async def close(self):
+        if self._executor is None:
+            return
+        await self._run(self._close)
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # ---------- রিড (ক্যাশ) ----------
+    def get(self, key: str):
+        """নন-ব্লকিং: সবসময় মেমোরি ক্যাশ থেকে (start এর আগে হলে ডিফল্ট)"""
+        spec = self._spec(key)
+        self.reads += 1
+        return self._cache.get(key, spec.default)
+
+    def all(self):
+        return {key: self._cache.get(key, spec.default) for key, spec in self.specs.items()}
+
+    def apply(self, values: Dict[str, Any]):
+        """অন্য প্রসেসে লেখা ভ্যালু (বাসের SETTINGS মেসেজ) শুধু ক্যাশে — ডিস্কে লিখেছে উৎস প্রসেস"""
+        for key, value in values.items():
+            spec = self.specs.get(key)
+            if spec is not None:
+                self._cache[key] = spec.coerce(value)
+
+    # ---------- রাইট ----------
+    async def set(self, key: str, value: Any):
+        return (await self.set_many({key: value}))[key]
+
+    async def set_many(self, values: Dict[str, Any]):
+        """সব ভ্যালু যাচাই করে এক ট্রানজেকশনে লেখা; কোনোটা ভুল হলে কিছুই লেখা হয় না"""
+        coerced = {key: self._spec(key).coerce(value) for key, value in values.items()}
+        encoded = [(key, self.specs[key].encode(value)) for key, value in coerced.items()]
+        # কমিটের আগ পর্যন্ত পুরনো ভ্যালু পড়া যায়; কমিট ব্যর্থ হলে ক্যাশ অপরিবর্তিত
+        await self._run(self._write, encoded, time.time())
+        self._cache.update(coerced)
+        self.writes += 1
+        return coerced
+
+    def _write(self, encoded, now: float):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO settings (key, value, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                [(key, raw, now) for key, raw in encoded],
+            )
+            self._conn.executemany(
+                "INSERT INTO settings_history (key, value, changed_at) VALUES (?, ?, ?)",
+                [(key, raw, now) for key, raw in encoded],
+            )
+            # প্রতি কী তে শুধু সাম্প্রতিক HISTORY_LIMIT টি রাখা
+            self._conn.executemany(
+                "DELETE FROM settings_history WHERE key = ? AND id <= "
+                "(SELECT id FROM settings_history WHERE key = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                [(key, key, HISTORY_LIMIT) for key, _ in encoded],
+            )
+
+    async def reset(self, key: str):
+        spec = self._spec(key)
+        return await self.set(key, spec.default)
+
+    # ---------- হিস্টোরি ----------
+    async def history(self, key: str, limit: int = 20) -> List[dict]:
+        spec = self._spec(key)
+        rows = await self._run(self._history, key, max(1, min(limit, HISTORY_LIMIT)))
+        return [{"value": spec.decode(raw), "changed_at": changed_at} for raw, changed_at in rows]
+
+    def _history(self, key: str, limit: int):
+        return self._conn.execute(
+            "SELECT value, changed_at FROM settings_history WHERE key = ? ORDER BY id DESC LIMIT ?",
+            (key, limit),
+        ).fetchall()
+
+    def status(self):
+        return {
+            "path": self.path,
+            "open": self._conn is not None,
+            "keys": len(self.specs),
+            "reads": self.reads,
+            "writes": self.writes,
+        }
+
+
+class FillRepository:
+    """
+    পেপার ট্রেডিং এর ফিল (শুধু-অ্যাপেন্ড)। সেটিংসের মতোই নিজস্ব থ্রেড ও কানেকশন (একই WAL ফাইল),
+    আর লেখা হয় ব্যাচে — প্রতি ফিলে একটি কমিট নয়, এক্সিকিউশন ইঞ্জিনের flush এ একটি ট্রানজেকশন।
+    """
+
+    COLUMNS = ("order_id", "symbol", "side", "qty", "price", "fee", "source", "verdict", "strategy",
+               "filled_at", "latency")
+
+    def __init__(self, path: str = DB_FILE):
+        self.path = path
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self.batches = 0
+        self.rows = 0
+
+    async def _run(self, fn, *args):
+        if self._executor is None:
+            raise RuntimeError("Fill repository is not started")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def start(self):
+        if self._executor is not None:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fills-db")
+        await self._run(self._open)
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS paper_fills (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                order_id INTEGER NOT NULL,
+                symbol TEXT NOT NULL,
+                side TEXT NOT NULL,
+                qty REAL NOT NULL,
+                price REAL NOT NULL,
+                fee REAL NOT NULL,
+                source TEXT,
+                verdict TEXT,
+                strategy TEXT,
+                filled_at REAL NOT NULL,
+                latency TEXT
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_paper_fills_symbol ON paper_fills (symbol, id)")
+        conn.commit()
+        self._conn = conn
+
+    async def close(self):
+        if self._executor is None:
+            return
+        await self._run(self._close)
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def append(self, fills: List[dict]):
+        """এক ট্রানজেকশনে সব; ব্যর্থ হলে কিছুই লেখা হয় না (কলার আবার চেষ্টা করে)"""
+        if not fills:
+            return
+        rows = [tuple(json.dumps(fill[name]) if name == "latency" else fill[name] for name in self.COLUMNS)
+                for fill in fills]
+        await self._run(self._append, rows)
+        self.batches += 1
+        self.rows += len(rows)
+
+    def _append(self, rows):
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT INTO paper_fills ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                rows,
+            )
+
+    async def load(self, symbol: Optional[str] = None, limit: Optional[int] = None) -> List[dict]:
+        """পুরনো থেকে নতুন; limit দিলে সাম্প্রতিক limit টি"""
+        rows = await self._run(self._load, symbol, limit)
+        fills = []
+        for row in reversed(rows):
+            fill = dict(zip(self.COLUMNS, row))
+            fill["latency"] = json.loads(fill["latency"]) if fill["latency"] else {}
+            fills.append(fill)
+        return fills
+
+    def _load(self, symbol: Optional[str], limit: Optional[int]):
+        query = f"SELECT {', '.join(self.COLUMNS)} FROM paper_fills"
+        args: list = []
+        if symbol is not None:
+            query += " WHERE symbol = ?"
+            args.append(symbol)
+        query += " ORDER BY id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            args.append(limit)
+        return self._conn.execute(query, args).fetchall()
+
+    async def clear(self):
+        await self._run(self._clear)
+
+    def _clear(self):
+        with self._conn:
+            self._conn.execute("DELETE FROM paper_fills")
+
+    def status(self):
+        return {"path": self.path, "open": self._conn is not None, "batches": self.batches, "rows": self.rows}
+
+
+settings_repo = SettingsRepository()
+fill_repo = FillRepository()
@@ -1,17 +1,52 @@
 import asyncio
+import importlib
 import json
-import ccxt.async_support as ccxt
+import logging
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
-from typing import List
+from typing import Any, Dict, List, Optional
 
 # মডিউল ইম্পোর্ট
+# ভারী লাইব্রেরি (ccxt, pandas) এখানে ইমপোর্ট হয় না: প্রথম ব্যবহারে বা স্টার্টআপ ওয়ার্মআপে থ্রেডে
+from app.services.readiness import readiness
 from app.services.stream_engine import market_stream
-from app.services.signal_engine import signal_engine
-from app.database import init_db, get_strategy, set_strategy
+from app.services.stream_recorder import stream_recorder
+from app.services.sentiment_feed import sentiment_feed
+from app.services.trade_tape import TradeTape
+from app.services.tick_history import tick_history
+from app.services.paper_trading import paper_trader
+from app.services.market_scanner import market_scanner
+from app.services.exchange_pool import exchange_pool
+from app.services.backtest_engine import load_history, run_backtest, run_sweep
+from app.services.market_store import market_store
+from app.services.broadcast_hub import hub
+from app.services.arbitrage_engine import arbitrage_engine
+from app.services.order_book import order_book_manager
+from app.services.candle_aggregator import candle_aggregator
+from app.services.compute_executor import compute_executor
+from app.services.metrics import CONTENT_TYPE, loop_lag_monitor, registry
+from app.services.market_bus import envelope, market_bus
+from app.services.request_scheduler import UI, request_priority, request_scheduler, set_task_priority
+from app.core.config import settings
+from app.database import fill_repo, settings_repo
 
-app = FastAPI(title="Metron Hybrid Brain (Advanced)")
+logger = logging.getLogger(__name__)
+
+readiness.mark("imports")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await startup()
+    try:
+        yield
+    finally:
+        await shutdown()
+
+app = FastAPI(title="Metron Hybrid Brain (Advanced)", lifespan=lifespan)
 
 # CORS কনফিগারেশন
 app.add_middleware(
@@ -22,98 +57,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# ============================================================
-# ১. কানেকশন ম্যানেজার (With Auto-Cleaning)
-# ============================================================
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-
-    def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-
-    async def broadcast(self, message: dict):
-        # ইম্প্রুভমেন্ট ২: কানেকশন ক্লিনিং
-        # আমরা লিস্টের একটি কপি তৈরি করে লুপ চালাব যাতে রিমুভ করলে এরর না হয়
-        for connection in self.active_connections[:]:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                # যদি পাঠাতে ব্যর্থ হয়, ধরে নিব কানেকশন ডেড
-                self.disconnect(connection)
-
-manager = ConnectionManager()
-
-# ============================================================
-# ২. ব্রডকাস্ট ইঞ্জিন (With Backoff & Arbitrage)
-# ============================================================
-
-async def fetch_arbitrage_prices(symbol: str):
-    """আরবিট্রেজ প্রাইস ফেচ করার হেল্পার ফাংশন"""
-    exchanges_to_check = ['binance', 'kucoin', 'bybit', 'gateio']
-    
-    async def fetch_price(exchange_id):
-        try:
-            if hasattr(ccxt, exchange_id):
-                exchange_class = getattr(ccxt, exchange_id)
-                async with exchange_class() as exchange:
-                    # Timeout সেট করা জরুরি যাতে লুপ আটকে না থাকে
-                    exchange.timeout = 3000 
-                    ticker = await exchange.fetch_ticker(symbol)
-                    return {"exchange": exchange_id.title(), "price": ticker['last'], "logo": "🟢"}
-        except Exception:
-            # কোনো এক্সচেঞ্জ এরর দিলে আমরা চুপচাপ None রিটার্ন করব (সিস্টেম ক্র্যাশ করবে না)
-            return None
-
-    tasks = [fetch_price(ex_id) for ex_id in exchanges_to_check]
-    results = await asyncio.gather(*tasks)
-    return [r for r in results if r is not None]
+# pair → ট্রেড টেপ (/api/feed স্ট্যাটাসের জন্য)
+trade_tapes: Dict[str, TradeTape] = {}
 
 async def broadcast_market_data():
     error_count = 0
-    tick_count = 0 # ইম্প্রুভমেন্ট ৪: টাইমিং কন্ট্রোল
+    tape = trade_tapes["BTC/USDT"] = TradeTape("binance", "BTC/USDT")
+
+    # এই টাস্কের সব এক্সচেঞ্জ কল ui প্রায়োরিটিতে (বাজেটে ইঞ্জিন ও অর্ডারের পরে)
+    set_task_priority(UI)
 
     while True:
         try:
-            if not manager.active_connections:
+            if not market_bus.has_audience():
                 await asyncio.sleep(3)
                 continue
 
-            async with ccxt.binance() as exchange:
-                symbol = "BTC/USDT"
-                
-                # --- ১. সেন্টিমেন্ট (প্রতি ২ সেকেন্ডে) ---
-                ohlcv = await exchange.fetch_ohlcv(symbol, '1h', limit=100)
-                if ohlcv:
-                    sentiment_result = signal_engine.analyze_market_sentiment(ohlcv)
-                    sentiment_result["symbol"] = symbol
-                    await manager.broadcast({"type": "SENTIMENT", "payload": sentiment_result})
-
-                # --- ২. ট্রেড (প্রতি ২ সেকেন্ডে) ---
-                trades = await exchange.fetch_trades(symbol, limit=15)
-                formatted_trades = [{
-                    "id": t['id'], "price": t['price'], "amount": t['amount'], 
-                    "side": t['side'], "time": t['datetime'].split('T')[1][:8]
-                } for t in trades]
-                
-                await manager.broadcast({"type": "TRADES", "payload": formatted_trades})
-
-                # --- ৩. আরবিট্রেজ (ইম্প্রুভমেন্ট ৪: প্রতি ১০ সেকেন্ডে) ---
-                # i3 প্রসেসরে চাপ কমাতে আমরা এটি প্রতি ৫ লুপে (approx 10s) একবার চালাব
-                if tick_count % 5 == 0:
-                    arb_data = await fetch_arbitrage_prices(symbol)
-                    if arb_data:
-                        await manager.broadcast({"type": "ARBITRAGE", "payload": arb_data})
+            exchange = await exchange_pool.get("binance")
+
+            # --- ট্রেড (প্রতি ২ সেকেন্ডে) ---
+            # since কার্সর থেকে শুধু নতুন ট্রেড (id দিয়ে ডিডুপ); কিছু না এলে কিছুই পাঠানো হয় না
+            new_trades = await tape.poll(exchange)
+            if new_trades:
+                # পুরনো ফিড আগের মতো সাম্প্রতিক পুরো লিস্ট পায়, টপিক সাবস্ক্রাইবাররা শুধু নতুনগুলো
+                snapshot = tape.snapshot()
+                await market_bus.broadcast({"type": "TRADES", "payload": snapshot["payload"]})
+                await market_bus.publish(tape.topic, {"type": "TRADES", "topic": tape.topic, "payload": new_trades},
+                                         snapshot=snapshot)
 
             # সফল হলে এরর কাউন্ট রিসেট
             error_count = 0 
-            tick_count += 1
-            await asyncio.sleep(2)
+            # পুরো পেজ এসেছে মানে কার্সর পিছিয়ে — দেরি না করে বাকিটা
+            await asyncio.sleep(settings.TRADE_TAPE_INTERVAL if tape.caught_up else 0.2)
 
         except Exception as e:
             # ইম্প্রুভমেন্ট ১: Exponential Backoff Error Handling
@@ -123,39 +98,524 @@ async def broadcast_market_data():
             print(f"⚠️ Broadcast Error (Retry in {sleep_time}s): {e}")
             await asyncio.sleep(sleep_time)
 
+async def publish_topic(message: dict):
+    """স্ক্যানার/আরবিট্রেজের মেসেজ: পুরনো ফিড ও message["topic"] টপিক, সিরিয়ালাইজ একবারই"""
+    if message["type"] == "SENTIMENT":
+        # পেপার ট্রেডিং আগে: ভারডিক্ট বদলালে এখনই অর্ডার (ক্লায়েন্টে পাঠানোর জন্য অপেক্ষা নয়)
+        await paper_trader.on_signal(message)
+        # সাবস্ক্রাইবাররা seq সহ ডেল্টা (শুধু উল্টানো ভোট), পুরনো ফিড পুরো স্ন্যাপশট; না বদলালে কিছুই না
+        update, snapshot = sentiment_feed.encode(message["topic"], message["payload"])
+        if update is not None:
+            await market_bus.publish(message["topic"], update, legacy=True, snapshot=snapshot)
+        return
+    await market_bus.publish(message["topic"], message, legacy=True)
+
+async def publish_book(message: dict):
+    """অর্ডার বুক শুধু book:pair টপিকের সাবস্ক্রাইবারদের (পুরনো ফিডে নয়)"""
+    await market_bus.publish(message["topic"], message)
+
+async def publish_paper(message: dict, snapshot: dict):
+    """পেপার ফিল paper:pair টপিকে (batch), স্ন্যাপশটে সাম্প্রতিক ফিল, পজিশন ও অ্যাকাউন্ট"""
+    await market_bus.publish(message["topic"], message, snapshot=snapshot)
+
+def signals_wanted():
+    """স্ক্যানার চলবে কিনা: ক্লায়েন্ট আছে, বা পেপার ট্রেডিং সিগন্যাল চায়"""
+    return market_bus.has_audience() or paper_trader.running
+
+async def deliver_to_hub(item: dict):
+    """বাসের এনভেলপ লোকাল হাবে: topic না থাকলে পুরনো ফিডের broadcast"""
+    if item["topic"] is None:
+        await hub.broadcast(item["message"])
+    else:
+        if not market_bus.ingests and item["message"].get("type") == "TICKER":
+            # গেটওয়েতে স্ট্রিম নেই: বাসের টিকার থেকেই টিক হিস্ট্রি (ইনজেস্টে স্ট্রিম নিজেই লেখে)
+            data = item["message"]["data"]
+            if "ts" in data:
+                tick_history.append(data["exchange"], data["pair"], data["ts"], data["price"],
+                                    data.get("size", 0.0), data.get("side", 0))
+        if readiness.first_signal_at is None and item["topic"].startswith("sentiment:"):
+            readiness.signal()
+        await hub.publish(item["topic"], item["message"], legacy=item["legacy"], snapshot=item.get("snapshot"))
+
+def hub_snapshot():
+    # নতুন/রিকানেক্ট করা গেটওয়ে আগে ইনজেস্টের সেটিংস পায় (বিচ্ছিন্ন থাকাকালীন বদল মিস না হয়)
+    return [{"control": settings_message(settings_repo.all())}] + \
+        [envelope(topic, message, snapshot=message) for topic, message in hub.latest_messages()]
+
+def settings_message(values: dict):
+    return {"type": "SETTINGS", "values": values}
+
+async def apply_control(message: dict):
+    """বাসের কন্ট্রোল মেসেজ: অন্য প্রসেসে (গেটওয়ে ওয়ার্কার/ইনজেস্ট) বদলানো সেটিংস এই প্রসেসের ক্যাশে"""
+    if message.get("type") == "SETTINGS":
+        settings_repo.apply(message["values"])
+
+async def pump_ticker_stream():
+    """LiveMarketStream এর টিক কিউ থেকে ticker:exchange:pair টপিকে (হাবে কনফ্লেশন হয়)"""
+    queue = await market_stream.subscribe()
+    try:
+        while True:
+            tick = await queue.get()
+            if tick["type"] != "TICKER":
+                continue
+            data = tick["data"]
+            topic = f"ticker:{data['exchange']}:{data['pair']}"
+            await market_bus.publish(topic, {"type": "TICKER", "topic": topic, "data": data})
+    finally:
+        await market_stream.unsubscribe(queue)
+
 # ============================================================
-# ৩. সিস্টেম ইভেন্টস ও API
+# সিস্টেম ইভেন্টস ও API
 # ============================================================
-@app.on_event("startup")
-async def startup_event():
-    init_db()
-    loop = asyncio.get_event_loop()
-    loop.create_task(market_stream.start_engine())
-    loop.create_task(broadcast_market_data())
+# ব্যাকগ্রাউন্ড টাস্ক: শাটডাউনে ক্যানসেল করে শেষ হওয়া পর্যন্ত অপেক্ষা
+background_tasks: List[asyncio.Task] = []
+
+def spawn(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    background_tasks.append(task)
+    return task
+
+async def startup():
+    """দ্রুত অংশ: সেটিংস, মেট্রিক, বাস — এরপরই সার্ভার রিকোয়েস্ট নেয় (/health); বাকিটা ওয়ার্মআপে"""
+    # সব চেক আগে রেজিস্টার, নইলে প্রথম পাস হওয়া চেকেই ready হয়ে যেত
+    readiness.require("settings", "bus")
+    # সেটিংস একবার লোড করে মেমোরিতে; এরপর রিড ডিস্কে যায় না
+    await settings_repo.start()
+    readiness.passed("settings")
+    if settings.METRICS_ENABLED:
+        loop_lag_monitor.start()
+    # মার্কেট ডাটা বাস; gateway রোলে এখানেই শেষ — টিক/সিগন্যাল আসে ইনজেস্ট প্রসেস থেকে
+    await market_bus.start(deliver_to_hub, local_audience=lambda: len(hub.clients), snapshot=hub_snapshot,
+                           control=apply_control)
+    if not market_bus.ingests:
+        spawn(wait_for_bus())
+        return
+    readiness.require("markets", "compute", "indicators", "engines")
+    readiness.passed("bus")
+    spawn(warmup())
+
+async def wait_for_bus():
+    """গেটওয়ে: ইনজেস্টের সাথে কানেক্ট হলে তবেই রেডি (রেডিস ট্রান্সপোর্টে connected নেই — সাথে সাথে)"""
+    while not market_bus.transport.status().get("connected", True):
+        await asyncio.sleep(0.2)
+    readiness.passed("bus")
+
+async def warmup():
+    """
+    ভারী অংশ ব্যাকগ্রাউন্ডে, সব শেষে /ready 200:
+    ccxt ইমপোর্ট (থ্রেডে) → মার্কেট লোড ও কম্পিউট ওয়ার্কার একসাথে → লোকাল স্টোর থেকে ইন্ডিকেটর স্টেট → ইঞ্জিন।
+    """
+    # লাইভ স্ট্রিম সবার আগে: টিক আসতে থাকুক, ওয়েবসকেট ক্লায়েন্ট প্রথম থেকেই দাম পায়
+    spawn(market_stream.start_engine())
+    spawn(pump_ticker_stream())
+    # ccxt ইমপোর্ট ~০.৫s — থ্রেডে, লুপ টিক/ওয়েবসকেট সার্ভ করতে থাকে
+    await asyncio.to_thread(importlib.import_module, "ccxt.async_support")
+    readiness.mark("ccxt")
+    exchange_pool.start_health_checks()
+    # ইন্ডিকেটর হিসাব ওয়ার্কারে (লুপ ওয়েবসকেট/টিক সার্ভ করতে থাকে)
+    await asyncio.gather(spawn(load_markets()), spawn(start_compute()))
+    await preload_indicators()
+    await start_engines()
+    readiness.passed("engines")
+
+async def load_markets():
+    """স্ক্যানারের এক্সচেঞ্জের মার্কেট রেডিনেসের শর্ত; বাকিগুলো ব্যাকগ্রাউন্ডে (ব্যর্থ হলে প্রথম ব্যবহারে লোড হবে)"""
+    # আরবিট্রেজের এক্সচেঞ্জগুলো (আইডি সেটিংস থেকে, হার্ড-কোড নয়)
+    others = [ex_id for ex_id in settings.ARBITRAGE_EXCHANGES if ex_id != settings.SCANNER_EXCHANGE]
+    spawn(exchange_pool.warmup(others))
+    error_count = 0
+    while True:
+        try:
+            await asyncio.wait_for(exchange_pool.get(settings.SCANNER_EXCHANGE), settings.STARTUP_MARKETS_TIMEOUT)
+            readiness.passed("markets")
+            return
+        except Exception as e:
+            error_count += 1
+            readiness.failed("markets", e)
+            logger.warning(f"⚠️ Market load failed for {settings.SCANNER_EXCHANGE}: {e}")
+            await asyncio.sleep(min(30, 2 * error_count))
+
+async def start_compute():
+    await compute_executor.start()
+    readiness.passed("compute")
+
+async def preload_indicators():
+    """
+    লোকাল স্টোরে যে (symbol, timeframe) এর ক্যান্ডেল আছে তা দিয়ে ওয়ার্কারের ইন্ডিকেটর স্টেট গরম করা —
+    স্ক্যানারের প্রথম সিগন্যাল তখন ফুল রিকম্পিউট নয়, ইনক্রিমেন্টাল আপডেট।
+    """
+    if not settings.STARTUP_PRELOAD_INDICATORS:
+        readiness.passed("indicators")
+        return
+    keys = [(symbol, timeframe) for symbol in settings.SCANNER_SYMBOLS for timeframe in settings.SCANNER_TIMEFRAMES]
+
+    async def preload(symbol: str, timeframe: str):
+        ohlcv = market_store.candles(settings.SCANNER_EXCHANGE, symbol, timeframe, limit=settings.SCANNER_CANDLES)
+        if len(ohlcv):
+            await compute_executor.analyze(ohlcv, symbol, timeframe)
+        return len(ohlcv) > 0
+
+    results = await asyncio.gather(*(preload(*key) for key in keys), return_exceptions=True)
+    for key, result in zip(keys, results):
+        if isinstance(result, Exception):
+            logger.warning(f"⚠️ Indicator preload failed for {key}: {result}")
+    warmed = sum(1 for result in results if result is True)
+    logger.info(f"🔥 Indicator state preloaded for {warmed}/{len(keys)} series from the local store")
+    readiness.passed("indicators")
+
+async def start_engines():
+    spawn(broadcast_market_data())
+    # মাল্টি-সিম্বল, মাল্টি-টাইমফ্রেম সেন্টিমেন্ট স্ক্যানার
+    # লোকাল অর্ডার বুক: book:pair টপিক ও সেন্টিমেন্টের ইমব্যালান্স ভোট
+    await order_book_manager.start(publish_book)
+    # লাইভ ট্রেড থেকে ক্যান্ডেল: স্ট্রিম চললে স্ক্যানার ওই জবের REST পোলিং বাদ দেয়
+    if settings.CANDLE_AGGREGATOR and settings.SCANNER_EXCHANGE == "binance":
+        await candle_aggregator.start(publish_topic, book_metrics=order_book_manager.metrics)
+    # পেপার ট্রেডিং: স্ক্যানার/অ্যাগ্রিগেটরের ভারডিক্ট publish_topic দিয়ে সরাসরি আসে
+    if settings.PAPER_TRADING:
+        await paper_trader.start(publish_paper)
+    await market_scanner.start(publish_topic, is_active=signals_wanted,
+                               book_metrics=order_book_manager.metrics,
+                               streamed=candle_aggregator.streaming)
+    # আরবিট্রেজ: লাইভ বুক মেমোরিতে, বদলালে arbitrage:pair টপিকে
+    await arbitrage_engine.start(publish_topic, is_active=market_bus.has_audience)
+
+async def shutdown():
+    # আগে রেডিনেস বন্ধ (নতুন ট্রাফিক নয়), তারপর ওয়ার্মআপসহ সব ব্যাকগ্রাউন্ড টাস্ক, শেষে সার্ভিস
+    readiness.stop()
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
+    await market_scanner.stop()
+    await candle_aggregator.stop()
+    await arbitrage_engine.stop()
+    await paper_trader.stop()
+    await order_book_manager.stop()
+    await market_stream.stop_engine()
+    await compute_executor.stop()
+    await market_bus.stop()
+    await exchange_pool.close_all()
+    await loop_lag_monitor.stop()
+    await settings_repo.close()
+
+@app.get("/health")
+async def get_health():
+    """লাইভনেস: প্রসেস ও ইভেন্ট লুপ সাড়া দিচ্ছে (ওয়ার্মআপ চলাকালীনও 200)"""
+    return {"status": "ok", "role": market_bus.role, "uptime": round(readiness.uptime(), 3)}
+
+@app.get("/ready")
+async def get_ready():
+    """রেডিনেস: সব স্টার্টআপ চেক পাস হলে 200, নইলে 503 (কোন চেক বাকি ও কেন)"""
+    status = readiness.status()
+    if not status["ready"]:
+        return JSONResponse(status, status_code=503)
+    return status
 
 class StrategyRequest(BaseModel):
     strategy: str
 
 @app.get("/api/strategy")
 async def get_bot_strategy():
-    return {"strategy": get_strategy()}
+    return {"strategy": settings_repo.get("strategy")}
 
 @app.post("/api/strategy")
 async def set_bot_strategy(req: StrategyRequest):
-    set_strategy(req.strategy)
+    value = await settings_repo.set("strategy", req.strategy)
+    # ক্যাশ প্রতি প্রসেসে: বাকি গেটওয়ে ওয়ার্কার ও ইনজেস্টকে (পেপার ট্রেডার) জানানো
+    await market_bus.notify(settings_message({"strategy": value}))
     return {"status": "success", "message": f"Strategy switched to {req.strategy}"}
 
+class SettingsRequest(BaseModel):
+    values: Dict[str, Any]
+
+@app.get("/api/settings")
+async def get_settings():
+    return {
+        "values": settings_repo.all(),
+        "specs": {key: spec.describe() for key, spec in settings_repo.specs.items()},
+    }
+
+@app.put("/api/settings")
+async def update_settings(req: SettingsRequest):
+    # সব কী একসাথে যাচাই ও এক ট্রানজেকশনে লেখা
+    try:
+        values = await settings_repo.set_many(req.values)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await market_bus.notify(settings_message(values))
+    return {"status": "success", "values": values}
+
+@app.get("/api/settings/{key}/history")
+async def get_setting_history(key: str, limit: int = Query(20, ge=1, le=100)):
+    try:
+        return {"key": key, "history": await settings_repo.history(key, limit)}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+
+def _require_ingest(component: str = "Market stream"):
+    """ইঞ্জিনের স্টেট শুধু ইনজেস্ট প্রসেসে — গেটওয়েতে খালি উত্তরের বদলে 409"""
+    if not market_bus.ingests:
+        raise HTTPException(status_code=409, detail=f"{component} runs in the ingest process (role: {market_bus.role})")
+
+def _bus_latest(topic: str):
+    """গেটওয়ে: ইনজেস্টের শেষ পাঠানো মেসেজ (হাবে রাখা) — এখনো না এলে 404"""
+    message = hub.latest(topic)
+    if message is None:
+        raise HTTPException(status_code=404, detail=f"No data on the bus yet for {topic}")
+    return message
+
 # ফলব্যাক API (যদি সকেট কানেক্ট না হয়)
 @app.get("/api/arbitrage")
 async def get_arbitrage(symbol: str = Query("BTC/USDT")):
-    data = await fetch_arbitrage_prices(symbol)
-    return {"data": data}
+    if not market_bus.ingests:
+        message = _bus_latest(f"arbitrage:{symbol}")
+        opportunities = message.get("opportunities", [])
+        return {"symbol": symbol, "data": message["payload"], "opportunities": opportunities,
+                "best": opportunities[0] if opportunities else None}
+    # মেমোরির স্ন্যাপশট — অনুরোধে কোনো এক্সচেঞ্জ কল হয় না
+    snapshot = arbitrage_engine.snapshot(symbol)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"Symbol not tracked: {symbol} (tracked: {list(arbitrage_engine.books)})")
+    return snapshot
+
+@app.get("/api/orderbook")
+async def get_order_book(symbol: str = Query("BTC/USDT"), depth: int = Query(20, ge=1, le=500)):
+    if not market_bus.ingests:
+        # বাসে ORDER_BOOK_PUBLISH_DEPTH লেভেল পর্যন্তই আসে
+        view = _bus_latest(f"book:{symbol}")["payload"]
+        return {**view, "bids": view["bids"][:depth], "asks": view["asks"][:depth]}
+    if symbol not in order_book_manager.books:
+        raise HTTPException(status_code=404, detail=f"Symbol not tracked: {symbol} (tracked: {list(order_book_manager.books)})")
+    view = order_book_manager.view(symbol, depth)
+    if view is None:
+        raise HTTPException(status_code=503, detail="Order book is syncing")
+    return view
+
+@app.get("/api/orderbook/status")
+async def get_order_book_status():
+    _require_ingest("Order book")
+    return {"books": order_book_manager.status()}
+
+@app.get("/api/arbitrage/status")
+async def get_arbitrage_status():
+    _require_ingest("Arbitrage engine")
+    return arbitrage_engine.status()
+
+@app.get("/api/exchanges/health")
+async def get_exchange_health():
+    _require_ingest("Exchange pool")
+    return {"exchanges": exchange_pool.status()}
+
+@app.get("/api/exchanges/scheduler")
+async def get_exchange_scheduler():
+    _require_ingest("Exchange pool")
+    return {"exchanges": request_scheduler.status()}
+
+@app.get("/api/store")
+async def get_store_status():
+    return {"series": market_store.status()}
+
+@app.get("/api/stream")
+async def get_stream_status():
+    _require_ingest()
+    return market_stream.status()
+
+class RecordRequest(BaseModel):
+    name: Optional[str] = None           # STREAM_RECORD_DIR এর ভেতরের ফাইলের নাম; না দিলে টাইমস্ট্যাম্প
+
+class ReplayRequest(BaseModel):
+    name: str
+    speed: float = 1.0                   # 1 = আসল গতি, N = N গুণ, 0 = যত দ্রুত সম্ভব
+    loop: bool = False
+
+@app.post("/api/stream/record")
+async def start_stream_recording(req: RecordRequest):
+    _require_ingest()
+    try:
+        path = await market_stream.start_recording(stream_recorder.resolve(req.name))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"status": "recording", "path": path}
+
+@app.delete("/api/stream/record")
+async def stop_stream_recording():
+    _require_ingest()
+    await market_stream.stop_recording()
+    return stream_recorder.status()
+
+@app.get("/api/stream/recordings")
+async def list_stream_recordings():
+    directory = settings.STREAM_RECORD_DIR
+    names = sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+    return {"recordings": [{"name": name, "bytes": os.path.getsize(os.path.join(directory, name))} for name in names]}
+
+@app.post("/api/stream/replay")
+async def start_stream_replay(req: ReplayRequest):
+    """লাইভ সোর্স থামিয়ে রেকর্ডিং চালানো; DELETE দিলে লাইভে ফেরে"""
+    _require_ingest()
+    try:
+        await market_stream.start_replay(stream_recorder.resolve(req.name), req.speed, req.loop)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Recording not found: {req.name}")
+    return {"status": "replaying", "replay": market_stream.status()["replay"]}
+
+@app.delete("/api/stream/replay")
+async def stop_stream_replay():
+    _require_ingest()
+    await market_stream.stop_replay()
+    return market_stream.status()
+
+@app.get("/api/ticks")
+async def get_tick_history(exchange: str = Query("binance"), symbol: str = Query("BTC/USDT"),
+                           seconds: Optional[float] = Query(None, gt=0), ticks: Optional[int] = Query(None, gt=0)):
+    """মেমোরির টিক হিস্ট্রি: শেষ seconds সেকেন্ড বা ticks টি (কলাম-ভিত্তিক; এক্সচেঞ্জ কল হয় না)"""
+    result = tick_history.query(exchange, symbol, seconds, ticks)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"No tick history for {exchange}:{symbol}")
+    return result
+
+@app.get("/api/ticks/status")
+async def get_tick_history_status():
+    return {"series": tick_history.status()}
+
+@app.get("/api/paper")
+async def get_paper_status():
+    """পেপার ট্রেডিং: অ্যাকাউন্ট, পজিশন, কাউন্টার ও স্টেজ লেটেন্সি (p50/p99, µs)"""
+    _require_ingest("Paper trading")
+    return paper_trader.status()
+
+@app.get("/api/paper/orders")
+async def get_paper_orders(symbol: Optional[str] = Query(None), limit: int = Query(50, ge=1, le=1000)):
+    """মেমোরির সাম্প্রতিক অর্ডার (রিজেক্টেড সহ), প্রতিটির স্টেজ লেটেন্সি সহ"""
+    _require_ingest("Paper trading")
+    return {"orders": paper_trader.recent_orders(limit, symbol)}
+
+@app.get("/api/paper/fills")
+async def get_paper_fills(symbol: Optional[str] = Query(None), limit: int = Query(100, ge=1, le=5000)):
+    """ডিস্কে লেখা ফিল (ব্যাচে লেখা হয়, তাই শেষ PAPER_FLUSH_INTERVAL এর ফিল এখনো না থাকতে পারে)"""
+    _require_ingest("Paper trading")
+    if not paper_trader.running:
+        raise HTTPException(status_code=409, detail="Paper trading is not running in this process")
+    return {"fills": await fill_repo.load(symbol, limit)}
+
+@app.delete("/api/paper")
+async def reset_paper_account():
+    _require_ingest("Paper trading")
+    await paper_trader.reset()
+    return paper_trader.status()
+
+@app.get("/api/bus")
+async def get_bus_status():
+    return market_bus.status()
+
+@app.get("/api/scanner")
+async def get_scanner_status():
+    _require_ingest("Market scanner")
+    return {"jobs": market_scanner.status()}
+
+@app.get("/api/compute")
+async def get_compute_status():
+    _require_ingest("Compute executor")
+    return compute_executor.status()
+
+@app.get("/api/signal/cache")
+async def get_signal_cache():
+    _require_ingest("Compute executor")
+    return await compute_executor.cache_stats()
+
+@app.get("/api/candles/status")
+async def get_candle_status():
+    _require_ingest("Candle aggregator")
+    return candle_aggregator.status()
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus স্ক্রেপ এন্ডপয়েন্ট"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics disabled")
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+class BacktestRequest(BaseModel):
+    exchange: str = "binance"
+    symbol: str = "BTC/USDT"
+    timeframe: str = "1h"
+    since: Optional[int] = None          # ms টাইমস্ট্যাম্প; না দিলে সাম্প্রতিক limit টি ক্যান্ডেল
+    limit: int = 5000
+    params: Optional[Dict[str, float]] = None
+    thresholds: Optional[Dict[str, float]] = None
+    fee_bps: Optional[float] = None
+    slippage_bps: Optional[float] = None
+    allow_short: bool = False
+    capital: float = 10000.0
+
+class SweepRequest(BacktestRequest):
+    grid: Dict[str, List[float]]
+    sort_by: str = "total_return"
+    top: int = 20
+
+async def _load_backtest_history(req: BacktestRequest):
+    limit = min(req.limit, settings.BACKTEST_MAX_CANDLES)
+    try:
+        with request_priority(UI):
+            return await load_history(req.exchange, req.symbol, req.timeframe, req.since, limit)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"History fetch failed: {e}")
+
+def _backtest_options(req: BacktestRequest):
+    return {"fee_bps": req.fee_bps, "slippage_bps": req.slippage_bps,
+            "allow_short": req.allow_short, "capital": req.capital}
+
+@app.post("/api/backtest")
+async def backtest(req: BacktestRequest):
+    ohlcv = await _load_backtest_history(req)
+    try:
+        # CPU-ভারী কাজ থ্রেডে, যাতে লাইভ ফিড আটকে না যায়
+        result = await asyncio.to_thread(run_backtest, ohlcv, req.params, req.thresholds, **_backtest_options(req))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result.update({"exchange": req.exchange, "symbol": req.symbol, "timeframe": req.timeframe})
+    return result
+
+@app.post("/api/backtest/sweep")
+async def backtest_sweep(req: SweepRequest):
+    ohlcv = await _load_backtest_history(req)
+    try:
+        result = await run_sweep(ohlcv, req.grid, sort_by=req.sort_by, top=req.top, **_backtest_options(req))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result.update({"exchange": req.exchange, "symbol": req.symbol, "timeframe": req.timeframe})
+    return result
+
+@app.get("/api/feed")
+async def get_feed_status():
+    _require_ingest("Sentiment feed")
+    return {"sentiment": sentiment_feed.status(), "trades": [tape.status() for tape in trade_tapes.values()]}
+
+@app.get("/api/ws/metrics")
+async def get_ws_metrics():
+    return hub.metrics()
 
 @app.websocket("/ws/feed")
 async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+    client = await hub.connect(websocket)
     try:
         while True:
-            await websocket.receive_text()
-    except WebSocketDisconnect:
-        manager.disconnect(websocket)
+            # subscribe/unsubscribe কমান্ড (services/broadcast_hub.py তে প্রোটোকল)
+            # টেক্সট (JSON) বা msgpack ক্লায়েন্টের বাইনারি ফ্রেম
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            raw = message.get("bytes") if message.get("bytes") is not None else message.get("text")
+            await hub.handle_client_message(client, raw)
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: স্লো ক্লায়েন্ট হিসেবে হাব আগেই সকেট বন্ধ করে দিয়েছে
+        pass
+    finally:
+        hub.disconnect(client)
@@ -0,0 +1,330 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.exchange_pool import exchange_pool
+from app.services.stream_engine import market_stream
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# আরবিট্রেজ ইঞ্জিন
+# ------------------------------------------------------------
+# - প্রতি (exchange, pair) এর লাইভ বেস্ট বিড/আস্ক ও top-N ডেপথ মেমোরিতে
+#   Binance: combined stream এর depthN@100ms (মাল্টিপ্লেক্স চালু থাকলে), বাকিরা: fetch_order_book পোলিং
+# - কোনো কোট বদলালে শুধু সেই এক্সচেঞ্জ জড়িত (buy, sell) জোড়াগুলো আবার হিসাব
+# - নেট স্প্রেড = টেকার ফি বাদে; ডেপথ ধরে কতটুকু সাইজ লাভে এক্সিকিউট করা যায় সেটাও
+# - /api/arbitrage ক্যাশ করা স্ন্যাপশট দেয়, কোনো এক্সচেঞ্জ কল করে না
+# ============================================================
+
+BINANCE_DEPTH_LEVELS = (5, 10, 20)   # Binance partial book stream এর সাপোর্টেড লেভেল
+# কিছু এক্সচেঞ্জ শুধু নির্দিষ্ট অর্ডার বুক limit নেয়
+ORDER_BOOK_LIMITS = {"kucoin": (20, 100)}
+DEMAND_WINDOW = 60.0                  # REST এ চাওয়ার পর এতক্ষণ পোলিং চালু থাকে (ওয়েবসকেট ক্লায়েন্ট না থাকলেও)
+LOGOS = {"binance": "🟡", "kucoin": "🟢", "bybit": "🟠", "gate": "🔵"}
+
+Levels = List[Tuple[float, float]]   # [(price, qty), ...] বেস্ট থেকে খারাপের দিকে
+
+
+def _supported_limit(depth: int, allowed) -> int:
+    return next((n for n in allowed if n >= depth), allowed[-1])
+
+
+def fee_rate(exchange_id: str) -> float:
+    return settings.ARBITRAGE_FEES_BPS.get(exchange_id, settings.ARBITRAGE_DEFAULT_FEE_BPS) / 10_000
+
+
+def walk_book(asks: Levels, bids: Levels, buy_fee: float, sell_fee: float):
+    """
+    buy এক্সচেঞ্জের asks আর sell এক্সচেঞ্জের bids একসাথে হাঁটা, যতক্ষণ ফি বাদেও লাভ থাকে।
+    রিটার্ন (সাইজ, কেনার মোট খরচ, বেচার মোট আয়) — দুটোই ফি সহ।
+    """
+    size = cost = proceeds = 0.0
+    i = j = 0
+    ask_left = asks[0][1] if asks else 0.0
+    bid_left = bids[0][1] if bids else 0.0
+    while i < len(asks) and j < len(bids):
+        pay = asks[i][0] * (1 + buy_fee)
+        get = bids[j][0] * (1 - sell_fee)
+        if get <= pay:
+            break
+        qty = min(ask_left, bid_left)
+        size += qty
+        cost += qty * pay
+        proceeds += qty * get
+        ask_left -= qty
+        bid_left -= qty
+        if ask_left <= 0:
+            i += 1
+            ask_left = asks[i][1] if i < len(asks) else 0.0
+        if bid_left <= 0:
+            j += 1
+            bid_left = bids[j][1] if j < len(bids) else 0.0
+    return size, cost, proceeds
+
+
+class Quote:
+    """একটি এক্সচেঞ্জে একটি পেয়ারের top-N বুক"""
+    __slots__ = ("exchange", "bids", "asks", "updated", "source")
+
+    def __init__(self, exchange: str, bids: Levels, asks: Levels, source: str):
+        self.exchange = exchange
+        self.bids = bids
+        self.asks = asks
+        self.updated = time.time()
+        self.source = source
+
+    @property
+    def bid(self):
+        return self.bids[0][0] if self.bids else None
+
+    @property
+    def ask(self):
+        return self.asks[0][0] if self.asks else None
+
+    def is_stale(self, now: float):
+        return now - self.updated > settings.ARBITRAGE_STALE_SECONDS
+
+    def row(self):
+        bid, ask = self.bid, self.ask
+        mid = (bid + ask) / 2 if bid is not None and ask is not None else (bid or ask)
+        return {
+            # পুরনো ফরম্যাট (exchange, price, logo) এর সাথে বিড/আস্ক ও ডেপথ
+            "exchange": self.exchange.title(),
+            "exchange_id": self.exchange,
+            "price": mid,
+            "logo": LOGOS.get(self.exchange, "🟢"),
+            "bid": bid,
+            "ask": ask,
+            "bid_depth": sum(q for _, q in self.bids),
+            "ask_depth": sum(q for _, q in self.asks),
+            "updated": self.updated,
+            "source": self.source,
+        }
+
+
+def evaluate(buy: Quote, sell: Quote):
+    """buy এক্সচেঞ্জে আস্কে কিনে sell এক্সচেঞ্জে বিডে বেচা"""
+    if buy.ask is None or sell.bid is None:
+        return None
+    buy_fee, sell_fee = fee_rate(buy.exchange), fee_rate(sell.exchange)
+    pay = buy.ask * (1 + buy_fee)
+    get = sell.bid * (1 - sell_fee)
+    size, cost, proceeds = walk_book(buy.asks, sell.bids, buy_fee, sell_fee)
+    return {
+        "buy": buy.exchange,
+        "sell": sell.exchange,
+        "buy_price": buy.ask,
+        "sell_price": sell.bid,
+        "gross_bps": round((sell.bid - buy.ask) / buy.ask * 10_000, 2),
+        "net_bps": round((get - pay) / pay * 10_000, 2),
+        "size": size,
+        "profit": round(proceeds - cost, 8),
+        "avg_net_bps": round((proceeds - cost) / cost * 10_000, 2) if cost else 0.0,
+    }
+
+
+class PairBook:
+    """একটি পেয়ারের সব এক্সচেঞ্জের কোট ও (buy, sell) জোড়ার ফলাফল"""
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.quotes: Dict[str, Quote] = {}
+        self.spreads: Dict[Tuple[str, str], dict] = {}
+        self.version = 0
+        self.published_version = 0
+        self._snapshot: Optional[dict] = None
+
+    def update(self, quote: Quote):
+        exchange = quote.exchange
+        self.quotes[exchange] = quote
+        # শুধু এই এক্সচেঞ্জ জড়িত জোড়াগুলো — বাকিগুলোর ফল অপরিবর্তিত
+        for other, other_quote in self.quotes.items():
+            if other == exchange:
+                continue
+            for buy, sell in ((quote, other_quote), (other_quote, quote)):
+                result = evaluate(buy, sell)
+                if result is None:
+                    self.spreads.pop((buy.exchange, sell.exchange), None)
+                else:
+                    self.spreads[(buy.exchange, sell.exchange)] = result
+        self.version += 1
+        self._snapshot = None
+
+    def expire(self, now: float):
+        stale = [ex for ex, quote in self.quotes.items() if quote.is_stale(now)]
+        for exchange in stale:
+            del self.quotes[exchange]
+            for key in [k for k in self.spreads if exchange in k]:
+                del self.spreads[key]
+        if stale:
+            self.version += 1
+            self._snapshot = None
+        return stale
+
+    def snapshot(self):
+        if self._snapshot is None:
+            opportunities = sorted(self.spreads.values(), key=lambda r: r["net_bps"], reverse=True)
+            self._snapshot = {
+                "symbol": self.symbol,
+                "data": [q.row() for q in sorted(self.quotes.values(), key=lambda q: q.exchange)],
+                "opportunities": opportunities[:settings.ARBITRAGE_TOP_OPPORTUNITIES],
+                "best": opportunities[0] if opportunities else None,
+                "updated": max((q.updated for q in self.quotes.values()), default=None),
+                "version": self.version,
+            }
+        return self._snapshot
+
+
+class ArbitrageEngine:
+    """
+    কনফিগারেবল এক্সচেঞ্জ × পেয়ারের কোট রাখা ও নেট স্প্রেড হিসাব।
+    publish(message) প্রতি ARBITRAGE_PUBLISH_INTERVAL এ বদলে যাওয়া পেয়ারগুলোর জন্য কল হয়।
+    """
+
+    def __init__(self):
+        self.books: Dict[str, PairBook] = {}
+        self.exchanges: List[str] = []
+        self.tasks: List[asyncio.Task] = []
+        self.errors: Dict[Tuple[str, str], int] = {}
+        self.live: set = set()  # লাইভ স্ট্রিমে আসা এক্সচেঞ্জ
+        self.depth_kind: Optional[str] = None
+        self.publish: Optional[Callable[[dict], Awaitable[None]]] = None
+        self.is_active: Callable[[], bool] = lambda: True
+        self.last_demand = 0.0
+        self.updates = 0
+
+    def book(self, symbol: str):
+        return self.books.get(symbol)
+
+    async def start(self, publish, is_active=None,
+                    symbols: Optional[List[str]] = None,
+                    exchanges: Optional[List[str]] = None):
+        self.publish = publish
+        if is_active is not None:
+            self.is_active = is_active
+        self.exchanges = list(exchanges or settings.ARBITRAGE_EXCHANGES)
+        symbols = list(symbols or settings.ARBITRAGE_SYMBOLS)
+        self.books = {symbol: PairBook(symbol) for symbol in symbols}
+
+        if "binance" in self.exchanges and settings.BINANCE_MULTIPLEX:
+            levels = _supported_limit(settings.ARBITRAGE_DEPTH, BINANCE_DEPTH_LEVELS)
+            self.depth_kind = f"depth{levels}@100ms"
+            self.live.add("binance")
+            queue = await market_stream.subscribe()
+            self.tasks.append(asyncio.create_task(self._consume(queue)))
+            await market_stream.watch(symbols, [self.depth_kind])
+
+        for exchange_id in self.exchanges:
+            for symbol in symbols:
+                self.tasks.append(asyncio.create_task(self._poll(exchange_id, symbol)))
+        self.tasks.append(asyncio.create_task(self._publisher()))
+        logger.info(f"💱 Arbitrage engine started: {len(symbols)} pairs × {len(self.exchanges)} exchanges")
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        for task in self.tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self.tasks = []
+        if self.depth_kind:
+            await market_stream.unwatch(list(self.books), [self.depth_kind])
+            self.depth_kind = None
+        self.live.clear()
+
+    # ---------- কোট আপডেট ----------
+    def update(self, exchange_id: str, symbol: str, bids, asks, source: str = "poll"):
+        book = self.books.get(symbol)
+        if book is None:
+            return
+        depth = settings.ARBITRAGE_DEPTH
+        quote = Quote(exchange_id, [(float(p), float(q)) for p, q, *_ in bids[:depth]],
+                      [(float(p), float(q)) for p, q, *_ in asks[:depth]], source)
+        book.update(quote)
+        self.updates += 1
+
+    async def _consume(self, queue: asyncio.Queue):
+        try:
+            while True:
+                event = await queue.get()
+                if event["type"] != "DEPTH":
+                    continue
+                data = event["data"]
+                self.update(data["exchange"], data["pair"], data["bids"], data["asks"], source="stream")
+        finally:
+            await market_stream.unsubscribe(queue)
+
+    def _wanted(self):
+        return self.is_active() or time.monotonic() - self.last_demand < DEMAND_WINDOW
+
+    async def _poll(self, exchange_id: str, symbol: str):
+        interval = settings.ARBITRAGE_POLL_INTERVAL
+        allowed = ORDER_BOOK_LIMITS.get(exchange_id)
+        limit = _supported_limit(settings.ARBITRAGE_DEPTH, allowed) if allowed else settings.ARBITRAGE_DEPTH
+        await asyncio.sleep(random.uniform(0, interval))
+        key = (exchange_id, symbol)
+        while True:
+            book = self.books[symbol]
+            quote = book.quotes.get(exchange_id)
+            # লাইভ স্ট্রিম সচল থাকলে পোলিং লাগে না; স্ট্রিম থেমে গেলে পোলিং ফলব্যাক
+            streaming = exchange_id in self.live and quote is not None and quote.source == "stream" \
+                and time.time() - quote.updated < interval * 2
+            if streaming or not self._wanted():
+                await asyncio.sleep(interval)
+                continue
+            try:
+                exchange = await exchange_pool.get(exchange_id)
+                order_book = await asyncio.wait_for(exchange.fetch_order_book(symbol, limit=limit), timeout=5)
+                self.update(exchange_id, symbol, order_book["bids"], order_book["asks"])
+                self.errors.pop(key, None)
+                await asyncio.sleep(interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                errors = self.errors[key] = self.errors.get(key, 0) + 1
+                sleep_time = min(30, 2 * errors)
+                logger.warning(f"⚠️ Arbitrage fetch {exchange_id} {symbol} (Retry in {sleep_time}s): {e}")
+                await asyncio.sleep(sleep_time)
+
+    async def _publisher(self):
+        """বদলে যাওয়া পেয়ারের স্ন্যাপশট নির্দিষ্ট ইন্টারভালে (স্ট্রিমের ১০০ms আপডেট সরাসরি ক্লায়েন্টে যায় না)"""
+        while True:
+            await asyncio.sleep(settings.ARBITRAGE_PUBLISH_INTERVAL)
+            now = time.time()
+            for book in self.books.values():
+                book.expire(now)
+                if book.version == book.published_version or not self.publish:
+                    continue
+                book.published_version = book.version
+                snapshot = book.snapshot()
+                topic = f"arbitrage:{book.symbol}"
+                try:
+                    await self.publish({"type": "ARBITRAGE", "topic": topic, "payload": snapshot["data"],
+                                        "opportunities": snapshot["opportunities"]})
+                except Exception as e:
+                    logger.warning(f"⚠️ Arbitrage publish failed: {e}")
+
+    # ---------- রিড ----------
+    def snapshot(self, symbol: str):
+        """মেমোরি থেকে (বদল না হলে আগের তৈরি ডিক্ট) — REST এর জন্য"""
+        self.last_demand = time.monotonic()
+        book = self.books.get(symbol)
+        return book.snapshot() if book is not None else None
+
+    def status(self):
+        return {
+            "exchanges": self.exchanges,
+            "symbols": list(self.books),
+            "live": sorted(self.live),
+            "updates": self.updates,
+            "errors": {f"{ex}:{sym}": n for (ex, sym), n in self.errors.items()},
+        }
+
+
+arbitrage_engine = ArbitrageEngine()
@@ -0,0 +1,238 @@
+import asyncio
+import itertools
+import logging
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.batch_signal import compute_votes, TS, OPEN, CLOSE
+from app.services.indicator_stream import DEFAULT_PARAMS, MIN_CANDLES
+from app.services.exchange_pool import exchange_pool
+from app.services.market_store import market_store
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# ব্যাকটেস্ট ইঞ্জিন
+# ------------------------------------------------------------
+# ১. ইতিহাসের সব ক্যান্ডেলের ২০টি ভোট একবারে (batch_signal.compute_votes)
+# ২. স্কোর থেকে টার্গেট পজিশন: STRONG → পুরো সাইজ, সাধারণ BUY/SELL → অর্ধেক
+# ৩. ক্যান্ডেল t এর ক্লোজে সিগন্যাল, ফিল হয় t+1 এর ওপেনে (লুক-অ্যাহেড নেই)
+# ৪. প্রতিটি পজিশন পরিবর্তনে ফি + স্লিপেজ (bps, ট্রেড করা নোশনালের উপর)
+# প্যারামিটার সুইপে ইন্ডিকেটর লেংথ প্রতি একবার ভোট হিসাব হয়, থ্রেশহোল্ডগুলো তার উপর সস্তায় চলে।
+# ============================================================
+
+# analyze_market_sentiment এর VERDICT_LEVELS এর সমান ডিফল্ট
+DEFAULT_THRESHOLDS = {"strong_buy": 6, "buy": 2, "sell": -2, "strong_sell": -6}
+WEAK_POSITION = 0.5
+EQUITY_POINTS = 500
+SORT_METRICS = ("total_return", "max_drawdown", "sharpe", "hit_rate", "avg_trade")
+YEAR_MS = 365 * 24 * 60 * 60 * 1000
+
+
+def _resolve_params(params):
+    """ইন্ডিকেটর প্যারামিটার যাচাই; লেংথগুলো int, মাল্টিপ্লায়ারগুলো float থাকে"""
+    resolved = dict(DEFAULT_PARAMS)
+    for key, value in (params or {}).items():
+        if key not in DEFAULT_PARAMS:
+            raise ValueError(f"Unknown indicator parameter: {key}")
+        resolved[key] = type(DEFAULT_PARAMS[key])(value)
+    return resolved
+
+
+def _resolve_thresholds(thresholds):
+    resolved = dict(DEFAULT_THRESHOLDS)
+    for key, value in (thresholds or {}).items():
+        if key not in DEFAULT_THRESHOLDS:
+            raise ValueError(f"Unknown threshold: {key}")
+        resolved[key] = value
+    if not resolved["strong_sell"] <= resolved["sell"] < resolved["buy"] <= resolved["strong_buy"]:
+        raise ValueError("Thresholds must satisfy strong_sell <= sell < buy <= strong_buy")
+    return resolved
+
+
+def target_positions(score, thresholds, allow_short=False):
+    """প্রতি ক্যান্ডেলের স্কোর থেকে টার্গেট পজিশন (-1 .. +1)"""
+    target = np.zeros(score.shape)
+    target[score >= thresholds["buy"]] = WEAK_POSITION
+    target[score >= thresholds["strong_buy"]] = 1.0
+    if allow_short:
+        target[score <= thresholds["sell"]] = -WEAK_POSITION
+        target[score <= thresholds["strong_sell"]] = -1.0
+    # প্রথম MIN_CANDLES-1 ক্যান্ডেলে লাইভ ইঞ্জিন "LOADING..." দেখায়, তাই ফ্ল্যাট
+    target[:MIN_CANDLES - 1] = 0.0
+    return target
+
+
+def simulate(ohlcv, score, thresholds=None, fee_bps=None, slippage_bps=None,
+             allow_short=False, capital=10000.0, equity_curve=True):
+    """
+    একটি সিম্বলের (T, 6) ক্যান্ডেল ও (T,) স্কোর থেকে ইকুইটি, ড্রডাউন ও ট্রেড পরিসংখ্যান।
+    পুরোটাই ভেক্টরাইজড, তাই সুইপের প্রতিটি কম্বিনেশনে খরচ কয়েক মিলিসেকেন্ড।
+    """
+    thresholds = _resolve_thresholds(thresholds)
+    fee_bps = settings.BACKTEST_FEE_BPS if fee_bps is None else fee_bps
+    slippage_bps = settings.BACKTEST_SLIPPAGE_BPS if slippage_bps is None else slippage_bps
+    cost_rate = (fee_bps + slippage_bps) / 10000.0
+
+    opens, closes, ts = ohlcv[:, OPEN], ohlcv[:, CLOSE], ohlcv[:, TS]
+    T = len(closes)
+    # ক্যান্ডেল t তে ধরা পজিশন = আগের ক্যান্ডেলের সিগন্যাল (ওপেন থেকে পরের ওপেন পর্যন্ত)
+    position = np.zeros(T)
+    position[1:] = target_positions(score, thresholds, allow_short)[:-1]
+    bar_return = np.empty(T)
+    bar_return[:-1] = opens[1:] / opens[:-1] - 1.0
+    bar_return[-1] = closes[-1] / opens[-1] - 1.0
+
+    turnover = np.abs(np.diff(position, prepend=0.0))
+    growth = 1.0 + position * bar_return - turnover * cost_rate
+    equity = capital * np.cumprod(growth)
+    peak = np.maximum.accumulate(np.maximum(equity, capital))
+    drawdown = equity / peak - 1.0
+
+    # ট্রেড = একই দিকের (লং/শর্ট) টানা পজিশন; সাইজ বদলালেও একই ট্রেড ধরা হয়
+    side = np.sign(position)
+    starts = np.flatnonzero(np.diff(side, prepend=0.0) != 0)
+    ends = np.append(starts[1:], T)
+    active = side[starts] != 0
+    starts, ends = starts[active], ends[active]
+    log_growth = np.log(np.maximum(growth, 1e-12))
+    cum_log = np.concatenate([[0.0], np.cumsum(log_growth)])
+    # এক্সিট খরচ পরের ক্যান্ডেলে কাটা হয়, তাই ট্রেডের রিটার্নে আলাদা করে যোগ
+    exit_cost = np.where(ends < T, np.abs(position[ends - 1]) * cost_rate, 0.0)
+    trade_returns = np.exp(cum_log[ends] - cum_log[starts]) * (1.0 - exit_cost) - 1.0
+    wins = int((trade_returns > 0).sum())
+
+    bar_ms = float(np.median(np.diff(ts))) if T > 1 else 0.0
+    std = float(log_growth.std())
+    sharpe = float(log_growth.mean() / std * math.sqrt(YEAR_MS / bar_ms)) if std > 0 and bar_ms > 0 else 0.0
+
+    result = {
+        "final_equity": round(float(equity[-1]), 2),
+        "total_return": round(float(equity[-1] / capital - 1.0) * 100, 4),
+        "buy_and_hold": round(float(closes[-1] / opens[0] - 1.0) * 100, 4),
+        "max_drawdown": round(float(drawdown.min()) * 100, 4),
+        "sharpe": round(sharpe, 4),
+        "trades": len(trade_returns),
+        "wins": wins,
+        "hit_rate": round(wins / len(trade_returns) * 100, 2) if len(trade_returns) else 0.0,
+        "avg_trade": round(float(trade_returns.mean()) * 100, 4) if len(trade_returns) else 0.0,
+        "exposure": round(float((position != 0).mean()) * 100, 2),
+        "fees_paid": round(float((turnover * cost_rate * np.concatenate([[capital], equity[:-1]])).sum()), 2),
+    }
+    if equity_curve:
+        # ফ্রন্টএন্ড চার্টের জন্য সর্বোচ্চ EQUITY_POINTS টি পয়েন্ট
+        step = max(1, T // EQUITY_POINTS)
+        idx = np.append(np.arange(0, T, step), T - 1) if (T - 1) % step else np.arange(0, T, step)
+        result["equity_curve"] = [
+            {"timestamp": int(ts[i]), "equity": round(float(equity[i]), 2),
+             "drawdown": round(float(drawdown[i]) * 100, 4)}
+            for i in idx
+        ]
+    return result
+
+
+def run_backtest(ohlcv, params=None, thresholds=None, **options):
+    """একটি প্যারামিটার সেটে পুরো ব্যাকটেস্ট (ব্লকিং; API থেকে থ্রেডে চালানো হয়)"""
+    data = np.asarray(ohlcv, dtype=np.float64)
+    if data.ndim != 2 or len(data) < MIN_CANDLES + 1:
+        raise ValueError(f"Backtest needs at least {MIN_CANDLES + 1} candles")
+    params = _resolve_params(params)
+    score = compute_votes(data, params)[0].sum(axis=1)
+    result = simulate(data, score, thresholds, **options)
+    result["candles"] = len(data)
+    result["params"] = params
+    result["thresholds"] = _resolve_thresholds(thresholds)
+    return result
+
+
+# ============================================================
+# মাল্টি-প্রসেস প্যারামিটার সুইপ
+# ============================================================
+_worker_ohlcv = None
+
+
+def _init_worker(ohlcv):
+    # ক্যান্ডেল অ্যারে প্রতি ওয়ার্কারে একবারই পাঠানো হয়, প্রতি টাস্কে নয়
+    global _worker_ohlcv
+    _worker_ohlcv = ohlcv
+
+
+def _sweep_task(params, threshold_grid, options):
+    """এক সেট ইন্ডিকেটর প্যারামিটারে ভোট একবার, তারপর সব থ্রেশহোল্ড কম্বিনেশন"""
+    score = compute_votes(_worker_ohlcv, params)[0].sum(axis=1)
+    rows = []
+    for thresholds in threshold_grid:
+        try:
+            result = simulate(_worker_ohlcv, score, thresholds, equity_curve=False, **options)
+        except ValueError:
+            continue  # অবৈধ থ্রেশহোল্ড অর্ডার (যেমন buy > strong_buy) বাদ
+        result["params"] = {k: v for k, v in params.items() if v != DEFAULT_PARAMS[k]}
+        result["thresholds"] = _resolve_thresholds(thresholds)
+        rows.append(result)
+    return rows
+
+
+def _expand(grid, keys):
+    keys = [k for k in keys if k in grid]
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+async def run_sweep(ohlcv, grid: Dict[str, List[float]], sort_by="total_return", top=20,
+                    workers: Optional[int] = None, **options):
+    """
+    grid এর প্রতিটি কী একটি থ্রেশহোল্ড (strong_buy, buy, sell, strong_sell) অথবা
+    ইন্ডিকেটর প্যারামিটার (DEFAULT_PARAMS এর কী)। সব কম্বিনেশন প্রসেস পুলে চলে।
+    """
+    data = np.asarray(ohlcv, dtype=np.float64)
+    if data.ndim != 2 or len(data) < MIN_CANDLES + 1:
+        raise ValueError(f"Backtest needs at least {MIN_CANDLES + 1} candles")
+    if sort_by not in SORT_METRICS:
+        raise ValueError(f"sort_by must be one of {SORT_METRICS}")
+    unknown = set(grid) - set(DEFAULT_THRESHOLDS) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown sweep keys: {sorted(unknown)}")
+
+    param_grid = [_resolve_params(p) for p in _expand(grid, DEFAULT_PARAMS)]
+    threshold_grid = _expand(grid, DEFAULT_THRESHOLDS)
+    combinations = len(param_grid) * len(threshold_grid)
+    if combinations > settings.BACKTEST_MAX_COMBINATIONS:
+        raise ValueError(f"Sweep too large: {combinations} > {settings.BACKTEST_MAX_COMBINATIONS} combinations")
+
+    workers = min(workers or settings.BACKTEST_WORKERS, len(param_grid))
+    logger.info(f"🧪 Sweep: {combinations} combinations, {len(param_grid)} vote passes on {workers} workers")
+    # spawn: সার্ভার প্রসেসে অনেক থ্রেড (settings-db, fills-db, ccxt) চলে, fork এ লক আটকে থাকতে পারে
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data,),
+                               mp_context=multiprocessing.get_context("spawn"))
+    try:
+        # প্রথম submit এ ওয়ার্কার spawn হয় (ইন্টারপ্রেটার চালু হয়ে initargs পড়া পর্যন্ত পাইপে আটকে থাকে) — থ্রেডে
+        futures = await asyncio.to_thread(
+            lambda: [pool.submit(_sweep_task, params, threshold_grid, options) for params in param_grid])
+        chunks = await asyncio.gather(*(asyncio.wrap_future(future) for future in futures))
+    finally:
+        # রিকোয়েস্ট ক্যানসেল হলে বাকি কম্বিনেশন বাদ; চলমানগুলোর অপেক্ষা থ্রেডে (with এর shutdown লুপ আটকাত)
+        await asyncio.to_thread(pool.shutdown, True, cancel_futures=True)
+
+    rows = [row for chunk in chunks for row in chunk]
+    # max_drawdown নেগেটিভ শতাংশ, তাই সব মেট্রিকেই বড় মান ভালো
+    rows.sort(key=lambda row: row[sort_by], reverse=True)
+    return {"combinations": len(rows), "candles": len(data), "results": rows[:top]}
+
+
+# ============================================================
+# ইতিহাস লোড (লোকাল স্টোর থেকে; শুধু মিসিং রেঞ্জ এক্সচেঞ্জ থেকে আসে)
+# ============================================================
+async def load_history(exchange_id: str, symbol: str, timeframe: str,
+                       since: Optional[int] = None, limit: int = 5000):
+    """since থেকে limit টি (since না দিলে সাম্প্রতিক limit টি) ক্যান্ডেলের memmap উইন্ডো"""
+    if since is None:
+        return await market_store.sync_candles(exchange_id, symbol, timeframe, limit=limit)
+    # শুধু চাওয়া রেঞ্জ — until ছাড়া backfill since থেকে এখন পর্যন্ত সব পেজ আনত (শেয়ার্ড রিকোয়েস্ট বাজেট থেকে)
+    exchange = await exchange_pool.get(exchange_id)
+    until = since + limit * exchange.parse_timeframe(timeframe) * 1000
+    window = await market_store.backfill(exchange_id, symbol, timeframe, since, until=until)
+    return window[:limit]
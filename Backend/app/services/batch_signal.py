@@ -0,0 +1,403 @@
+import warnings
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.services.indicator_stream import DEFAULT_PARAMS, EPSILON, DAY_MS, INDICATORS, _Ewm
+
+# ============================================================
+# ভেক্টরাইজড ব্যাচ সিগন্যাল ইঞ্জিন
+# ------------------------------------------------------------
+# ইনপুট: (symbols × candles × fields) আকারের অ্যারে, fields = [ts, open, high, low, close, volume]
+# আউটপুট: (symbols × candles × 20) ভোট অ্যারে (+1 BUY, -1 SELL, 0 NEUTRAL)
+# পুরো ইউনিভার্সের জন্য একবারে NumPy অপারেশন চলে; শুধু রিকার্সিভ ইন্ডিকেটরগুলো
+# (EMA/RMA, PSAR, Supertrend) সময়ের অক্ষে লুপ করে, কিন্তু সব সিম্বলের উপর একসাথে।
+# সব সিম্বলের ক্যান্ডেল সংখ্যা একই হতে হবে (NaN প্যাডিং চলবে না)।
+# ============================================================
+
+TS, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+BUY, SELL, NEUTRAL = 1, -1, 0
+
+INDICATOR_NAMES = [cls(DEFAULT_PARAMS).name for cls in INDICATORS]
+
+# এর চেয়ে কম সিম্বল হলে রিকার্সিভ লুপগুলো প্রতি রো-তে সাধারণ float এ চলে
+# (লম্বা ইতিহাসের ব্যাকটেস্টে প্রতি ধাপে NumPy কলের ওভারহেড এড়াতে)
+ROW_LOOP_MAX_SYMBOLS = 8
+
+
+def _alpha(span=None, alpha=None):
+    com = (span - 1) / 2.0 if span is not None else (1.0 - alpha) / alpha
+    return 1.0 / (1.0 + com)
+
+
+def _shift(x, n):
+    """সময়ের অক্ষে n ঘর পিছনে সরানো (শুরুতে NaN)"""
+    out = np.full_like(x, np.nan)
+    if n < x.shape[1]:
+        out[:, n:] = x[:, :-n] if n else x
+    return out
+
+
+def _windows(x, n):
+    """(S, T) থেকে (S, T, n) রোলিং উইন্ডো ভিউ; প্রথম n-1 ঘর NaN প্যাডেড (কপি ছাড়া)"""
+    pad = np.full((x.shape[0], n - 1), np.nan)
+    return sliding_window_view(np.concatenate([pad, x], axis=1), n, axis=1)
+
+
+def _rolling_mean(x, n):
+    return _windows(x, n).mean(axis=-1)
+
+
+def _rolling_sum(x, n):
+    return _windows(x, n).sum(axis=-1)
+
+
+def _rolling_max(x, n):
+    return _windows(x, n).max(axis=-1)
+
+
+def _rolling_min(x, n):
+    return _windows(x, n).min(axis=-1)
+
+
+def _ewm(x, alpha, presma=1):
+    """
+    pandas ewm(adjust=False) সব সিম্বলে একসাথে।
+    presma > 1 হলে প্রথম presma পজিশনের গড় দিয়ে সিড (pandas_ta ema/atr এর মতো),
+    তারপর প্রথম বৈধ ভ্যালু থেকে রিকারশন।
+    """
+    S, T = x.shape
+    out = np.full((S, T), np.nan)
+    seed_at = presma - 1
+    if seed_at >= T:
+        return out
+    if S <= ROW_LOOP_MAX_SYMBOLS:
+        for s, row in enumerate(x.tolist()):
+            ewm = _Ewm(alpha, presma)
+            out[s] = [ewm.feed(v, True) for v in row]
+        return out
+
+    with np.errstate(invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        prev = np.nanmean(x[:, :seed_at + 1], axis=1) if presma > 1 else x[:, 0].copy()
+    out[:, seed_at] = prev
+    old_wt = 1.0 - alpha
+    for t in range(seed_at + 1, T):
+        cur = x[:, t]
+        nxt = (old_wt * prev + alpha * cur) / (old_wt + alpha)
+        # pandas এর মতো: NaN বা একই ভ্যালু হলে আগেরটাই থাকে; আগে কিছু না থাকলে প্রথম বৈধ ভ্যালু
+        prev = np.where(np.isnan(prev), cur, np.where(np.isnan(cur) | (cur == prev), prev, nxt))
+        out[:, t] = prev
+    return out
+
+
+def _true_range(high, low, close, prenan=False):
+    prev_close = _shift(close, 1)
+    tr = np.fmax(np.abs(high - low), np.fmax(np.abs(high - prev_close), np.abs(prev_close - low)))
+    if prenan:
+        tr[:, 0] = np.nan
+    return tr
+
+
+def _vote(buy, sell=None):
+    """বুলিয়ান মাস্ক থেকে ভোট (+1/-1/0); sell না দিলে buy না হলেই SELL"""
+    if sell is None:
+        return np.where(buy, BUY, SELL).astype(np.int8)
+    return np.where(buy, BUY, np.where(sell, SELL, NEUTRAL)).astype(np.int8)
+
+
+# ============================================================
+# ২০টি ইন্ডিকেটর (analyze_market_sentiment এর ভোট লজিক অনুযায়ী)
+# ============================================================
+def _psar_row(high, low, af0, max_af):
+    """_psar_falling এর এক সিম্বলের স্কেলার সংস্করণ (একই অর্ডারে আপডেট)"""
+    T = len(high)
+    falling_out = [True] * T
+    sar_out = [0.0] * T
+    up = high[1] - high[0]
+    dn = low[0] - low[1]
+    dmn = dn if (dn > up and dn > 0) else 0.0
+    falling = abs(dmn) >= EPSILON and dmn > 0
+    ep = low[0] if falling else high[0]
+    sar = high[0] if falling else low[0]
+    af = af0
+
+    for i in range(1, T):
+        h, l = high[i], low[i]
+        sar = sar + af * (ep - sar)
+        reverse = h > sar if falling else l < sar
+        if (l < ep) if falling else (h > ep):
+            ep = l if falling else h
+            af = min(af + af0, max_af)
+        sar = max(high[i - 1], sar) if falling else min(low[i - 1], sar)
+
+        if reverse:
+            sar = ep
+            af = af0
+            falling = not falling
+            ep = l if falling else h
+        falling_out[i] = falling
+        sar_out[i] = sar
+    return falling_out, sar_out
+
+
+def _psar_falling(high, low, p):
+    S, T = high.shape
+    af0, max_af = p["psar_af"], p["psar_max_af"]
+    falling_out = np.ones((S, T), dtype=bool)
+    sar_out = np.zeros((S, T))
+    if T < 2:
+        return falling_out, sar_out
+    if S <= ROW_LOOP_MAX_SYMBOLS:
+        for s, (hi, lo) in enumerate(zip(high.tolist(), low.tolist())):
+            falling_out[s], sar_out[s] = _psar_row(hi, lo, af0, max_af)
+        return falling_out, sar_out
+
+    up = high[:, 1] - high[:, 0]
+    dn = low[:, 0] - low[:, 1]
+    dmn = np.where((dn > up) & (dn > 0), dn, 0.0)
+    falling = (np.abs(dmn) >= EPSILON) & (dmn > 0)
+    ep = np.where(falling, low[:, 0], high[:, 0])
+    sar = np.where(falling, high[:, 0], low[:, 0])
+    af = np.full(S, af0)
+
+    for i in range(1, T):
+        h, l = high[:, i], low[:, i]
+        sar = sar + af * (ep - sar)
+        # রিভার্সাল চেক হয় ক্ল্যাম্প করার আগের SAR দিয়ে (pandas_ta লুপের অর্ডার)
+        reverse = np.where(falling, h > sar, l < sar)
+        new_ep = np.where(falling, l < ep, h > ep)
+        ep = np.where(new_ep, np.where(falling, l, h), ep)
+        af = np.where(new_ep, np.minimum(af + af0, max_af), af)
+        sar = np.where(falling, np.maximum(high[:, i - 1], sar), np.minimum(low[:, i - 1], sar))
+
+        sar = np.where(reverse, ep, sar)
+        af = np.where(reverse, af0, af)
+        falling = falling ^ reverse
+        ep = np.where(reverse, np.where(falling, l, h), ep)
+        falling_out[:, i] = falling
+        sar_out[:, i] = sar
+    return falling_out, sar_out
+
+
+def _supertrend_row(close, lb_all, ub_all):
+    """_supertrend_dir এর এক সিম্বলের স্কেলার সংস্করণ"""
+    direction = [1.0] * len(close)
+    d, prev_lb, prev_ub = 1.0, lb_all[0], ub_all[0]
+    for i in range(1, len(close)):
+        c, lb, ub = close[i], lb_all[i], ub_all[i]
+        if c > prev_ub:
+            d = 1.0
+        elif c < prev_lb:
+            d = -1.0
+        else:
+            if d > 0 and lb < prev_lb:
+                lb = prev_lb
+            if d < 0 and ub > prev_ub:
+                ub = prev_ub
+        direction[i] = d
+        prev_lb, prev_ub = lb, ub
+    return direction
+
+
+def _supertrend_dir(high, low, close, p):
+    S, T = close.shape
+    n, mult = p["supertrend"], p["supertrend_multiplier"]
+    atr = _ewm(_true_range(high, low, close), _alpha(alpha=1.0 / n), presma=n)
+    hl2 = 0.5 * (high + low)
+    lb_all, ub_all = hl2 - mult * atr, hl2 + mult * atr
+
+    direction = np.ones((S, T))
+    if S <= ROW_LOOP_MAX_SYMBOLS:
+        for s, rows in enumerate(zip(close.tolist(), lb_all.tolist(), ub_all.tolist())):
+            direction[s] = _supertrend_row(*rows)
+        direction[:, :n] = np.nan
+        return direction
+
+    prev_dir = np.ones(S)
+    prev_lb, prev_ub = lb_all[:, 0], ub_all[:, 0]
+    for i in range(1, T):
+        c, lb, ub = close[:, i], lb_all[:, i], ub_all[:, i]
+        up = c > prev_ub
+        down = ~up & (c < prev_lb)
+        keep = ~up & ~down
+        d = np.where(up, 1.0, np.where(down, -1.0, prev_dir))
+        lb = np.where(keep & (d > 0) & (lb < prev_lb), prev_lb, lb)
+        ub = np.where(keep & (d < 0) & (ub > prev_ub), prev_ub, ub)
+        direction[:, i] = d
+        prev_dir, prev_lb, prev_ub = d, lb, ub
+    direction[:, :n] = np.nan
+    return direction
+
+
+def _day_cumsum(x, day):
+    """
+    প্রতি UTC দিনের সেগমেন্টে আলাদা np.cumsum — pandas এর groupby().cumsum() এর মতো একই ক্রমে যোগ।
+    আগের দিনের মোট বিয়োগ করে নয়: তাতে রাউন্ডিংয়ের অবশেষ থাকে, আর ক্লোজ ≈ VWAP এ ভোট উল্টে যায়।
+    """
+    out = np.empty_like(x)
+    shared = bool((day == day[:1]).all())  # সাধারণত সব সিম্বলের টাইমস্ট্যাম্প একই
+    for rows in ([slice(None)] if shared else range(x.shape[0])):
+        row_day = day[0] if shared else day[rows]
+        bounds = np.flatnonzero(row_day[1:] != row_day[:-1]) + 1
+        for a, b in zip(np.concatenate([[0], bounds]), np.concatenate([bounds, [len(row_day)]])):
+            out[rows, a:b] = np.cumsum(x[rows, a:b], axis=-1)
+    return out
+
+
+def _vwap(high, low, close, volume, ts):
+    """দিনভিত্তিক (UTC) অ্যাঙ্করড VWAP; দিনের শুরু থেকে ভলিউম শূন্য হলে NaN (pandas_ta এর 0/0 এর মতো)"""
+    tp = (high + low + close) / 3.0
+    day = ts // DAY_MS
+    wp_sum = _day_cumsum(tp * volume, day)
+    volume_sum = _day_cumsum(volume, day)
+    vwap = np.full_like(close, np.nan)
+    np.divide(wp_sum, volume_sum, out=vwap, where=volume_sum != 0)
+    return vwap
+
+
+def compute_votes(ohlcv, params=None):
+    """
+    সব সিম্বল ও সব ক্যান্ডেলের জন্য ২০টি ভোট।
+    ohlcv: (S, T, 6) বা (T, 6) অ্যারে; রিটার্ন (S, T, 20) int8
+    votes[:, t] মানে ohlcv[:, :t+1] দিয়ে analyze_market_sentiment চালালে যে ভোট আসত।
+    """
+    p = dict(DEFAULT_PARAMS, **(params or {}))
+    data = np.asarray(ohlcv, dtype=np.float64)
+    if data.ndim == 2:
+        data = data[None, :, :]
+    ts = data[:, :, TS]
+    high, low, close, volume = data[:, :, HIGH], data[:, :, LOW], data[:, :, CLOSE], data[:, :, VOLUME]
+    S, T = close.shape
+    votes = np.zeros((S, T, len(INDICATORS)), dtype=np.int8)
+    prev_close = _shift(close, 1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # 1. SMA
+        votes[:, :, 0] = _vote(close > _rolling_mean(close, p["sma"]))
+
+        # 2. EMA
+        ema = _ewm(close, _alpha(span=p["ema"]), presma=p["ema"])
+        votes[:, :, 1] = _vote(close > ema)
+
+        # 3. MACD
+        fast = _ewm(close, _alpha(span=p["macd_fast"]), presma=p["macd_fast"])
+        slow = _ewm(close, _alpha(span=p["macd_slow"]), presma=p["macd_slow"])
+        macd = fast - slow
+        signal = _ewm(macd, _alpha(span=p["macd_signal"]), presma=p["macd_signal"])
+        votes[:, :, 2] = _vote(macd > signal)
+
+        # 4. ADX
+        n = p["adx"]
+        rma = _alpha(alpha=1.0 / n)
+        atr = _ewm(_true_range(high, low, close, prenan=True), rma, presma=n)
+        up = high - _shift(high, 1)
+        dn = _shift(low, 1) - low
+        pos = np.where((up > dn) & (up > 0), up, 0.0)
+        neg = np.where((dn > up) & (dn > 0), dn, 0.0)
+        pos[np.abs(pos) < EPSILON] = 0.0
+        neg[np.abs(neg) < EPSILON] = 0.0
+        pos[:, 0] = neg[:, 0] = np.nan
+        k = 100.0 / atr
+        dmp = k * _ewm(pos, rma)
+        dmn = k * _ewm(neg, rma)
+        dx = 100.0 * np.abs(dmp - dmn) / (dmp + dmn)
+        adx = _ewm(dx, rma)
+        votes[:, :, 3] = np.where(adx > 25, _vote(dmp > dmn), NEUTRAL)
+
+        # 5. Parabolic SAR
+        falling, sar = _psar_falling(high, low, p)
+        bull = ~falling & (sar > 0)
+        bull[:, 0] = False
+        votes[:, :, 4] = _vote(bull)
+
+        # 6. Ichimoku (ISA বনাম ISB, kijun-1 ক্যান্ডেল শিফটেড)
+        def mid(length):
+            return 0.5 * (_rolling_max(high, length) + _rolling_min(low, length))
+        span_a = 0.5 * (mid(p["ichimoku_tenkan"]) + mid(p["ichimoku_kijun"]))
+        span_b = mid(p["ichimoku_senkou"])
+        lag = p["ichimoku_kijun"] - 1
+        votes[:, :, 5] = _vote(_shift(span_a, lag) > _shift(span_b, lag))
+
+        # 7. Supertrend
+        votes[:, :, 6] = _vote(_supertrend_dir(high, low, close, p) == 1)
+
+        # 8. RSI
+        n = p["rsi"]
+        diff = close - prev_close
+        gain = _ewm(np.where(np.isnan(diff), np.nan, np.maximum(diff, 0.0)), _alpha(alpha=1.0 / n))
+        loss = _ewm(np.where(np.isnan(diff), np.nan, np.minimum(diff, 0.0)), _alpha(alpha=1.0 / n))
+        rsi = 100.0 * gain / (gain + np.abs(loss))
+        votes[:, :, 7] = _vote(rsi < 30, rsi > 70)
+
+        # 9. Stochastic (%K = raw stoch এর smooth-SMA)
+        n = p["stoch_k"]
+        hh, ll = _rolling_max(high, n), _rolling_min(low, n)
+        rng = hh - ll
+        rng = np.where(rng == 0, EPSILON, rng)
+        raw = 100.0 * (close - ll) / rng
+        stoch_k = _rolling_mean(raw, p["stoch_smooth"])
+        votes[:, :, 8] = _vote(stoch_k < 20, stoch_k > 80)
+
+        # 10. CCI (pandas_ta 0.4.x এর ফর্মুলা হুবহু: tp - mean / (c * mad))
+        tp = (high + low + close) / 3.0
+        win = _windows(tp, p["cci"])
+        mean_tp = win.mean(axis=-1)
+        mad = np.abs(win - mean_tp[..., None]).mean(axis=-1)
+        cci = tp - mean_tp / (0.015 * mad)
+        votes[:, :, 9] = _vote(cci < -100, cci > 100)
+
+        # 11. Williams %R
+        n = p["willr"]
+        hh, ll = _rolling_max(high, n), _rolling_min(low, n)
+        willr = 100.0 * ((close - ll) / (hh - ll) - 1)
+        votes[:, :, 10] = _vote(willr < -80, willr > -20)
+
+        # 12. ROC
+        base = _shift(close, p["roc"])
+        roc = 100.0 * (close - base) / base
+        votes[:, :, 11] = _vote(roc > 0)
+
+        # 13. Bollinger Bands (ddof=1)
+        win = _windows(close, p["bbands"])
+        mid_bb = win.mean(axis=-1)
+        std = win.std(axis=-1, ddof=1)
+        votes[:, :, 12] = _vote(close < mid_bb - p["bbands_std"] * std, close > mid_bb + p["bbands_std"] * std)
+
+        # 14. ATR (ভোট সবসময় NEUTRAL)
+        votes[:, :, 13] = NEUTRAL
+
+        # 15. Keltner Channels
+        n = p["kc"]
+        basis = _ewm(close, _alpha(span=n), presma=n)
+        band = _ewm(_true_range(high, low, close), _alpha(span=n), presma=n)
+        upper, lower = basis + p["kc_scalar"] * band, basis - p["kc_scalar"] * band
+        votes[:, :, 14] = _vote(close > upper, close < lower)
+
+        # 16. Donchian Channels
+        n = p["donchian"]
+        votes[:, :, 15] = _vote(close >= _rolling_max(high, n), close <= _rolling_min(low, n))
+
+        # 17. OBV (শেষ ক্যান্ডেলের signed volume > 0)
+        votes[:, :, 16] = _vote(np.sign(diff) * volume > 0)
+
+        # 18. MFI
+        n = p["mfi"]
+        flow = tp * volume * np.where(tp > _shift(tp, 1), 1.0, -1.0)
+        gain = _rolling_sum(np.maximum(flow, 0.0), n)
+        loss = _rolling_sum(np.maximum(-flow, 0.0), n)
+        mfi = 100.0 * gain / (gain + loss + EPSILON)
+        mfi[:, :n] = np.nan
+        votes[:, :, 17] = _vote(mfi < 20, mfi > 80)
+
+        # 19. VWAP
+        votes[:, :, 18] = _vote(close > _vwap(high, low, close, volume, ts))
+
+        # 20. A/D Line (pandas_ta হুবহু: কোনো বারে high == low হলে সিম্বলের সব রেঞ্জে epsilon, তারপর
+        # cumsum আর ad[-1] > ad[-(ad_lookback+1)] — ইনক্রিমেন্টের রোলিং যোগফলে রাউন্ডিং ভোট উল্টাত)
+        rng = high - low
+        rng = np.where((rng == 0).any(axis=1, keepdims=True), rng + EPSILON, rng)
+        ad = np.cumsum((2 * close - (high + low)) * (volume / rng), axis=1)
+        votes[:, :, 19] = _vote(ad > _shift(ad, p["ad_lookback"]))
+
+    return votes
@@ -0,0 +1,484 @@
+import asyncio
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Union
+
+from fastapi import WebSocket
+
+from app.core.config import settings
+from app.services.metrics import WS_CONFLATED, WS_DROPPED, WS_RECEIVED, WS_SENT, registry
+from app.services.serializers import CLIENT_FORMATS, Frames, json_codec, negotiate_format
+from app.services.tick_history import parse_window, tick_history
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# ওয়েবসকেট ব্রডকাস্ট হাব
+# ------------------------------------------------------------
+# - প্রতিটি মেসেজ প্রতি ফরম্যাটে একবারই সিরিয়ালাইজ হয় (json টেক্সট / msgpack বাইনারি),
+#   তারপর সেই ফরম্যাটের সব ক্লায়েন্টের কিউতে একই ফ্রেম
+# - প্রতি ক্লায়েন্টের নিজস্ব বাউন্ডেড কিউ ও রাইটার টাস্ক: একটি স্লো ট্যাব অন্যদের আটকায় না
+# - কিউ ভরে গেলে পলিসি অনুযায়ী conflate (একই key এর পুরনোটা বদলে নতুনটা) বা ড্রপ
+# - অনেকক্ষণ পিছিয়ে থাকা ক্লায়েন্টকে বের করে দেওয়া (ব্রাউজার নিজে রিকানেক্ট করবে)
+#
+# টপিক সাবস্ক্রিপশন (ক্লায়েন্ট → সার্ভার টেক্সট মেসেজ):
+#   {"op": "subscribe", "topics": ["ticker:binance:BTC/USDT", "sentiment:BTC/USDT:1h", "trades:BTC/USDT", "book:BTC/USDT"]}
+#   {"op": "unsubscribe", "topics": [...]}     {"op": "list"}
+#   {"op": "resync", "topics": [...]}          ← seq এ ফাঁক দেখলে: টপিকের পুরো স্ন্যাপশট আবার
+#   {"op": "history", "exchange": "binance", "pair": "BTC/USDT", "seconds": 60 | "ticks": 500}
+#                                              ← মেমোরির টিক হিস্ট্রি (TICK_HISTORY), চার্টের প্রাথমিক ডাটা
+# প্রথম subscribe এর আগে ক্লায়েন্ট পুরনো ফিড (SENTIMENT/TRADES/ARBITRAGE সবকিছু) পায়;
+# subscribe করার পর শুধু তার টপিকগুলো। প্রতি টপিকে কনফ্লেশন ইন্টারভাল (WS_TOPIC_CONFLATION_MS):
+# "latest" টপিকে শেষ ভ্যালু, "batch" টপিকে (trades) ইন্টারভালের সব আইটেম একসাথে যায়।
+# "delta" টপিকে (sentiment) প্রডিউসার ডেল্টা ও পুরো স্ন্যাপশট দুটোই দেয়: সাবস্ক্রাইবাররা seq সহ ডেল্টা,
+# subscribe/resync এ স্ন্যাপশট। batch/delta মেসেজ ক্লায়েন্টের কিউতে কনফ্লেট হয় না (বদলালে তথ্য হারাবে);
+# কিউ উপচে বাদ পড়লে seq/ট্রেড id এর ফাঁক দেখে ক্লায়েন্ট resync করে।
+# ============================================================
+
+POLICIES = ("conflate", "drop_oldest", "drop_new")
+SLOW_CLIENT_CLOSE_CODE = 1013  # "Try Again Later"
+
+# টপিক টাইপ → (অংশের সংখ্যা, কনফ্লেশন মোড)
+TOPIC_KINDS = {
+    "ticker": (3, "latest"),     # ticker:exchange:pair
+    "sentiment": (3, "delta"),   # sentiment:pair:timeframe (স্ন্যাপশট + SENTIMENT_DELTA, services/sentiment_feed.py)
+    "trades": (2, "batch"),      # trades:pair
+    "arbitrage": (2, "latest"),  # arbitrage:pair
+    "book": (2, "latest"),       # book:pair (লোকাল অর্ডার বুক)
+    "paper": (2, "batch"),       # paper:pair (পেপার ট্রেডিং এর ফিল, স্ন্যাপশটে পজিশন ও অ্যাকাউন্ট)
+}
+
+
+def parse_topic(name: str):
+    """টপিক নাম যাচাই; ঠিক থাকলে (kind, mode), না হলে ValueError"""
+    parts = name.split(":") if isinstance(name, str) else []
+    kind = parts[0] if parts else None
+    if kind not in TOPIC_KINDS or len(parts) != TOPIC_KINDS[kind][0] or not all(parts):
+        raise ValueError(f"Invalid topic: {name}")
+    return kind, TOPIC_KINDS[kind][1]
+
+
+class ClientConnection:
+    """একটি ওয়েবসকেট ক্লায়েন্ট: পেন্ডিং মেসেজ (key → টেক্সট) ও তার রাইটার টাস্ক"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, websocket: WebSocket, max_queue: int, policy: str, fmt: str = "json"):
+        self.id = next(self._ids)
+        self.websocket = websocket
+        self.format = fmt  # "json" (টেক্সট ফ্রেম) বা "msgpack" (বাইনারি ফ্রেম)
+        self.max_queue = max_queue
+        self.policy = policy
+        self.pending: "OrderedDict[object, Union[str, bytes]]" = OrderedDict()
+        self.wakeup = asyncio.Event()
+        self.writer: Optional[asyncio.Task] = None
+        self.lagging_since: Optional[float] = None
+        self.connected_at = time.time()
+        self.sent = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.topics: Optional[Set[str]] = None  # None = পুরনো ফিড (সব broadcast)
+        self._seq = itertools.count()
+
+    def enqueue(self, frame: Union[str, bytes], key=None):
+        """ব্লক না করে কিউতে রাখা; রিটার্ন False মানে মেসেজটি বাদ পড়েছে"""
+        pending = self.pending
+        if key is not None and self.policy == "conflate" and key in pending:
+            # পুরনো স্ন্যাপশট এখনো পাঠানো হয়নি — জায়গা না বদলে শুধু নতুন ভ্যালু
+            pending[key] = frame
+            self.conflated += 1
+            WS_CONFLATED.inc()
+            return True
+
+        if len(pending) >= self.max_queue:
+            if self.lagging_since is None:
+                self.lagging_since = time.monotonic()
+            self.dropped += 1
+            WS_DROPPED.inc()
+            if self.policy == "drop_new":
+                return False
+            pending.popitem(last=False)
+
+        if key is None or self.policy != "conflate":
+            key = ("_seq", next(self._seq))
+        pending[key] = frame
+        self.wakeup.set()
+        return True
+
+    def is_slow(self, now: float, limit: float):
+        return self.lagging_since is not None and now - self.lagging_since > limit
+
+    def status(self):
+        return {
+            "id": self.id,
+            "format": self.format,
+            "queue": len(self.pending),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "conflated": self.conflated,
+            "lagging": self.lagging_since is not None,
+            "topics": sorted(self.topics) if self.topics is not None else None,
+            "connected_at": self.connected_at,
+        }
+
+
+class Topic:
+    """
+    একটি টপিকের সাবস্ক্রাইবার ও থ্রটল স্টেট।
+    কনফ্লেশন টপিক লেভেলে হয়, তাই হাজার ক্লায়েন্টেও প্রতি ফ্লাশে একবারই সিরিয়ালাইজ।
+    """
+
+    def __init__(self, name: str, interval: float, mode: str):
+        self.name = name
+        self.interval = interval
+        self.mode = mode
+        self.subscribers: Dict[int, ClientConnection] = {}
+        self.pending: Optional[dict] = None
+        self.last_flush = 0.0
+        self.last_message: Optional[dict] = None
+        self.last_frames: Optional[Frames] = None
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.published = 0
+        self.flushed = 0
+
+    def merge(self, message: dict):
+        """থ্রটলের মধ্যে আসা মেসেজ জমানো: latest এ শেষটা, batch এ payload লিস্ট জোড়া"""
+        if self.mode == "delta" and self.pending is not None:
+            # দুটি ডেল্টা জোড়ার বদলে পুরো স্ন্যাপশট (publish এ আগেই last_message এ রাখা)
+            self.pending = self.last_message
+        elif self.mode == "batch" and self.pending is not None:
+            payload = self.pending["payload"] + list(message.get("payload") or [])
+            self.pending["payload"] = payload[-settings.WS_TOPIC_BATCH_MAX:]
+        elif self.mode == "batch":
+            self.pending = dict(message, payload=list(message.get("payload") or []))
+        else:
+            self.pending = message
+
+    def status(self):
+        return {
+            "topic": self.name,
+            "subscribers": len(self.subscribers),
+            "interval_ms": round(self.interval * 1000),
+            "published": self.published,
+            "flushed": self.flushed,
+        }
+
+
+class BroadcastHub:
+    """
+    সব ওয়েবসকেট ক্লায়েন্টের ফ্যান-আউট।
+    broadcast() কখনো নেটওয়ার্কের জন্য অপেক্ষা করে না; শুধু প্রতিটি কিউতে O(1) এ রাখে।
+    """
+
+    def __init__(self, max_queue: Optional[int] = None, policy: Optional[str] = None,
+                 slow_client_seconds: Optional[float] = None, send_timeout: Optional[float] = None):
+        self.max_queue = max_queue or settings.WS_CLIENT_QUEUE_SIZE
+        self.policy = policy or settings.WS_OVERFLOW_POLICY
+        if self.policy not in POLICIES:
+            raise ValueError(f"Unknown overflow policy: {self.policy}")
+        self.slow_client_seconds = slow_client_seconds or settings.WS_SLOW_CLIENT_SECONDS
+        self.send_timeout = send_timeout or settings.WS_SEND_TIMEOUT
+        self.clients: Dict[int, ClientConnection] = {}
+        self.topics: Dict[str, Topic] = {}
+        self.messages = 0
+        self.evicted = 0
+        self.serialize_seconds = 0.0
+
+    @property
+    def active_connections(self):
+        return list(self.clients.values())
+
+    def __len__(self):
+        return len(self.clients)
+
+    async def connect(self, websocket: WebSocket, fmt: Optional[str] = None):
+        """
+        ফরম্যাট নেগোশিয়েশন: ?format=msgpack কুয়েরি বা "msgpack" সাবপ্রোটোকল।
+        লাইব্রেরি না থাকলে বা অন্য কিছু চাইলে json (টেক্সট ফ্রেম)।
+        """
+        offered = websocket.scope.get("subprotocols") or []
+        requested = fmt or websocket.query_params.get("format") or next(
+            (p for p in offered if p in CLIENT_FORMATS), None)
+        fmt = negotiate_format(requested)
+        await websocket.accept(subprotocol=fmt if fmt in offered else None)
+        client = ClientConnection(websocket, self.max_queue, self.policy, fmt)
+        self.clients[client.id] = client
+        client.writer = asyncio.create_task(self._writer(client))
+        return client
+
+    def disconnect(self, client: ClientConnection):
+        if self.clients.pop(client.id, None) is None:
+            return
+        for name in client.topics or ():
+            topic = self.topics.get(name)
+            if topic is not None:
+                topic.subscribers.pop(client.id, None)
+        client.pending.clear()
+        if client.writer and client.writer is not asyncio.current_task():
+            client.writer.cancel()
+
+    async def evict(self, client: ClientConnection, reason: str):
+        if client.id not in self.clients:
+            return
+        self.evicted += 1
+        logger.warning(f"🐢 Evicting websocket client {client.id}: {reason}")
+        self.disconnect(client)
+        try:
+            await client.websocket.close(code=SLOW_CLIENT_CLOSE_CODE)
+        except Exception:
+            pass
+
+    def serialize(self, message: dict, fmt: str = "json"):
+        started = time.perf_counter()
+        frame = CLIENT_FORMATS[fmt].dumps(message)
+        self.serialize_seconds += time.perf_counter() - started
+        return frame
+
+    def _frame(self, frames: Frames, fmt: str):
+        """ফরম্যাটের ফ্রেম; ক্যাশে না থাকলেই শুধু সিরিয়ালাইজ (আর সময় মাপা)"""
+        frame = frames.cache.get(fmt)
+        if frame is None:
+            frame = frames.cache[fmt] = self.serialize(frames.message, fmt)
+        return frame
+
+    def _fan_out(self, frames: Frames, key, clients):
+        now = time.monotonic()
+        slow = []
+        for client in clients:
+            client.enqueue(self._frame(frames, client.format), key)
+            if client.is_slow(now, self.slow_client_seconds):
+                slow.append(client)
+        for client in slow:
+            asyncio.create_task(self.evict(client, f"lagging > {self.slow_client_seconds}s"))
+
+    async def broadcast(self, message: dict, key=None):
+        """
+        পুরনো ফিডের (টপিক সাবস্ক্রাইব না করা) সব ক্লায়েন্টকে পাঠানো। key একই হলে
+        (ডিফল্ট: topic বা type) পিছিয়ে থাকা ক্লায়েন্টের কিউতে পুরনোটার জায়গায় নতুনটা বসে।
+        """
+        self._broadcast_legacy(message, key)
+
+    def _broadcast_legacy(self, message: dict, key=None, frames: Optional[Frames] = None):
+        frames = frames or Frames(message)
+        clients = [c for c in self.clients.values() if c.topics is None]
+        if not clients:
+            return frames
+        self.messages += 1
+        if key is None:
+            key = message.get("topic") or message.get("type")
+        self._fan_out(frames, key, clients)
+        return frames
+
+    # ---------- টপিক ----------
+    def _topic(self, name: str):
+        topic = self.topics.get(name)
+        if topic is None:
+            kind, mode = parse_topic(name)
+            interval = settings.WS_TOPIC_CONFLATION_MS.get(kind, 0) / 1000.0
+            topic = self.topics[name] = Topic(name, interval, mode)
+        return topic
+
+    async def publish(self, topic_name: str, message: dict, legacy: bool = False, snapshot: Optional[dict] = None):
+        """
+        টপিকের সাবস্ক্রাইবারদের পাঠানো (কনফ্লেশন ইন্টারভাল মেনে)।
+        legacy=True হলে একই মেসেজ পুরনো ফিডের ক্লায়েন্টরাও পায়, প্রতি ফরম্যাটে সিরিয়ালাইজ একবারই।
+        snapshot: ডেল্টা/ব্যাচ টপিকের পুরো স্টেট — subscribe/resync এ যায়, আর পুরনো ফিড (যারা ডেল্টা বোঝে না) এটাই পায়।
+        """
+        frames = None
+        if legacy and snapshot is not None:
+            self._broadcast_legacy(snapshot, topic_name)
+        elif legacy:
+            frames = self._broadcast_legacy(message, topic_name)
+        try:
+            topic = self._topic(topic_name)
+        except ValueError:
+            return
+        topic.published += 1
+
+        if snapshot is not None or topic.mode != "batch":
+            topic.last_frames = None
+            topic.last_message = snapshot if snapshot is not None else message
+        if not topic.subscribers:
+            return
+        now = time.monotonic()
+        if topic.pending is None and now - topic.last_flush >= topic.interval:
+            self._flush_topic(topic, message, frames)
+            return
+        topic.merge(message)
+        if topic.timer is None:
+            delay = max(0.0, topic.last_flush + topic.interval - now)
+            topic.timer = asyncio.get_running_loop().call_later(delay, self._flush_topic, topic)
+
+    def _flush_topic(self, topic: Topic, message: Optional[dict] = None, frames: Optional[Frames] = None):
+        topic.timer = None
+        if message is None:
+            message, topic.pending = topic.pending, None
+        if message is None or not topic.subscribers:
+            return
+        frames = frames or Frames(message)
+        if topic.mode == "latest" or message is topic.last_message:
+            topic.last_frames = frames
+        topic.last_flush = time.monotonic()
+        topic.flushed += 1
+        self.messages += 1
+        # শুধু latest টপিকের মেসেজ স্বয়ংসম্পূর্ণ, তাই ক্লায়েন্টের কিউতে শুধু সেগুলো কনফ্লেট হয়
+        key = topic.name if topic.mode == "latest" else None
+        self._fan_out(frames, key, list(topic.subscribers.values()))
+
+    def subscribe(self, client: ClientConnection, names: List[str]):
+        """রিটার্ন (সাবস্ক্রাইব হওয়া টপিক, এরর লিস্ট)"""
+        if client.topics is None:
+            client.topics = set()
+        added, errors = [], []
+        for name in names:
+            if name in client.topics:
+                added.append(name)
+                continue
+            if len(client.topics) >= settings.WS_MAX_TOPICS_PER_CLIENT:
+                errors.append(f"Topic limit reached ({settings.WS_MAX_TOPICS_PER_CLIENT})")
+                break
+            try:
+                topic = self._topic(name)
+            except ValueError as e:
+                errors.append(str(e))
+                continue
+            topic.subscribers[client.id] = client
+            client.topics.add(name)
+            added.append(name)
+        return added, errors
+
+    def send_snapshots(self, client: ClientConnection, names: List[str]):
+        """শেষ ভ্যালু/স্ন্যাপশট সাথে সাথে, পরের আপডেটের অপেক্ষা না করে"""
+        for name in names:
+            topic = self.topics.get(name)
+            if topic is None or topic.last_message is None:
+                continue
+            if topic.last_frames is None:
+                topic.last_frames = Frames(topic.last_message)
+            # ডেল্টা/ব্যাচের আগে পেন্ডিং থাকা মেসেজের পরেই বসে, তাই ক্রম ঠিক থাকে
+            key = topic.name if topic.mode == "latest" else None
+            client.enqueue(self._frame(topic.last_frames, client.format), key)
+
+    def unsubscribe(self, client: ClientConnection, names: List[str]):
+        removed = []
+        for name in names:
+            if client.topics and name in client.topics:
+                client.topics.discard(name)
+                topic = self.topics.get(name)
+                if topic is not None:
+                    topic.subscribers.pop(client.id, None)
+                removed.append(name)
+        return removed
+
+    def _reply(self, client: ClientConnection, message: dict):
+        client.enqueue(self.serialize(message, client.format))
+
+    async def handle_client_message(self, client: ClientConnection, raw: Union[str, bytes]):
+        """ক্লায়েন্টের subscribe/unsubscribe/list কমান্ড (টেক্সট JSON, বা msgpack ক্লায়েন্টের বাইনারি)"""
+        WS_RECEIVED.inc()
+        try:
+            codec = CLIENT_FORMATS[client.format] if isinstance(raw, bytes) else json_codec
+            request = codec.loads(raw)
+            op = request.get("op")
+            topics = request.get("topics") or []
+            if isinstance(topics, str):
+                topics = [topics]
+        except (ValueError, AttributeError):
+            self._reply(client, {"type": "ERROR", "message": "Invalid JSON command"})
+            return
+
+        if op == "subscribe":
+            added, errors = self.subscribe(client, topics)
+            self._reply(client, {"type": "SUBSCRIBED", "topics": added, "errors": errors})
+            self.send_snapshots(client, added)
+        elif op == "unsubscribe":
+            removed = self.unsubscribe(client, topics)
+            self._reply(client, {"type": "UNSUBSCRIBED", "topics": removed})
+        elif op == "resync":
+            topics = [name for name in topics if client.topics and name in client.topics]
+            self._reply(client, {"type": "RESYNC", "topics": topics})
+            self.send_snapshots(client, topics)
+        elif op == "history":
+            try:
+                seconds, ticks = parse_window(request.get("seconds"), request.get("ticks"))
+            except ValueError as e:
+                self._reply(client, {"type": "ERROR", "message": str(e)})
+                return
+            exchange_id, pair = request.get("exchange") or "binance", request.get("pair") or "BTC/USDT"
+            result = tick_history.query(exchange_id, pair, seconds, ticks)
+            if result is None:
+                self._reply(client, {"type": "ERROR", "message": f"No tick history for {exchange_id}:{pair}"})
+            else:
+                self._reply(client, result)
+        elif op == "list":
+            self._reply(client, {"type": "TOPICS", "topics": sorted(client.topics or ())})
+        elif op == "ping":
+            self._reply(client, {"type": "PONG"})
+        else:
+            self._reply(client, {"type": "ERROR", "message": f"Unknown op: {op}"})
+
+    async def _writer(self, client: ClientConnection):
+        websocket = client.websocket
+        sent_counter = WS_SENT.labels(client.format)
+        try:
+            while True:
+                await client.wakeup.wait()
+                while client.pending:
+                    _, frame = client.pending.popitem(last=False)
+                    send = websocket.send_bytes(frame) if isinstance(frame, bytes) else websocket.send_text(frame)
+                    await asyncio.wait_for(send, timeout=self.send_timeout)
+                    client.sent += 1
+                    sent_counter.inc()
+                    if client.lagging_since is not None and len(client.pending) <= client.max_queue // 2:
+                        client.lagging_since = None
+                client.wakeup.clear()
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            await self.evict(client, f"send timeout > {self.send_timeout}s")
+        except Exception:
+            # সকেট বন্ধ হয়ে গেছে; রিসিভ লুপও একই সাথে disconnect করবে
+            self.disconnect(client)
+
+    def latest(self, topic_name: str) -> Optional[dict]:
+        """একটি টপিকের শেষ মেসেজ/স্ন্যাপশট (গেটওয়ের REST ফলব্যাক) — না থাকলে None"""
+        topic = self.topics.get(topic_name)
+        return topic.last_message if topic is not None else None
+
+    def latest_messages(self):
+        """টপিকগুলোর শেষ মেসেজ/স্ন্যাপশট (topic, message) — নতুন বাস গেটওয়ের প্রাথমিক স্টেট"""
+        return [(t.name, t.last_message) for t in self.topics.values() if t.last_message is not None]
+
+    def metrics(self):
+        depths = [len(c.pending) for c in self.clients.values()]
+        return {
+            "clients": len(self.clients),
+            "policy": self.policy,
+            "messages": self.messages,
+            "evicted": self.evicted,
+            "sent": sum(c.sent for c in self.clients.values()),
+            "dropped": sum(c.dropped for c in self.clients.values()),
+            "conflated": sum(c.conflated for c in self.clients.values()),
+            "lagging": sum(1 for c in self.clients.values() if c.lagging_since is not None),
+            "queue_depth_max": max(depths, default=0),
+            "queue_depth_avg": round(sum(depths) / len(depths), 2) if depths else 0.0,
+            "serializer": json_codec.name,
+            "formats": {fmt: sum(1 for c in self.clients.values() if c.format == fmt) for fmt in CLIENT_FORMATS},
+            "serialize_ms": round(self.serialize_seconds * 1000, 3),
+            "topics": [t.status() for t in self.topics.values() if t.subscribers],
+        }
+
+
+hub = BroadcastHub()
+
+registry.gauge_callback("metron_ws_clients", "Connected websocket clients by format",
+                        lambda: {fmt: sum(1 for c in hub.clients.values() if c.format == fmt) for fmt in CLIENT_FORMATS},
+                        labels=("format",))
+registry.gauge_callback("metron_ws_queue_depth", "Pending frames across client queues",
+                        lambda: {"total": sum(len(c.pending) for c in hub.clients.values()),
+                                 "max": max((len(c.pending) for c in hub.clients.values()), default=0)},
+                        labels=("stat",))
+registry.gauge_callback("metron_ws_lagging_clients", "Clients whose queue is over capacity",
+                        lambda: sum(1 for c in hub.clients.values() if c.lagging_since is not None))
@@ -0,0 +1,373 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.services.market_store import market_store
+from app.services.compute_executor import compute_executor
+from app.services.stream_engine import RESET, market_stream
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# লাইভ ট্রেড থেকে ক্যান্ডেল (Binance trade stream)
+# ------------------------------------------------------------
+# - টাইম বার (1s … 1d): বাকেট = ts - ts % tf; ট্রেড না থাকা বাকেট আগের close দিয়ে ফ্ল্যাট বার
+#   (Binance kline এর মতো)
+# - বার ক্লোজ: বাকেট শেষ হওয়ার পর CANDLE_LATE_MS গ্রেস। এর মধ্যে আসা দেরির ট্রেড বারটিতে যোগ হয়,
+#   গ্রেস পার হলে বার ফাইনাল আর পরে আসা ট্রেড গোনা হয়ে বাদ (late)
+# - ঐচ্ছিক ভলিউম বার (vol10 = ১০ বেস ইউনিট) ও টিক বার (tick500 = ৫০০ ট্রেড)
+# - ফাইনাল ও ফর্মিং বার market_store এ, তারপর সরাসরি SignalEngine — REST পোলিং ছাড়াই
+#   সাব-সেকেন্ড সেন্টিমেন্ট (স্ট্রিম চালু থাকলে স্ক্যানার ওই জবের REST ফেচ বাদ দেয়)
+# ============================================================
+
+TIMEFRAME_UNITS = {"s": 1000, "m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+STREAM_STALE_SECONDS = 10.0  # এর বেশি সময় ট্রেড না এলে স্ট্রিম বন্ধ ধরা (স্ক্যানার আবার REST এ)
+OFFSET_ALPHA = 0.05          # লোকাল ঘড়ি − এক্সচেঞ্জ ট্রেড টাইমের EMA
+
+
+def timeframe_ms(timeframe: str) -> int:
+    """"15m" → 900000"""
+    unit = timeframe[-1:]
+    if unit not in TIMEFRAME_UNITS or not timeframe[:-1].isdigit():
+        raise ValueError(f"Invalid timeframe: {timeframe}")
+    return int(timeframe[:-1]) * TIMEFRAME_UNITS[unit]
+
+
+# বারের রো: [ts, open, high, low, close, volume, প্রথম ট্রেড ts, শেষ ট্রেড ts]
+FIRST_TS, LAST_TS = 6, 7
+
+
+def _new_bar(ts: int, price: float, trade_ts: Optional[int]):
+    return [ts, price, price, price, price, 0.0, trade_ts, trade_ts]
+
+
+def _add_trade(bar: list, trade_ts: int, price: float, qty: float):
+    if bar[FIRST_TS] is None:
+        # ফ্ল্যাট (ট্রেডহীন) বারে প্রথম ট্রেড: OHLC এই দাম থেকে শুরু
+        bar[1] = bar[2] = bar[3] = bar[4] = price
+        bar[FIRST_TS] = bar[LAST_TS] = trade_ts
+    else:
+        if price > bar[2]:
+            bar[2] = price
+        if price < bar[3]:
+            bar[3] = price
+        # অর্ডারের বাইরে আসা ট্রেড: open/close ট্রেড টাইম দিয়ে ঠিক করা
+        if trade_ts >= bar[LAST_TS]:
+            bar[4] = price
+            bar[LAST_TS] = trade_ts
+        elif trade_ts < bar[FIRST_TS]:
+            bar[1] = price
+            bar[FIRST_TS] = trade_ts
+    bar[5] += qty
+
+
+class TimeBars:
+    """একটি টাইমফ্রেম। open = এখনো ফাইনাল না হওয়া বার (গ্রেসে থাকা আগেরটি + ফর্মিং)"""
+    kind = "time"
+
+    def __init__(self, timeframe: str, late_ms: int):
+        self.timeframe = timeframe
+        self.tf_ms = timeframe_ms(timeframe)
+        self.late_ms = late_ms
+        self.open: List[list] = []
+        self.last_final_ts: Optional[int] = None
+        self.last_close: Optional[float] = None
+        self.ready = False
+        self.pending: List[tuple] = []  # সিড চলাকালীন আসা ট্রেড
+        self.late = 0
+        self.finalized = 0
+
+    def seed(self, ohlcv, fetched_at_ms: int):
+        """
+        স্টোরের ক্যান্ডেল থেকে শুরু: শেষটি ফর্মিং (REST এর আংশিক বার), তার আগেরগুলো ফাইনাল।
+        সিডের সময় জমা ট্রেডের মধ্যে fetched_at_ms এর পরেরগুলো যোগ হয় (আগেরগুলো REST বারে আছে)।
+        """
+        if len(ohlcv):
+            last = [float(x) for x in ohlcv[-1]]
+            self.open = [[int(last[0])] + last[1:6] + [int(last[0]), fetched_at_ms]]
+            self.last_final_ts = int(last[0]) - self.tf_ms
+            self.last_close = float(ohlcv[-2][4]) if len(ohlcv) > 1 else last[1]
+        self.ready = True
+        finals = []
+        for trade_ts, price, qty in self.pending:
+            if trade_ts > fetched_at_ms:
+                finals += self.add(trade_ts, price, qty)
+        self.pending = []
+        return finals
+
+    def _bar(self, bucket: int, price: float):
+        """bucket এর খোলা বার (না থাকলে তৈরি; মাঝের খালি বাকেট ফ্ল্যাট বার দিয়ে পূরণ)"""
+        open_bars = self.open
+        for i in range(len(open_bars) - 1, -1, -1):
+            if open_bars[i][0] == bucket:
+                return open_bars[i]
+            if open_bars[i][0] < bucket:
+                break
+        if open_bars and bucket < open_bars[0][0]:
+            # খোলা বারগুলো পরপর বাকেট; এর আগের বাকেট শুধু একদম শুরুতে (কোনো বার ফাইনাল হওয়ার আগে)
+            # আসতে পারে — তখন সামনে ফ্ল্যাট বার বসিয়ে ক্রম ঠিক রাখা
+            head = [_new_bar(ts, price, None) for ts in range(bucket, open_bars[0][0], self.tf_ms)]
+            open_bars[:0] = head
+            return head[0]
+        prev_ts = open_bars[-1][0] if open_bars else self.last_final_ts
+        prev_close = open_bars[-1][4] if open_bars else self.last_close
+        if prev_ts is not None and prev_close is not None:
+            for ts in range(prev_ts + self.tf_ms, bucket, self.tf_ms):
+                open_bars.append(_new_bar(ts, prev_close, None))
+        bar = _new_bar(bucket, prev_close if prev_close is not None else price, None)
+        open_bars.append(bar)
+        return bar
+
+    def add(self, trade_ts: int, price: float, qty: float):
+        """ট্রেড যোগ; রিটার্ন এই ট্রেডের পর ফাইনাল হওয়া বারগুলো"""
+        bucket = trade_ts - trade_ts % self.tf_ms
+        if self.last_final_ts is not None and bucket <= self.last_final_ts:
+            self.late += 1
+            return []
+        _add_trade(self._bar(bucket, price), trade_ts, price, qty)
+        return self.advance(trade_ts - self.late_ms)
+
+    def advance(self, watermark: float):
+        """watermark পর্যন্ত শেষ হওয়া বাকেটগুলো ফাইনাল"""
+        finals = []
+        open_bars = self.open
+        while open_bars and open_bars[0][0] + self.tf_ms <= watermark:
+            bar = open_bars.pop(0)
+            self.last_final_ts = bar[0]
+            self.last_close = bar[4]
+            finals.append(bar)
+        self.finalized += len(finals)
+        return finals
+
+    def tick(self, now_ms: float):
+        """টাইমার: ট্রেড না এলেও চলতি বাকেটের (ফ্ল্যাট) বার খোলা ও পুরনোগুলো ক্লোজ"""
+        if self.last_close is not None or self.open:
+            price = self.open[-1][4] if self.open else self.last_close
+            self._bar(int(now_ms) - int(now_ms) % self.tf_ms, price)
+        return self.advance(now_ms - self.late_ms)
+
+    def status(self):
+        return {"timeframe": self.timeframe, "open": len(self.open), "finalized": self.finalized,
+                "late": self.late, "last_final_ts": self.last_final_ts}
+
+
+class CountBars:
+    """ভলিউম বা টিক বার: threshold পূর্ণ হলে বার ক্লোজ (ts = প্রথম ট্রেডের সময়)"""
+
+    def __init__(self, kind: str, threshold: float):
+        self.kind = kind
+        self.threshold = threshold
+        self.timeframe = f"{kind}{threshold:g}"
+        self.open: List[list] = []
+        self.count = 0
+        self.ready = True
+        self.late = 0
+        self.finalized = 0
+
+    def add(self, trade_ts: int, price: float, qty: float):
+        if not self.open:
+            self.open.append(_new_bar(trade_ts, price, trade_ts))
+            self.count = 0
+        bar = self.open[0]
+        _add_trade(bar, trade_ts, price, qty)
+        self.count += 1
+        filled = bar[5] if self.kind == "vol" else self.count
+        if filled < self.threshold:
+            return []
+        self.open = []
+        self.finalized += 1
+        return [bar]
+
+    def tick(self, now_ms: float):
+        return []
+
+    def status(self):
+        return {"timeframe": self.timeframe, "open": len(self.open), "finalized": self.finalized, "late": self.late}
+
+
+class CandleAggregator:
+    def __init__(self):
+        self.builders: Dict[str, list] = {}            # symbol → বার বিল্ডার
+        self.dirty: Set[Tuple[str, str]] = set()       # (symbol, timeframe) — নতুন ট্রেড এসেছে
+        self.closed: Set[Tuple[str, str]] = set()      # বার ফাইনাল হয়েছে (সাথে সাথে সিগন্যাল)
+        self.last_trade_id: Dict[str, int] = {}
+        self.last_trade_at: Dict[str, float] = {}
+        self.trades = 0
+        self.clock_offset = 0.0                        # ms, লোকাল − এক্সচেঞ্জ (লেটেন্সি + স্কিউ)
+        self.task: Optional[asyncio.Task] = None
+        self.publish: Optional[Callable[[dict], Awaitable[None]]] = None
+        self.book_metrics: Callable[[str], Optional[dict]] = lambda symbol: None
+        self.wakeup = asyncio.Event()
+
+    def _make_builders(self, timeframes: List[str]):
+        builders = [TimeBars(tf, settings.CANDLE_LATE_MS) for tf in timeframes]
+        builders += [CountBars("vol", v) for v in settings.CANDLE_VOLUME_BARS]
+        builders += [CountBars("tick", n) for n in settings.CANDLE_TICK_BARS]
+        return builders
+
+    async def start(self, publish, book_metrics=None,
+                    symbols: Optional[List[str]] = None,
+                    timeframes: Optional[List[str]] = None):
+        if not settings.BINANCE_MULTIPLEX:
+            logger.warning("⚠️ Candle aggregator needs BINANCE_MULTIPLEX (trade stream); skipped")
+            return
+        self.publish = publish
+        if book_metrics is not None:
+            self.book_metrics = book_metrics
+        symbols = list(symbols or settings.SCANNER_SYMBOLS)
+        timeframes = list(timeframes or settings.SCANNER_TIMEFRAMES + settings.CANDLE_EXTRA_TIMEFRAMES)
+        for symbol in symbols:
+            self.builders[symbol] = self._make_builders(timeframes)
+
+        # আগে হ্যান্ডলার ও স্ট্রিম, সিড ব্যাকগ্রাউন্ডে — সিড চলাকালীন ট্রেড বিল্ডারে জমা থাকে
+        market_stream.add_handler("trade", self.on_trade)
+        market_stream.add_handler(RESET, self.on_reset)
+        await market_stream.watch(symbols, ["trade"])
+        self.task = asyncio.create_task(self._run())
+        logger.info(f"🕯️ Candle aggregator started: {', '.join(symbols)} × {', '.join(timeframes)}")
+
+    async def _seed(self, symbol: str, bars: TimeBars):
+        ohlcv, fetched_at = [], 0
+        try:
+            ohlcv = await market_store.sync_candles("binance", symbol, bars.timeframe, limit=settings.SCANNER_CANDLES)
+            fetched_at = int(time.time() * 1000 - self.clock_offset)
+        except Exception as e:
+            # সিড ছাড়াও চলে (জমা সব ট্রেড যোগ হয়): ইতিহাস MIN_CANDLES পর্যন্ত না জমা পর্যন্ত LOADING
+            logger.warning(f"⚠️ Candle seed failed {symbol} {bars.timeframe}: {e}")
+        finals = bars.seed(ohlcv, fetched_at)
+        if finals:
+            self._commit(symbol, bars, finals)
+
+    async def stop(self):
+        market_stream.remove_handler("trade", self.on_trade)
+        market_stream.remove_handler(RESET, self.on_reset)
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        if self.builders:
+            await market_stream.unwatch(list(self.builders), ["trade"])
+
+    # ---------- ট্রেড ইনপুট (স্ট্রিম হ্যান্ডলার, সিঙ্ক) ----------
+    def on_trade(self, pair: str, data: dict):
+        builders = self.builders.get(pair)
+        if builders is None:
+            return
+        trade_id = data["t"]
+        # রিকানেক্টের পর রিপ্লে হওয়া ট্রেড দুবার গোনা হয় না
+        if trade_id <= self.last_trade_id.get(pair, -1):
+            return
+        self.last_trade_id[pair] = trade_id
+        trade_ts, price, qty = data["T"], float(data["p"]), float(data["q"])
+        now = time.time()
+        self.last_trade_at[pair] = now
+        self.clock_offset += OFFSET_ALPHA * ((now * 1000 - trade_ts) - self.clock_offset)
+        self.trades += 1
+
+        for bars in builders:
+            if not bars.ready:
+                bars.pending.append((trade_ts, price, qty))
+                continue
+            finals = bars.add(trade_ts, price, qty)
+            key = (pair, bars.timeframe)
+            self.dirty.add(key)
+            if finals:
+                self._commit(pair, bars, finals)
+                self.closed.add(key)
+                self.wakeup.set()
+
+    def on_reset(self, pair: Optional[str], data: dict):
+        """স্ট্রিমের সোর্স বদল (রিপ্লে শুরু/পাস/শেষ): ট্রেড আইডি নতুন করে শুরু হতে পারে, ডিডুপ ভুলে যাওয়া"""
+        self.last_trade_id.clear()
+
+    def _commit(self, symbol: str, bars, finals: List[list]):
+        """ফাইনাল বার + এখনকার খোলা বারগুলো স্টোরে (টেইল রিরাইট)"""
+        rows = [bar[:6] for bar in finals] + [bar[:6] for bar in bars.open]
+        market_store.write_tail("binance", symbol, bars.timeframe, rows)
+
+    # ---------- টাইমার ও সিগন্যাল ----------
+    async def _run(self):
+        for symbol, builders in self.builders.items():
+            for bars in builders:
+                if not bars.ready:
+                    await self._seed(symbol, bars)
+        interval = settings.CANDLE_SIGNAL_INTERVAL
+        while True:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            try:
+                self._tick(time.time() * 1000 - self.clock_offset)
+                await self._evaluate()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Candle aggregator error: {e}")
+
+    def _tick(self, exchange_now_ms: float):
+        for symbol, builders in self.builders.items():
+            for bars in builders:
+                if not bars.ready:
+                    continue
+                finals = bars.tick(exchange_now_ms)
+                if finals:
+                    self._commit(symbol, bars, finals)
+                    self.closed.add((symbol, bars.timeframe))
+
+    async def _evaluate(self):
+        keys, self.dirty, self.closed = self.dirty | self.closed, set(), set()
+        for symbol, timeframe in keys:
+            bars = next(b for b in self.builders[symbol] if b.timeframe == timeframe)
+            if bars.open:
+                market_store.write_tail("binance", symbol, timeframe, [bar[:6] for bar in bars.open])
+                # গ্রেসে থাকা বার এখনো বদলাতে পারে, তাই সেটাই "ফর্মিং" — তার পরেরগুলো উইন্ডোর বাইরে
+                until = bars.open[0][0] + 1
+            else:
+                until = None
+            ohlcv = market_store.candles("binance", symbol, timeframe, limit=settings.SCANNER_CANDLES, until=until)
+            if len(ohlcv) == 0:
+                continue
+            computed = time.perf_counter()
+            result = await compute_executor.analyze(ohlcv, symbol, timeframe, book=self.book_metrics(symbol))
+            if result is None:
+                continue
+            signalled = time.perf_counter()
+            result["symbol"] = symbol
+            result["timeframe"] = timeframe
+            result["source"] = "stream"
+            if self.publish:
+                topic = f"sentiment:{symbol}:{timeframe}"
+                await self.publish({"type": "SENTIMENT", "topic": topic, "payload": result,
+                                    "stamps": {"compute": computed, "signal": signalled}})
+
+    # ---------- রিড ----------
+    def streaming(self, exchange_id: str, symbol: str, timeframe: str):
+        """স্ক্যানারের জন্য: এই জব কি লাইভ ট্রেড থেকে চলছে (তাহলে REST ফেচ লাগে না)"""
+        if exchange_id != "binance" or self.task is None:
+            return False
+        builders = self.builders.get(symbol)
+        if not builders or not any(b.timeframe == timeframe for b in builders):
+            return False
+        return time.time() - self.last_trade_at.get(symbol, 0.0) < STREAM_STALE_SECONDS
+
+    def forming(self, symbol: str, timeframe: str):
+        builders = self.builders.get(symbol) or []
+        bars = next((b for b in builders if b.timeframe == timeframe), None)
+        return [bar[:6] for bar in bars.open] if bars else None
+
+    def status(self):
+        return {
+            "trades": self.trades,
+            "clock_offset_ms": round(self.clock_offset, 1),
+            "symbols": {symbol: [b.status() for b in builders] for symbol, builders in self.builders.items()},
+        }
+
+
+candle_aggregator = CandleAggregator()
@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+import zlib
+from concurrent.futures import BrokenExecutor, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Hashable, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.indicator_stream import drain_timings
+from app.services.metrics import SIGNAL_COMPUTE_SECONDS, observe_indicator_timings, registry
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# সিপিইউ-ভারী সিগন্যাল হিসাব ইভেন্ট লুপের বাইরে
+# ------------------------------------------------------------
+# - মোড: process (প্রতি শার্ডে একটি ওয়ার্কার প্রসেস, GIL এর বাইরে) | thread
+# - কী (symbol, timeframe) সবসময় একই শার্ডে যায় — ইনক্রিমেন্টাল স্টেট সেই ওয়ার্কারেই থাকে
+#   আর একই কী এর দুটি হিসাব কখনো একসাথে চলে না
+# - ব্যাক-প্রেশার: একসাথে সর্বোচ্চ COMPUTE_MAX_PENDING টি জব; বাকিরা run() এ অপেক্ষা করে
+# - স্টেল জব: একই কী এর নতুন জব এলে পুরনোটা (অপেক্ষায় বা শার্ডের কিউতে থাকলে) বাতিল,
+#   আর চলমান পুরনোটার ফলাফল ফেলে দেওয়া হয় — run() তখন None দেয়
+# ============================================================
+
+COMPUTE_MODES = ("process", "thread")
+
+
+def _analyze(ohlcv, symbol: str, timeframe: str, book: Optional[dict], params: Optional[dict] = None):
+    """
+    ওয়ার্কারে চলে: ওয়ার্কারের নিজস্ব signal_engine (প্রসেস মোডে প্রতি প্রসেসে আলাদা)।
+    ইন্ডিকেটর-প্রতি সময়ের স্যাম্পল ফলাফলের সাথে ফেরত যায় (প্রসেসের মেট্রিক প্যারেন্টে দেখা যায় না)।
+    """
+    from app.services.signal_engine import signal_engine
+    result = signal_engine.analyze_incremental(ohlcv, symbol, timeframe, book=book, params=params)
+    return result, drain_timings()
+
+
+def _analyze_full(ohlcv):
+    from app.services.signal_engine import signal_engine
+    return signal_engine.analyze_market_sentiment(ohlcv)
+
+
+def _ping():
+    # সিগন্যাল ইঞ্জিন মডিউল লোড (প্যারেন্ট স্টার্টআপে ইমপোর্ট করে না) — প্রথম সিগন্যালের পথে নয়, ওয়ার্মআপে
+    from app.services import signal_engine  # noqa: F401
+    return True
+
+
+def _cache_stats():
+    from app.services.signal_engine import signal_engine
+    return signal_engine.cache_stats()
+
+
+class ComputeExecutor:
+    def __init__(self, mode: Optional[str] = None, workers: Optional[int] = None,
+                 max_pending: Optional[int] = None):
+        self.mode = mode or settings.COMPUTE_MODE
+        if self.mode not in COMPUTE_MODES:
+            raise ValueError(f"COMPUTE_MODE must be one of {COMPUTE_MODES}")
+        self.workers = workers or settings.COMPUTE_WORKERS
+        self.max_pending = max_pending or settings.COMPUTE_MAX_PENDING
+        self.shards: List[Executor] = []
+        self.slots: Optional[asyncio.Semaphore] = None
+        self.generations: Dict[Hashable, int] = {}
+        self.queued: Dict[Hashable, Future] = {}  # key → শার্ডে জমা সর্বশেষ জব
+        self.waiting = 0
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.ran = 0
+        self.stale = 0
+        self.errors = 0
+        self.restarts = 0
+        self.wait_ms = 0.0     # স্লটের জন্য অপেক্ষা (ব্যাক-প্রেশার), মোট
+        self.compute_ms = 0.0  # শার্ডে জমা থেকে ফলাফল পর্যন্ত, মোট
+
+    def _new_shard(self, index: int) -> Executor:
+        if self.mode == "thread":
+            return ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"compute-{index}")
+        # spawn: প্যারেন্টে অনেক থ্রেড (লুপ, settings-db, ccxt) চলে, fork এ লক আটকে থাকতে পারে
+        return ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+
+    async def start(self):
+        if self.shards:
+            return
+        self.slots = asyncio.Semaphore(self.max_pending)
+        self.shards = [self._new_shard(i) for i in range(self.workers)]
+        # ওয়ার্কার চালু ও ইমপোর্ট (pandas_ta) এখনই, প্রথম সিগন্যালের সময় নয়
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        await asyncio.gather(*(loop.run_in_executor(shard, _ping) for shard in self.shards))
+        logger.info(f"🧮 Compute executor: {self.workers} {self.mode} workers "
+                    f"(ready in {(time.perf_counter() - started) * 1000:.0f} ms)")
+
+    async def stop(self):
+        shards, self.shards = self.shards, []
+        for shard in shards:
+            shard.shutdown(wait=False, cancel_futures=True)
+
+    def _shard_index(self, key: Hashable) -> int:
+        # hash() প্রসেস ভেদে বদলায়; crc32 স্থির
+        return zlib.crc32(repr(key).encode()) % len(self.shards)
+
+    def _replace_shard(self, index: int, broken: Executor):
+        """
+        ওয়ার্কার মারা গেলে (OOM, segfault) পুল BrokenProcessPool হয়ে থাকে, ওই শার্ডের সব কী থেমে যেত —
+        নতুন শার্ড; তার ইন্ডিকেটর স্টেট পরের জবগুলোতে আবার গড়ে ওঠে। একই ভাঙা পুলে একাধিক জব থাকলে একবারই।
+        """
+        if index >= len(self.shards) or self.shards[index] is not broken:
+            return
+        self.shards[index] = self._new_shard(index)
+        self.restarts += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+        logger.warning(f"⚠️ Compute shard {index} broke (worker died), restarted it")
+
+    async def run(self, key: Hashable, fn, *args):
+        """
+        key এর জন্য fn(*args) শার্ডে চালানো। একই key এর নতুন জব এর মধ্যে এলে None।
+        fn ও args প্রসেস মোডে পিকল হয় (মডিউল-লেভেল ফাংশন লাগে)।
+        """
+        if not self.shards:
+            await self.start()
+        generation = self.generations.get(key, 0) + 1
+        self.generations[key] = generation
+        self.submitted += 1
+        previous = self.queued.pop(key, None)
+        if previous is not None:
+            # শার্ডের কিউতে থাকলে বাতিল হয় (চলমান হলে cancel কিছু করে না, ফলাফল পরে ফেলে দেওয়া হয়)
+            previous.cancel()
+
+        queued = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            started = time.perf_counter()
+            self.wait_ms += (started - queued) * 1000
+            if self.generations.get(key) != generation:
+                self.stale += 1
+                return None
+            self.in_flight += 1
+            index = self._shard_index(key)
+            shard = self.shards[index]
+            try:
+                job = self.queued[key] = shard.submit(fn, *args)
+            except BrokenExecutor:
+                self.in_flight -= 1
+                self._replace_shard(index, shard)
+                return None
+            try:
+                waiter = asyncio.wrap_future(job)
+                # wait() বাইরের ক্যান্সেলে waiter কে ছোঁয় না, তাই স্টেল-বাতিল আর কলারের ক্যান্সেল আলাদা করা যায়
+                await asyncio.wait({waiter})
+                if waiter.cancelled():
+                    self.stale += 1
+                    return None
+                result = waiter.result()
+            except asyncio.CancelledError:
+                job.cancel()
+                raise
+            except BrokenExecutor:
+                # এই জব হারানো (সুপারসিডেডের মতো None); পরের জব নতুন শার্ডে
+                self.errors += 1
+                self._replace_shard(index, shard)
+                return None
+            except Exception:
+                self.errors += 1
+                raise
+            finally:
+                self.in_flight -= 1
+                if self.queued.get(key) is job:
+                    del self.queued[key]
+                if not job.cancelled():
+                    self.ran += 1
+                    self.compute_ms += (time.perf_counter() - started) * 1000
+        finally:
+            self.slots.release()
+
+        if self.generations.get(key) != generation:
+            self.stale += 1
+            return None
+        self.completed += 1
+        return result
+
+    async def analyze(self, ohlcv, symbol: str, timeframe: str, book: Optional[dict] = None,
+                      params: Optional[dict] = None):
+        """SignalEngine.analyze_incremental ওয়ার্কারে; সুপারসিডেড হলে None"""
+        # memmap উইন্ডোর কপি: ফর্মিং রো এর মধ্যে বদলালেও ওয়ার্কার একটি স্থির স্ন্যাপশট পায়
+        window = np.array(ohlcv, dtype=np.float64)
+        # শার্ড শুধু (symbol, timeframe) দিয়ে: একই সিম্বলের সব প্যারামিটার সেট একই ওয়ার্কারের ক্যাশে
+        with SIGNAL_COMPUTE_SECONDS.labels(self.mode).time():
+            outcome = await self.run((symbol, timeframe), _analyze, window, symbol, timeframe, book, params)
+        if outcome is None:
+            return None
+        result, timings = outcome
+        observe_indicator_timings(timings)
+        return result
+
+    async def analyze_full(self, ohlcv, key: Hashable = "full"):
+        """pandas_ta দিয়ে পুরো analyze_market_sentiment ওয়ার্কারে"""
+        return await self.run(key, _analyze_full, np.array(ohlcv, dtype=np.float64).tolist())
+
+    async def cache_stats(self):
+        """প্রতি ওয়ার্কারের ইন্ডিকেটর ক্যাশ stats এর যোগফল (স্টেট ওয়ার্কারেই থাকে)"""
+        if not self.shards:
+            return {}
+        loop = asyncio.get_running_loop()
+        shard_stats = await asyncio.gather(*(loop.run_in_executor(shard, _cache_stats) for shard in self.shards))
+        totals = {}
+        for stats in shard_stats:
+            for name, value in stats.items():
+                totals[name] = value if name in ("max_entries", "ttl") else totals.get(name, 0) + value
+        lookups = totals.get("window_hits", 0) + totals.get("window_misses", 0)
+        totals["window_hit_ratio"] = round(totals.get("window_hits", 0) / lookups, 4) if lookups else 0.0
+        peeks = totals.get("indicator_hits", 0) + totals.get("indicator_misses", 0)
+        totals["indicator_hit_ratio"] = round(totals.get("indicator_hits", 0) / peeks, 4) if peeks else 0.0
+        return totals
+
+    def status(self):
+        return {
+            "mode": self.mode,
+            "workers": len(self.shards),
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "stale": self.stale,
+            "errors": self.errors,
+            "restarts": self.restarts,
+            "avg_wait_ms": round(self.wait_ms / self.submitted, 3) if self.submitted else 0.0,
+            "avg_compute_ms": round(self.compute_ms / self.ran, 3) if self.ran else 0.0,
+        }
+
+
+compute_executor = ComputeExecutor()
+
+registry.gauge_callback(
+    "metron_compute_jobs", "Signal jobs running on or waiting for a compute shard",
+    lambda: {"in_flight": compute_executor.in_flight, "waiting": compute_executor.waiting}, ("state",))
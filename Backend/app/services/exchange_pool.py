@@ -0,0 +1,175 @@
+import asyncio
+import importlib
+import logging
+import time
+from typing import Dict, Iterable, Optional
+
+from app.services.metrics import EXCHANGE_REQUEST_SECONDS
+from app.services.request_scheduler import request_scheduler
+
+logger = logging.getLogger(__name__)
+
+# এই ccxt মেথডগুলোর ল্যাটেন্সি exchange/method/outcome লেবেলে মাপা হয়
+INSTRUMENTED_METHODS = (
+    "load_markets", "fetch_ohlcv", "fetch_order_book", "fetch_trades", "fetch_ticker", "fetch_tickers",
+    "fetch_time", "fetch_status",
+)
+
+
+def _instrument(exchange_id: str, client):
+    """ক্লায়েন্ট ইনস্ট্যান্সের মেথড টাইমারে মোড়ানো (ক্লাস অপরিবর্তিত)"""
+    for name in INSTRUMENTED_METHODS:
+        method = getattr(client, name, None)
+        if method is None:
+            continue
+        ok = EXCHANGE_REQUEST_SECONDS.labels(exchange_id, name, "ok")
+        error = EXCHANGE_REQUEST_SECONDS.labels(exchange_id, name, "error")
+
+        async def timed(*args, _method=method, _ok=ok, _error=error, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = await _method(*args, **kwargs)
+            except BaseException:
+                _error.observe(time.perf_counter() - started)
+                raise
+            _ok.observe(time.perf_counter() - started)
+            return result
+        setattr(client, name, timed)
+    return client
+
+
+class PooledExchange:
+    """একটি ccxt ক্লায়েন্ট ও তার হেলথ তথ্য"""
+
+    def __init__(self, exchange_id: str, client):
+        self.exchange_id = exchange_id
+        self.client = client
+        self.markets_loaded = False
+        self.healthy = True
+        self.failures = 0
+        self.last_check = 0.0
+        self.last_latency_ms = 0.0
+        self.created = time.time()
+
+    def status(self):
+        return {
+            "exchange": self.exchange_id,
+            "healthy": self.healthy,
+            "markets_loaded": self.markets_loaded,
+            "failures": self.failures,
+            "latency_ms": round(self.last_latency_ms, 2),
+            "last_check": self.last_check,
+        }
+
+
+class ExchangePool:
+    """
+    exchange_id অনুযায়ী শেয়ার্ড ccxt ক্লায়েন্ট পুল।
+    - প্রথম ব্যবহারে ক্লায়েন্ট তৈরি ও load_markets একবারই (লেজি ওয়ার্মআপ)
+    - একই HTTP সেশন বারবার ব্যবহার হয়, তাই প্রতি টিকে TLS হ্যান্ডশেক লাগে না
+    - পিরিয়ডিক হেলথ চেক; বারবার ফেইল করলে ক্লায়েন্ট বাদ দিয়ে নতুন করে তৈরি
+    """
+
+    def __init__(self, health_interval: float = 60.0, max_failures: int = 3):
+        self.entries: Dict[str, PooledExchange] = {}
+        self.locks: Dict[str, asyncio.Lock] = {}
+        self.health_interval = health_interval
+        self.max_failures = max_failures
+        self.health_task: Optional[asyncio.Task] = None
+
+    def _lock(self, exchange_id: str):
+        lock = self.locks.get(exchange_id)
+        if lock is None:
+            lock = self.locks[exchange_id] = asyncio.Lock()
+        return lock
+
+    async def get(self, exchange_id: str, load_markets: bool = True):
+        """পুল থেকে ক্লায়েন্ট নেওয়া (না থাকলে তৈরি)"""
+        entry = self.entries.get(exchange_id)
+        if entry is not None and (entry.markets_loaded or not load_markets):
+            return entry.client
+
+        async with self._lock(exchange_id):
+            entry = self.entries.get(exchange_id)
+            if entry is None:
+                # ccxt ইমপোর্ট (~০.৫s) প্রথম ক্লায়েন্টে — স্টার্টআপে ওয়ার্মআপ থ্রেডে আগেই লোড হয়ে থাকে
+                ccxt = importlib.import_module("ccxt.async_support")
+                if not hasattr(ccxt, exchange_id):
+                    raise ValueError(f"Unknown exchange: {exchange_id}")
+                # শিডিউলার বাইরে, টাইমার ভেতরে: ল্যাটেন্সিতে বাজেটের অপেক্ষা ধরা হয় না
+                client = request_scheduler.wrap(exchange_id, _instrument(exchange_id, getattr(ccxt, exchange_id)()))
+                entry = self.entries[exchange_id] = PooledExchange(exchange_id, client)
+                logger.info(f"🔌 Exchange client created: {exchange_id}")
+
+            if load_markets and not entry.markets_loaded:
+                # ব্যর্থ হলে markets_loaded False থাকে, পরের কলে আবার চেষ্টা হবে
+                await entry.client.load_markets()
+                entry.markets_loaded = True
+        return entry.client
+
+    async def warmup(self, exchange_ids: Iterable[str]):
+        """ব্যাকগ্রাউন্ডে ক্লায়েন্ট তৈরি ও মার্কেট লোড (ব্যর্থ হলে পরে লেজি লোড হবে)"""
+        results = await asyncio.gather(*(self.get(ex_id) for ex_id in exchange_ids), return_exceptions=True)
+        for ex_id, result in zip(exchange_ids, results):
+            if isinstance(result, Exception):
+                logger.warning(f"⚠️ Warmup failed for {ex_id}: {result}")
+
+    def start_health_checks(self):
+        if self.health_task is None or self.health_task.done():
+            self.health_task = asyncio.create_task(self._health_loop())
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for exchange_id in list(self.entries):
+                await self.check(exchange_id)
+
+    async def check(self, exchange_id: str):
+        entry = self.entries.get(exchange_id)
+        if entry is None:
+            return False
+        started = time.perf_counter()
+        try:
+            if entry.client.has.get("fetchTime"):
+                await asyncio.wait_for(entry.client.fetch_time(), timeout=5)
+            else:
+                await asyncio.wait_for(entry.client.fetch_status(), timeout=5)
+            entry.healthy = True
+            entry.failures = 0
+        except Exception as e:
+            entry.healthy = False
+            entry.failures += 1
+            logger.warning(f"⚠️ Health check failed for {exchange_id} ({entry.failures}): {e}")
+            if entry.failures >= self.max_failures:
+                # সেশন নষ্ট হয়ে থাকতে পারে, তাই ক্লায়েন্ট বন্ধ করে পরের get() এ নতুন করে তৈরি
+                await self.discard(exchange_id)
+        entry.last_check = time.time()
+        entry.last_latency_ms = (time.perf_counter() - started) * 1000
+        return entry.healthy
+
+    async def discard(self, exchange_id: str):
+        entry = self.entries.pop(exchange_id, None)
+        if entry is not None:
+            try:
+                await entry.client.close()
+            except Exception:
+                pass
+
+    async def close_all(self):
+        """অ্যাপ বন্ধের সময় সব সেশন পরিষ্কারভাবে বন্ধ করা"""
+        if self.health_task:
+            self.health_task.cancel()
+            try:
+                await self.health_task
+            except asyncio.CancelledError:
+                pass
+            self.health_task = None
+        for exchange_id in list(self.entries):
+            await self.discard(exchange_id)
+        logger.info("🛑 Exchange pool closed")
+
+    def status(self):
+        return [entry.status() for entry in self.entries.values()]
+
+
+exchange_pool = ExchangePool()
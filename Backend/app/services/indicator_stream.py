@@ -0,0 +1,898 @@
+import math
+import time
+from collections import deque
+
+# ============================================================
+# ইনক্রিমেন্টাল ইন্ডিকেটর ইঞ্জিন
+# ------------------------------------------------------------
+# প্রতি টিকে ১০০ ক্যান্ডেলের DataFrame বানিয়ে ২০টি ইন্ডিকেটর নতুন করে
+# হিসাব না করে, প্রতিটি ইন্ডিকেটরের ছোট রোলিং স্টেট রাখা হয়।
+# - push(): ক্লোজড ক্যান্ডেল স্টেটে কমিট করে
+# - peek(): ফর্মিং (চলমান) ক্যান্ডেল দিয়ে স্টেট না বদলে ভোট হিসাব করে
+# ফর্মুলাগুলো pandas_ta (0.4.x) এর ডিফল্ট প্যারামিটার হুবহু অনুসরণ করে,
+# যাতে একই ডাটায় SignalEngine.analyze_market_sentiment এর সাথে ভোট মিলে যায়।
+# ============================================================
+
+# ইন্ডিকেটর-প্রতি সময়ের স্যাম্পল (মেট্রিকের জন্য): প্রতি TIMING_SAMPLE_EVERY তম feed এ মাপা হয়,
+# বাকিগুলোতে কোনো টাইমার নেই। compute_executor ওয়ার্কার থেকে drain_timings() দিয়ে নেয়।
+TIMING_SAMPLE_EVERY = 16
+TIMING_BUFFER_MAX = 4096
+_timings = []
+_feeds = 0
+
+NAN = float("nan")
+EPSILON = 2.220446049250313e-16  # sys.float_info.epsilon (pandas_ta non_zero_range)
+DAY_MS = 86_400_000
+
+# ডিফল্ট প্যারামিটার (analyze_market_sentiment এর হার্ডকোড করা ভ্যালুগুলো)
+DEFAULT_PARAMS = {
+    "sma": 50,
+    "ema": 20,
+    "macd_fast": 12,
+    "macd_slow": 26,
+    "macd_signal": 9,
+    "adx": 14,
+    "psar_af": 0.02,
+    "psar_max_af": 0.2,
+    "ichimoku_tenkan": 9,
+    "ichimoku_kijun": 26,
+    "ichimoku_senkou": 52,
+    "supertrend": 7,
+    "supertrend_multiplier": 3.0,
+    "rsi": 14,
+    "stoch_k": 14,
+    "stoch_smooth": 3,
+    "cci": 20,
+    "willr": 14,
+    "roc": 10,
+    "bbands": 20,
+    "bbands_std": 2.0,
+    "atr": 14,
+    "kc": 20,
+    "kc_scalar": 2.0,
+    "donchian": 20,
+    "mfi": 14,
+    "ad_lookback": 4,
+}
+
+# pandas এর মতো: এর কম ক্যান্ডেলে "LOADING..." দেখানো হয়
+MIN_CANDLES = 50
+
+
+def _ewm_alpha(span=None, alpha=None):
+    """pandas ewm এর মতো com হয়ে alpha বের করা (বিট-লেভেলে মিল রাখার জন্য)"""
+    com = (span - 1) / 2.0 if span is not None else (1.0 - alpha) / alpha
+    return 1.0 / (1.0 + com)
+
+
+def _gt(a, b):
+    """NaN সেফ তুলনা (pandas এর মতো NaN হলে False)"""
+    return a > b
+
+
+# ============================================================
+# ১. বেসিক রোলিং প্রিমিটিভ (সবগুলো feed(x, commit) প্যাটার্নে)
+# ============================================================
+class _Ewm:
+    """
+    pandas ewm(adjust=False) এর O(1) সংস্করণ।
+    presma > 1 হলে প্রথম presma পজিশনের গড় দিয়ে সিড করা হয় (pandas_ta ema/atr)।
+    """
+    __slots__ = ("alpha", "presma", "count", "seed", "value")
+
+    def __init__(self, alpha, presma=1):
+        self.alpha = alpha
+        self.presma = presma
+        self.count = 0
+        self.seed = []
+        self.value = NAN
+
+    def feed(self, x, commit):
+        if self.count < self.presma - 1:
+            if commit:
+                self.seed.append(x)
+                self.count += 1
+            return NAN
+
+        if self.count == self.presma - 1:
+            valid = [s for s in self.seed if s == s]
+            if x == x:
+                valid.append(x)
+            value = math.fsum(valid) / len(valid) if valid else NAN
+        elif self.value != self.value:
+            value = x  # প্রথম বৈধ ভ্যালু (rma এর NaN লিডিং)
+        elif x != x or x == self.value:
+            value = self.value
+        else:
+            old_wt = 1.0 - self.alpha
+            value = (old_wt * self.value + self.alpha * x) / (old_wt + self.alpha)
+
+        if commit:
+            self.count += 1
+            self.value = value
+            if self.seed:
+                self.seed = []
+        return value
+
+
+class _Window:
+    """শেষ n টি ভ্যালুর রানিং যোগফল ও বর্গের যোগফল (ড্রিফট এড়াতে মাঝে মাঝে রিসেট)"""
+    __slots__ = ("n", "values", "anchor", "total", "total_sq", "pushes")
+
+    def __init__(self, n):
+        self.n = n
+        self.values = deque(maxlen=n)
+        self.anchor = 0.0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.pushes = 0
+
+    def _rebase(self):
+        # প্রতি n পুশে একবার যোগফল নতুন করে বানানো হয় (অ্যামর্টাইজড O(1))
+        self.anchor = self.values[-1]
+        shifted = [v - self.anchor for v in self.values]
+        self.total = math.fsum(shifted)
+        self.total_sq = math.fsum(d * d for d in shifted)
+
+    def feed(self, x, commit):
+        """x যোগ করার পর উইন্ডোর (count, sum, sum_sq, anchor) — sum গুলো anchor শিফটেড"""
+        anchor = self.anchor
+        full = len(self.values) == self.n
+        d = x - self.anchor
+        total = self.total + d
+        total_sq = self.total_sq + d * d
+        if full:
+            old = self.values[0] - self.anchor
+            total -= old
+            total_sq -= old * old
+        count = self.n if full else len(self.values) + 1
+
+        if commit:
+            self.values.append(x)
+            self.total, self.total_sq = total, total_sq
+            self.pushes += 1
+            if self.pushes % self.n == 0:
+                self._rebase()
+        # রিবেসে self.anchor বদলে যেতে পারে, তাই হিসাবের সময়ের anchor ফেরত দেওয়া
+        return count, total, total_sq, anchor
+
+    def mean(self, x, commit):
+        count, total, _, anchor = self.feed(x, commit)
+        if count < self.n:
+            return NAN
+        return anchor + total / count
+
+    def mean_std(self, x, commit, ddof=1):
+        count, total, total_sq, anchor = self.feed(x, commit)
+        if count < self.n:
+            return NAN, NAN
+        var = (total_sq - total * total / count) / (count - ddof)
+        return anchor + total / count, math.sqrt(var) if var > 0 else 0.0
+
+    def total_of(self, x, commit):
+        count, total, _, anchor = self.feed(x, commit)
+        if count < self.n:
+            return NAN
+        return total + anchor * count
+
+
+class _Extreme:
+    """মনোটোনিক ডেক দিয়ে রোলিং max/min (pandas rolling(n).max()/min() এর মতো)"""
+    __slots__ = ("n", "is_max", "dq", "index")
+
+    def __init__(self, n, is_max=True):
+        self.n = n
+        self.is_max = is_max
+        self.dq = deque()
+        self.index = 0
+
+    def _better(self, a, b):
+        return a >= b if self.is_max else a <= b
+
+    def feed(self, x, commit):
+        i = self.index
+        if commit:
+            dq = self.dq
+            while dq and self._better(x, dq[-1][1]):
+                dq.pop()
+            dq.append((i, x))
+            while dq[0][0] <= i - self.n:
+                dq.popleft()
+            self.index += 1
+            result = dq[0][1]
+        else:
+            result = x
+            for idx, val in self.dq:
+                if idx > i - self.n:
+                    if not self._better(x, val):
+                        result = val
+                    break
+        return result if i + 1 >= self.n else NAN
+
+
+class _Lag:
+    """শেষ n টি ভ্যালু রেখে n ক্যান্ডেল আগের ভ্যালু দেওয়া (shift(n))"""
+    __slots__ = ("n", "values")
+
+    def __init__(self, n):
+        self.n = n
+        self.values = deque(maxlen=n)
+
+    def feed(self, x, commit):
+        prev = self.values[0] if len(self.values) == self.n else NAN
+        if commit:
+            self.values.append(x)
+        return prev
+
+
+# ============================================================
+# ২. ২০টি ইন্ডিকেটর (প্রতিটি feed(bar, commit) -> "BUY"/"SELL"/"NEUTRAL")
+# bar = (timestamp, open, high, low, close, volume)
+# inputs: ফর্মিং বারের যে ফিল্ডগুলো ভোটে প্রভাব ফেলে — এগুলো না বদলালে আগের peek এর ভোটই থাকে
+# ============================================================
+CLOSE = (4,)
+HL = (2, 3)
+HLC = (2, 3, 4)
+HLCV = (2, 3, 4, 5)
+
+class _SMA:
+    inputs = CLOSE
+
+    def __init__(self, p):
+        self.name = f"SMA ({p['sma']})"
+        self.window = _Window(p["sma"])
+
+    def feed(self, bar, commit):
+        sma = self.window.mean(bar[4], commit)
+        return "BUY" if _gt(bar[4], sma) else "SELL"
+
+
+class _EMA:
+    inputs = CLOSE
+
+    def __init__(self, p):
+        self.name = f"EMA ({p['ema']})"
+        self.ema = _Ewm(_ewm_alpha(span=p["ema"]), presma=p["ema"])
+
+    def feed(self, bar, commit):
+        ema = self.ema.feed(bar[4], commit)
+        return "BUY" if _gt(bar[4], ema) else "SELL"
+
+
+class _MACD:
+    name = "MACD"
+    inputs = CLOSE
+
+    def __init__(self, p):
+        self.fast = _Ewm(_ewm_alpha(span=p["macd_fast"]), presma=p["macd_fast"])
+        self.slow = _Ewm(_ewm_alpha(span=p["macd_slow"]), presma=p["macd_slow"])
+        self.signal = _Ewm(_ewm_alpha(span=p["macd_signal"]), presma=p["macd_signal"])
+
+    def feed(self, bar, commit):
+        macd = self.fast.feed(bar[4], commit) - self.slow.feed(bar[4], commit)
+        # সিগন্যাল লাইন শুরু হয় MACD এর প্রথম বৈধ ভ্যালু থেকে
+        signal = self.signal.feed(macd, commit) if macd == macd else NAN
+        return "BUY" if _gt(macd, signal) else "SELL"
+
+
+def _true_range(high, low, prev_close):
+    hl = high - low
+    if prev_close != prev_close:
+        return abs(hl)
+    return max(abs(hl), abs(high - prev_close), abs(prev_close - low))
+
+
+class _ADX:
+    name = "ADX (Strength)"
+    inputs = HLC
+
+    def __init__(self, p):
+        n = p["adx"]
+        rma = _ewm_alpha(alpha=1.0 / n)
+        self.atr = _Ewm(rma, presma=n)
+        self.pos = _Ewm(rma)
+        self.neg = _Ewm(rma)
+        self.adx = _Ewm(rma)
+        self.prev = None
+
+    def feed(self, bar, commit):
+        _, _, high, low, close, _ = bar
+        prev = self.prev
+        if prev is None:
+            # prenan=True: প্রথম ক্যান্ডেলের TR ও DM দুটোই NaN
+            tr = up_dm = dn_dm = NAN
+        else:
+            tr = _true_range(high, low, prev[4])
+            up = high - prev[2]
+            dn = prev[3] - low
+            up_dm = up if (up > dn and up > 0) else 0.0
+            dn_dm = dn if (dn > up and dn > 0) else 0.0
+            if abs(up_dm) < EPSILON:
+                up_dm = 0.0
+            if abs(dn_dm) < EPSILON:
+                dn_dm = 0.0
+
+        atr = self.atr.feed(tr, commit)
+        k = 100.0 / atr if atr == atr and atr != 0 else NAN
+        dmp = k * self.pos.feed(up_dm, commit)
+        dmn = k * self.neg.feed(dn_dm, commit)
+        dx = 100.0 * abs(dmp - dmn) / (dmp + dmn) if (dmp + dmn) else NAN
+        adx = self.adx.feed(dx, commit)
+        if commit:
+            self.prev = bar
+
+        if _gt(adx, 25):
+            return "BUY" if _gt(dmp, dmn) else "SELL"
+        return "NEUTRAL"
+
+
+class _PSAR:
+    name = "Parabolic SAR"
+    inputs = HL
+
+    def __init__(self, p):
+        self.af0 = p["psar_af"]
+        self.max_af = p["psar_max_af"]
+        self.first = None
+        self.state = None  # (falling, ep, af, sar, prev_high, prev_low)
+
+    def _step(self, bar):
+        high, low = bar[2], bar[3]
+        if self.state is None:
+            # প্রথম দুই ক্যান্ডেল দেখে শুরুর দিক ঠিক করা (pandas_ta _falling)
+            first = self.first
+            up = high - first[2]
+            dn = first[3] - low
+            dmn = dn if (dn > up and dn > 0) else 0.0
+            falling = abs(dmn) >= EPSILON and dmn > 0
+            ep = first[3] if falling else first[2]
+            sar = first[2] if falling else first[3]
+            af = self.af0
+            prev_high, prev_low = first[2], first[3]
+        else:
+            falling, ep, af, sar, prev_high, prev_low = self.state
+
+        sar = sar + af * (ep - sar)
+        if falling:
+            reverse = high > sar
+            if low < ep:
+                ep = low
+                af = min(af + self.af0, self.max_af)
+            sar = max(prev_high, sar)
+        else:
+            reverse = low < sar
+            if high > ep:
+                ep = high
+                af = min(af + self.af0, self.max_af)
+            sar = min(prev_low, sar)
+
+        if reverse:
+            sar = ep
+            af = self.af0
+            falling = not falling
+            ep = low if falling else high
+        return falling, ep, af, sar, high, low
+
+    def feed(self, bar, commit):
+        if self.first is None:
+            if commit:
+                self.first = bar
+            return "SELL"
+        state = self._step(bar)
+        if commit:
+            self.state = state
+        falling, sar = state[0], state[3]
+        return "BUY" if (not falling and sar > 0) else "SELL"
+
+
+class _Ichimoku:
+    name = "Ichimoku Cloud"
+    inputs = HL
+
+    def __init__(self, p):
+        t, k, s = p["ichimoku_tenkan"], p["ichimoku_kijun"], p["ichimoku_senkou"]
+        self.tenkan = (_Extreme(t, True), _Extreme(t, False))
+        self.kijun = (_Extreme(k, True), _Extreme(k, False))
+        self.senkou = (_Extreme(s, True), _Extreme(s, False))
+        # pandas_ta স্প্যান দুটোকে (kijun - 1) ক্যান্ডেল সামনে শিফট করে
+        self.span_a_lag = _Lag(k - 1)
+        self.span_b_lag = _Lag(k - 1)
+
+    @staticmethod
+    def _mid(pair, bar, commit):
+        return 0.5 * (pair[0].feed(bar[2], commit) + pair[1].feed(bar[3], commit))
+
+    def feed(self, bar, commit):
+        span_a = 0.5 * (self._mid(self.tenkan, bar, commit) + self._mid(self.kijun, bar, commit))
+        span_b = self._mid(self.senkou, bar, commit)
+        # ভোট: pandas_ta কলাম অর্ডার অনুযায়ী (ISA বনাম ISB, শিফটেড)
+        isa = self.span_a_lag.feed(span_a, commit)
+        isb = self.span_b_lag.feed(span_b, commit)
+        return "BUY" if _gt(isa, isb) else "SELL"
+
+
+class _Supertrend:
+    name = "Supertrend"
+    inputs = HLC
+
+    def __init__(self, p):
+        self.length = p["supertrend"]
+        self.multiplier = p["supertrend_multiplier"]
+        self.atr = _Ewm(_ewm_alpha(alpha=1.0 / self.length), presma=self.length)
+        self.prev_close = NAN
+        self.count = 0
+        self.state = None  # (direction, lb, ub)
+
+    def feed(self, bar, commit):
+        high, low, close = bar[2], bar[3], bar[4]
+        matr = self.multiplier * self.atr.feed(_true_range(high, low, self.prev_close), commit)
+        hl2 = 0.5 * (high + low)
+        lb, ub = hl2 - matr, hl2 + matr
+
+        if self.state is None:
+            direction = 1
+        else:
+            prev_dir, prev_lb, prev_ub = self.state
+            if close > prev_ub:
+                direction = 1
+            elif close < prev_lb:
+                direction = -1
+            else:
+                direction = prev_dir
+                if direction > 0 and lb < prev_lb:
+                    lb = prev_lb
+                if direction < 0 and ub > prev_ub:
+                    ub = prev_ub
+
+        index = self.count
+        if commit:
+            self.state = (direction, lb, ub)
+            self.prev_close = close
+            self.count += 1
+        # প্রথম length টি ক্যান্ডেলে pandas_ta direction NaN রাখে
+        return "BUY" if (index >= self.length and direction == 1) else "SELL"
+
+
+class _RSI:
+    inputs = CLOSE
+
+    def __init__(self, p):
+        n = p["rsi"]
+        self.name = f"RSI ({n})"
+        rma = _ewm_alpha(alpha=1.0 / n)
+        self.pos = _Ewm(rma)
+        self.neg = _Ewm(rma)
+        self.prev_close = NAN
+
+    def feed(self, bar, commit):
+        diff = bar[4] - self.prev_close
+        if commit:
+            self.prev_close = bar[4]
+        gain = self.pos.feed(max(diff, 0.0) if diff == diff else NAN, commit)
+        loss = self.neg.feed(min(diff, 0.0) if diff == diff else NAN, commit)
+        denom = gain + abs(loss)
+        val = 100.0 * gain / denom if denom else NAN
+        return "BUY" if val < 30 else "SELL" if val > 70 else "NEUTRAL"
+
+
+class _Stochastic:
+    name = "Stochastic"
+    inputs = HLC
+
+    def __init__(self, p):
+        self.hh = _Extreme(p["stoch_k"], True)
+        self.ll = _Extreme(p["stoch_k"], False)
+        self.smooth = _Window(p["stoch_smooth"])
+
+    def feed(self, bar, commit):
+        hh = self.hh.feed(bar[2], commit)
+        ll = self.ll.feed(bar[3], commit)
+        if hh != hh or ll != ll:
+            return "NEUTRAL"
+        rng = (hh - ll) or EPSILON
+        k = self.smooth.mean(100.0 * (bar[4] - ll) / rng, commit)
+        return "BUY" if k < 20 else "SELL" if k > 80 else "NEUTRAL"
+
+
+class _CCI:
+    name = "CCI"
+    inputs = HLC
+
+    def __init__(self, p):
+        self.n = p["cci"]
+        self.window = _Window(self.n)
+
+    def feed(self, bar, commit):
+        tp = (bar[2] + bar[3] + bar[4]) / 3.0
+        mean_tp = self.window.mean(tp, commit)
+        if mean_tp != mean_tp:
+            return "NEUTRAL"
+        # MAD এর জন্য উইন্ডোর ভ্যালুগুলো লাগে (n=20, তাই O(n) হলেও খরচ নগণ্য)
+        values = list(self.window.values)
+        if not commit:
+            values = values[1:] + [tp] if len(values) == self.n else values + [tp]
+        center = sum(values) / len(values)
+        mad = sum(abs(v - center) for v in values) / len(values)
+        # pandas_ta 0.4.x এর ফর্মুলা হুবহু: tp - mean / (c * mad)
+        if mad:
+            val = tp - mean_tp / (0.015 * mad)
+        else:
+            val = -math.inf if mean_tp > 0 else math.inf if mean_tp < 0 else NAN
+        return "BUY" if val < -100 else "SELL" if val > 100 else "NEUTRAL"
+
+
+class _WilliamsR:
+    name = "Williams %R"
+    inputs = HLC
+
+    def __init__(self, p):
+        self.hh = _Extreme(p["willr"], True)
+        self.ll = _Extreme(p["willr"], False)
+
+    def feed(self, bar, commit):
+        hh = self.hh.feed(bar[2], commit)
+        ll = self.ll.feed(bar[3], commit)
+        rng = hh - ll
+        val = 100.0 * ((bar[4] - ll) / rng - 1) if rng else NAN
+        return "BUY" if val < -80 else "SELL" if val > -20 else "NEUTRAL"
+
+
+class _ROC:
+    name = "Momentum (ROC)"
+    inputs = CLOSE
+
+    def __init__(self, p):
+        self.lag = _Lag(p["roc"])
+
+    def feed(self, bar, commit):
+        prev = self.lag.feed(bar[4], commit)
+        val = 100.0 * (bar[4] - prev) / prev if prev else NAN
+        return "BUY" if val > 0 else "SELL"
+
+
+class _Bollinger:
+    name = "Bollinger Bands"
+    inputs = CLOSE
+
+    def __init__(self, p):
+        self.window = _Window(p["bbands"])
+        self.std = p["bbands_std"]
+
+    def feed(self, bar, commit):
+        mid, std = self.window.mean_std(bar[4], commit)
+        close = bar[4]
+        if close < mid - self.std * std:
+            return "BUY"
+        if close > mid + self.std * std:
+            return "SELL"
+        return "NEUTRAL"
+
+
+class _ATR:
+    name = "ATR (Volatility)"
+    inputs = ()
+
+    def __init__(self, p):
+        pass
+
+    def feed(self, bar, commit):
+        # ভোট সবসময় NEUTRAL, তাই আলাদা ATR স্টেট রাখার দরকার নেই
+        return "NEUTRAL"
+
+
+class _Keltner:
+    name = "Keltner Channels"
+    inputs = HLC
+
+    def __init__(self, p):
+        n = p["kc"]
+        self.scalar = p["kc_scalar"]
+        self.basis = _Ewm(_ewm_alpha(span=n), presma=n)
+        self.band = _Ewm(_ewm_alpha(span=n), presma=n)
+        self.prev_close = NAN
+
+    def feed(self, bar, commit):
+        tr = _true_range(bar[2], bar[3], self.prev_close)
+        if commit:
+            self.prev_close = bar[4]
+        basis = self.basis.feed(bar[4], commit)
+        band = self.band.feed(tr, commit)
+        upper = basis + self.scalar * band
+        lower = basis - self.scalar * band
+        close = bar[4]
+        return "BUY" if close > upper else "SELL" if close < lower else "NEUTRAL"
+
+
+class _Donchian:
+    name = "Donchian Channels"
+    inputs = HLC
+
+    def __init__(self, p):
+        self.upper = _Extreme(p["donchian"], True)
+        self.lower = _Extreme(p["donchian"], False)
+
+    def feed(self, bar, commit):
+        upper = self.upper.feed(bar[2], commit)
+        lower = self.lower.feed(bar[3], commit)
+        if bar[4] >= upper:
+            return "BUY"
+        if bar[4] <= lower:
+            return "SELL"
+        return "NEUTRAL"
+
+
+class _OBV:
+    name = "OBV"
+    inputs = (4, 5)
+
+    def __init__(self, p):
+        self.prev_close = NAN
+
+    def feed(self, bar, commit):
+        # obv[-1] > obv[-2] মানে শেষ ক্যান্ডেলের signed volume > 0
+        diff = bar[4] - self.prev_close
+        if commit:
+            self.prev_close = bar[4]
+        sign = 1.0 if diff > 0 else -1.0 if diff < 0 else 0.0
+        return "BUY" if sign * bar[5] > 0 else "SELL"
+
+
+class _MFI:
+    name = "MFI"
+    inputs = HLCV
+
+    def __init__(self, p):
+        self.n = p["mfi"]
+        self.pos = _Window(self.n)
+        self.neg = _Window(self.n)
+        self.prev_tp = NAN
+        self.count = 0
+
+    def feed(self, bar, commit):
+        tp = (bar[2] + bar[3] + bar[4]) / 3.0
+        flow = tp * bar[5] * (1 if tp > self.prev_tp else -1)
+        gain = self.pos.total_of(max(flow, 0.0), commit)
+        loss = self.neg.total_of(max(-flow, 0.0), commit)
+        index = self.count
+        if commit:
+            self.prev_tp = tp
+            self.count += 1
+        if index < self.n:
+            return "NEUTRAL"
+        val = 100.0 * gain / (gain + loss + EPSILON)
+        return "BUY" if val < 20 else "SELL" if val > 80 else "NEUTRAL"
+
+
+class _VWAP:
+    name = "VWAP"
+    inputs = (0, 2, 3, 4, 5)
+
+    def __init__(self, p):
+        self.day = None
+        self.wp = 0.0
+        self.vol = 0.0
+
+    def feed(self, bar, commit):
+        # pandas_ta ডিফল্ট anchor "D": প্রতি UTC দিনে নতুন করে শুরু
+        day = bar[0] // DAY_MS
+        tp = (bar[2] + bar[3] + bar[4]) / 3.0
+        if day != self.day:
+            wp, vol = tp * bar[5], bar[5]
+        else:
+            wp, vol = self.wp + tp * bar[5], self.vol + bar[5]
+        if commit:
+            self.day, self.wp, self.vol = day, wp, vol
+        val = wp / vol if vol else NAN
+        return "BUY" if _gt(bar[4], val) else "SELL"
+
+
+class _ADLine:
+    name = "A/D Line"
+    inputs = HLCV
+
+    def __init__(self, p):
+        # pandas_ta এর মতো হুবহু: ad = cumsum, ভোট ad[-1] > ad[-5]। শেষ ৪টি ইনক্রিমেন্টের যোগফল নয় —
+        # cumsum এর রাউন্ডিংয়ে (যেমন শূন্য ভলিউমের বারে) দুটো আলাদা ভোট দিত
+        self.lookback = p["ad_lookback"]
+        self.rows = []  # প্রতি কমিটেড বারের (2c-(h+l), volume, high-low)
+        self.ad = []    # cumsum
+        # non_zero_range: উইন্ডোর কোনো বারে high == low হলে *সব* বারের রেঞ্জে epsilon যোগ হয়
+        self.flat = False
+
+    @staticmethod
+    def _cumsum(rows, flat):
+        total, out = 0.0, []
+        for num, volume, rng in rows:
+            total += num * (volume / (rng + EPSILON if flat else rng))
+            out.append(total)
+        return out
+
+    def feed(self, bar, commit):
+        _, _, high, low, close, volume = bar
+        row = (2 * close - (high + low), volume, high - low)
+        flat = self.flat or row[2] == 0
+        if flat and not self.flat:
+            # প্রথম ফ্ল্যাট বার: আগের সব ইনক্রিমেন্ট epsilon সহ নতুন করে (উইন্ডোতে একবারই)
+            ad = self._cumsum(self.rows + [row], True)
+            value, past = ad[-1], ad[-1 - self.lookback] if len(ad) > self.lookback else NAN
+        else:
+            prev = self.ad[-1] if self.ad else 0.0
+            value = prev + row[0] * (row[1] / (row[2] + EPSILON if flat else row[2]))
+            past = self.ad[-self.lookback] if len(self.ad) >= self.lookback else NAN
+        if commit:
+            self.rows.append(row)
+            if flat and not self.flat:
+                self.ad, self.flat = ad, True
+            else:
+                self.ad.append(value)
+        return "BUY" if _gt(value, past) else "SELL"
+
+
+# analyze_market_sentiment এর ভোটিং অর্ডার
+INDICATORS = (
+    _SMA, _EMA, _MACD, _ADX, _PSAR, _Ichimoku, _Supertrend,
+    _RSI, _Stochastic, _CCI, _WilliamsR, _ROC,
+    _Bollinger, _ATR, _Keltner, _Donchian,
+    _OBV, _MFI, _VWAP, _ADLine,
+)
+
+
+def drain_timings():
+    """জমা (indicator, seconds) স্যাম্পল নিয়ে বাফার খালি করা"""
+    global _timings
+    samples, _timings = _timings, []
+    return samples
+
+
+# ============================================================
+# ৩. ইঞ্জিন: প্রতি (symbol, timeframe) এর জন্য একটি ইনস্ট্যান্স
+# ============================================================
+class IncrementalSignalEngine:
+    """
+    ক্লোজড বার একবারই কমিট হয়; ফর্মিং বারে মেমো দুই স্তরে:
+    - উইন্ডো: ফর্মিং বার হুবহু একই হলে আগের ভোট লিস্টই ফেরত
+    - ইন্ডিকেটর: শুধু যেসব ইন্ডিকেটরের inputs বদলেছে সেগুলো আবার peek হয়
+      (যেমন একই দামে ট্রেড হলে শুধু ভলিউম-নির্ভর ইন্ডিকেটর)
+    কমিট হলে মেমো খালি হয়।
+    """
+
+    def __init__(self, params=None):
+        self.params = dict(DEFAULT_PARAMS, **(params or {}))
+        self.stats = {"bars": 0, "window_hits": 0, "window_misses": 0, "indicator_hits": 0, "indicator_misses": 0}
+        self.reset()
+
+    def reset(self):
+        self.indicators = [cls(self.params) for cls in INDICATORS]
+        # ফিল্ড বিটমাস্ক; timestamp (বিট 0) সবার — নতুন বার মানেই সব ইন্ডিকেটর আবার
+        self.masks = [sum(1 << j for j in (0,) + ind.inputs) for ind in self.indicators]
+        self.count = 0
+        self.origin_ts = None  # স্টেটের প্রথম ক্যান্ডেল — রিকার্সিভ ইন্ডিকেটরগুলো এখান থেকে সিড হয়েছে
+        self.last_closed_ts = None
+        self.last_details = None
+        self.forming = None
+        self._clear_memo()
+
+    def _clear_memo(self):
+        self.memo_bar = None      # শেষ peek করা ফর্মিং বার
+        self.memo_signals = None  # সেই বারে প্রতি ইন্ডিকেটরের ভোট
+        self.memo_details = None
+
+    def _feed(self, bar, commit):
+        global _feeds
+        _feeds += 1
+        if _feeds % TIMING_SAMPLE_EVERY or len(_timings) >= TIMING_BUFFER_MAX:
+            return [{"name": ind.name, "signal": ind.feed(bar, commit)} for ind in self.indicators]
+        details = []
+        for ind in self.indicators:
+            started = time.perf_counter()
+            signal = ind.feed(bar, commit)
+            _timings.append((ind.name, time.perf_counter() - started))
+            details.append({"name": ind.name, "signal": signal})
+        return details
+
+    def push(self, candle):
+        """একটি ক্লোজড ক্যান্ডেল স্টেটে কমিট করা"""
+        bar = tuple(candle[:1]) + tuple(float(x) for x in candle[1:6])
+        self.last_details = self._feed(bar, True)
+        if self.count == 0:
+            self.origin_ts = bar[0]
+        self.count += 1
+        self.stats["bars"] += 1
+        self.last_closed_ts = bar[0]
+        self._clear_memo()
+        return self.last_details
+
+    def peek(self, candle):
+        """ফর্মিং ক্যান্ডেল দিয়ে ভোট (স্টেট অপরিবর্তিত থাকে)"""
+        bar = tuple(candle[:1]) + tuple(float(x) for x in candle[1:6])
+        return self._feed(bar, False)
+
+    def _peek_memo(self, candle):
+        """peek, তবে আগের ফর্মিং বারের তুলনায় যে ফিল্ড বদলেছে শুধু তার উপর নির্ভরশীল ইন্ডিকেটর আবার"""
+        bar = tuple(candle[:1]) + tuple(float(x) for x in candle[1:6])
+        prev = self.memo_bar
+        if prev is None:
+            changed = -1
+        else:
+            changed = 0
+            for j in range(6):
+                if bar[j] != prev[j]:
+                    changed |= 1 << j
+        if not changed:
+            self.stats["window_hits"] += 1
+            return self.memo_details
+        self.stats["window_misses"] += 1
+
+        if changed & 1:
+            # নতুন ফর্মিং বার (বা কমিটের পর প্রথম peek): সব ইন্ডিকেটর
+            self.stats["indicator_misses"] += len(self.masks)
+            details = self._feed(bar, False)
+            self.memo_signals = [d["signal"] for d in details]
+        else:
+            stale = [i for i, mask in enumerate(self.masks) if mask & changed]
+            self.stats["indicator_hits"] += len(self.masks) - len(stale)
+            self.stats["indicator_misses"] += len(stale)
+            signals = self.memo_signals
+            for i in stale:
+                signals[i] = self.indicators[i].feed(bar, False)
+            details = [{"name": ind.name, "signal": signal} for ind, signal in zip(self.indicators, signals)]
+        self.memo_bar = bar
+        self.memo_details = details
+        return details
+
+    def update(self, candle):
+        """
+        প্রতি টিক বা ক্যান্ডেলে কল করা যায়।
+        একই timestamp হলে ফর্মিং ক্যান্ডেল বদলায়, নতুন timestamp এলে আগেরটি কমিট হয়।
+        """
+        if self.forming is not None and candle[0] > self.forming[0]:
+            self.push(self.forming)
+        elif self.last_closed_ts is not None and candle[0] <= self.last_closed_ts:
+            return self.details()
+        self.forming = candle
+        return self.details()
+
+    def details(self):
+        """বর্তমান ভোট লিস্ট (ক্যান্ডেল কম থাকলে None)"""
+        total = self.count + (1 if self.forming is not None else 0)
+        if total < MIN_CANDLES:
+            return None
+        if self.forming is None:
+            return self.last_details
+        return self._peek_memo(self.forming)
+
+    def sync(self, ohlcv_data):
+        """
+        REST লিস্ট বা market_store এর (n, 6) উইন্ডোর সাথে স্টেট মেলানো।
+        শেষ ক্যান্ডেলটি ফর্মিং ধরা হয়; শুধু নতুন ক্লোজড ক্যান্ডেলগুলো পুশ হয়।
+        স্টেট সবসময় উইন্ডোর প্রথম ক্যান্ডেল থেকে: উইন্ডো সরে গেলে (স্ক্যানারের sync_candles(limit=100))
+        বা মাঝে গ্যাপ থাকলে (রিস্টার্ট/মিসিং ডাটা) পুরো উইন্ডো থেকে নতুন করে বানানো হয় —
+        নাহলে Supertrend/PSAR/ADX/MACD/RSI এর সিড উইন্ডোর বাইরের হিস্টোরিতে থেকে যেত
+        আর pandas_ta এর সাথে ভোট মিলত না। ফর্মিং ক্যান্ডেলের টিকগুলো আগের মতোই O(1)।
+        """
+        if len(ohlcv_data) == 0:
+            return None
+
+        start = 0
+        if self.origin_ts is not None and ohlcv_data[0][0] != self.origin_ts:
+            self.reset()
+        elif self.last_closed_ts is not None and ohlcv_data[-1][0] >= self.last_closed_ts:
+            start = None
+            for i in range(len(ohlcv_data) - 1, -1, -1):
+                if ohlcv_data[i][0] == self.last_closed_ts:
+                    start = i + 1
+                    break
+            if start is None:
+                self.reset()
+                start = 0
+        elif self.last_closed_ts is not None:
+            self.reset()
+
+        for candle in ohlcv_data[start:-1]:
+            self.push(candle)
+        if ohlcv_data[-1][0] == self.last_closed_ts:
+            self.forming = None
+        else:
+            # memmap উইন্ডো হলে রো-টি পরে জায়গায় বদলে যেতে পারে, তাই কপি রাখা
+            self.forming = tuple(ohlcv_data[-1])
+        return self.details()
@@ -0,0 +1,460 @@
+import asyncio
+import logging
+import struct
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+from app.core.config import settings
+from app.services.metrics import registry
+from app.services.serializers import json_codec
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# মার্কেট ডাটা বাস: এক ইনজেস্ট প্রসেস, অনেক ওয়েবসকেট গেটওয়ে
+# ------------------------------------------------------------
+# রোল (PROCESS_ROLE):
+#   all     — আগের মতো এক প্রসেসে সবকিছু; বাস সরাসরি লোকাল হাবে দেয় (কোনো সিরিয়ালাইজ নেই)
+#   ingest  — এক্সচেঞ্জ কানেকশন, স্ক্যানার, অর্ডার বুক, আরবিট্রেজ চালায়; টিক/বার/সিগন্যাল বাসে পাঠায়
+#   gateway — কোনো এক্সচেঞ্জ কল নেই; বাস থেকে পেয়ে নিজের হাবের ক্লায়েন্টদের পাঠায়
+#             (uvicorn --workers N: প্রতি কোরে একটি গেটওয়ে)
+# ব্যাকএন্ড (BUS_URL):
+#   ""                        — ইন-প্রসেস
+#   unix:///tmp/metron.sock   — লোকাল IPC (ইউনিক্স সকেট), ইনজেস্ট সার্ভার, গেটওয়ে ক্লায়েন্ট
+#   tcp://127.0.0.1:7781      — একই প্রোটোকল TCP তে (কন্টেইনার ভেদে)
+#   redis://localhost:6379/0  — Redis pub/sub (redis প্যাকেজ ইন্সটল থাকলে)
+# এনভেলপ প্রতি মেসেজে একবারই এনকোড হয়, সব গেটওয়েতে একই বাইট যায়।
+# IPC তে নতুন গেটওয়ে কানেক্ট হলে "latest" টপিকগুলোর শেষ মেসেজ আগে পায়,
+# আর গেটওয়ে তার ক্লায়েন্ট সংখ্যা ফেরত পাঠায় (কেউ না দেখলে ইনজেস্ট পোলিং থামায়)।
+# কন্ট্রোল মেসেজ ({"control": ...}, যেমন সেটিংস বদল) উল্টো দিকেও যায়: গেটওয়ে → ইনজেস্ট → সব গেটওয়ে।
+# ============================================================
+
+ROLES = ("all", "ingest", "gateway")
+FRAME_HEADER = struct.Struct("!I")
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+Envelope = dict
+Deliver = Callable[[Envelope], Awaitable[None]]
+Control = Callable[[dict], Awaitable[None]]
+
+
+def envelope(topic: Optional[str], message: dict, legacy: bool = False, snapshot: Optional[dict] = None) -> Envelope:
+    """topic None = পুরনো ফিডের broadcast; snapshot শুধু ডেল্টা/ব্যাচ টপিকে (hub.publish দেখুন)"""
+    item = {"topic": topic, "legacy": legacy, "message": message}
+    if snapshot is not None:
+        item["snapshot"] = snapshot
+    return item
+
+
+def _encode(item: dict) -> bytes:
+    body = json_codec.dumps(item).encode()
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+async def _read_frame(reader: asyncio.StreamReader):
+    header = await reader.readexactly(FRAME_HEADER.size)
+    (size,) = FRAME_HEADER.unpack(header)
+    if size > MAX_FRAME_BYTES:
+        raise ValueError(f"Bus frame too large: {size} bytes")
+    return json_codec.loads(await reader.readexactly(size))
+
+
+def _stream_address(url: str):
+    """unix:///path → ("unix", path), tcp://host:port → ("tcp", (host, port))"""
+    parsed = urlparse(url)
+    if parsed.scheme == "unix":
+        return "unix", parsed.path
+    if parsed.scheme == "tcp":
+        return "tcp", (parsed.hostname or "127.0.0.1", parsed.port or 7781)
+    raise ValueError(f"Unsupported bus url: {url}")
+
+
+class Transport:
+    """ইনজেস্ট পাশে send/remote_audience, গেটওয়ে পাশে subscribe/send_upstream"""
+    name = "inprocess"
+
+    async def start_publisher(self, snapshot: Callable[[], List[Envelope]], control: Control):
+        pass
+
+    async def start_subscriber(self, deliver: Deliver, audience: Callable[[], int]):
+        pass
+
+    def send(self, item: Envelope):
+        pass
+
+    async def send_upstream(self, item: dict) -> bool:
+        """গেটওয়ে → ইনজেস্ট (কন্ট্রোল মেসেজ); পাঠানো গেল কিনা"""
+        return False
+
+    def remote_audience(self) -> int:
+        return 0
+
+    async def stop(self):
+        pass
+
+    def status(self):
+        return {}
+
+
+class StreamTransport(Transport):
+    """
+    ইউনিক্স সকেট / TCP: দৈর্ঘ্য-প্রিফিক্সড JSON ফ্রেম।
+    স্লো গেটওয়ের রাইট বাফার BUS_MAX_BUFFER_BYTES ছাড়ালে কানেকশন কেটে দেওয়া হয় —
+    গেটওয়ে রিকানেক্ট করে স্ন্যাপশট থেকে আবার শুরু করে, ইনজেস্ট আটকে থাকে না।
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.kind, self.address = _stream_address(url)
+        self.name = self.kind
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.peers: Dict[asyncio.StreamWriter, int] = {}  # গেটওয়ে → তার ক্লায়েন্ট সংখ্যা
+        self.task: Optional[asyncio.Task] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.connected = False
+        self.sent = 0
+        self.received = 0
+        self.disconnects = 0
+
+    # ---------- ইনজেস্ট ----------
+    async def start_publisher(self, snapshot, control):
+        self.snapshot = snapshot
+        self.control = control
+        if self.kind == "unix":
+            self.server = await asyncio.start_unix_server(self._serve, path=self.address)
+        else:
+            host, port = self.address
+            self.server = await asyncio.start_server(self._serve, host, port)
+        logger.info(f"📡 Bus publisher listening on {self.url}")
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.peers[writer] = 0
+        logger.info(f"📡 Gateway connected to bus ({len(self.peers)} total)")
+        try:
+            for item in self.snapshot():
+                writer.write(_encode(item))
+            while True:
+                report = await _read_frame(reader)
+                if "control" in report:
+                    await self.control(report["control"])
+                else:
+                    self.peers[writer] = int(report.get("clients", 0))
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self.peers.pop(writer, None)
+            writer.close()
+            logger.info(f"📡 Gateway left bus ({len(self.peers)} remaining)")
+
+    def send(self, item: Envelope):
+        if not self.peers:
+            return
+        frame = _encode(item)
+        limit = settings.BUS_MAX_BUFFER_BYTES
+        for writer in list(self.peers):
+            if writer.transport.get_write_buffer_size() > limit:
+                logger.warning("⚠️ Bus gateway is lagging, disconnecting it")
+                self.disconnects += 1
+                self.peers.pop(writer, None)
+                writer.transport.abort()
+                continue
+            writer.write(frame)
+        self.sent += 1
+
+    def remote_audience(self):
+        return sum(self.peers.values())
+
+    # ---------- গেটওয়ে ----------
+    async def start_subscriber(self, deliver, audience):
+        self.task = asyncio.create_task(self._subscribe(deliver, audience))
+
+    async def _open(self):
+        if self.kind == "unix":
+            return await asyncio.open_unix_connection(self.address)
+        host, port = self.address
+        return await asyncio.open_connection(host, port)
+
+    async def _subscribe(self, deliver: Deliver, audience: Callable[[], int]):
+        error_count = 0
+        while True:
+            reporter = writer = None
+            try:
+                reader, writer = await self._open()
+                self.writer = writer
+                self.connected = True
+                error_count = 0
+                logger.info(f"📡 Gateway subscribed to bus {self.url}")
+                reporter = asyncio.create_task(self._report(writer, audience))
+                while True:
+                    item = await _read_frame(reader)
+                    self.received += 1
+                    await deliver(item)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error_count += 1
+                logger.warning(f"⚠️ Bus connection lost (Retry in {min(30, 2 * error_count)}s): {e}")
+            finally:
+                self.connected = False
+                self.writer = None
+                if reporter:
+                    reporter.cancel()
+                if writer:
+                    writer.close()
+            await asyncio.sleep(min(30, 2 * error_count))
+
+    async def send_upstream(self, item: dict) -> bool:
+        if self.writer is None:
+            return False
+        self.writer.write(_encode(item))
+        await self.writer.drain()
+        return True
+
+    async def _report(self, writer: asyncio.StreamWriter, audience: Callable[[], int]):
+        """ক্লায়েন্ট সংখ্যা বদলালে ইনজেস্টকে জানানো"""
+        last = None
+        while True:
+            count = audience()
+            if count != last:
+                writer.write(_encode({"clients": count}))
+                await writer.drain()
+                last = count
+            await asyncio.sleep(1)
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        if self.server:
+            self.server.close()
+            for writer in list(self.peers):
+                writer.close()
+            self.peers.clear()
+            await self.server.wait_closed()
+            self.server = None
+
+    def status(self):
+        return {
+            "url": self.url,
+            "gateways": len(self.peers),
+            "remote_clients": self.remote_audience(),
+            "connected": self.connected,
+            "sent": self.sent,
+            "received": self.received,
+            "lagging_disconnects": self.disconnects,
+        }
+
+
+class RedisTransport(Transport):
+    """
+    Redis pub/sub (ঐচ্ছিক)। স্ন্যাপশট ও অডিয়েন্স রিপোর্ট নেই: গেটওয়ে পরের আপডেট থেকে পায়,
+    আর ইনজেস্ট ধরে নেয় কেউ না কেউ দেখছে।
+    """
+    name = "redis"
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as aioredis
+        except ImportError:
+            raise RuntimeError("BUS_URL is redis:// but the 'redis' package is not installed")
+        self.url = url
+        self.channel = settings.BUS_REDIS_CHANNEL
+        self.control_channel = f"{self.channel}:control"
+        self.client = aioredis.from_url(url)
+        self.outbox: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+        self.control_task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.received = 0
+        self.dropped = 0
+
+    async def start_publisher(self, snapshot, control):
+        # publish() await করতে হয়; হট পাথ আটকাতে বাউন্ডেড আউটবক্স ও আলাদা টাস্ক
+        self.outbox = asyncio.Queue(maxsize=settings.BUS_REDIS_OUTBOX)
+        self.task = asyncio.create_task(self._drain())
+        # গেটওয়ের কন্ট্রোল মেসেজ আলাদা চ্যানেলে (ডাটা চ্যানেলে ইনজেস্ট সাবস্ক্রাইব করে না)
+        self.control_task = asyncio.create_task(
+            self._subscribe(self.control_channel, lambda item: control(item["control"])))
+
+    def send(self, item: Envelope):
+        try:
+            self.outbox.put_nowait(json_codec.dumps(item))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _drain(self):
+        while True:
+            data = await self.outbox.get()
+            try:
+                await self.client.publish(self.channel, data)
+                self.sent += 1
+            except Exception as e:
+                logger.warning(f"⚠️ Redis bus publish failed: {e}")
+                await asyncio.sleep(1)
+
+    def remote_audience(self):
+        return 1
+
+    async def start_subscriber(self, deliver, audience):
+        self.task = asyncio.create_task(self._subscribe(self.channel, deliver))
+
+    async def send_upstream(self, item: dict) -> bool:
+        await self.client.publish(self.control_channel, json_codec.dumps(item))
+        return True
+
+    async def _subscribe(self, channel: str, deliver: Deliver):
+        error_count = 0
+        while True:
+            try:
+                pubsub = self.client.pubsub()
+                await pubsub.subscribe(channel)
+                error_count = 0
+                async for raw in pubsub.listen():
+                    if raw.get("type") != "message":
+                        continue
+                    self.received += 1
+                    await deliver(json_codec.loads(raw["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error_count += 1
+                sleep_time = min(30, 2 * error_count)
+                logger.warning(f"⚠️ Redis bus subscription lost (Retry in {sleep_time}s): {e}")
+                await asyncio.sleep(sleep_time)
+
+    async def stop(self):
+        for task in (self.task, self.control_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self.task = self.control_task = None
+        await self.client.aclose()
+
+    def status(self):
+        return {"url": self.url, "channel": self.channel, "sent": self.sent,
+                "received": self.received, "dropped": self.dropped}
+
+
+def create_transport(url: str) -> Transport:
+    if not url:
+        return Transport()
+    if url.startswith("redis://") or url.startswith("rediss://"):
+        return RedisTransport(url)
+    return StreamTransport(url)
+
+
+class MarketBus:
+    """
+    প্রডিউসাররা (স্ক্যানার, আরবিট্রেজ, অর্ডার বুক, টিকার পাম্প) শুধু এখানে publish করে।
+    all/ingest রোলে লোকাল হাবে সাথে সাথে দেওয়া হয়, ingest এ ট্রান্সপোর্টেও যায়;
+    gateway রোলে ট্রান্সপোর্ট থেকে আসা এনভেলপ লোকাল হাবে যায়।
+    """
+
+    def __init__(self):
+        self.role = "all"
+        self.transport: Transport = Transport()
+        self.deliver: Optional[Deliver] = None
+        self.control: Optional[Control] = None
+        self.local_audience: Callable[[], int] = lambda: 0
+        self.published = 0
+        self.started_at: Optional[float] = None
+
+    async def start(self, deliver: Deliver, local_audience: Callable[[], int],
+                    snapshot: Callable[[], List[Envelope]], role: Optional[str] = None,
+                    url: Optional[str] = None, control: Optional[Control] = None):
+        self.role = role or settings.PROCESS_ROLE
+        if self.role not in ROLES:
+            raise ValueError(f"PROCESS_ROLE must be one of {ROLES}")
+        url = settings.BUS_URL if url is None else url
+        if self.role != "all" and not url:
+            raise ValueError(f"PROCESS_ROLE={self.role} needs BUS_URL")
+        self.deliver = deliver
+        self.control = control
+        self.local_audience = local_audience
+        self.transport = create_transport(url) if self.role != "all" else Transport()
+        if self.role == "ingest":
+            await self.transport.start_publisher(snapshot, self._upstream)
+        elif self.role == "gateway":
+            await self.transport.start_subscriber(self._receive, local_audience)
+        self.started_at = time.time()
+        logger.info(f"📡 Market bus: role={self.role}, backend={self.transport.name}")
+
+    async def stop(self):
+        await self.transport.stop()
+        self.transport = Transport()
+
+    @property
+    def ingests(self):
+        """এই প্রসেস কি এক্সচেঞ্জ ডাটা টানে (all বা ingest)"""
+        return self.role != "gateway"
+
+    async def publish(self, topic: str, message: dict, legacy: bool = False, snapshot: Optional[dict] = None):
+        await self._send(envelope(topic, message, legacy, snapshot))
+
+    async def broadcast(self, message: dict):
+        await self._send(envelope(None, message))
+
+    async def _send(self, item: Envelope):
+        self.published += 1
+        self.transport.send(item)
+        if self.deliver is not None:
+            await self.deliver(item)
+
+    async def notify(self, message: dict):
+        """
+        কন্ট্রোল মেসেজ অন্য সব প্রসেসে (এই প্রসেসে কলার নিজেই প্রয়োগ করেছে):
+        গেটওয়ে থেকে ইনজেস্টে, ইনজেস্ট প্রয়োগ করে সব গেটওয়েতে পাঠায় (উৎস গেটওয়েও আবার পায় — প্রয়োগ আইডেমপোটেন্ট)।
+        """
+        if self.role == "ingest":
+            self.transport.send({"control": message})
+        elif self.role == "gateway":
+            if not await self.transport.send_upstream({"control": message}):
+                logger.warning("⚠️ Bus is disconnected, control message stays local to this gateway")
+
+    async def _upstream(self, message: dict):
+        """ইনজেস্টে গেটওয়ের কন্ট্রোল মেসেজ: নিজে প্রয়োগ, তারপর সব গেটওয়েতে"""
+        await self._apply(message)
+        self.transport.send({"control": message})
+
+    async def _receive(self, item: Envelope):
+        """গেটওয়েতে বাসের ফ্রেম: কন্ট্রোল হলে প্রয়োগ, নইলে লোকাল হাবে"""
+        if "control" in item:
+            await self._apply(item["control"])
+        else:
+            await self.deliver(item)
+
+    async def _apply(self, message: dict):
+        if self.control is None:
+            return
+        try:
+            await self.control(message)
+        except Exception as e:
+            logger.warning(f"⚠️ Bus control message failed ({message.get('type')}): {e}")
+
+    def has_audience(self):
+        """কোনো ক্লায়েন্ট (এই প্রসেসে বা কোনো গেটওয়েতে) দেখছে কিনা"""
+        return bool(self.local_audience()) or bool(self.transport.remote_audience())
+
+    def status(self):
+        return {
+            "role": self.role,
+            "backend": self.transport.name,
+            "published": self.published,
+            "local_clients": self.local_audience(),
+            "transport": self.transport.status(),
+        }
+
+
+market_bus = MarketBus()
+
+registry.gauge_callback(
+    "metron_bus_remote_clients", "Websocket clients reported by bus gateways",
+    lambda: market_bus.transport.remote_audience())
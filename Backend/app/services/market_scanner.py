@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.market_store import market_store
+from app.services.compute_executor import compute_executor
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================
+# ১. স্ক্যান জব: প্রতি (symbol, timeframe) এর নিজস্ব লুপ
+# ============================================================
+class ScanJob:
+    def __init__(self, exchange_id: str, symbol: str, timeframe: str):
+        self.exchange_id = exchange_id
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.error_count = 0
+        self.last_latency_ms = 0.0
+        self.last_update = 0.0
+        self.last_verdict = None
+
+    @property
+    def topic(self):
+        return f"sentiment:{self.symbol}:{self.timeframe}"
+
+    def status(self):
+        return {
+            "symbol": self.symbol,
+            "timeframe": self.timeframe,
+            "verdict": self.last_verdict,
+            "latency_ms": round(self.last_latency_ms, 2),
+            "last_update": self.last_update,
+            "errors": self.error_count,
+        }
+
+
+class MarketScanner:
+    """
+    কনফিগারেবল ওয়াচলিস্টের প্রতিটি (symbol, timeframe) আলাদা টাস্কে স্ক্যান করে।
+    - Semaphore দিয়ে একসাথে চলা ফেচের সংখ্যা সীমিত
+    - এক্সচেঞ্জ রেট-লিমিট, কোয়ালেসিং ও ক্যাশ request_scheduler এ (পুলের ক্লায়েন্টেই)
+    - একটি স্লো সিম্বল অন্যগুলোকে আটকায় না (প্রতিটির নিজস্ব টাইমআউট ও ব্যাকঅফ)
+    """
+
+    def __init__(self):
+        self.jobs: Dict[tuple, ScanJob] = {}
+        self.tasks: Dict[tuple, asyncio.Task] = {}
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.publish: Optional[Callable[[dict], Awaitable[None]]] = None
+        self.is_active: Callable[[], bool] = lambda: True
+        # symbol → অর্ডার বুক মেট্রিক (বা None); থাকলে SignalEngine এ যায়
+        self.book_metrics: Callable[[str], Optional[dict]] = lambda symbol: None
+        # (exchange, symbol, timeframe) লাইভ স্ট্রিম থেকে চললে True — তখন REST ফেচ বাদ
+        self.streamed: Callable[[str, str, str], bool] = lambda exchange_id, symbol, timeframe: False
+
+    async def start(self, publish, is_active=None, book_metrics=None, streamed=None,
+                    symbols: Optional[List[str]] = None,
+                    timeframes: Optional[List[str]] = None,
+                    exchange_id: Optional[str] = None):
+        """ওয়াচলিস্টের প্রতিটি জবের জন্য টাস্ক চালু করা"""
+        self.publish = publish
+        if is_active is not None:
+            self.is_active = is_active
+        if book_metrics is not None:
+            self.book_metrics = book_metrics
+        if streamed is not None:
+            self.streamed = streamed
+        self.semaphore = asyncio.Semaphore(settings.SCANNER_CONCURRENCY)
+
+        exchange_id = exchange_id or settings.SCANNER_EXCHANGE
+        for symbol in symbols or settings.SCANNER_SYMBOLS:
+            for timeframe in timeframes or settings.SCANNER_TIMEFRAMES:
+                self.add(exchange_id, symbol, timeframe)
+        logger.info(f"🔭 Scanner started: {len(self.jobs)} jobs on {exchange_id}")
+
+    def add(self, exchange_id: str, symbol: str, timeframe: str):
+        key = (exchange_id, symbol, timeframe)
+        if key in self.tasks:
+            return
+        job = self.jobs[key] = ScanJob(exchange_id, symbol, timeframe)
+        self.tasks[key] = asyncio.create_task(self._run_job(job))
+
+    async def remove(self, exchange_id: str, symbol: str, timeframe: str):
+        key = (exchange_id, symbol, timeframe)
+        task = self.tasks.pop(key, None)
+        self.jobs.pop(key, None)
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def stop(self):
+        for key in list(self.tasks):
+            await self.remove(*key)
+
+    async def _run_job(self, job: ScanJob):
+        interval = settings.SCANNER_INTERVAL
+        # সব জব একসাথে শুরু হলে রেট-লিমিটে ধাক্কা লাগে, তাই ছড়িয়ে দেওয়া
+        await asyncio.sleep(random.uniform(0, interval))
+
+        while True:
+            if not self.is_active():
+                await asyncio.sleep(3)
+                continue
+            if self.streamed(job.exchange_id, job.symbol, job.timeframe):
+                # ক্যান্ডেল অ্যাগ্রিগেটর ট্রেড থেকে সিগন্যাল পাঠাচ্ছে; স্ট্রিম থামলে আবার REST
+                await asyncio.sleep(interval)
+                continue
+            try:
+                await self._scan_once(job)
+                job.error_count = 0
+                await asyncio.sleep(interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Exponential-ধাঁচের ব্যাকঅফ শুধু এই জবের জন্য
+                job.error_count += 1
+                sleep_time = min(30, 2 * job.error_count)
+                logger.warning(f"⚠️ Scan Error {job.symbol} {job.timeframe} (Retry in {sleep_time}s): {e}")
+                await asyncio.sleep(sleep_time)
+
+    async def _scan_once(self, job: ScanJob):
+        async with self.semaphore:
+            started = time.perf_counter()
+            # স্টোর ওয়ার্ম থাকলে শুধু ফর্মিং ক্যান্ডেল থেকে বাকিটুকু ফেচ হয়; ফেরত আসে memmap উইন্ডো
+            ohlcv = await asyncio.wait_for(
+                market_store.sync_candles(job.exchange_id, job.symbol, job.timeframe, limit=settings.SCANNER_CANDLES),
+                timeout=settings.SCANNER_FETCH_TIMEOUT,
+            )
+            job.last_latency_ms = (time.perf_counter() - started) * 1000
+
+        if len(ohlcv) == 0:
+            return
+        book = self.book_metrics(job.symbol) if job.exchange_id == "binance" else None
+        computed = time.perf_counter()
+        result = await compute_executor.analyze(ohlcv, job.symbol, job.timeframe, book=book)
+        if result is None:
+            return  # একই জবের নতুন হিসাব এর মধ্যে এসেছে
+        signalled = time.perf_counter()
+        result["symbol"] = job.symbol
+        result["timeframe"] = job.timeframe
+        job.last_verdict = result["verdict"]
+        job.last_update = time.time()
+
+        if self.publish:
+            # stamps: পেপার ট্রেডিং এর স্টেজ লেটেন্সির জন্য (পেলোডের বাইরে, তাই ডেল্টা/ক্লায়েন্টে যায় না)
+            await self.publish({"type": "SENTIMENT", "topic": job.topic, "payload": result,
+                                "stamps": {"compute": computed, "signal": signalled}})
+
+    def status(self):
+        return [job.status() for job in self.jobs.values()]
+
+
+market_scanner = MarketScanner()
@@ -0,0 +1,329 @@
+import asyncio
+import logging
+import os
+import re
+import zlib
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.exchange_pool import exchange_pool
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# লোকাল মার্কেট ডাটা স্টোর (মেমরি-ম্যাপড NumPy)
+# ------------------------------------------------------------
+# প্রতি (exchange, symbol, timeframe) এর ক্যান্ডেল একটি র' বাইনারি ফাইলে: রো = [ts, o, h, l, c, v] float64
+# প্রতি (exchange, symbol) এর ট্রেড আলাদা ফাইলে: TRADE_DTYPE রেকর্ড
+# - ফাইল শুধু শেষে বাড়ে (append); শুধু শেষ (ফর্মিং) ক্যান্ডেল জায়গায় বদলায়
+# - রিড হয় np.memmap এর স্লাইস — কপি ছাড়া উইন্ডো, সিগন্যাল ইঞ্জিন ও ব্যাকটেস্ট সরাসরি ব্যবহার করে
+# - এক্সচেঞ্জ থেকে শুধু যে রেঞ্জ নেই সেটুকুই আনা হয়, তাই রিস্টার্টের পরেও স্টোর ওয়ার্ম থাকে
+# ============================================================
+
+OHLCV_FIELDS = 6
+TRADE_DTYPE = np.dtype([
+    ("ts", "<i8"),
+    ("id", "<i8"),
+    ("price", "<f8"),
+    ("amount", "<f8"),
+    ("side", "i1"),  # +1 buy, -1 sell, 0 অজানা
+])
+
+
+def _safe_name(value: str):
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", value)
+
+
+def trade_id(raw):
+    """ccxt ট্রেড id কে int64 এ রূপান্তর (সংখ্যা না হলে crc32 হ্যাশ), ডিডুপের জন্য"""
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        return zlib.crc32(str(raw).encode())
+
+
+class MappedSeries:
+    """
+    শুধু-অ্যাপেন্ড বাইনারি ফাইল + রিড-অনলি memmap ভিউ।
+    ফাইলের দৈর্ঘ্য বদলালে তবেই নতুন করে ম্যাপ হয়; পুরনো ভিউগুলো বৈধ থাকে।
+    """
+
+    def __init__(self, path: str, dtype, width: Optional[int] = None):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.width = width
+        self.row_bytes = self.dtype.itemsize * (width or 1)
+        self.length = 0
+        self.view = self._empty()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._repair()
+        self._remap()
+
+    def _empty(self):
+        return np.empty((0, self.width) if self.width else (0,), dtype=self.dtype)
+
+    def _repair(self):
+        # ক্র্যাশে অর্ধেক লেখা রো থাকলে কেটে ফেলা
+        if os.path.exists(self.path):
+            size = os.path.getsize(self.path)
+            if size % self.row_bytes:
+                with open(self.path, "r+b") as f:
+                    f.truncate(size - size % self.row_bytes)
+
+    def _remap(self):
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        length = size // self.row_bytes
+        if length == self.length:
+            return
+        self.length = length
+        if length == 0:
+            self.view = self._empty()
+        else:
+            shape = (length, self.width) if self.width else (length,)
+            self.view = np.memmap(self.path, dtype=self.dtype, mode="r", shape=shape)
+
+    def __len__(self):
+        return self.length
+
+    def rows(self):
+        """পুরো সিরিজের memmap ভিউ (কপি নয়)"""
+        return self.view
+
+    def write(self, rows, at: int):
+        """at ইনডেক্স থেকে rows লেখা (at == length মানে append)"""
+        rows = np.ascontiguousarray(rows, dtype=self.dtype)
+        if len(rows) == 0:
+            return
+        with open(self.path, "r+b" if os.path.exists(self.path) else "wb") as f:
+            f.seek(at * self.row_bytes)
+            f.write(rows.tobytes())
+        self._remap()
+
+    def replace(self, rows):
+        """পুরো ফাইল নতুন করে লেখা (পুরনো ইতিহাস আগে যোগ করার সময়); পুরনো ভিউ অক্ষত থাকে"""
+        tmp = self.path + ".tmp"
+        np.ascontiguousarray(rows, dtype=self.dtype).tofile(tmp)
+        os.replace(tmp, self.path)
+        self.length = -1
+        self._remap()
+
+
+class MarketStore:
+    """
+    ক্যান্ডেল ও ট্রেডের লোকাল স্টোর।
+    - sync_candles: শেষ limit টি ক্যান্ডেল নিশ্চিত করে, শুধু শেষ স্টোর করা ক্যান্ডেল থেকে ফেচ
+    - backfill: since থেকে ইতিহাস (ব্যাকটেস্টের জন্য), শুরুর ও শেষের মিসিং অংশ আলাদা করে আনে
+    - candles / trades: কপি ছাড়া memmap উইন্ডো
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or settings.MARKET_DATA_DIR
+        self.series: Dict[tuple, MappedSeries] = {}
+        self.locks: Dict[tuple, asyncio.Lock] = {}
+
+    # ---------- ফাইল/সিরিজ ----------
+    def _candle_series(self, exchange_id: str, symbol: str, timeframe: str):
+        key = ("ohlcv", exchange_id, symbol, timeframe)
+        series = self.series.get(key)
+        if series is None:
+            path = os.path.join(self.root, exchange_id, _safe_name(symbol), f"{timeframe}.ohlcv")
+            series = self.series[key] = MappedSeries(path, np.float64, OHLCV_FIELDS)
+        return series
+
+    def _trade_series(self, exchange_id: str, symbol: str):
+        key = ("trades", exchange_id, symbol)
+        series = self.series.get(key)
+        if series is None:
+            path = os.path.join(self.root, exchange_id, _safe_name(symbol), "trades.bin")
+            series = self.series[key] = MappedSeries(path, TRADE_DTYPE)
+        return series
+
+    def _lock(self, key):
+        lock = self.locks.get(key)
+        if lock is None:
+            lock = self.locks[key] = asyncio.Lock()
+        return lock
+
+    # ---------- ক্যান্ডেল রিড ----------
+    def candles(self, exchange_id: str, symbol: str, timeframe: str,
+                limit: Optional[int] = None, since: Optional[int] = None, until: Optional[int] = None):
+        """[since, until) রেঞ্জের শেষ limit টি ক্যান্ডেল — memmap এর স্লাইস, কপি নয়"""
+        rows = self._candle_series(exchange_id, symbol, timeframe).rows()
+        ts = rows[:, 0]
+        start = int(np.searchsorted(ts, since, "left")) if since is not None else 0
+        end = int(np.searchsorted(ts, until, "left")) if until is not None else len(rows)
+        if limit is not None:
+            start = max(start, end - limit)
+        return rows[start:end]
+
+    def write_candles(self, exchange_id: str, symbol: str, timeframe: str, ohlcv):
+        """
+        নতুন ক্যান্ডেল লেখা। স্টোরের শেষ ক্যান্ডেলের চেয়ে পুরনো রো উপেক্ষিত,
+        একই ts হলে জায়গায় আপডেট (ফর্মিং ক্যান্ডেল), নতুনগুলো append।
+        """
+        if len(ohlcv) == 0:
+            return 0
+        series = self._candle_series(exchange_id, symbol, timeframe)
+        data = np.asarray(ohlcv, dtype=np.float64)[:, :OHLCV_FIELDS]
+        if len(series):
+            last_ts = series.rows()[-1, 0]
+            data = data[data[:, 0] >= last_ts]
+            if len(data) == 0:
+                return 0
+            at = len(series) - 1 if data[0, 0] == last_ts else len(series)
+        else:
+            at = 0
+        series.write(data, at)
+        return len(data)
+
+    def write_tail(self, exchange_id: str, symbol: str, timeframe: str, ohlcv):
+        """
+        লাইভ অ্যাগ্রিগেটরের খোলা বারগুলো (সবচেয়ে নতুন অংশ) লেখা: ডাটার প্রথম ts থেকে
+        স্টোরের শেষ পর্যন্ত জায়গায় বদলানো। write_candles এর মতো শুধু শেষ রো নয়, late গ্রেসে
+        থাকা আগের বারটিও আপডেট হয়। স্টোরে এর পরের (নতুন) রো থাকলে write_candles এর নিয়মে।
+        """
+        if len(ohlcv) == 0:
+            return 0
+        series = self._candle_series(exchange_id, symbol, timeframe)
+        data = np.asarray(ohlcv, dtype=np.float64)[:, :OHLCV_FIELDS]
+        at = int(np.searchsorted(series.rows()[:, 0], data[0, 0], "left"))
+        if at + len(data) < len(series):
+            return self.write_candles(exchange_id, symbol, timeframe, data)
+        series.write(data, at)
+        return len(data)
+
+    # ---------- এক্সচেঞ্জ থেকে মিসিং রেঞ্জ ----------
+    async def _fetch_range(self, exchange, symbol, timeframe, since, until=None, limit=None):
+        """since থেকে until (বা limit টি) পর্যন্ত পেজ করে ক্যান্ডেল আনা"""
+        tf_ms = exchange.parse_timeframe(timeframe) * 1000
+        page_limit = settings.MARKET_STORE_PAGE_LIMIT
+        candles = []
+        while limit is None or len(candles) < limit:
+            want = page_limit if limit is None else min(page_limit, limit - len(candles))
+            page = await exchange.fetch_ohlcv(symbol, timeframe, since=int(since), limit=want)
+            if candles:
+                page = [c for c in page if c[0] > candles[-1][0]]
+            if until is not None:
+                page = [c for c in page if c[0] < until]
+            if not page:
+                break
+            candles.extend(page)
+            since = page[-1][0] + tf_ms
+            if until is not None and since >= until:
+                break
+        return candles
+
+    async def sync_candles(self, exchange_id: str, symbol: str, timeframe: str, limit: int = 100):
+        """
+        শেষ limit টি ক্যান্ডেল স্টোরে আছে তা নিশ্চিত করে তাদের উইন্ডো ফেরত দেওয়া।
+        স্টোর ওয়ার্ম থাকলে শুধু শেষ স্টোর করা ক্যান্ডেল (ফর্মিং) থেকে বাকিটুকু আনা হয়।
+        """
+        async with self._lock(("ohlcv", exchange_id, symbol, timeframe)):
+            exchange = await exchange_pool.get(exchange_id)
+            tf_ms = exchange.parse_timeframe(timeframe) * 1000
+            series = self._candle_series(exchange_id, symbol, timeframe)
+            now = exchange.milliseconds()
+            current_open = now - now % tf_ms
+
+            rows = series.rows()
+            if len(rows) and rows[-1, 0] >= current_open - (limit - 1) * tf_ms:
+                # ওয়ার্ম: শেষ ক্যান্ডেল (আগে ফর্মিং ছিল) থেকে এখন পর্যন্ত
+                since = rows[-1, 0]
+                missing = int((current_open - since) // tf_ms) + 1
+            else:
+                # কোল্ড বা অনেক পুরনো: পুরো উইন্ডো (স্টোরের সাথে গ্যাপ থাকলে সেটাও পূরণ)
+                since = current_open - (limit - 1) * tf_ms
+                if len(rows) and rows[-1, 0] >= since - settings.MARKET_STORE_MAX_GAP * tf_ms:
+                    since = rows[-1, 0]
+                missing = int((current_open - since) // tf_ms) + 1
+
+            fetched = await self._fetch_range(exchange, symbol, timeframe, since, limit=missing)
+            if fetched and len(rows) and fetched[0][0] > rows[-1, 0] + tf_ms:
+                logger.info(f"🕳️ Candle gap in store {exchange_id} {symbol} {timeframe}, appending after gap")
+            self.write_candles(exchange_id, symbol, timeframe, fetched)
+        return self.candles(exchange_id, symbol, timeframe, limit=limit)
+
+    async def backfill(self, exchange_id: str, symbol: str, timeframe: str,
+                       since: int, until: Optional[int] = None):
+        """
+        [since, until) ইতিহাস নিশ্চিত করা (ব্যাকটেস্ট)।
+        স্টোরের আগের অংশ আর শেষের পরের অংশ শুধু আনা হয়; মাঝের ডাটা আবার ডাউনলোড হয় না।
+        """
+        async with self._lock(("ohlcv", exchange_id, symbol, timeframe)):
+            exchange = await exchange_pool.get(exchange_id)
+            tf_ms = exchange.parse_timeframe(timeframe) * 1000
+            series = self._candle_series(exchange_id, symbol, timeframe)
+            rows = series.rows()
+
+            if len(rows) == 0:
+                fetched = await self._fetch_range(exchange, symbol, timeframe, since, until)
+                self.write_candles(exchange_id, symbol, timeframe, fetched)
+            else:
+                first_ts, last_ts = rows[0, 0], rows[-1, 0]
+                if until is not None and until <= first_ts:
+                    # স্টোরের আগের আলাদা রেঞ্জ: শুধু সেটুকু আনা, স্টোরে লেখা নয় — মাঝে গ্যাপ রেখে লিখলে
+                    # "শুধু মিসিং রেঞ্জ" এর হিসাব (প্রথম/শেষ ts) গ্যাপটা আর ধরত না
+                    fetched = await self._fetch_range(exchange, symbol, timeframe, since, until)
+                    if not fetched:
+                        return rows[:0]
+                    return np.asarray(fetched, dtype=np.float64)[:, :OHLCV_FIELDS]
+                if since < first_ts:
+                    head = await self._fetch_range(exchange, symbol, timeframe, since, until=first_ts)
+                    if head:
+                        # শুরুতে যোগ করতে ফাইল নতুন করে লেখা লাগে (ব্যাকফিলে একবারই হয়)
+                        series.replace(np.concatenate([np.asarray(head, dtype=np.float64)[:, :OHLCV_FIELDS], rows]))
+                end = until if until is not None else exchange.milliseconds()
+                if end > last_ts + tf_ms:
+                    tail = await self._fetch_range(exchange, symbol, timeframe, last_ts, until=until)
+                    self.write_candles(exchange_id, symbol, timeframe, tail)
+        return self.candles(exchange_id, symbol, timeframe, since=since, until=until)
+
+    # ---------- ট্রেড ----------
+    def append_trades(self, exchange_id: str, symbol: str, trades):
+        """
+        ccxt ট্রেড লিস্ট append (ts অনুযায়ী সাজানো ধরে)।
+        স্টোরের শেষ ts এর আগের ট্রেড বাদ; একই ts হলে id দিয়ে ডুপ্লিকেট বাদ।
+        """
+        if not trades:
+            return 0
+        series = self._trade_series(exchange_id, symbol)
+        stored = series.rows()
+        last_ts = int(stored[-1]["ts"]) if len(stored) else None
+        seen = set()
+        if last_ts is not None:
+            tail_start = int(np.searchsorted(stored["ts"], last_ts, "left"))
+            seen = set(stored["id"][tail_start:].tolist())
+
+        records = []
+        for t in trades:
+            ts = int(t["timestamp"])
+            tid = trade_id(t.get("id"))
+            if last_ts is not None and (ts < last_ts or (ts == last_ts and tid in seen)):
+                continue
+            seen.add(tid)
+            side = 1 if t.get("side") == "buy" else -1 if t.get("side") == "sell" else 0
+            records.append((ts, tid, float(t["price"]), float(t["amount"]), side))
+        if records:
+            series.write(np.array(records, dtype=TRADE_DTYPE), len(series))
+        return len(records)
+
+    def trades(self, exchange_id: str, symbol: str, since: Optional[int] = None, limit: Optional[int] = None):
+        """since (ms) এর পরের শেষ limit টি ট্রেড — TRADE_DTYPE এর memmap স্লাইস"""
+        rows = self._trade_series(exchange_id, symbol).rows()
+        start = int(np.searchsorted(rows["ts"], since, "right")) if since is not None else 0
+        if limit is not None:
+            start = max(start, len(rows) - limit)
+        return rows[start:]
+
+    def status(self):
+        return [
+            {"kind": key[0], "exchange": key[1], "symbol": key[2],
+             "timeframe": key[3] if len(key) > 3 else None, "rows": len(series),
+             "last_ts": int(series.rows()[-1][0]) if len(series) else None}
+            for key, series in self.series.items()
+        ]
+
+
+market_store = MarketStore()
@@ -0,0 +1,329 @@
+import asyncio
+import bisect
+import logging
+import math
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# হালকা Prometheus-স্টাইল মেট্রিক (কোনো এক্সটার্নাল লাইব্রেরি ছাড়া)
+# ------------------------------------------------------------
+# - Counter / Gauge / Histogram, লেবেল সহ; labels(...) এর চাইল্ড ক্যাশ হয়,
+#   তাই হট পাথে শুধু একটি dict লুকআপ + যোগ (হিস্টোগ্রামে bisect)
+# - কলব্যাক গেজ: স্ক্রেপের সময়ই মান পড়া (কিউ ডেপথ, ক্লায়েন্ট সংখ্যা) — হট পাথে খরচ নেই
+# - render() → /metrics এর টেক্সট এক্সপোজিশন ফরম্যাট (0.0.4)
+# ============================================================
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# সেকেন্ডে; এক্সচেঞ্জ REST থেকে সাব-মিলিসেকেন্ড হিসাব পর্যন্ত
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FAST_BUCKETS = (0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01)
+
+
+def _escape(value: str):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(names: Sequence[str], values: Sequence[str], extra: str = ""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, int) or (isinstance(value, float) and value.is_integer() and abs(value) < 1e15):
+        return str(int(value))
+    return repr(float(value))
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # শেষটি +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self):
+        return _Timer(self)
+
+
+class _Timer:
+    """with histogram.labels(...).time(): ... — ব্লকের সময় সেকেন্ডে"""
+    __slots__ = ("child", "started")
+
+    def __init__(self, child: _HistogramChild):
+        self.child = child
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.started)
+        return False
+
+
+class Metric:
+    kind = "untyped"
+    child_class = _CounterChild
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.children: Dict[tuple, object] = {}
+        if not self.label_names:
+            self._default = self.children[()] = self._new_child()
+
+    def _new_child(self):
+        return self.child_class()
+
+    def labels(self, *values):
+        key = tuple(str(v) for v in values)
+        child = self.children.get(key)
+        if child is None:
+            if len(key) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}")
+            child = self.children[key] = self._new_child()
+        return child
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        for key, child in list(self.children.items()):
+            yield self.name, _labels_text(self.label_names, key), child.value
+
+
+class Counter(Metric):
+    kind = "counter"
+    child_class = _CounterChild
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+    child_class = _GaugeChild
+
+    def set(self, value: float):
+        self._default.set(value)
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default.dec(amount)
+
+
+class CallbackGauge(Metric):
+    """স্ক্রেপের সময় fn() — সংখ্যা, অথবা {লেবেল টাপল: মান}"""
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, fn: Callable[[], object], labels: Sequence[str] = ()):
+        self.fn = fn
+        super().__init__(name, help_text, labels)
+
+    def samples(self):
+        try:
+            value = self.fn()
+        except Exception as e:
+            logger.warning(f"⚠️ Metric callback {self.name} failed: {e}")
+            return
+        if isinstance(value, dict):
+            for key, item in value.items():
+                key = key if isinstance(key, tuple) else (key,)
+                yield self.name, _labels_text(self.label_names, key), item
+        else:
+            yield self.name, "", value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, help_text, labels)
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def time(self):
+        return _Timer(self._default)
+
+    def samples(self):
+        for key, child in list(self.children.items()):
+            cumulative = 0
+            for bound, count in zip(self.bounds + (math.inf,), child.counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket", _labels_text(self.label_names, key, le), cumulative
+            labels = _labels_text(self.label_names, key)
+            yield f"{self.name}_sum", labels, child.sum
+            yield f"{self.name}_count", labels, child.count
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def _register(self, metric: Metric):
+        existing = self.metrics.get(metric.name)
+        if existing is not None:
+            # মডিউল রিলোড বা দুবার রেজিস্টার: আগেরটাই ব্যবহার
+            return existing
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def gauge_callback(self, name: str, help_text: str, fn: Callable[[], object],
+                       labels: Sequence[str] = ()) -> CallbackGauge:
+        metric = CallbackGauge(name, help_text, fn, labels)
+        # কলব্যাক সবসময় সর্বশেষটি (singleton বদলালে)
+        self.metrics[name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+# ============================================================
+# হট-পাথ মেট্রিক (মডিউলগুলো সরাসরি ইমপোর্ট করে)
+# ============================================================
+EXCHANGE_REQUEST_SECONDS = registry.histogram(
+    "metron_exchange_request_seconds", "Exchange REST call latency", ("exchange", "method", "outcome"))
+EXCHANGE_SCHEDULED = registry.counter(
+    "metron_exchange_scheduler_total", "Exchange calls by scheduler outcome", ("exchange", "outcome"))
+EXCHANGE_QUEUE_SECONDS = registry.histogram(
+    "metron_exchange_queue_seconds", "Time spent waiting for exchange rate-limit budget", ("exchange", "priority"))
+STREAM_MESSAGES = registry.counter(
+    "metron_stream_messages_total", "Inbound exchange websocket messages", ("exchange", "kind"))
+STREAM_DROPPED = registry.counter(
+    "metron_stream_dropped_total", "Ticks dropped because a LiveMarketStream subscriber queue was full")
+WS_SENT = registry.counter(
+    "metron_ws_sent_total", "Frames written to client websockets", ("format",))
+WS_RECEIVED = registry.counter(
+    "metron_ws_received_total", "Control messages received from client websockets")
+WS_DROPPED = registry.counter(
+    "metron_ws_dropped_total", "Frames dropped because a client queue was full")
+WS_CONFLATED = registry.counter(
+    "metron_ws_conflated_total", "Pending frames replaced by a newer one for the same key")
+SIGNAL_COMPUTE_SECONDS = registry.histogram(
+    "metron_signal_compute_seconds", "Signal evaluation latency including executor queueing", ("mode",))
+SIGNAL_INDICATOR_SECONDS = registry.histogram(
+    "metron_signal_indicator_seconds", "Sampled per-indicator update time", ("indicator",), buckets=FAST_BUCKETS)
+PAPER_LATENCY_SECONDS = registry.histogram(
+    "metron_paper_latency_seconds", "Paper trading signal-to-fill latency by stage", ("stage",),
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+             0.05, 0.1, 0.25, 0.5, 1.0))
+STARTUP_PHASE_SECONDS = registry.gauge(
+    "metron_startup_phase_seconds", "Seconds from process start until each startup phase completed", ("phase",))
+LOOP_LAG_SECONDS = registry.histogram(
+    "metron_event_loop_lag_seconds", "Event loop scheduling delay",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5))
+LOOP_LAG_LAST = registry.gauge("metron_event_loop_lag_last_seconds", "Most recent event loop lag sample")
+
+
+def observe_indicator_timings(samples):
+    """ওয়ার্কার থেকে আসা (indicator, seconds) স্যাম্পল"""
+    for name, seconds in samples:
+        SIGNAL_INDICATOR_SECONDS.labels(name).observe(seconds)
+
+
+class LoopLagMonitor:
+    """
+    প্রতি interval এ ঘুমিয়ে দেখা কতটা দেরিতে জাগল — সেটাই লুপ ল্যাগ
+    (কোনো কলব্যাক লুপ আটকে রাখলে বাড়ে)।
+    """
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = interval or settings.METRICS_LOOP_LAG_INTERVAL
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            LOOP_LAG_SECONDS.observe(lag)
+            LOOP_LAG_LAST.set(lag)
+
+
+loop_lag_monitor = LoopLagMonitor()
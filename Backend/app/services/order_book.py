@@ -0,0 +1,368 @@
+import asyncio
+import logging
+import math
+import time
+from array import array
+from bisect import bisect_left
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.exchange_pool import exchange_pool
+from app.services.stream_engine import market_stream
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# লোকাল অর্ডার বুক (Binance depth diff stream)
+# ------------------------------------------------------------
+# Binance এর নিয়ম অনুযায়ী সিঙ্ক:
+#   ১. <pair>@depth@100ms স্ট্রিম চালু, ইভেন্ট বাফারে
+#   ২. REST স্ন্যাপশট (lastUpdateId); বাফারের u <= lastUpdateId ইভেন্ট বাদ
+#   ৩. প্রথম ইভেন্টে U <= lastUpdateId+1 <= u, এরপর প্রতিটির U == আগের u + 1
+#   ৪. সিকোয়েন্সে ফাঁক পেলে বুক বাতিল করে আবার স্ন্যাপশট (resync)
+# প্রাইস লেভেল: int টিক কী এর সাজানো array + সমান্তরাল qty array (ডিক্ট/ফ্লোট কী নয়);
+# বেস্ট লেভেল অ্যারের শেষে, তাই টপের কাছের ইনসার্ট/ডিলিটে মেমোরি সরাতে হয় সামান্যই।
+# ============================================================
+
+DIFF_STREAM = "depth@100ms"
+BUFFER_LIMIT = 2000  # সিঙ্কের সময় সর্বোচ্চ কতগুলো ডিফ জমা রাখা হয়
+
+
+class BookSide:
+    """
+    একপাশের লেভেল। keys ঊর্ধ্বক্রমে (খারাপ → বেস্ট): বিডে key = tick, আস্কে key = -tick,
+    তাই দুই পাশেই বেস্ট লেভেল শেষে আর "বেস্ট থেকে X দূরত্বের ভেতরে" মানে key >= সীমা।
+    """
+    __slots__ = ("sign", "keys", "qtys")
+
+    def __init__(self, is_bid: bool):
+        self.sign = 1 if is_bid else -1
+        self.keys = array("q")
+        self.qtys = array("d")
+
+    def __len__(self):
+        return len(self.keys)
+
+    def clear(self):
+        del self.keys[:]
+        del self.qtys[:]
+
+    def set(self, tick: int, qty: float):
+        """qty 0 মানে লেভেল মুছে ফেলা"""
+        keys = self.keys
+        key = tick * self.sign
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            if qty > 0:
+                self.qtys[i] = qty
+            else:
+                del keys[i]
+                del self.qtys[i]
+        elif qty > 0:
+            keys.insert(i, key)
+            self.qtys.insert(i, qty)
+
+    def best(self):
+        """(tick, qty) বা None"""
+        if not self.keys:
+            return None
+        return self.keys[-1] * self.sign, self.qtys[-1]
+
+    def top(self, n: int):
+        """বেস্ট থেকে n টি (tick, qty)"""
+        start = max(0, len(self.keys) - n)
+        sign = self.sign
+        return [(self.keys[i] * sign, self.qtys[i]) for i in range(len(self.keys) - 1, start - 1, -1)]
+
+    def volume(self, n: int):
+        return sum(self.qtys[max(0, len(self.qtys) - n):])
+
+    def within(self, limit_tick: int):
+        """limit_tick পর্যন্ত (বেস্টের দিক থেকে) মোট qty ও টিক × qty"""
+        i = bisect_left(self.keys, limit_tick * self.sign)
+        # অ্যারের বাফারের উপর জিরো-কপি ভিউ; ফাংশন শেষে ছেড়ে দেওয়া হয় (নইলে অ্যারে রিসাইজ করা যায় না)
+        keys = np.frombuffer(self.keys, dtype=np.int64)[i:]
+        qtys = np.frombuffer(self.qtys, dtype=np.float64)[i:]
+        return float(qtys.sum()), float(np.dot(keys, qtys)) * self.sign
+
+    def trim(self, max_levels: int):
+        """বেস্ট থেকে সবচেয়ে দূরের লেভেল ফেলে দেওয়া (অ্যারের শুরু)"""
+        extra = len(self.keys) - max_levels
+        if extra > 0:
+            del self.keys[:extra]
+            del self.qtys[:extra]
+
+
+class LocalOrderBook:
+    def __init__(self, symbol: str, tick_size: float = 1e-8):
+        self.symbol = symbol
+        self.set_tick_size(tick_size)
+        self.bids = BookSide(True)
+        self.asks = BookSide(False)
+        self.last_update_id: Optional[int] = None
+        self.synced = False
+        self.buffer: deque = deque(maxlen=BUFFER_LIMIT)
+        self.version = 0
+        self.published_version = 0
+        self.updated = 0.0
+        self.diffs = 0
+        self.gaps = 0
+        self.resyncs = 0
+
+    def set_tick_size(self, tick_size: float):
+        self.tick_size = tick_size
+        # আউটপুট প্রাইসে ফ্লোটের লেজ (66999.93000000001) না আসার জন্য টিকের দশমিক ঘর
+        self.decimals = max(0, math.ceil(-math.log10(tick_size) - 1e-9))
+
+    def to_tick(self, price) -> int:
+        return round(float(price) / self.tick_size)
+
+    def price(self, tick: int) -> float:
+        return round(tick * self.tick_size, self.decimals)
+
+    def _apply_levels(self, bids, asks):
+        to_tick = self.to_tick
+        for price, qty, *_ in bids:
+            self.bids.set(to_tick(price), float(qty))
+        for price, qty, *_ in asks:
+            self.asks.set(to_tick(price), float(qty))
+
+    def load_snapshot(self, bids, asks, last_update_id: int):
+        """
+        REST স্ন্যাপশট বসানো ও বাফারের ডিফ রিপ্লে।
+        রিটার্ন False মানে বাফারের সাথে মেলেনি (স্ন্যাপশট খুব পুরনো বা বাফারের মাঝে ফাঁক) — আবার resync লাগবে।
+        তখন স্ন্যাপশটের পরের ডিফগুলো বাফারে থেকে যায়, যাতে পরের (নতুন) স্ন্যাপশট এগুলোর সাথে মেলানো যায়।
+        খুব নতুন স্ন্যাপশটে (সব ডিফের u <= lastUpdateId) বাফার বাদ, পরের লাইভ ডিফ থেকে সংযোগ।
+        """
+        self.bids.clear()
+        self.asks.clear()
+        self._apply_levels(bids, asks)
+        self.last_update_id = last_update_id
+        self.synced = True
+        self.resyncs += 1
+        pending = [event for event in self.buffer if event[1] > last_update_id]
+        self.buffer = deque(maxlen=BUFFER_LIMIT)
+        for i, (first_id, final_id, diff_bids, diff_asks) in enumerate(pending):
+            if i == 0 and not first_id <= last_update_id + 1 <= final_id:
+                self.synced = False
+                self.buffer.extend(pending)
+                return False
+            if not self.apply_diff(first_id, final_id, diff_bids, diff_asks):
+                # apply_diff ফাঁকের ডিফটি বাফারে রেখেছে; তার পরেরগুলোও
+                self.buffer.extend(pending[i + 1:])
+                return False
+        self.version += 1
+        self.updated = time.time()
+        return True
+
+    def apply_diff(self, first_id: int, final_id: int, bids, asks) -> bool:
+        """একটি depthUpdate; রিটার্ন False মানে সিকোয়েন্স গ্যাপ (বুক আর নির্ভরযোগ্য নয়)"""
+        if not self.synced:
+            self.buffer.append((first_id, final_id, bids, asks))
+            return True
+        if final_id <= self.last_update_id:
+            return True  # পুরনো ইভেন্ট
+        if first_id > self.last_update_id + 1:
+            self.gaps += 1
+            self.synced = False
+            self.buffer.clear()
+            self.buffer.append((first_id, final_id, bids, asks))
+            return False
+        self._apply_levels(bids, asks)
+        self.last_update_id = final_id
+        self.diffs += 1
+        self.version += 1
+        self.updated = time.time()
+        max_levels = settings.ORDER_BOOK_MAX_LEVELS
+        if len(self.bids) > max_levels or len(self.asks) > max_levels:
+            self.bids.trim(max_levels)
+            self.asks.trim(max_levels)
+        return True
+
+    # ---------- মেট্রিক ----------
+    def metrics(self, levels: Optional[int] = None, distances_bps: Optional[List[float]] = None):
+        best_bid, best_ask = self.bids.best(), self.asks.best()
+        if not self.synced or best_bid is None or best_ask is None:
+            return None
+        levels = levels or settings.ORDER_BOOK_IMBALANCE_LEVELS
+        distances_bps = distances_bps or settings.ORDER_BOOK_DISTANCES_BPS
+        (bid_tick, bid_qty), (ask_tick, ask_qty) = best_bid, best_ask
+        bid, ask = self.price(bid_tick), self.price(ask_tick)
+        mid = (bid + ask) / 2
+        bid_volume, ask_volume = self.bids.volume(levels), self.asks.volume(levels)
+        total = bid_volume + ask_volume
+
+        liquidity = {}
+        mid_tick = (bid_tick + ask_tick) / 2
+        for bps in distances_bps:
+            offset = mid_tick * bps / 10_000
+            bid_qty_in, bid_ticks = self.bids.within(math.ceil(mid_tick - offset))
+            ask_qty_in, ask_ticks = self.asks.within(math.floor(mid_tick + offset))
+            liquidity[f"{bps:g}"] = {
+                "bid": bid_qty_in,
+                "ask": ask_qty_in,
+                "bid_notional": bid_ticks * self.tick_size,
+                "ask_notional": ask_ticks * self.tick_size,
+            }
+
+        return {
+            "symbol": self.symbol,
+            "bid": bid,
+            "ask": ask,
+            "bid_qty": bid_qty,
+            "ask_qty": ask_qty,
+            "mid": mid,
+            "spread": ask - bid,
+            "spread_bps": (ask - bid) / mid * 10_000,
+            # মাইক্রোপ্রাইস: বেস্ট লেভেলের qty দিয়ে ভারিত — বিডে বেশি qty হলে দাম আস্কের দিকে ঝোঁকে
+            "microprice": (bid * ask_qty + ask * bid_qty) / (bid_qty + ask_qty),
+            "imbalance_top": (bid_qty - ask_qty) / (bid_qty + ask_qty),
+            "imbalance": (bid_volume - ask_volume) / total if total else 0.0,
+            "levels": levels,
+            "liquidity": liquidity,
+            "depth": {"bids": len(self.bids), "asks": len(self.asks)},
+            "update_id": self.last_update_id,
+            "updated": self.updated,
+        }
+
+    def view(self, depth: int = 20):
+        """ওয়েবসকেট/REST এর জন্য top-N লেভেল ও মেট্রিক"""
+        metrics = self.metrics()
+        if metrics is None:
+            return None
+        return {
+            **metrics,
+            "bids": [(self.price(t), q) for t, q in self.bids.top(depth)],
+            "asks": [(self.price(t), q) for t, q in self.asks.top(depth)],
+        }
+
+    def status(self):
+        return {
+            "symbol": self.symbol,
+            "synced": self.synced,
+            "levels": {"bids": len(self.bids), "asks": len(self.asks)},
+            "update_id": self.last_update_id,
+            "diffs": self.diffs,
+            "gaps": self.gaps,
+            "resyncs": self.resyncs,
+            "buffered": len(self.buffer),
+        }
+
+
+class OrderBookManager:
+    """
+    প্রতি সিম্বলে একটি LocalOrderBook। ডিফ আসে LiveMarketStream এর হ্যান্ডলার দিয়ে সরাসরি
+    (কিউ নয় — কিউ ভরে ডিফ বাদ পড়লে বুক নষ্ট হয়), গ্যাপ পেলে ব্যাকগ্রাউন্ডে resync।
+    """
+
+    def __init__(self):
+        self.books: Dict[str, LocalOrderBook] = {}
+        self.resync_tasks: Dict[str, asyncio.Task] = {}
+        self.publisher: Optional[asyncio.Task] = None
+        self.publish: Optional[Callable[[dict], Awaitable[None]]] = None
+
+    async def start(self, publish=None, symbols: Optional[List[str]] = None):
+        if not settings.BINANCE_MULTIPLEX:
+            logger.warning("⚠️ Order book needs BINANCE_MULTIPLEX (depth diff stream); skipped")
+            return
+        self.publish = publish
+        symbols = list(symbols or settings.ORDER_BOOK_SYMBOLS)
+        for symbol in symbols:
+            self.books.setdefault(symbol, LocalOrderBook(symbol))
+        market_stream.add_handler(DIFF_STREAM, self.on_diff)
+        # আগে স্ট্রিম (ডিফ বাফার হতে থাকে), তারপর স্ন্যাপশট
+        await market_stream.watch(symbols, [DIFF_STREAM])
+        for book in self.books.values():
+            self._schedule_resync(book)
+        self.publisher = asyncio.create_task(self._publisher())
+        logger.info(f"📚 Order books started: {', '.join(symbols)}")
+
+    async def stop(self):
+        market_stream.remove_handler(DIFF_STREAM, self.on_diff)
+        tasks = list(self.resync_tasks.values()) + ([self.publisher] if self.publisher else [])
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self.resync_tasks.clear()
+        self.publisher = None
+        if self.books:
+            await market_stream.unwatch(list(self.books), [DIFF_STREAM])
+
+    def on_diff(self, pair: str, data: dict):
+        book = self.books.get(pair)
+        if book is None:
+            return
+        if not book.apply_diff(data["U"], data["u"], data["b"], data["a"]):
+            logger.warning(f"⚠️ Order book gap {pair}: expected {book.last_update_id + 1}, got {data['U']}")
+            self._schedule_resync(book)
+
+    def _schedule_resync(self, book: LocalOrderBook):
+        task = self.resync_tasks.get(book.symbol)
+        if task is None or task.done():
+            self.resync_tasks[book.symbol] = asyncio.create_task(self._resync(book))
+
+    async def _resync(self, book: LocalOrderBook):
+        errors = 0
+        # প্রথম ডিফ বাফারে আসা পর্যন্ত অপেক্ষা, নইলে স্ন্যাপশটের পরের সংযোগ যাচাই করা যায় না
+        await asyncio.sleep(0.5)
+        while not book.synced:
+            try:
+                from ccxt.base.decimal_to_precision import TICK_SIZE
+                exchange = await exchange_pool.get("binance")
+                market = exchange.market(book.symbol)
+                precision = market["precision"]["price"]
+                book.set_tick_size(precision if exchange.precisionMode == TICK_SIZE else 10 ** -precision)
+                snapshot = await asyncio.wait_for(
+                    exchange.fetch_order_book(book.symbol, limit=settings.ORDER_BOOK_SNAPSHOT_DEPTH), timeout=10)
+                if book.load_snapshot(snapshot["bids"], snapshot["asks"], snapshot["nonce"]):
+                    logger.info(f"📚 Order book synced {book.symbol} @ {book.last_update_id}")
+                    return
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                errors += 1
+                sleep_time = min(30, 2 * errors)
+                logger.warning(f"⚠️ Order book snapshot {book.symbol} failed (Retry in {sleep_time}s): {e}")
+                await asyncio.sleep(sleep_time)
+
+    async def _publisher(self):
+        while True:
+            await asyncio.sleep(settings.ORDER_BOOK_PUBLISH_INTERVAL)
+            if not self.publish:
+                continue
+            for book in self.books.values():
+                if book.version == book.published_version:
+                    continue
+                view = book.view(settings.ORDER_BOOK_PUBLISH_DEPTH)
+                if view is None:
+                    continue
+                book.published_version = book.version
+                topic = f"book:{book.symbol}"
+                try:
+                    await self.publish({"type": "ORDER_BOOK", "topic": topic, "payload": view})
+                except Exception as e:
+                    logger.warning(f"⚠️ Order book publish failed: {e}")
+
+    # ---------- রিড ----------
+    def metrics(self, symbol: str):
+        """SignalEngine এর জন্য; সিঙ্ক না থাকলে None"""
+        book = self.books.get(symbol)
+        return book.metrics() if book is not None else None
+
+    def view(self, symbol: str, depth: int = 20):
+        book = self.books.get(symbol)
+        return book.view(depth) if book is not None else None
+
+    def status(self):
+        return [book.status() for book in self.books.values()]
+
+
+order_book_manager = OrderBookManager()
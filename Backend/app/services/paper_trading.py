@@ -0,0 +1,466 @@
+import asyncio
+import itertools
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.database import fill_repo, settings_repo
+from app.services.metrics import PAPER_LATENCY_SECONDS
+from app.services.order_book import order_book_manager
+from app.services.tick_history import tick_history
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# পেপার ট্রেডিং এক্সিকিউশন ইঞ্জিন
+# ------------------------------------------------------------
+# - ইভেন্ট-চালিত: publish_topic এ প্রতিটি SENTIMENT মেসেজ সরাসরি on_signal এ (কোনো পোলিং লুপ নেই);
+#   PAPER_TIMEFRAME এর ভারডিক্ট বা স্ট্র্যাটেজি বদলালেই শুধু টার্গেট পজিশন আবার হিসাব
+# - টার্গেট → রিব্যালান্স মার্কেট অর্ডার → ভেন্যু। LocalMatchingVenue: লোকাল অর্ডার বুকের লেভেল হেঁটে
+#   VWAP (বুক সিঙ্ক না থাকলে শেষ টিকের দামে + স্লিপেজ) — ExecutionVenue বদলে আসল এক্সচেঞ্জ বসানো যায়
+# - পজিশন, ক্যাশ ও PnL মেমোরিতে; ফিল ডিস্কে ব্যাচে (fill_repo), স্টার্টে সেই ফিল থেকেই পজিশন আবার গড়া
+# - প্রতি অর্ডারে স্টেজের লেটেন্সি (perf_counter):
+#     compute  ইন্ডিকেটর হিসাব শুরু → সিগন্যাল তৈরি (ওয়ার্কার কিউ সহ)
+#     dispatch সিগন্যাল → ইঞ্জিনে পৌঁছানো (পাবলিশ পথ)
+#     decide   পৌঁছানো → অর্ডার তৈরি (রিস্ক/সাইজিং)
+#     match    অর্ডার → ফিল (ভেন্যু)
+#     total    হিসাব শুরু → ফিল পজিশনে বসানো
+# ============================================================
+
+STAGES = ("compute", "dispatch", "decide", "match", "total")
+
+# স্ট্র্যাটেজি → ভারডিক্ট → টার্গেট (সর্বোচ্চ পজিশনের ভগ্নাংশ, শুধু লং); None মানে আগের পজিশন ধরে রাখা
+STRATEGY_TARGETS = {
+    "conservative": {"STRONG BUY": 0.5, "BUY": None, "NEUTRAL": None, "SELL": 0.0, "STRONG SELL": 0.0},
+    "aggressive": {"STRONG BUY": 1.0, "BUY": 0.5, "NEUTRAL": None, "SELL": 0.0, "STRONG SELL": 0.0},
+    "sniper": {"STRONG BUY": 1.0, "BUY": None, "NEUTRAL": 0.0, "SELL": 0.0, "STRONG SELL": 0.0},
+}
+
+
+def verdict_level(verdict: str):
+    """"STRONG BUY 🚀" → "STRONG BUY" (ইমোজি বাদ); LOADING.../ERROR অপরিবর্তিত"""
+    return verdict.rsplit(" ", 1)[0] if verdict and " " in verdict else verdict
+
+
+class Position:
+    __slots__ = ("symbol", "qty", "avg_price", "realized", "fees")
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.qty = 0.0
+        self.avg_price = 0.0
+        self.realized = 0.0
+        self.fees = 0.0
+
+    def apply(self, side: str, qty: float, price: float, fee: float):
+        """ফিল বসানো; রিটার্ন ক্যাশের পরিবর্তন"""
+        self.fees += fee
+        if side == "buy":
+            total = self.qty + qty
+            self.avg_price = (self.qty * self.avg_price + qty * price) / total if total else 0.0
+            self.qty = total
+            return -(qty * price + fee)
+        self.realized += qty * (price - self.avg_price)
+        self.qty -= qty
+        if self.qty <= 1e-12:
+            self.qty = 0.0
+            self.avg_price = 0.0
+        return qty * price - fee
+
+    def view(self, mark: Optional[float]):
+        unrealized = self.qty * (mark - self.avg_price) if mark is not None and self.qty else 0.0
+        return {
+            "symbol": self.symbol,
+            "qty": self.qty,
+            "avg_price": self.avg_price,
+            "mark": mark,
+            "notional": self.qty * mark if mark is not None else None,
+            "unrealized_pnl": unrealized,
+            "realized_pnl": self.realized,
+            "fees": self.fees,
+        }
+
+
+# ============================================================
+# ভেন্যু: অর্ডার কোথায় ম্যাচ হবে
+# ============================================================
+class ExecutionVenue(ABC):
+    name = "venue"
+
+    @abstractmethod
+    def mark(self, symbol: str) -> Optional[float]:
+        """মার্ক প্রাইস (সাইজিং ও আনরিয়ালাইজড PnL); না জানলে None"""
+
+    @abstractmethod
+    async def execute(self, order: dict) -> dict:
+        """মার্কেট অর্ডার এক্সিকিউট; রিটার্ন {"qty", "price", "fee", "source"} বা RuntimeError"""
+
+
+class LocalMatchingVenue(ExecutionVenue):
+    """
+    এক্সচেঞ্জের স্ট্যান্ড-ইন: নেটওয়ার্ক ছাড়া, লুপেই সিঙ্ক্রোনাস ম্যাচিং।
+    বুক সিঙ্ক থাকলে উল্টো পাশের লেভেল হেঁটে (নিজের সাইজের ইমপ্যাক্টসহ), না থাকলে শেষ টিকে execution.slippage_bps।
+    """
+    name = "local"
+
+    def __init__(self, exchange_id: str = "binance", books=order_book_manager, ticks=tick_history):
+        self.exchange_id = exchange_id
+        self.books = books
+        self.ticks = ticks
+
+    def _book(self, symbol: str):
+        book = self.books.books.get(symbol)
+        return book if book is not None and book.synced else None
+
+    def _last_price(self, symbol: str):
+        ring = self.ticks.ring(self.exchange_id, symbol)
+        return float(ring.last(1)["price"][0]) if ring is not None and ring.count else None
+
+    def mark(self, symbol: str):
+        book = self._book(symbol)
+        if book is not None:
+            bid, ask = book.bids.best(), book.asks.best()
+            if bid is not None and ask is not None:
+                return book.price(bid[0] + ask[0]) / 2
+        return self._last_price(symbol)
+
+    async def execute(self, order: dict):
+        symbol, side, qty = order["symbol"], order["side"], order["qty"]
+        fee_rate = settings_repo.get("execution.fee_bps") / 10_000
+        book = self._book(symbol)
+        levels = (book.asks if side == "buy" else book.bids).top(settings.PAPER_BOOK_LEVELS) if book else None
+        if levels:
+            left, cost, price = qty, 0.0, None
+            for tick, level_qty in levels:
+                price = book.price(tick)
+                take = min(left, level_qty)
+                cost += take * price
+                left -= take
+                if left <= 0:
+                    break
+            # দেখা লেভেলের চেয়ে বড় অর্ডার: বাকিটা শেষ লেভেলের দামে (বাস্তবে আরও খারাপ হতো)
+            cost += max(0.0, left) * price
+            fill_price, source = cost / qty, "book"
+        else:
+            last = self._last_price(symbol)
+            if last is None:
+                raise RuntimeError(f"No market price for {symbol}")
+            slippage = settings_repo.get("execution.slippage_bps") / 10_000
+            fill_price, source = last * (1 + slippage if side == "buy" else 1 - slippage), "ticker"
+        return {"qty": qty, "price": fill_price, "fee": qty * fill_price * fee_rate, "source": source}
+
+
+# ============================================================
+# ইঞ্জিন
+# ============================================================
+class PaperTrader:
+    def __init__(self, venue: Optional[ExecutionVenue] = None):
+        self.venue: ExecutionVenue = venue or LocalMatchingVenue()
+        self.running = False
+        self.publish: Optional[Callable[[dict, dict], Awaitable[None]]] = None
+        self.symbols: List[str] = []
+        self.cash = settings.PAPER_CAPITAL
+        self.positions: Dict[str, Position] = {}
+        self.decided: Dict[str, tuple] = {}     # symbol → (ভারডিক্ট লেভেল, স্ট্র্যাটেজি) যার উপর শেষ সিদ্ধান্ত
+        self.orders: Deque[dict] = deque(maxlen=settings.PAPER_RECENT_ORDERS)
+        self.pending: List[dict] = []           # ডিস্কে লেখার অপেক্ষায় ফিল
+        self.wakeup = asyncio.Event()
+        self.flusher: Optional[asyncio.Task] = None
+        self.order_ids = itertools.count(1)
+        self.day: Optional[str] = None
+        self.day_start_equity = self.cash
+        self.halted = False
+        self.latency: Dict[str, Deque[float]] = {stage: deque(maxlen=settings.PAPER_LATENCY_SAMPLES)
+                                                 for stage in STAGES}
+        self.signals = 0
+        self.filled = 0
+        self.skipped = 0
+        self.rejected = 0
+
+    # ---------- লাইফসাইকেল ----------
+    async def start(self, publish=None, symbols: Optional[List[str]] = None):
+        if self.running:
+            return
+        self.publish = publish
+        self.symbols = list(symbols or settings.PAPER_SYMBOLS or settings.SCANNER_SYMBOLS)
+        await fill_repo.start()
+        self._restore(await fill_repo.load())
+        self.running = True
+        self.flusher = asyncio.create_task(self._flush_loop())
+        if settings_repo.get("execution.mode") != "paper":
+            logger.warning("⚠️ execution.mode is not 'paper' and no live venue is configured; orders stay simulated")
+        logger.info(f"🧾 Paper trader started: {', '.join(self.symbols)} on {settings.PAPER_TIMEFRAME} "
+                     f"({len(self.positions)} positions restored, cash {self.cash:.2f})")
+
+    async def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        if self.flusher:
+            self.flusher.cancel()
+            try:
+                await self.flusher
+            except asyncio.CancelledError:
+                pass
+            self.flusher = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Paper fill final flush error: {e}")
+        await fill_repo.close()
+
+    def _reset_state(self):
+        self.cash = settings.PAPER_CAPITAL
+        self.positions = {}
+        self.decided = {}
+        self.orders.clear()
+        self.day = None
+        self.halted = False
+
+    def _restore(self, fills: List[dict]):
+        """ডিস্কের ফিল ক্রমানুসারে বসিয়ে ক্যাশ ও পজিশন আবার গড়া"""
+        self._reset_state()
+        last_id = 0
+        for fill in fills:
+            position = self._position(fill["symbol"])
+            self.cash += position.apply(fill["side"], fill["qty"], fill["price"], fill["fee"])
+            last_id = max(last_id, fill["order_id"])
+        self.order_ids = itertools.count(last_id + 1)
+
+    async def reset(self):
+        """অ্যাকাউন্ট শুরুর অবস্থায়: মেমোরি ও ডিস্কের সব ফিল মুছে"""
+        self.pending = []
+        if self.running:
+            await fill_repo.clear()
+        self._reset_state()
+        self.order_ids = itertools.count(1)
+
+    def _position(self, symbol: str):
+        position = self.positions.get(symbol)
+        if position is None:
+            position = self.positions[symbol] = Position(symbol)
+        return position
+
+    # ---------- সিগন্যাল → অর্ডার ----------
+    async def on_signal(self, message: dict):
+        """publish_topic থেকে প্রতিটি SENTIMENT মেসেজ; message["stamps"] এ প্রডিউসারের perf_counter"""
+        received = time.perf_counter()
+        if not self.running:
+            return
+        payload = message["payload"]
+        symbol = payload.get("symbol")
+        if payload.get("timeframe") != settings.PAPER_TIMEFRAME or symbol not in self.symbols:
+            return
+        self.signals += 1
+        level = verdict_level(payload.get("verdict"))
+        strategy = settings_repo.get("strategy")
+        targets = STRATEGY_TARGETS.get(strategy, STRATEGY_TARGETS["conservative"])
+        if level not in targets or self.decided.get(symbol) == (level, strategy):
+            return
+        target = targets[level]
+        if target is None:
+            self.decided[symbol] = (level, strategy)
+            return
+
+        mark = self.venue.mark(symbol)
+        if mark is None or mark <= 0:
+            # দাম এখনো জানা নেই (স্টার্টআপ): সিদ্ধান্ত বাকি, পরের সিগন্যালে আবার
+            self.skipped += 1
+            return
+        # এক্সিকিউশনের অপেক্ষার মধ্যে একই ভারডিক্টে দ্বিতীয় অর্ডার না যাওয়ার জন্য আগেই রাখা;
+        # অর্ডার না হলে বা রিজেক্ট হলে আগের সিদ্ধান্ত ফেরত, যাতে পরের সিগন্যালে আবার চেষ্টা হয়
+        previous = self.decided.get(symbol)
+        self.decided[symbol] = (level, strategy)
+        order = self._order(symbol, target, mark, level, strategy)
+        if order is None:
+            self._undecide(symbol, previous)
+            self.skipped += 1
+            return
+        decided = time.perf_counter()
+        try:
+            fill = await self.venue.execute(order)
+        except Exception as e:
+            self._undecide(symbol, previous)
+            self.rejected += 1
+            order.update(status="rejected", error=str(e))
+            self.orders.append(order)
+            logger.warning(f"⚠️ Paper order rejected {symbol} {order['side']} {order['qty']:.8f}: {e}")
+            return
+        matched = time.perf_counter()
+
+        position = self._position(symbol)
+        self.cash += position.apply(order["side"], fill["qty"], fill["price"], fill["fee"])
+        done = time.perf_counter()
+        stamps = message.get("stamps") or {}
+        order["latency"] = self._observe(stamps.get("compute"), stamps.get("signal"), received, decided, matched, done)
+        order.update(status="filled", price=fill["price"], fee=fill["fee"], source=fill["source"],
+                     filled_at=time.time())
+        self.filled += 1
+        self.orders.append(order)
+        self.pending.append(order)
+        if len(self.pending) >= settings.PAPER_FLUSH_BATCH:
+            self.wakeup.set()
+        if self.publish:
+            await self._publish(order, position, mark)
+
+    def _undecide(self, symbol: str, previous: Optional[tuple]):
+        if previous is None:
+            self.decided.pop(symbol, None)
+        else:
+            self.decided[symbol] = previous
+
+    def _order(self, symbol: str, target: float, mark: float, level: str, strategy: str):
+        """টার্গেট ভগ্নাংশ থেকে রিব্যালান্স অর্ডার (রিস্ক সেটিংস মেনে); দরকার না হলে None"""
+        position = self._position(symbol)
+        equity = self._roll_day()
+        base = settings.PAPER_CAPITAL if settings_repo.get("risk.sizing_mode") == "fixed" else equity
+        target_qty = base * settings_repo.get("risk.max_position_pct") / 100 * target / mark
+        asset = symbol.split("/")[0]
+        if target_qty > position.qty and (self.halted or not settings_repo.get("risk.assets").get(asset, False)):
+            # দৈনিক লস লিমিট বা অ্যাসেট বন্ধ: নতুন এক্সপোজার নয়, শুধু কমানো চলে
+            target_qty = position.qty
+        delta = target_qty - position.qty
+        if delta > 0:
+            fee_rate = settings_repo.get("execution.fee_bps") / 10_000
+            delta = min(delta, max(0.0, self.cash) / (mark * (1 + fee_rate)))
+        if abs(delta) * mark < settings.PAPER_MIN_NOTIONAL:
+            return None
+        return {
+            "order_id": next(self.order_ids),
+            "symbol": symbol,
+            "side": "buy" if delta > 0 else "sell",
+            "qty": abs(delta),
+            "mark": mark,
+            "target": target,
+            "verdict": level,
+            "strategy": strategy,
+            "created_at": time.time(),
+        }
+
+    def _roll_day(self):
+        """বর্তমান ইকুইটি; UTC দিন বদলালে দিনের শুরু নতুন করে, লস লিমিট পার হলে halted"""
+        equity = self.equity()
+        today = time.strftime("%Y-%m-%d", time.gmtime())
+        if today != self.day:
+            self.day, self.day_start_equity, self.halted = today, equity, False
+        limit = settings_repo.get("risk.daily_loss_limit_pct")
+        if not self.halted and equity <= self.day_start_equity * (1 - limit / 100):
+            self.halted = True
+            logger.warning(f"🛑 Paper daily loss limit hit ({equity:.2f} vs {self.day_start_equity:.2f}); entries halted")
+        return equity
+
+    def _observe(self, computed, signalled, received, decided, matched, done):
+        """স্টেজ অনুযায়ী লেটেন্সি (মাইক্রোসেকেন্ড) — অর্ডারে রাখা, হিস্টোগ্রাম ও পার্সেন্টাইলে"""
+        spans = {"decide": decided - received, "match": matched - decided}
+        if signalled is not None:
+            spans["dispatch"] = received - signalled
+            if computed is not None:
+                spans["compute"] = signalled - computed
+        spans["total"] = done - (computed if computed is not None else signalled if signalled is not None else received)
+        latency = {}
+        for stage, seconds in spans.items():
+            PAPER_LATENCY_SECONDS.labels(stage).observe(seconds)
+            self.latency[stage].append(seconds)
+            latency[stage] = round(seconds * 1e6, 1)
+        return latency
+
+    # ---------- পাবলিশ ও পারসিস্ট ----------
+    async def _publish(self, order: dict, position: Position, mark: float):
+        topic = f"paper:{order['symbol']}"
+        fills = [o for o in self.orders if o["symbol"] == order["symbol"] and o["status"] == "filled"]
+        snapshot = {"type": "PAPER_FILLS", "topic": topic, "snapshot": True, "payload": fills,
+                    "position": position.view(mark), "account": self.account()}
+        try:
+            await self.publish({"type": "PAPER_FILLS", "topic": topic, "payload": [order]}, snapshot)
+        except Exception as e:
+            logger.warning(f"⚠️ Paper fill publish failed: {e}")
+
+    async def flush(self):
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        try:
+            await fill_repo.append(batch)
+        except Exception:
+            # পরের flush এ আবার (ফিল হারানো চলবে না)
+            self.pending = batch + self.pending
+            raise
+
+    async def _flush_loop(self):
+        errors = 0
+        while self.running:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(),
+                                       timeout=settings.PAPER_FLUSH_INTERVAL if not errors else min(30, 2 * errors))
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            try:
+                await self.flush()
+                errors = 0
+            except Exception as e:
+                errors += 1
+                logger.error(f"Paper fill flush error ({len(self.pending)} pending): {e}")
+
+    # ---------- রিড ----------
+    def equity(self):
+        total = self.cash
+        for symbol, position in self.positions.items():
+            if position.qty:
+                mark = self.venue.mark(symbol)
+                total += position.qty * (mark if mark is not None else position.avg_price)
+        return total
+
+    def account(self):
+        equity = self.equity()
+        return {
+            "cash": self.cash,
+            "equity": equity,
+            "capital": settings.PAPER_CAPITAL,
+            "pnl": equity - settings.PAPER_CAPITAL,
+            "day_start_equity": self.day_start_equity,
+            "halted": self.halted,
+        }
+
+    def latency_summary(self):
+        summary = {}
+        for stage, samples in self.latency.items():
+            if not samples:
+                continue
+            values = np.fromiter(samples, dtype=np.float64) * 1e6
+            p50, p99 = np.percentile(values, [50, 99])
+            summary[stage] = {"samples": len(values), "p50_us": round(float(p50), 1),
+                              "p99_us": round(float(p99), 1), "max_us": round(float(values.max()), 1)}
+        return summary
+
+    def recent_orders(self, limit: int = 50, symbol: Optional[str] = None):
+        orders = [o for o in self.orders if symbol is None or o["symbol"] == symbol]
+        return orders[-limit:]
+
+    def status(self):
+        return {
+            "running": self.running,
+            "venue": self.venue.name,
+            "mode": settings_repo.get("execution.mode"),
+            "strategy": settings_repo.get("strategy"),
+            "timeframe": settings.PAPER_TIMEFRAME,
+            "symbols": self.symbols,
+            "account": self.account(),
+            "positions": [position.view(self.venue.mark(symbol)) for symbol, position in self.positions.items()],
+            "decided": {symbol: level for symbol, (level, _) in self.decided.items()},
+            "signals": self.signals,
+            "filled": self.filled,
+            "skipped": self.skipped,
+            "rejected": self.rejected,
+            "pending_fills": len(self.pending),
+            "store": fill_repo.status(),
+            "latency": self.latency_summary(),
+        }
+
+
+paper_trader = PaperTrader()
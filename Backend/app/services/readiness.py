@@ -0,0 +1,99 @@
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+from app.services.metrics import STARTUP_PHASE_SECONDS, registry
+
+logger = logging.getLogger(__name__)
+
+
+def _process_started() -> float:
+    """
+    প্রসেস শুরুর সময় (epoch)। Linux এ /proc থেকে, তাই ইন্টারপ্রেটার, uvicorn ও app ইমপোর্টও
+    কোল্ড-স্টার্টে ধরা পড়ে; না পেলে এই মডিউল ইমপোর্টের সময়।
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            # comm ফিল্ডে স্পেস থাকতে পারে, তাই শেষ ')' এর পর থেকে গোনা; starttime = ২২তম ফিল্ড
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - uptime + int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return time.time()
+
+
+class Readiness:
+    """
+    স্টার্টআপ ফেজের সময় ও রেডিনেস চেক।
+    প্রতিটি রোল শুরুতে require() দিয়ে যে চেকগুলো লাগবে তা বলে; সবগুলো passed() হলে ready।
+    ফেজের সময় প্রসেস শুরু থেকে সেকেন্ডে (metron_startup_phase_seconds{phase})।
+    """
+
+    def __init__(self):
+        self.process_started = _process_started()
+        self.phases: Dict[str, float] = {}
+        self.checks: Dict[str, bool] = {}
+        self.errors: Dict[str, str] = {}
+        self.ready_at: Optional[float] = None
+        self.first_signal_at: Optional[float] = None
+        self.stopping = False
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_at is not None and not self.stopping
+
+    def uptime(self) -> float:
+        return time.time() - self.process_started
+
+    def mark(self, phase: str) -> float:
+        """ফেজ শেষ — প্রসেস শুরু থেকে কত সেকেন্ড (প্রথমবারটাই থাকে)"""
+        if phase not in self.phases:
+            self.phases[phase] = self.uptime()
+            STARTUP_PHASE_SECONDS.labels(phase).set(self.phases[phase])
+        return self.phases[phase]
+
+    def require(self, *checks: str):
+        for check in checks:
+            self.checks.setdefault(check, False)
+
+    def passed(self, check: str):
+        self.checks[check] = True
+        self.errors.pop(check, None)
+        self.mark(check)
+        if self.ready_at is None and all(self.checks.values()):
+            self.ready_at = self.mark("ready")
+            logger.info(f"✅ Ready {self.ready_at:.2f}s after process start")
+
+    def failed(self, check: str, error: object):
+        """চেক এখনও পাস নয় (রিট্রাই চলছে) — কারণ /ready তে দেখানো হয়"""
+        self.checks.setdefault(check, False)
+        self.errors[check] = str(error)
+
+    def signal(self):
+        """প্রথম সিগন্যাল ক্লায়েন্টের দিকে গেল — কোল্ড-স্টার্ট থেকে প্রথম সিগন্যাল"""
+        if self.first_signal_at is None:
+            self.first_signal_at = self.mark("first_signal")
+            logger.info(f"🎯 First signal {self.first_signal_at:.2f}s after process start")
+
+    def stop(self):
+        """শাটডাউন শুরু — /ready 503 দেয় যাতে লোড ব্যালান্সার নতুন ট্রাফিক না পাঠায়"""
+        self.stopping = True
+
+    def status(self):
+        return {
+            "ready": self.ready,
+            "stopping": self.stopping,
+            "uptime": round(self.uptime(), 3),
+            "checks": dict(self.checks),
+            "errors": dict(self.errors),
+            "phases": {phase: round(seconds, 3) for phase, seconds in self.phases.items()},
+            "ready_seconds": None if self.ready_at is None else round(self.ready_at, 3),
+            "first_signal_seconds": None if self.first_signal_at is None else round(self.first_signal_at, 3),
+        }
+
+
+readiness = Readiness()
+registry.gauge_callback("metron_ready", "1 when every startup readiness check has passed",
+                        lambda: 1 if readiness.ready else 0)
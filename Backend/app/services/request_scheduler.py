@@ -0,0 +1,290 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.services.metrics import EXCHANGE_QUEUE_SECONDS, EXCHANGE_SCHEDULED
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# এক্সচেঞ্জ রিকোয়েস্ট শিডিউলার (প্রতি এক্সচেঞ্জে একটি)
+# ------------------------------------------------------------
+# পুলের প্রতিটি ccxt ক্লায়েন্টের মেথড এখান দিয়ে যায়, তাই স্ক্যানার, আরবিট্রেজ, অর্ডার বুক,
+# পোলিং স্ট্র্যাটেজি ও API — সবাই একই বাজেট ভাগ করে:
+# - ওয়েট বাজেট (টোকেন বাকেট): EXCHANGE_RATE_LIMITS = সেকেন্ডে ওয়েট, প্রতি কলের ওয়েট
+#   এক্সচেঞ্জের প্রকাশিত টেবিল থেকে (Binance: depth limit অনুযায়ী 5..250, trades 25 ইত্যাদি)
+# - প্রায়োরিটি: execution (অর্ডার) > engine (স্ক্যানার, বুক, আরবিট্রেজ) > ui (পোলিং/ফিড);
+#   ui কল বাজেটের EXCHANGE_UI_RESERVE অংশ খালি রেখে তবেই পায়
+# - single-flight: একই (method, args) চলমান থাকলে নতুন কল সেটার ফলাফলের জন্যই অপেক্ষা করে
+# - TTL ক্যাশ: EXCHANGE_CACHE_TTL (মেথড অনুযায়ী); ফলাফল শেয়ার্ড, কলার বদলাবে না
+# - 429/418 (RateLimitExceeded/DDoSProtection) এলে পুরো এক্সচেঞ্জ EXCHANGE_RATE_LIMIT_COOLDOWN থামে
+# অর্ডার/একাউন্ট মেথড কখনো ক্যাশ বা কোয়ালেস হয় না।
+# ============================================================
+
+EXECUTION, ENGINE, UI = 0, 1, 2
+PRIORITY_NAMES = {EXECUTION: "execution", ENGINE: "engine", UI: "ui"}
+
+_priority: contextvars.ContextVar = contextvars.ContextVar("request_priority", default=ENGINE)
+
+
+@contextmanager
+def request_priority(level: int):
+    """with request_priority(UI): ... — ব্লকের (ও এর ভেতরে তৈরি টাস্কের) এক্সচেঞ্জ কলের প্রায়োরিটি"""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def set_task_priority(level: int):
+    """বর্তমান টাস্কের বাকি অংশের প্রায়োরিটি (প্রতি টাস্কের কনটেক্সট আলাদা, তাই অন্য টাস্কে ছড়ায় না)"""
+    _priority.set(level)
+
+
+READ_METHODS = (
+    "fetch_ohlcv", "fetch_order_book", "fetch_trades", "fetch_ticker", "fetch_tickers",
+    "fetch_time", "fetch_status",
+)
+EXECUTION_METHODS = (
+    "create_order", "cancel_order", "cancel_all_orders", "edit_order", "fetch_order",
+    "fetch_open_orders", "fetch_my_trades", "fetch_balance",
+)
+
+
+def _binance_depth_weight(args, kwargs):
+    limit = kwargs.get("limit", args[1] if len(args) > 1 else None) or 100
+    for bound, weight in ((100, 5), (500, 25), (1000, 50)):
+        if limit <= bound:
+            return weight
+    return 250
+
+
+# Binance স্পট REST ওয়েট (১ মিনিটে ৬০০০); অন্য এক্সচেঞ্জে প্রতি কলে ১
+REQUEST_WEIGHTS: Dict[str, Dict[str, Any]] = {
+    "binance": {
+        "fetch_order_book": _binance_depth_weight,
+        "fetch_trades": 25,
+        "fetch_ohlcv": 2,
+        "fetch_ticker": 2,
+        "fetch_tickers": 80,
+        "fetch_order": 4,
+        "fetch_open_orders": 6,
+        "fetch_my_trades": 20,
+        "fetch_balance": 20,
+    },
+}
+
+
+def request_weight(exchange_id: str, method: str, args=(), kwargs=None) -> float:
+    weight = REQUEST_WEIGHTS.get(exchange_id, {}).get(method, 1)
+    return float(weight(args, kwargs or {}) if callable(weight) else weight)
+
+
+def _is_rate_limit(error: Exception) -> bool:
+    """ccxt এর রেট-লিমিট এরর কি না (ccxt এখানে লেজি — এরর এসেছে মানে ইতিমধ্যে লোড হয়ে আছে)"""
+    from ccxt.base.errors import DDoSProtection, RateLimitExceeded
+    return isinstance(error, (RateLimitExceeded, DDoSProtection))
+
+
+class WeightBudget:
+    """
+    প্রায়োরিটি সহ টোকেন বাকেট। অপেক্ষমাণরা (priority, আগমন) অর্ডারে হিপে থাকে,
+    একটি পাম্প টাস্ক রিফিল হলে মাথার জনকে ছাড়ে — ui এর লম্বা লাইন execution কে আটকায় না।
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, ui_reserve: float = 0.0):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.ui_reserve = ui_reserve * self.capacity
+        self.waiters: list = []
+        self.sequence = itertools.count()
+        self.pump: Optional[asyncio.Task] = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _needed(self, weight: float, priority: int):
+        # বাকেটের চেয়ে ভারী কল (যেমন depth 5000) পূর্ণ বাকেটে ছাড়া হয়, নইলে কখনো পেত না
+        weight = min(weight, self.capacity)
+        return weight + (self.ui_reserve if priority == UI else 0.0), weight
+
+    def try_take(self, weight: float, priority: int):
+        self._refill()
+        needed, weight = self._needed(weight, priority)
+        if not self.waiters and self.tokens >= min(needed, self.capacity):
+            self.tokens -= weight
+            return True
+        return False
+
+    async def acquire(self, weight: float, priority: int):
+        if self.try_take(weight, priority):
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self.sequence), weight, future))
+        if self.pump is None or self.pump.done():
+            self.pump = asyncio.create_task(self._pump())
+        await future
+
+    async def _pump(self):
+        while self.waiters:
+            priority, _, weight, future = self.waiters[0]
+            if future.done():  # কলার ক্যান্সেল করেছে
+                heapq.heappop(self.waiters)
+                continue
+            self._refill()
+            needed, weight = self._needed(weight, priority)
+            needed = min(needed, self.capacity)
+            if self.tokens >= needed:
+                heapq.heappop(self.waiters)
+                self.tokens -= weight
+                future.set_result(None)
+                continue
+            await asyncio.sleep((needed - self.tokens) / self.rate)
+
+    def penalize(self, seconds: float):
+        """এক্সচেঞ্জ রেট-লিমিট এরর দিলে: seconds ধরে কোনো টোকেন নেই"""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+    def status(self):
+        self._refill()
+        return {
+            "rate": self.rate,
+            "capacity": self.capacity,
+            "tokens": round(self.tokens, 2),
+            "waiting": {PRIORITY_NAMES[p]: sum(1 for w in self.waiters if w[0] == p and not w[3].done())
+                        for p in PRIORITY_NAMES},
+        }
+
+
+class ExchangeScheduler:
+    """একটি এক্সচেঞ্জের বাজেট, চলমান রিকোয়েস্ট ও ক্যাশ"""
+
+    def __init__(self, exchange_id: str):
+        self.exchange_id = exchange_id
+        self.budget = WeightBudget(settings.EXCHANGE_RATE_LIMITS.get(exchange_id, 5.0),
+                                   ui_reserve=settings.EXCHANGE_UI_RESERVE)
+        self.in_flight: Dict[tuple, asyncio.Future] = {}
+        self.cache: Dict[tuple, Tuple[float, Any]] = {}
+        self.sent = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.rate_limited = 0
+        self.weight_used = 0.0
+        self.counters = {outcome: EXCHANGE_SCHEDULED.labels(exchange_id, outcome)
+                         for outcome in ("sent", "cache_hit", "coalesced", "rate_limited")}
+        self.queue_timers = {p: EXCHANGE_QUEUE_SECONDS.labels(exchange_id, name) for p, name in PRIORITY_NAMES.items()}
+
+    async def call(self, method: str, fn: Callable, args: tuple, kwargs: dict, shared: bool):
+        if not shared:
+            return await self._send(method, fn, args, kwargs, EXECUTION)
+
+        key = (method, repr(args), repr(sorted(kwargs.items())))
+        now = time.monotonic()
+        cached = self.cache.get(key)
+        if cached is not None and cached[0] > now:
+            self.cache_hits += 1
+            self.counters["cache_hit"].inc()
+            return cached[1]
+
+        running = self.in_flight.get(key)
+        if running is not None:
+            self.coalesced += 1
+            self.counters["coalesced"].inc()
+            # shield: একজন কলার ক্যান্সেল করলে বাকিদের রিকোয়েস্ট বাতিল হয় না
+            return await asyncio.shield(running)
+
+        # প্রথম কলার ক্যান্সেল (wait_for টাইমআউট) হলেও রিকোয়েস্ট শেষ হয়ে ক্যাশে যায়, অন্যরা পায়
+        task = asyncio.ensure_future(self._send(method, fn, args, kwargs, _priority.get()))
+        self.in_flight[key] = task
+        task.add_done_callback(lambda done: self._finished(key, method, done))
+        return await asyncio.shield(task)
+
+    def _finished(self, key: tuple, method: str, task: asyncio.Future):
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        ttl = settings.EXCHANGE_CACHE_TTL.get(method, 0.0)
+        if ttl <= 0:
+            return
+        now = time.monotonic()
+        if len(self.cache) >= 1024:
+            self.cache = {k: v for k, v in self.cache.items() if v[0] > now}
+        self.cache[key] = (now + ttl, task.result())
+
+    async def _send(self, method: str, fn: Callable, args: tuple, kwargs: dict, priority: int):
+        weight = request_weight(self.exchange_id, method, args, kwargs)
+        queued = time.perf_counter()
+        await self.budget.acquire(weight, priority)
+        self.queue_timers[priority].observe(time.perf_counter() - queued)
+        self.sent += 1
+        self.weight_used += weight
+        self.counters["sent"].inc()
+        try:
+            return await fn(*args, **kwargs)
+        except Exception as e:
+            if not _is_rate_limit(e):
+                raise
+            self.rate_limited += 1
+            self.counters["rate_limited"].inc()
+            cooldown = settings.EXCHANGE_RATE_LIMIT_COOLDOWN
+            self.budget.penalize(cooldown)
+            logger.warning(f"⚠️ {self.exchange_id} rate limit hit, pausing requests for {cooldown}s")
+            raise
+
+    def status(self):
+        return {
+            "exchange": self.exchange_id,
+            "budget": self.budget.status(),
+            "sent": self.sent,
+            "weight_used": self.weight_used,
+            "cache_hits": self.cache_hits,
+            "coalesced": self.coalesced,
+            "rate_limited": self.rate_limited,
+            "in_flight": len(self.in_flight),
+        }
+
+
+class RequestScheduler:
+    def __init__(self):
+        self.exchanges: Dict[str, ExchangeScheduler] = {}
+
+    def scheduler(self, exchange_id: str) -> ExchangeScheduler:
+        scheduler = self.exchanges.get(exchange_id)
+        if scheduler is None:
+            scheduler = self.exchanges[exchange_id] = ExchangeScheduler(exchange_id)
+        return scheduler
+
+    def wrap(self, exchange_id: str, client):
+        """ক্লায়েন্ট ইনস্ট্যান্সের রিড ও অর্ডার মেথড শিডিউলারের মধ্য দিয়ে (ক্লাস অপরিবর্তিত)"""
+        scheduler = self.scheduler(exchange_id)
+        for names, shared in ((READ_METHODS, True), (EXECUTION_METHODS, False)):
+            for name in names:
+                method = getattr(client, name, None)
+                if method is None:
+                    continue
+
+                async def scheduled(*args, _name=name, _method=method, _shared=shared, **kwargs):
+                    return await scheduler.call(_name, _method, args, kwargs, _shared)
+                setattr(client, name, scheduled)
+        # বাজেট এখানে নিয়ন্ত্রিত, ccxt এর নিজস্ব থ্রটল দ্বিতীয়বার ধীর না করুক
+        client.enableRateLimit = False
+        return client
+
+    def status(self):
+        return [scheduler.status() for scheduler in self.exchanges.values()]
+
+
+request_scheduler = RequestScheduler()
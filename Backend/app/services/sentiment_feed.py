@@ -0,0 +1,80 @@
+import logging
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# সেন্টিমেন্ট ফিড: স্ন্যাপশট + ডেল্টা
+# ------------------------------------------------------------
+# প্রতি টপিকে (sentiment:pair:timeframe) শেষ পুরো পেলোড ও সিকোয়েন্স নম্বর রাখা হয়।
+#   SENTIMENT        {"seq": n, "payload": {...পুরো রেজাল্ট}}              ← subscribe/resync এ, বা গঠন বদলালে
+#   SENTIMENT_DELTA  {"seq": n, "payload": {বদলানো ফিল্ড..., "details": [শুধু যে ইন্ডিকেটরের ভোট উল্টেছে]}}
+# কিছু না বদলালে কিছুই পাঠানো হয় না। ক্লায়েন্ট seq এ ফাঁক দেখলে {"op": "resync"} পাঠায়।
+# ============================================================
+
+SNAPSHOT = "SENTIMENT"
+DELTA = "SENTIMENT_DELTA"
+
+
+class _TopicState:
+    __slots__ = ("seq", "payload", "votes")
+
+    def __init__(self):
+        self.seq = 0
+        self.payload: Optional[dict] = None
+        self.votes: Dict[str, str] = {}
+
+
+class SentimentFeed:
+    def __init__(self):
+        self.topics: Dict[str, _TopicState] = {}
+        self.snapshots = 0
+        self.deltas = 0
+        self.unchanged = 0
+
+    def encode(self, topic: str, payload: dict) -> Tuple[Optional[dict], dict]:
+        """
+        রিটার্ন (পাঠানোর মেসেজ বা None যদি কিছু না বদলায়, পুরো স্ন্যাপশট মেসেজ)।
+        স্ন্যাপশটের seq সবসময় সর্বশেষ পাঠানো মেসেজের seq।
+        """
+        state = self.topics.get(topic)
+        if state is None:
+            state = self.topics[topic] = _TopicState()
+        details = payload.get("details") or []
+        votes = {d["name"]: d["signal"] for d in details}
+        previous = state.payload
+
+        message = None
+        if previous is None or votes.keys() != state.votes.keys() or previous.keys() != payload.keys():
+            # প্রথমবার বা ইন্ডিকেটর/ফিল্ডের সেট বদলেছে: ডেল্টায় বোঝানো যায় না, পুরোটা
+            state.seq += 1
+            message = {"type": SNAPSHOT, "topic": topic, "seq": state.seq, "payload": payload}
+            self.snapshots += 1
+        else:
+            changes = {key: value for key, value in payload.items()
+                       if key != "details" and previous[key] != value}
+            flipped = [d for d in details if state.votes[d["name"]] != d["signal"]]
+            if flipped:
+                changes["details"] = flipped
+            if changes:
+                state.seq += 1
+                message = {"type": DELTA, "topic": topic, "seq": state.seq, "payload": changes}
+                self.deltas += 1
+            else:
+                self.unchanged += 1
+
+        state.payload = payload
+        state.votes = votes
+        snapshot = {"type": SNAPSHOT, "topic": topic, "seq": state.seq, "payload": payload}
+        return message, snapshot
+
+    def status(self):
+        return {
+            "topics": {topic: state.seq for topic, state in self.topics.items()},
+            "snapshots": self.snapshots,
+            "deltas": self.deltas,
+            "unchanged": self.unchanged,
+        }
+
+
+sentiment_feed = SentimentFeed()
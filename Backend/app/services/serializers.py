@@ -0,0 +1,138 @@
+import json
+import logging
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# প্লাগেবল সিরিয়ালাইজার
+# ------------------------------------------------------------
+# হট-পাথে দুই জায়গায় লাগে:
+#   ইনবাউন্ড — এক্সচেঞ্জের ওয়েবসকেট মেসেজ পার্স (json_codec.loads)
+#   আউটবাউন্ড — ক্লায়েন্টের ফ্রেম (টেক্সট JSON, অথবা নেগোশিয়েট করা msgpack বাইনারি)
+# orjson / msgspec ইন্সটল থাকলে সেটা, না থাকলে স্ট্যান্ডার্ড json (একই আউটপুট ফরম্যাট)।
+# ============================================================
+
+
+class JsonCodec:
+    """স্ট্যান্ডার্ড লাইব্রেরি (Starlette এর send_json এর মতো কমপ্যাক্ট ফরম্যাট)"""
+    name = "json"
+    binary = False
+
+    def loads(self, data):
+        return json.loads(data)
+
+    def dumps(self, obj) -> str:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+class OrjsonCodec:
+    name = "orjson"
+    binary = False
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        self._options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def loads(self, data):
+        return self._orjson.loads(data)
+
+    def dumps(self, obj) -> str:
+        # টেক্সট ফ্রেমের জন্য str লাগে; UTF-8 ডিকোড শুধু একটি কপি
+        return self._orjson.dumps(obj, option=self._options).decode()
+
+
+class MsgspecJsonCodec:
+    name = "msgspec"
+    binary = False
+
+    def __init__(self):
+        import msgspec
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def loads(self, data):
+        return self._decoder.decode(data)
+
+    def dumps(self, obj) -> str:
+        return self._encoder.encode(obj).decode()
+
+
+class MsgpackCodec:
+    """ক্লায়েন্ট চাইলে কমপ্যাক্ট বাইনারি ফ্রেম (msgspec বা msgpack, যেটা আছে)"""
+    name = "msgpack"
+    binary = True
+
+    def __init__(self):
+        try:
+            import msgspec
+            encoder, decoder = msgspec.msgpack.Encoder(), msgspec.msgpack.Decoder()
+            self._dumps, self._loads = encoder.encode, decoder.decode
+        except ImportError:
+            import msgpack
+            self._dumps = msgpack.packb
+            self._loads = msgpack.unpackb
+
+    def loads(self, data):
+        return self._loads(data)
+
+    def dumps(self, obj) -> bytes:
+        return self._dumps(obj)
+
+
+JSON_CODECS = {"orjson": OrjsonCodec, "msgspec": MsgspecJsonCodec, "json": JsonCodec}
+
+
+def _load_json_codec(preferred: str):
+    names = [preferred] if preferred != "auto" else ["orjson", "msgspec", "json"]
+    for name in names:
+        try:
+            return JSON_CODECS[name]()
+        except ImportError:
+            continue
+        except KeyError:
+            raise ValueError(f"Unknown serializer: {name}")
+    logger.warning(f"⚠️ Serializer '{preferred}' not installed, falling back to stdlib json")
+    return JsonCodec()
+
+
+def _load_binary_codec():
+    try:
+        return MsgpackCodec()
+    except ImportError:
+        return None
+
+
+json_codec = _load_json_codec(settings.SERIALIZER)
+binary_codec: Optional[MsgpackCodec] = _load_binary_codec()
+
+# ক্লায়েন্ট ফরম্যাট → কোডেক (msgpack শুধু লাইব্রেরি থাকলে)
+CLIENT_FORMATS: Dict[str, object] = {"json": json_codec}
+if binary_codec is not None:
+    CLIENT_FORMATS["msgpack"] = binary_codec
+
+
+def negotiate_format(requested: Optional[str]):
+    """ক্লায়েন্টের চাওয়া ফরম্যাট সাপোর্টেড হলে সেটা, না হলে json"""
+    return requested if requested in CLIENT_FORMATS else "json"
+
+
+class Frames:
+    """
+    একটি মেসেজের ফরম্যাট-ভিত্তিক ফ্রেম ক্যাশ: প্রতিটি ফরম্যাটে সর্বোচ্চ একবার সিরিয়ালাইজ,
+    আর কোনো ক্লায়েন্ট সেই ফরম্যাট না চাইলে একবারও না।
+    """
+    __slots__ = ("message", "cache")
+
+    def __init__(self, message, text: Optional[str] = None):
+        self.message = message
+        self.cache = {"json": text} if text is not None else {}
+
+    def get(self, fmt: str = "json"):
+        frame = self.cache.get(fmt)
+        if frame is None:
+            frame = self.cache[fmt] = CLIENT_FORMATS[fmt].dumps(self.message)
+        return frame
@@ -1,30 +1,127 @@
-import pandas as pd
-import pandas_ta as ta
+import time
+from collections import OrderedDict
+
 import numpy as np
 
+from app.core.config import settings
+from app.services.indicator_stream import IncrementalSignalEngine, MIN_CANDLES
+from app.services.batch_signal import INDICATOR_NAMES, compute_votes
+
+# ভারডিক্ট লেভেল: (স্কোরের শর্ত, ভারডিক্ট, কালার) — উপরে থেকে প্রথম মিলটাই নেওয়া হয়
+# শর্তগুলো NumPy অ্যারেতেও কাজ করে, তাই analyze_batch একই টেবিল ব্যবহার করে
+VERDICT_LEVELS = [
+    (lambda score: score >= 6, "STRONG BUY 🚀", "#00c853"), # গাঢ় সবুজ
+    (lambda score: score >= 2, "BUY 📈", "#00e676"), # হালকা সবুজ
+    (lambda score: score <= -6, "STRONG SELL 📉", "#ff3d00"), # গাঢ় লাল
+    (lambda score: score <= -2, "SELL 🔻", "#ff5722"), # হালকা লাল
+]
+DEFAULT_VERDICT = ("NEUTRAL 😐", "#ffb300") # হলুদ
+
+# analyze_batch এর আউটপুট স্ট্রাকচার্ড অ্যারের ফিল্ড
+BATCH_DTYPE = np.dtype([
+    ("verdict", "U16"),
+    ("score", "i2"),
+    ("buy", "i1"),
+    ("sell", "i1"),
+    ("neutral", "i1"),
+    ("votes", "i1", (len(INDICATOR_NAMES),)),
+])
+
+class StreamCache:
+    """
+    (symbol, timeframe, params) → IncrementalSignalEngine, LRU + TTL (শেষ ব্যবহার থেকে)।
+    এন্ট্রির ভেতরে শেষ ক্লোজড ক্যান্ডেল পর্যন্ত স্টেট ও ফর্মিং বারের মেমো থাকে, তাই একই কী এর
+    সব কলার (স্ক্যানার, ক্যান্ডেল অ্যাগ্রিগেটর, স্ট্র্যাটেজি) একটি ক্লোজড বার একবারই হিসাব করে।
+    """
+
+    def __init__(self, max_entries=None, ttl=None):
+        self.max_entries = max_entries or settings.SIGNAL_CACHE_MAX_ENTRIES
+        self.ttl = ttl or settings.SIGNAL_CACHE_TTL
+        self.entries = OrderedDict()  # key → [engine, শেষ ব্যবহার]; পুরনো ব্যবহার আগে
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.expired = 0
+        self.bypassed = 0
+        self.retired = {}  # বাদ পড়া ইঞ্জিনের stats (মোট হিসাব ঠিক রাখতে)
+
+    def get(self, key, params=None):
+        now = time.monotonic()
+        entry = self.entries.get(key)
+        if entry is not None and now - entry[1] > self.ttl:
+            self._drop(key)
+            self.expired += 1
+            entry = None
+        if entry is not None:
+            self.hits += 1
+            entry[1] = now
+            self.entries.move_to_end(key)
+            return entry[0]
+
+        self.misses += 1
+        # মেয়াদোত্তীর্ণগুলো সামনেই থাকে (ব্যবহারের অর্ডার), তারপর সাইজ লিমিট
+        while self.entries:
+            oldest_key, oldest = next(iter(self.entries.items()))
+            if now - oldest[1] <= self.ttl and len(self.entries) < self.max_entries:
+                break
+            self._drop(oldest_key)
+            if now - oldest[1] > self.ttl:
+                self.expired += 1
+            else:
+                self.evicted += 1
+        engine = IncrementalSignalEngine(params)
+        self.entries[key] = [engine, now]
+        return engine
+
+    def _drop(self, key):
+        engine = self.entries.pop(key)[0]
+        for name, value in engine.stats.items():
+            self.retired[name] = self.retired.get(name, 0) + value
+
+    def stats(self):
+        totals = dict(self.retired)
+        for engine, _ in self.entries.values():
+            for name, value in engine.stats.items():
+                totals[name] = totals.get(name, 0) + value
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted": self.evicted,
+            "expired": self.expired,
+            "bypassed": self.bypassed,
+            **totals,
+        }
+
+
 class SignalEngine:
+    """
+    স্টেটলেস ভোটিং: প্রতি কলের ভোট লোকাল লিস্টে, ফলাফল প্রতিবার নতুন dict —
+    তাই একাধিক থ্রেড/প্রসেসে একসাথে মূল্যায়ন একে অপরের ভোট নষ্ট করে না।
+    একমাত্র স্টেট streams (প্রতি কী আলাদা); একই কী এর কল একসাথে না চালানো কলারের দায়িত্ব
+    (compute_executor একই কী সবসময় একই ওয়ার্কারে পাঠায়)।
+    """
+
     def __init__(self):
-        self.buy_votes = 0
-        self.sell_votes = 0
-        self.neutral_votes = 0
-        self.details = []
-
-    def _add_vote(self, name, signal):
-        """ভোট এবং ডিটেইলস লিস্ট আপডেট করার হেল্পার ফাংশন"""
-        if signal == "BUY":
-            self.buy_votes += 1
-        elif signal == "SELL":
-            self.sell_votes += 1
-        else:
-            self.neutral_votes += 1
-        
-        self.details.append({"name": name, "signal": signal})
+        # প্রতি (symbol, timeframe, params) এর ইনক্রিমেন্টাল ইন্ডিকেটর স্টেট ও মেমো
+        self.streams = StreamCache()
+
+    @staticmethod
+    def _add_vote(details, name, signal):
+        """ভোট ডিটেইলস লিস্টে যোগ করার হেল্পার ফাংশন (গণনা _summarize এ)"""
+        details.append({"name": name, "signal": signal})
 
     def analyze_market_sentiment(self, ohlcv_data):
         """
         ২০টি ইন্ডিকেটর বিশ্লেষণ করে ফাইনাল সিগন্যাল তৈরি করে।
         ohlcv_data: লিস্ট অফ লিস্ট [[time, open, high, low, close, vol], ...]
         """
+        # pandas/pandas_ta ইমপোর্টেই ~০.৭s — শুধু এই পুরনো পাথে লাগে, তাই স্টার্টআপে নয়, প্রথম কলে
+        import pandas as pd
+        import pandas_ta as ta  # noqa: F401 (df.ta অ্যাক্সেসর রেজিস্টার করে)
+
         # ১. ডাটা প্রিপারেশন (Dataframe)
         # i3 অপ্টিমাইজেশন: আমরা সব ডাটা না নিয়ে শুধু শেষ ১০০টি ক্যান্ডেল নিব ক্যালকুলেশনের জন্য
         df = pd.DataFrame(ohlcv_data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
@@ -44,11 +141,8 @@ class SignalEngine:
             df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
             df.set_index('datetime', inplace=True)
 
-        # রিসেট ভোটিং
-        self.buy_votes = 0
-        self.sell_votes = 0
-        self.neutral_votes = 0
-        self.details = []
+        # এই কলের ভোট (ইনস্ট্যান্সে নয়)
+        details = []
 
         # শেষ ক্যান্ডেলের ভ্যালু (Latest Price)
         last_close = df['close'].iloc[-1]
@@ -62,12 +156,12 @@ class SignalEngine:
             # 1. SMA (50)
             sma50 = df.ta.sma(length=50)
             if sma50 is not None:
-                self._add_vote("SMA (50)", "BUY" if last_close > sma50.iloc[-1] else "SELL")
+                self._add_vote(details, "SMA (50)", "BUY" if last_close > sma50.iloc[-1] else "SELL")
 
             # 2. EMA (20)
             ema20 = df.ta.ema(length=20)
             if ema20 is not None:
-                self._add_vote("EMA (20)", "BUY" if last_close > ema20.iloc[-1] else "SELL")
+                self._add_vote(details, "EMA (20)", "BUY" if last_close > ema20.iloc[-1] else "SELL")
 
             # 3. MACD (12, 26, 9)
             macd = df.ta.macd(fast=12, slow=26, signal=9)
@@ -75,7 +169,7 @@ class SignalEngine:
                 # MACD > Signal Line check
                 macd_line = macd['MACD_12_26_9'].iloc[-1]
                 signal_line = macd['MACDs_12_26_9'].iloc[-1]
-                self._add_vote("MACD", "BUY" if macd_line > signal_line else "SELL")
+                self._add_vote(details, "MACD", "BUY" if macd_line > signal_line else "SELL")
 
             # 4. ADX (14)
             adx = df.ta.adx(length=14)
@@ -85,9 +179,9 @@ class SignalEngine:
                 dmn = adx['DMN_14'].iloc[-1]
                 
                 if adx_val > 25:
-                    self._add_vote("ADX (Strength)", "BUY" if dmp > dmn else "SELL")
+                    self._add_vote(details, "ADX (Strength)", "BUY" if dmp > dmn else "SELL")
                 else:
-                    self._add_vote("ADX (Strength)", "NEUTRAL")
+                    self._add_vote(details, "ADX (Strength)", "NEUTRAL")
 
             # 5. Parabolic SAR
             psar = df.ta.psar()
@@ -102,15 +196,15 @@ class SignalEngine:
                     is_bullish = True
                 
                 if is_bullish:
-                     self._add_vote("Parabolic SAR", "BUY")
+                     self._add_vote(details, "Parabolic SAR", "BUY")
                 elif not pd.isna(short_val) and short_val > 0:
-                     self._add_vote("Parabolic SAR", "SELL")
+                     self._add_vote(details, "Parabolic SAR", "SELL")
                 else:
                      # Fallback logic
                      if last_close > long_val: 
-                         self._add_vote("Parabolic SAR", "BUY")
+                         self._add_vote(details, "Parabolic SAR", "BUY")
                      else:
-                        self._add_vote("Parabolic SAR", "SELL")
+                        self._add_vote(details, "Parabolic SAR", "SELL")
 
             # 6. Ichimoku Cloud
             ichi = df.ta.ichimoku()
@@ -120,14 +214,14 @@ class SignalEngine:
                 # কলাম নেমগুলো ভেরিয়েবল হতে পারে, তাই পজিশনাল অ্যাক্সেস সেফার
                 tenkan = span_a[span_a.columns[0]].iloc[-1] # Conversion Line
                 kijun = span_a[span_a.columns[1]].iloc[-1]   # Base Line
-                self._add_vote("Ichimoku Cloud", "BUY" if tenkan > kijun else "SELL")
+                self._add_vote(details, "Ichimoku Cloud", "BUY" if tenkan > kijun else "SELL")
 
             # 7. Supertrend
             supertrend = df.ta.supertrend()
             if supertrend is not None:
                 # Supertrend কলামে 1 মানে আপট্রেন্ড, -1 মানে ডাউনট্রেন্ড
                 direction = supertrend[supertrend.columns[1]].iloc[-1] 
-                self._add_vote("Supertrend", "BUY" if direction == 1 else "SELL")
+                self._add_vote(details, "Supertrend", "BUY" if direction == 1 else "SELL")
 
             # ==========================================
             # ২. Momentum Indicators (গতি ও শক্তি)
@@ -137,31 +231,31 @@ class SignalEngine:
             rsi = df.ta.rsi(length=14)
             if rsi is not None:
                 val = rsi.iloc[-1]
-                self._add_vote("RSI (14)", "BUY" if val < 30 else "SELL" if val > 70 else "NEUTRAL")
+                self._add_vote(details, "RSI (14)", "BUY" if val < 30 else "SELL" if val > 70 else "NEUTRAL")
 
             # 9. Stochastic
             stoch = df.ta.stoch()
             if stoch is not None:
                 k = stoch['STOCHk_14_3_3'].iloc[-1]
-                self._add_vote("Stochastic", "BUY" if k < 20 else "SELL" if k > 80 else "NEUTRAL")
+                self._add_vote(details, "Stochastic", "BUY" if k < 20 else "SELL" if k > 80 else "NEUTRAL")
 
             # 10. CCI (20)
             cci = df.ta.cci(length=20)
             if cci is not None:
                 val = cci.iloc[-1]
-                self._add_vote("CCI", "BUY" if val < -100 else "SELL" if val > 100 else "NEUTRAL")
+                self._add_vote(details, "CCI", "BUY" if val < -100 else "SELL" if val > 100 else "NEUTRAL")
 
             # 11. Williams %R
             willr = df.ta.willr()
             if willr is not None:
                 val = willr.iloc[-1]
-                self._add_vote("Williams %R", "BUY" if val < -80 else "SELL" if val > -20 else "NEUTRAL")
+                self._add_vote(details, "Williams %R", "BUY" if val < -80 else "SELL" if val > -20 else "NEUTRAL")
 
             # 12. Momentum (ROC)
             roc = df.ta.roc()
             if roc is not None:
                 val = roc.iloc[-1]
-                self._add_vote("Momentum (ROC)", "BUY" if val > 0 else "SELL")
+                self._add_vote(details, "Momentum (ROC)", "BUY" if val > 0 else "SELL")
 
             # ==========================================
             # ৩. Volatility Indicators (অস্থিরতা)
@@ -179,11 +273,11 @@ class SignalEngine:
                     upper = bb[bbu_col].iloc[-1]
                     
                     if last_close < lower:
-                        self._add_vote("Bollinger Bands", "BUY") # Dip Buy
+                        self._add_vote(details, "Bollinger Bands", "BUY") # Dip Buy
                     elif last_close > upper:
-                        self._add_vote("Bollinger Bands", "SELL") # Peak Sell
+                        self._add_vote(details, "Bollinger Bands", "SELL") # Peak Sell
                     else:
-                        self._add_vote("Bollinger Bands", "NEUTRAL")
+                        self._add_vote(details, "Bollinger Bands", "NEUTRAL")
 
             # 14. ATR (Volatility Check)
             atr = df.ta.atr(length=14)
@@ -191,7 +285,7 @@ class SignalEngine:
                 curr_atr = atr.iloc[-1]
                 # prev_atr = atr.iloc[-10] # Unused
                 # শুধু ভোলাটিলিটি বাড়ছে কিনা তা চেক করা হচ্ছে
-                self._add_vote("ATR (Volatility)", "NEUTRAL") 
+                self._add_vote(details, "ATR (Volatility)", "NEUTRAL") 
 
             # 15. Keltner Channels (KC)
             kc = df.ta.kc()
@@ -200,7 +294,7 @@ class SignalEngine:
                 upper = kc[kc.columns[2]].iloc[-1]
                 lower = kc[kc.columns[0]].iloc[-1]
                 # JS লজিক ছিল EMA এর উপরে কিনা, এখানে আমরা স্ট্যান্ডার্ড KC লজিক দিচ্ছি
-                self._add_vote("Keltner Channels", "BUY" if last_close > upper else "SELL" if last_close < lower else "NEUTRAL")
+                self._add_vote(details, "Keltner Channels", "BUY" if last_close > upper else "SELL" if last_close < lower else "NEUTRAL")
 
             # 16. Donchian Channels
             donchian = df.ta.donchian()
@@ -210,11 +304,11 @@ class SignalEngine:
                 lower = donchian[donchian.columns[0]].iloc[-1]
                 
                 if last_close >= upper:
-                    self._add_vote("Donchian Channels", "BUY")
+                    self._add_vote(details, "Donchian Channels", "BUY")
                 elif last_close <= lower:
-                    self._add_vote("Donchian Channels", "SELL")
+                    self._add_vote(details, "Donchian Channels", "SELL")
                 else:
-                    self._add_vote("Donchian Channels", "NEUTRAL")
+                    self._add_vote(details, "Donchian Channels", "NEUTRAL")
 
             # ==========================================
             # ৪. Volume Indicators (লেনদেনের পরিমাণ)
@@ -224,56 +318,129 @@ class SignalEngine:
             obv = df.ta.obv()
             if obv is not None:
                 # OBV বাড়ছে মানে বাই প্রেসার
-                self._add_vote("OBV", "BUY" if obv.iloc[-1] > obv.iloc[-2] else "SELL")
+                self._add_vote(details, "OBV", "BUY" if obv.iloc[-1] > obv.iloc[-2] else "SELL")
 
             # 18. MFI
             mfi = df.ta.mfi()
             if mfi is not None:
                 val = mfi.iloc[-1]
-                self._add_vote("MFI", "BUY" if val < 20 else "SELL" if val > 80 else "NEUTRAL")
+                self._add_vote(details, "MFI", "BUY" if val < 20 else "SELL" if val > 80 else "NEUTRAL")
 
             # 19. VWAP
             vwap = df.ta.vwap()
             if vwap is not None:
                 val = vwap.iloc[-1]
-                self._add_vote("VWAP", "BUY" if last_close > val else "SELL")
+                self._add_vote(details, "VWAP", "BUY" if last_close > val else "SELL")
 
             # 20. A/D Line (Accumulation/Distribution)
             ad = df.ta.ad()
             if ad is not None:
-                self._add_vote("A/D Line", "BUY" if ad.iloc[-1] > ad.iloc[-5] else "SELL")
+                self._add_vote(details, "A/D Line", "BUY" if ad.iloc[-1] > ad.iloc[-5] else "SELL")
 
         except Exception as e:
             print(f"Signal Calculation Error: {e}")
             return {"verdict": "ERROR", "score": 0, "details": []}
 
+        return self._summarize(details)
+
+    def analyze_incremental(self, ohlcv_data, symbol="BTC/USDT", timeframe="1h", book=None, params=None):
+        """
+        analyze_market_sentiment এর ইনক্রিমেন্টাল সংস্করণ (একই ভোট, একই আউটপুট)।
+        প্রতি কলে শুধু নতুন ক্লোজড ক্যান্ডেল স্টেটে যোগ হয় আর ফর্মিং ক্যান্ডেল peek হয়
+        (যে ইন্ডিকেটরের ইনপুট বদলায়নি তার ভোট মেমো থেকে)।
+        book: লোকাল অর্ডার বুকের মেট্রিক (থাকলে ইমব্যালান্সের একটি অতিরিক্ত ভোট ও "order_book" ফিল্ড)
+        params: DEFAULT_PARAMS এর ওভাররাইড (আলাদা ক্যাশ এন্ট্রি)
+        """
+        key = (symbol, timeframe, tuple(sorted(params.items())) if params else ())
+        stream = self.streams.get(key, params)
+        if len(ohlcv_data) and stream.last_closed_ts is not None and ohlcv_data[-1][0] < stream.last_closed_ts:
+            # শেয়ার্ড স্টেটের চেয়ে পুরনো উইন্ডো (যেমন হিস্টোরিক্যাল অনুরোধ): ক্যাশ না ভেঙে আলাদা হিসাব
+            self.streams.bypassed += 1
+            stream = IncrementalSignalEngine(params)
+
+        try:
+            details = stream.sync(ohlcv_data)
+        except Exception as e:
+            print(f"Signal Calculation Error: {e}")
+            stream.reset()
+            return {"verdict": "ERROR", "score": 0, "details": []}
+
+        if details is None:
+            return {"verdict": "LOADING...", "score": 0, "details": []}
+        if book is None:
+            return self._summarize(details)
+        result = self._summarize(details + [{"name": "Order Book", "signal": self._book_vote(book)}])
+        result["order_book"] = book
+        return result
+
+    def _book_vote(self, book):
+        """top-N ইমব্যালান্স: বিডে বেশি লিকুইডিটি = BUY চাপ"""
+        threshold = settings.ORDER_BOOK_VOTE_IMBALANCE
+        if book["imbalance"] > threshold:
+            return "BUY"
+        if book["imbalance"] < -threshold:
+            return "SELL"
+        return "NEUTRAL"
+
+    def _summarize(self, details):
+        """ভোট লিস্ট থেকে ফাইনাল ভারডিক্ট তৈরি (দুই ইঞ্জিনেই একই লজিক)"""
+        buy_votes = sum(1 for d in details if d["signal"] == "BUY")
+        sell_votes = sum(1 for d in details if d["signal"] == "SELL")
+        neutral_votes = len(details) - buy_votes - sell_votes
+
         # ==========================================
         # ফাইনাল ভারডিক্ট ক্যালকুলেশন
         # ==========================================
-        score = self.buy_votes - self.sell_votes
-        verdict = "NEUTRAL 😐"
-        color = "#ffb300" # হলুদ
-
-        if score >= 6:
-            verdict = "STRONG BUY 🚀"
-            color = "#00c853" # গাঢ় সবুজ
-        elif score >= 2:
-            verdict = "BUY 📈"
-            color = "#00e676" # হালকা সবুজ
-        elif score <= -6:
-            verdict = "STRONG SELL 📉"
-            color = "#ff3d00" # গাঢ় লাল
-        elif score <= -2:
-            verdict = "SELL 🔻"
-            color = "#ff5722" # হালকা লাল
+        score = buy_votes - sell_votes
+        verdict, color = DEFAULT_VERDICT
+        for condition, level_verdict, level_color in VERDICT_LEVELS:
+            if condition(score):
+                verdict, color = level_verdict, level_color
+                break
 
         return {
             "verdict": verdict,
             "color": color,
             "score": score,
-            "summary": {"buy": self.buy_votes, "sell": self.sell_votes, "neutral": self.neutral_votes},
-            "details": self.details
+            "summary": {"buy": buy_votes, "sell": sell_votes, "neutral": neutral_votes},
+            "details": details
         }
 
+    def analyze_batch(self, ohlcv_batch, params=None):
+        """
+        অনেক সিম্বল একসাথে: (symbols × candles × 6) অ্যারে থেকে ভেক্টরাইজড ভোট ও ভারডিক্ট।
+        রিটার্ন BATCH_DTYPE এর স্ট্রাকচার্ড অ্যারে (প্রতি সিম্বলে একটি রো, শেষ ক্যান্ডেলের ভারডিক্ট)।
+        """
+        data = np.asarray(ohlcv_batch, dtype=np.float64)
+        if data.ndim == 2:
+            data = data[None, :, :]
+        result = np.zeros(data.shape[0], dtype=BATCH_DTYPE)
+        if data.shape[1] < MIN_CANDLES:
+            result["verdict"] = "LOADING..."
+            return result
+
+        votes = compute_votes(data, params)[:, -1, :]
+        buy = (votes == 1).sum(axis=1)
+        sell = (votes == -1).sum(axis=1)
+        score = buy - sell
+
+        verdict = np.full(score.shape, DEFAULT_VERDICT[0], dtype="U16")
+        decided = np.zeros(score.shape, dtype=bool)
+        for condition, level_verdict, _ in VERDICT_LEVELS:
+            hit = condition(score) & ~decided
+            verdict[hit] = level_verdict
+            decided |= hit
+
+        result["verdict"] = verdict
+        result["score"] = score
+        result["buy"] = buy
+        result["sell"] = sell
+        result["neutral"] = votes.shape[1] - buy - sell
+        result["votes"] = votes
+        return result
+
+    def cache_stats(self):
+        return self.streams.stats()
+
 # সিঙ্গেলটন ইনস্ট্যান্স তৈরি (যাতে বারবার ক্লাস তৈরি করতে না হয়)
 signal_engine = SignalEngine()
@@ -1,10 +1,20 @@
-import json
 import asyncio
+import os
+import time
 import websockets
 import logging
-import ccxt.async_support as ccxt
 from abc import ABC, abstractmethod
-from typing import Optional, Set
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from app.core.config import settings
+from app.services.exchange_pool import exchange_pool
+from app.services.metrics import STREAM_DROPPED, STREAM_MESSAGES, registry
+from app.services.request_scheduler import UI, request_priority
+from app.services.serializers import json_codec
+from app.services.stream_recorder import FRAME, PAIRS, PRICE, read_records, stream_recorder
+from app.services.tick_history import tick_history
+
+RESET = "reset"  # add_handler এর বিশেষ kind: সোর্স বদল (রিপ্লে), ডাটা স্ট্রিম নয়
 
 # লগিং সেটআপ
 logging.basicConfig(level=logging.INFO)
@@ -40,7 +50,11 @@ class BinanceWebSocketStrategy(MarketStreamStrategy):
                     while self.running:
                         try:
                             msg = await asyncio.wait_for(ws.recv(), timeout=1.0)
-                            data = json.loads(msg)
+                            if stream_recorder.active:
+                                # combined-stream ফ্রেমের আকারে, যাতে রিপ্লে একই পথে চলে
+                                stream_recorder.record(FRAME, f'{{"stream":"{self.current_pair}@trade","data":{msg}}}')
+                            data = json_codec.loads(msg)
+                            STREAM_MESSAGES.labels("binance", "trade").inc()
                             price = float(data['p'])
                             await self.callback(price)
                         except asyncio.TimeoutError:
@@ -59,6 +73,240 @@ class BinanceWebSocketStrategy(MarketStreamStrategy):
         self.running = False
         logger.info("🛑 Stopping Binance Strategy")
 
+# --- Strategy 1b: Binance Combined Streams (Multiplexed) ---
+def binance_stream_id(pair: str):
+    """"BTC/USDT" → "btcusdt" (Binance স্ট্রিম নামের সিম্বল অংশ)"""
+    return pair.replace("/", "").lower()
+
+
+class BinanceCombinedConnection:
+    """
+    একটি /stream?streams=... কানেকশন, যেটিতে অনেক স্ট্রিম একসাথে চলে।
+    - রিকানেক্ট ছাড়াই SUBSCRIBE/UNSUBSCRIBE (Binance এর কন্ট্রোল মেসেজ রেট-লিমিট মেনে)
+    - কানেকশন পড়ে গেলে বর্তমান স্ট্রিম সেট দিয়ে URL বানিয়ে আবার কানেক্ট
+    """
+
+    def __init__(self, base_url: str, on_message: Callable[[str, dict], Awaitable[None]], max_streams: int):
+        self.base_url = base_url.rstrip("/")
+        self.on_message = on_message
+        self.max_streams = max_streams
+        self.streams: Set[str] = set()   # যেগুলো থাকা উচিত
+        self.live: Set[str] = set()      # যেগুলো সকেটে আসলেই চালু
+        self.ws = None
+        self.running = False
+        self.task: Optional[asyncio.Task] = None
+        self.next_id = 1
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.control_lock = asyncio.Lock()
+        self.last_control = 0.0
+        self.sync_lock = asyncio.Lock()
+        self.messages = 0
+        self.counters: Dict[str, object] = {}  # স্ট্রিম টাইপ → মেট্রিক কাউন্টার (লেবেল লুকআপ একবারই)
+
+    @property
+    def free(self):
+        return self.max_streams - len(self.streams)
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.running = True
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self.running = False
+        if self.ws is not None:
+            await self.ws.close()
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self.task = None
+
+    async def _run(self):
+        while self.running:
+            if not self.streams:
+                return
+            url = f"{self.base_url}/stream?streams={'/'.join(sorted(self.streams))}"
+            try:
+                async with websockets.connect(url, max_size=2 ** 22) as ws:
+                    self.ws = ws
+                    self.live = set(url.split("streams=", 1)[1].split("/"))
+                    logger.info(f"✅ Binance combined stream connected ({len(self.live)} streams)")
+                    # কানেক্ট হওয়ার মাঝে সেট বদলে থাকলে মিলিয়ে নেওয়া
+                    asyncio.create_task(self.sync())
+                    async for raw in ws:
+                        if stream_recorder.active:
+                            stream_recorder.record(FRAME, raw)
+                        await self._dispatch(raw)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self.running:
+                    logger.error(f"Binance Combined Stream Error: {e}")
+            finally:
+                self.ws = None
+                self.live = set()
+                for future in self.pending.values():
+                    if not future.done():
+                        future.set_exception(ConnectionError("Binance stream disconnected"))
+                self.pending.clear()
+            if self.running:
+                await asyncio.sleep(2)
+
+    async def _dispatch(self, raw):
+        message = json_codec.loads(raw)
+        stream = message.get("stream")
+        if stream is not None:
+            self.messages += 1
+            kind = stream.partition("@")[2]
+            counter = self.counters.get(kind)
+            if counter is None:
+                counter = self.counters[kind] = STREAM_MESSAGES.labels("binance", kind)
+            counter.inc()
+            await self.on_message(stream, message["data"])
+        elif "id" in message:
+            # SUBSCRIBE/UNSUBSCRIBE এর রিপ্লাই: {"result": null, "id": n} বা {"error": {...}, "id": n}
+            future = self.pending.pop(message["id"], None)
+            if future is not None and not future.done():
+                if message.get("error"):
+                    future.set_exception(RuntimeError(str(message["error"])))
+                else:
+                    future.set_result(message.get("result"))
+
+    async def _control(self, method: str, params: List[str]):
+        """কন্ট্রোল মেসেজ পাঠিয়ে রিপ্লাইয়ের অপেক্ষা; প্রতি সেকেন্ডে সর্বোচ্চ BINANCE_WS_CONTROL_RATE টি"""
+        ws = self.ws
+        if ws is None:
+            return False
+        async with self.control_lock:
+            wait = self.last_control + 1.0 / settings.BINANCE_WS_CONTROL_RATE - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self.last_control = time.monotonic()
+            request_id = self.next_id
+            self.next_id += 1
+            future = self.pending[request_id] = asyncio.get_running_loop().create_future()
+            await ws.send(json_codec.dumps({"method": method, "params": params, "id": request_id}))
+        await asyncio.wait_for(future, timeout=10)
+        return True
+
+    async def sync(self):
+        """self.streams আর self.live এর পার্থক্য SUBSCRIBE/UNSUBSCRIBE দিয়ে মেলানো"""
+        async with self.sync_lock:
+            try:
+                add = sorted(self.streams - self.live)
+                remove = sorted(self.live - self.streams)
+                for i in range(0, len(add), 100):
+                    if await self._control("SUBSCRIBE", add[i:i + 100]):
+                        self.live.update(add[i:i + 100])
+                for i in range(0, len(remove), 100):
+                    if await self._control("UNSUBSCRIBE", remove[i:i + 100]):
+                        self.live.difference_update(remove[i:i + 100])
+            except Exception as e:
+                # রিকানেক্টের সময় URL এ বর্তমান সেট থাকবে, তাই এখানে শুধু লগ
+                logger.warning(f"⚠️ Binance stream sync failed: {e}")
+
+    async def subscribe(self, streams: Iterable[str]):
+        self.streams.update(streams)
+        if self.task is None or self.task.done():
+            self.start()
+        else:
+            await self.sync()
+
+    async def unsubscribe(self, streams: Iterable[str]):
+        self.streams.difference_update(streams)
+        if not self.streams:
+            await self.stop()
+        else:
+            await self.sync()
+
+
+class BinanceMultiplexStrategy(MarketStreamStrategy):
+    """
+    Binance combined streams দিয়ে অনেক পেয়ার ও স্ট্রিম টাইপ (trade, aggTrade, bookTicker, kline_1m...)
+    কয়েকটি কানেকশনে। callback(kind, pair, data) প্রতিটি ইভেন্টে কল হয়।
+    """
+
+    def __init__(self, callback, base_url: Optional[str] = None, max_streams: Optional[int] = None):
+        super().__init__(callback)
+        self.base_url = base_url or settings.BINANCE_WS_URL
+        self.max_streams = max_streams or settings.BINANCE_WS_MAX_STREAMS
+        self.connections: List[BinanceCombinedConnection] = []
+        self.owner: Dict[str, BinanceCombinedConnection] = {}
+        self.pairs: Dict[str, str] = {}  # "btcusdt" → "BTC/USDT"
+        self.lock = asyncio.Lock()
+        self.stopped = asyncio.Event()
+
+    async def _on_message(self, stream: str, data: dict):
+        stream_id, _, kind = stream.partition("@")
+        pair = self.pairs.get(stream_id, stream_id.upper())
+        await self.callback(kind, pair, data)
+
+    def _names(self, pairs: Iterable[str], kinds: Iterable[str]):
+        names = []
+        for pair in pairs:
+            stream_id = binance_stream_id(pair)
+            if stream_id not in self.pairs and stream_recorder.active:
+                stream_recorder.record_pairs({stream_id: pair})
+            self.pairs[stream_id] = pair
+            names.extend(f"{stream_id}@{kind}" for kind in kinds)
+        return names
+
+    async def subscribe(self, pairs: Iterable[str], kinds: Iterable[str] = ("trade",)):
+        kinds = list(kinds)
+        async with self.lock:
+            by_connection: Dict[BinanceCombinedConnection, List[str]] = {}
+            for name in self._names(pairs, kinds):
+                if name in self.owner:
+                    continue
+                conn = next((c for c in self.connections if c.free > len(by_connection.get(c, []))), None)
+                if conn is None:
+                    conn = BinanceCombinedConnection(self.base_url, self._on_message, self.max_streams)
+                    self.connections.append(conn)
+                self.owner[name] = conn
+                by_connection.setdefault(conn, []).append(name)
+        for conn, names in by_connection.items():
+            await conn.subscribe(names)
+
+    async def unsubscribe(self, pairs: Iterable[str], kinds: Iterable[str] = ("trade",)):
+        kinds = list(kinds)
+        async with self.lock:
+            by_connection: Dict[BinanceCombinedConnection, List[str]] = {}
+            for name in self._names(pairs, kinds):
+                conn = self.owner.pop(name, None)
+                if conn is not None:
+                    by_connection.setdefault(conn, []).append(name)
+        for conn, names in by_connection.items():
+            await conn.unsubscribe(names)
+        self.connections = [c for c in self.connections if c.streams]
+
+    async def start(self, pair: str):
+        """LiveMarketStream এর সাথে সামঞ্জস্য: pair এর trade স্ট্রিম দিয়ে শুরু, stop পর্যন্ত চলে"""
+        self.running = True
+        self.current_pair = pair
+        logger.info(f"🚀 Starting Binance Multiplex Strategy for {pair}")
+        await self.subscribe([pair], ["trade"])
+        await self.stopped.wait()
+
+    async def stop(self):
+        self.running = False
+        for conn in self.connections:
+            await conn.stop()
+        self.connections = []
+        self.owner.clear()
+        self.stopped.set()
+        logger.info("🛑 Stopping Binance Multiplex Strategy")
+
+    def status(self):
+        return {
+            "connections": len(self.connections),
+            "streams": sorted(self.owner),
+            "messages": sum(c.messages for c in self.connections),
+        }
+
+
 # --- Strategy 2: CCXT Polling (Universal Support) ---
 class CCXTPollingStrategy(MarketStreamStrategy):
     def __init__(self, callback, exchange_id: str):
@@ -72,25 +320,151 @@ class CCXTPollingStrategy(MarketStreamStrategy):
         logger.info(f"� Starting Standard Polling Strategy for {self.exchange_id.upper()} : {pair}")
         
         try:
-            exchange_class = getattr(ccxt, self.exchange_id)
-            async with exchange_class() as exchange:
-                while self.running:
-                    try:
-                        ticker = await exchange.fetch_ticker(pair)
-                        price = ticker['last']
-                        await self.callback(price)
-                        await asyncio.sleep(1.5) # ১.৫ সেকেন্ড ডিলে (রেট লিমিট এড়াতে)
-                    except Exception as e:
-                        logger.error(f"Polling Error ({self.exchange_id}): {e}")
-                        await asyncio.sleep(5)
+            # শেয়ার্ড পুলের ক্লায়েন্ট; স্ট্র্যাটেজি বন্ধ হলেও সেশন খোলা থাকে অন্যদের জন্য
+            exchange = await exchange_pool.get(self.exchange_id)
         except Exception as e:
             logger.error(f"Exchange Init Error: {e}")
+            return
+
+        # ui প্রায়োরিটি: বাজেট টানাটানিতে অর্ডার ও ইঞ্জিনের কল আগে যায়;
+        # একই টিকার অন্য কেউ চাইলে শিডিউলারের ক্যাশ/কোয়ালেসিং থেকে পায়
+        error_count = 0
+        with request_priority(UI):
+            while self.running:
+                try:
+                    ticker = await exchange.fetch_ticker(pair)
+                    price = ticker['last']
+                    if stream_recorder.active:
+                        stream_recorder.record(PRICE, json_codec.dumps({"x": self.exchange_id, "s": pair, "p": price}))
+                    await self.callback(price)
+                    error_count = 0
+                    await asyncio.sleep(1.5)
+                except Exception as e:
+                    error_count += 1
+                    sleep_time = min(30, 2 * error_count)
+                    logger.error(f"Polling Error ({self.exchange_id}, retry in {sleep_time}s): {e}")
+                    await asyncio.sleep(sleep_time)
 
     async def stop(self):
         self.running = False
         logger.info(f"🛑 Stopping Polling Strategy ({self.exchange_id})")
 
 
+# --- Strategy 3: Recorded Stream Replay (Offline Load Test) ---
+class ReplayStrategy(MarketStreamStrategy):
+    """
+    stream_recorder এর ফাইল থেকে মেসেজ, রেকর্ডের সময়ের ব্যবধান মেনে (speed=1 আসল গতি, N = N গুণ দ্রুত,
+    0 = যত দ্রুত সম্ভব)। raw ফ্রেম লাইভের মতোই BinanceCombinedConnection._dispatch হয়ে
+    callback(kind, pair, data) এ যায়; পোলিং টিকার যায় price_callback(exchange, pair, price) এ।
+    রেকর্ডের সময় (E/T) প্লে করার মুহূর্তে রিবেস হয় (এখন − রেকর্ডে ধরা লেটেন্সি): নইলে লাইভ স্টেটে
+    পুরনো টাইমস্ট্যাম্প বারের লেট কাটঅফে বাদ পড়ত আর টিক হিস্ট্রির বাড়তে থাকা ক্রম ভাঙত। প্রতি পাসের শুরুতে
+    reset_callback — কনজিউমাররা ট্রেড আইডি ডিডুপ ভুলে যায় (রেকর্ডের আইডি লাইভ/আগের পাসের চেয়ে ছোট)।
+    kline এর t/T রিবেস হয় না (ইন্টারভালের সীমায় বাঁধা)।
+    """
+
+    TIME_FIELDS = ("E", "T")
+
+    YIELD_EVERY = 64  # সাবস্ক্রাইবার কিউ (100) ভরার আগে; সর্বোচ্চ গতিতে এত রেকর্ড পরপর লুপকে জায়গা দেওয়া
+
+    def __init__(self, callback, path: str, speed: float = 1.0, loop: bool = False,
+                 price_callback: Optional[Callable[[str, str, float], Awaitable[None]]] = None,
+                 reset_callback: Optional[Callable[[], None]] = None):
+        super().__init__(callback)
+        self.path = path
+        self.speed = max(0.0, speed)
+        self.loop = loop
+        self.price_callback = price_callback
+        self.reset_callback = reset_callback
+        self.time_shift = 0      # ms, এখনকার রেকর্ডের: প্লের সময় − ধরার সময়
+        self.pairs: Dict[str, str] = {}
+        self.connection = BinanceCombinedConnection("replay://", self._on_message, 0)
+        self.played = 0
+        self.passes = 0
+        self.behind = 0.0        # সময়সূচির চেয়ে সর্বোচ্চ কত সেকেন্ড পিছিয়ে ছিল
+        self.started_at: Optional[float] = None
+        self.finished = False
+        self.error: Optional[str] = None
+
+    async def _on_message(self, stream: str, data: dict):
+        stream_id, _, kind = stream.partition("@")
+        pair = self.pairs.get(stream_id, stream_id.upper())
+        for field in self.TIME_FIELDS:
+            if field in data:
+                data[field] += self.time_shift
+        await self.callback(kind, pair, data)
+
+    async def _play(self, kind: str, payload: str):
+        if kind == FRAME:
+            await self.connection._dispatch(payload)
+        elif kind == PRICE:
+            if self.price_callback is not None:
+                tick = json_codec.loads(payload)
+                await self.price_callback(tick["x"], tick["s"], float(tick["p"]))
+        elif kind == PAIRS:
+            self.pairs.update(json_codec.loads(payload))
+
+    async def _pass(self):
+        origin_us = None
+        clock = time.monotonic()
+        if self.reset_callback is not None:
+            self.reset_callback()
+        for ts_us, kind, payload in read_records(self.path):
+            if not self.running:
+                return
+            if origin_us is None:
+                origin_us = ts_us
+            if self.speed > 0:
+                wait = clock + (ts_us - origin_us) / 1e6 / self.speed - time.monotonic()
+                if wait > 0.001:
+                    await asyncio.sleep(wait)
+                elif -wait > self.behind:
+                    self.behind = -wait
+            elif self.played % self.YIELD_EVERY == 0:
+                await asyncio.sleep(0)
+            self.time_shift = int(time.time() * 1000 - ts_us / 1000)
+            try:
+                await self._play(kind, payload)
+            except Exception as e:
+                logger.error(f"Replay record error ({kind}): {e}")
+            self.played += 1
+
+    async def start(self, pair: str):
+        self.current_pair = pair
+        self.running = True
+        self.finished = False
+        self.started_at = time.time()
+        logger.info(f"⏯️ Replaying {self.path} (speed={self.speed or 'max'}, loop={self.loop})")
+        try:
+            while self.running:
+                await self._pass()
+                self.passes += 1
+                if not self.loop:
+                    break
+        except Exception as e:
+            self.error = str(e)
+            logger.error(f"Replay Error ({self.path}): {e}")
+        self.finished = True
+        logger.info(f"⏹️ Replay finished ({self.played} records, {self.passes} passes)")
+
+    async def stop(self):
+        self.running = False
+        logger.info("🛑 Stopping Replay Strategy")
+
+    def status(self):
+        elapsed = time.time() - self.started_at if self.started_at else 0.0
+        return {
+            "path": self.path,
+            "speed": self.speed,
+            "loop": self.loop,
+            "played": self.played,
+            "passes": self.passes,
+            "per_second": round(self.played / elapsed, 1) if elapsed > 0 else 0.0,
+            "behind_seconds": round(self.behind, 4),
+            "finished": self.finished,
+            "error": self.error,
+        }
+
+
 # --- Context Class (The Engine) ---
 class LiveMarketStream:
     def __init__(self):
@@ -102,24 +476,143 @@ class LiveMarketStream:
         self.strategy: Optional[MarketStreamStrategy] = None
         self.param_lock = asyncio.Lock() # রেস কন্ডিশন এড়াতে
         self.task_runner = None
+        # Binance এর সব পেয়ার/স্ট্রিম একটি মাল্টিপ্লেক্স স্ট্র্যাটেজিতে (পেয়ার বদলাতে রিকানেক্ট লাগে না)
+        self.multiplex: Optional[BinanceMultiplexStrategy] = None
+        self.watched: Dict[str, int] = {}  # স্ট্রিম (pair@kind) → কতজন watch করছে
+        # স্ট্রিম টাইপ → সিঙ্ক হ্যান্ডলার(pair, data): কিউ ছাড়া সরাসরি (যেমন অর্ডার বুকের ডিফ, যা বাদ পড়া চলে না)
+        self.handlers: Dict[str, List[Callable[[str, dict], None]]] = {}
+
+    def _emit(self, payload: dict):
+        for q in list(self.subscribers):
+            try:
+                q.put_nowait(payload)
+            except asyncio.QueueFull:
+                STREAM_DROPPED.inc()
 
     async def broadcast_price(self, price: float):
         """স্ট্র্যাটেজি থেকে কলব্যাক পাওয়ার মেথড"""
         self.latest_price = price
-        payload = {
+        ts = int(time.time() * 1000)
+        tick_history.append(self.current_exchange, self.current_pair, ts, price)
+        self._emit(self._ticker(self.current_exchange, self.current_pair, price, ts))
+
+    async def on_price(self, exchange_id: str, pair: str, price: float):
+        """রিপ্লের পোলিং টিকার: রেকর্ডের এক্সচেঞ্জ/পেয়ার সহ"""
+        if exchange_id == self.current_exchange and pair == self.current_pair:
+            self.latest_price = price
+        ts = int(time.time() * 1000)
+        tick_history.append(exchange_id, pair, ts, price)
+        self._emit(self._ticker(exchange_id, pair, price, ts))
+
+    def _ticker(self, exchange_id: str, pair: str, price: float, ts: int, size: float = 0.0, side: int = 0):
+        return {
             "type": "TICKER",
             "data": {
-                "pair": self.current_pair,
-                "exchange": self.current_exchange,
-                "price": self.latest_price,
-                "timestamp": asyncio.get_running_loop().time()
+                "pair": pair,
+                "exchange": exchange_id,
+                "price": price,
+                "timestamp": asyncio.get_running_loop().time(),
+                # ট্রেডের সময় (epoch ms), পরিমাণ ও দিক — গেটওয়ে এগুলো দিয়ে নিজের টিক হিস্ট্রি বানায়
+                "ts": ts,
+                "size": size,
+                "side": side,
             }
         }
-        for q in list(self.subscribers):
+
+    async def on_binance_event(self, kind: str, pair: str, data: dict):
+        """মাল্টিপ্লেক্স স্ট্র্যাটেজির কলব্যাক: স্ট্রিম টাইপ অনুযায়ী সাবস্ক্রাইবারদের পেলোড"""
+        for handler in self.handlers.get(kind, ()):
             try:
-                q.put_nowait(payload)
-            except asyncio.QueueFull:
-                pass
+                handler(pair, data)
+            except Exception as e:
+                logger.error(f"Stream handler error ({kind}): {e}")
+        if kind in ("trade", "aggTrade"):
+            price = float(data["p"])
+            if pair == self.current_pair and self.current_exchange == "binance":
+                self.latest_price = price
+            # m = buyer maker, মানে সেলার অ্যাগ্রেসর
+            ts, size, side = data["T"], float(data["q"]), -1 if data["m"] else 1
+            tick_history.append("binance", pair, ts, price, size, side)
+            self._emit(self._ticker("binance", pair, price, ts, size, side))
+        elif kind == "bookTicker":
+            self._emit({"type": "BOOK_TICKER", "data": {
+                "pair": pair, "exchange": "binance",
+                "bid": float(data["b"]), "bid_qty": float(data["B"]),
+                "ask": float(data["a"]), "ask_qty": float(data["A"]),
+            }})
+        elif kind.startswith("depth") and "bids" in data:
+            # partial book (depth5/10/20): প্রতিবার পুরো top-N স্ন্যাপশট
+            self._emit({"type": "DEPTH", "data": {
+                "pair": pair, "exchange": "binance", "update_id": data.get("lastUpdateId"),
+                "bids": [(float(p), float(q)) for p, q in data["bids"]],
+                "asks": [(float(p), float(q)) for p, q in data["asks"]],
+            }})
+        elif kind.startswith("kline"):
+            k = data["k"]
+            self._emit({"type": "KLINE", "data": {
+                "pair": pair, "exchange": "binance", "timeframe": k["i"], "closed": k["x"],
+                "candle": [k["t"], float(k["o"]), float(k["h"]), float(k["l"]), float(k["c"]), float(k["v"])],
+            }})
+
+    def add_handler(self, kind: str, handler: Callable[[str, dict], None]):
+        """kind: স্ট্রিম টাইপ (trade, depth ...), অথবা RESET — রিপ্লে শুরু/প্রতি পাস/শেষে, pair None"""
+        self.handlers.setdefault(kind, []).append(handler)
+
+    def _reset_consumers(self):
+        """সোর্স বদলালে কনজিউমারদের পার-পেয়ার ডিডুপ ভুলে যেতে বলা (নতুন সোর্সের ট্রেড আইডি ছোট হতে পারে)"""
+        for handler in self.handlers.get(RESET, ()):
+            try:
+                handler(None, {})
+            except Exception as e:
+                logger.error(f"Stream reset handler error: {e}")
+
+    def remove_handler(self, kind: str, handler: Callable[[str, dict], None]):
+        handlers = self.handlers.get(kind, [])
+        if handler in handlers:
+            handlers.remove(handler)
+
+    def _ensure_multiplex(self):
+        if self.multiplex is None:
+            self.multiplex = BinanceMultiplexStrategy(self.on_binance_event)
+        return self.multiplex
+
+    @property
+    def replaying(self):
+        return isinstance(self.strategy, ReplayStrategy)
+
+    async def watch(self, pairs: Iterable[str], kinds: Iterable[str] = ("trade",)):
+        """অতিরিক্ত Binance পেয়ার/স্ট্রিম চালু (রেফারেন্স কাউন্টেড, লাইভ SUBSCRIBE)"""
+        kinds = list(kinds)
+        fresh: Dict[str, List[str]] = {}
+        for pair in pairs:
+            for kind in kinds:
+                key = f"{pair}@{kind}"
+                self.watched[key] = self.watched.get(key, 0) + 1
+                if self.watched[key] == 1:
+                    fresh.setdefault(kind, []).append(pair)
+        if self.replaying:
+            # রিপ্লেতে শুধু হিসাব রাখা; লাইভে ফিরলে _resume_live সব SUBSCRIBE করে
+            return
+        multiplex = self._ensure_multiplex()
+        for kind, fresh_pairs in fresh.items():
+            await multiplex.subscribe(fresh_pairs, [kind])
+
+    async def unwatch(self, pairs: Iterable[str], kinds: Iterable[str] = ("trade",)):
+        kinds = list(kinds)
+        stale: Dict[str, List[str]] = {}
+        for pair in pairs:
+            for kind in kinds:
+                key = f"{pair}@{kind}"
+                count = self.watched.get(key, 0) - 1
+                if count > 0:
+                    self.watched[key] = count
+                elif key in self.watched:
+                    del self.watched[key]
+                    stale.setdefault(kind, []).append(pair)
+        if self.multiplex is None or self.replaying:
+            return
+        for kind, stale_pairs in stale.items():
+            await self.multiplex.unsubscribe(stale_pairs, [kind])
 
     async def subscribe(self) -> asyncio.Queue:
         q = asyncio.Queue(maxsize=100)
@@ -132,12 +625,116 @@ class LiveMarketStream:
 
     async def start_engine(self):
         """ডিফল্ট স্ট্র্যাটেজি দিয়ে ইঞ্জিন চালু করা"""
+        if settings.STREAM_REPLAY_PATH:
+            # লাইভের বদলে রেকর্ডিং (অফলাইন লোড টেস্ট)
+            await self.start_replay(settings.STREAM_REPLAY_PATH, settings.STREAM_REPLAY_SPEED,
+                                    settings.STREAM_REPLAY_LOOP)
+            return
         await self.change_stream("binance", "BTC/USDT")
+        if settings.STREAM_RECORD_ON_START:
+            await self.start_recording()
+
+    async def _stop_strategy(self):
+        if self.strategy:
+            await self.strategy.stop()
+        if self.task_runner:
+            self.task_runner.cancel()
+            try:
+                await self.task_runner
+            except asyncio.CancelledError:
+                pass
+        self.strategy = None
+        self.task_runner = None
+
+    async def start_replay(self, path: str, speed: float = 1.0, loop: bool = False):
+        """
+        লাইভ সোর্স বন্ধ করে রেকর্ডিং চালানো। watch এর হিসাব থাকে, তাই stop_replay এ একই
+        স্ট্রিমগুলো আবার SUBSCRIBE হয়।
+        """
+        if not os.path.isfile(path):
+            raise FileNotFoundError(path)
+        async with self.param_lock:
+            await self._stop_strategy()
+            if self.multiplex:
+                await self.multiplex.stop()
+                self.multiplex = None
+            self.strategy = ReplayStrategy(self.on_binance_event, path, speed, loop, price_callback=self.on_price,
+                                           reset_callback=self._reset_consumers)
+            self.task_runner = asyncio.create_task(self.strategy.start(self.current_pair))
+
+    async def stop_replay(self):
+        """রিপ্লে থামিয়ে লাইভে ফেরা"""
+        async with self.param_lock:
+            if not self.replaying:
+                return
+            await self._stop_strategy()
+            # লাইভ ট্রেড আইডি রিপ্লের শেষ আইডির চেয়ে ছোট হতে পারে
+            self._reset_consumers()
+            await self._resume_live()
+
+    async def _resume_live(self):
+        by_kind: Dict[str, List[str]] = {}
+        for key in self.watched:
+            pair, _, kind = key.rpartition("@")
+            by_kind.setdefault(kind, []).append(pair)
+        for kind, pairs in by_kind.items():
+            await self._ensure_multiplex().subscribe(pairs, [kind])
+        if not (self.current_exchange == "binance" and settings.BINANCE_MULTIPLEX):
+            self._start_strategy(self.current_exchange, self.current_pair)
+
+    def _start_strategy(self, exchange_id: str, pair: str):
+        if exchange_id == "binance":
+            self.strategy = BinanceWebSocketStrategy(self.broadcast_price)
+        else:
+            self.strategy = CCXTPollingStrategy(self.broadcast_price, exchange_id)
+        self.task_runner = asyncio.create_task(self.strategy.start(pair))
+
+    async def start_recording(self, path: Optional[str] = None):
+        """লাইভ সোর্সের raw মেসেজ ফাইলে (path না দিলে STREAM_RECORD_DIR এ নতুন ফাইল)"""
+        path = path or stream_recorder.resolve()
+        stream_recorder.start(path)
+        pairs = dict(self.multiplex.pairs) if self.multiplex else {}
+        pairs[binance_stream_id(self.current_pair)] = self.current_pair
+        stream_recorder.record_pairs(pairs)
+        return path
+
+    async def stop_recording(self):
+        await stream_recorder.stop()
+
+    async def stop_engine(self):
+        """অ্যাপ বন্ধের সময় চলমান স্ট্র্যাটেজি থামানো"""
+        async with self.param_lock:
+            if self.strategy:
+                await self.strategy.stop()
+            if self.task_runner:
+                self.task_runner.cancel()
+                try:
+                    await self.task_runner
+                except asyncio.CancelledError:
+                    pass
+                self.task_runner = None
+            if self.multiplex:
+                await self.multiplex.stop()
+                self.multiplex = None
+                self.watched.clear()
+        await stream_recorder.stop()
 
     async def change_stream(self, exchange_id: str, pair: str):
         """যেকোনো এক্সচেঞ্জ বা পেয়ারে সুইচ করার মাস্টার ফাংশন"""
         async with self.param_lock:
-            # ১. আগের স্ট্র্যাটেজি বন্ধ করা
+            previous = (self.current_exchange, self.current_pair)
+            if self.replaying:
+                # রিপ্লে সব পেয়ার চালায়; শুধু বর্তমান পেয়ার আর watch এর হিসাব বদলায়
+                if previous[0] == "binance" and settings.BINANCE_MULTIPLEX:
+                    await self.unwatch([previous[1]], ["trade"])
+                self.current_exchange = exchange_id
+                self.current_pair = pair
+                self.strategy.current_pair = pair
+                if exchange_id == "binance" and settings.BINANCE_MULTIPLEX:
+                    await self.watch([pair], ["trade"])
+                return
+            # ১. আগের স্ট্র্যাটেজি বন্ধ করা (স্ট্র্যাটেজি না থাকলে আগের পেয়ার মাল্টিপ্লেক্সে চলছিল)
+            multiplexed = self.strategy is None and previous[0] == "binance" and self.multiplex is not None
             if self.strategy:
                 await self.strategy.stop()
                 if self.task_runner:
@@ -146,6 +743,8 @@ class LiveMarketStream:
                         await self.task_runner
                     except asyncio.CancelledError:
                         pass
+                self.strategy = None
+                self.task_runner = None
             
             # ২. নতুন প্যারামিটার সেট
             self.current_exchange = exchange_id
@@ -153,12 +752,33 @@ class LiveMarketStream:
             logger.info(f"twisted_rightwards_arrows Switching Engine to: {exchange_id.upper()} -> {pair}")
 
             # ৩. স্ট্র্যাটেজি সিলেক্ট করা
-            if exchange_id == "binance":
-                self.strategy = BinanceWebSocketStrategy(self.broadcast_price)
-            else:
-                self.strategy = CCXTPollingStrategy(self.broadcast_price, exchange_id)
-            
+            # মাল্টিপ্লেক্সে আগে নতুন পেয়ার SUBSCRIBE, তারপর আগেরটা UNSUBSCRIBE — উল্টো ক্রমে
+            # কানেকশনের শেষ স্ট্রিম সরে গিয়ে সেটি বন্ধ হয়ে যেত, আর সুইচে রিকানেক্ট লাগত
+            if exchange_id == "binance" and settings.BINANCE_MULTIPLEX:
+                await self.watch([pair], ["trade"])
+            if multiplexed:
+                await self.unwatch([previous[1]], ["trade"])
+            if exchange_id == "binance" and settings.BINANCE_MULTIPLEX:
+                return
             # ৪. নতুন স্ট্র্যাটেজি ব্যাকগ্রাউন্ডে চালানো
-            self.task_runner = asyncio.create_task(self.strategy.start(pair))
+            self._start_strategy(exchange_id, pair)
+
+    def status(self):
+        return {
+            "exchange": self.current_exchange,
+            "pair": self.current_pair,
+            "latest_price": self.latest_price,
+            "watched": sorted(self.watched),
+            "multiplex": self.multiplex.status() if self.multiplex else None,
+            "replay": self.strategy.status() if self.replaying else None,
+            "recorder": stream_recorder.status(),
+        }
 
 market_stream = LiveMarketStream()
+
+registry.gauge_callback("metron_stream_subscribers", "LiveMarketStream subscriber queues",
+                        lambda: len(market_stream.subscribers))
+registry.gauge_callback("metron_stream_queue_depth", "Pending ticks across LiveMarketStream subscriber queues",
+                        lambda: {"total": sum(q.qsize() for q in market_stream.subscribers),
+                                 "max": max((q.qsize() for q in market_stream.subscribers), default=0)},
+                        labels=("stat",))
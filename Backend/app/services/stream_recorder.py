@@ -0,0 +1,212 @@
+import asyncio
+import gzip
+import logging
+import os
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.serializers import json_codec
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# লাইভ স্ট্রিম রেকর্ডার (শুধু-অ্যাপেন্ড ফাইল)
+# ------------------------------------------------------------
+# এক্সচেঞ্জের raw মেসেজ টাইমস্ট্যাম্পসহ, পরে ReplayStrategy নেটওয়ার্ক ছাড়া একই কলব্যাক পথে চালায়।
+# ফাইল = এক বা একাধিক সেগমেন্ট (প্রতি রেকর্ডিং সেশনে একটি); .gz হলে প্রতি সেগমেন্ট আলাদা gzip মেম্বার
+#   #MREC1 <t0_epoch_us>           ← সেগমেন্ট হেডার
+#   <dt_us> <kind> <payload>       ← আগের রেকর্ড থেকে মাইক্রোসেকেন্ড পার্থক্য (সেগমেন্টের প্রথমটি t0 থেকে)
+# kind:
+#   F — Binance combined-stream এর raw ফ্রেম ({"stream": ..., "data": ...}), সকেট থেকে যেমন এসেছে
+#   P — পোলিং টিকার {"x": exchange, "s": pair, "p": price}
+#   M — স্ট্রিম আইডি → পেয়ার ম্যাপ {"btcusdt": "BTC/USDT"}
+# লুপে শুধু লাইন বাফারে যোগ হয়; কম্প্রেশন ও ডিস্কে লেখা আলাদা থ্রেডে, প্রতি flush interval এ
+# (ফাইল সেশন জুড়ে খোলা, তাই gzip এর ডিকশনারি চাংক পেরিয়েও কাজে লাগে)
+# ============================================================
+
+MAGIC = "#MREC1"
+FRAME = "F"
+PRICE = "P"
+PAIRS = "M"
+
+
+def _now_us():
+    return time.time_ns() // 1000
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, compresslevel=6)
+    return open(path, mode)
+
+
+class StreamRecorder:
+    def __init__(self):
+        self.path: Optional[str] = None
+        self.file = None
+        self.active = False
+        self.buffer: List[str] = []
+        self.last_us = 0
+        self.started_at: Optional[float] = None
+        self.records = 0
+        self.bytes = 0
+        self.kinds: Dict[str, int] = {}
+        self.flusher: Optional[asyncio.Task] = None
+        self.write_lock = asyncio.Lock()
+
+    @staticmethod
+    def resolve(name: Optional[str] = None):
+        """
+        রেকর্ডিং ডিরেক্টরির ভেতরের ফাইল পাথ; নাম না দিলে টাইমস্ট্যাম্প দিয়ে নতুন নাম।
+        API থেকে আসা নামে ডিরেক্টরি অংশ চলবে না।
+        """
+        if not name:
+            name = time.strftime("stream-%Y%m%dT%H%M%S.mrec.gz", time.gmtime())
+        if os.path.basename(name) != name or name in (".", ".."):
+            raise ValueError(f"Invalid recording name: {name}")
+        return os.path.join(settings.STREAM_RECORD_DIR, name)
+
+    def start(self, path: str):
+        if self.active:
+            raise RuntimeError(f"Already recording to {self.path}")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.file = _open(path, "ab")  # প্রতি সেশনে নতুন সেগমেন্ট (gzip এ নতুন মেম্বার)
+        self.last_us = _now_us()
+        self.buffer = [f"{MAGIC} {self.last_us}\n"]
+        self.started_at = time.time()
+        self.records = 0
+        self.bytes = 0
+        self.kinds = {}
+        self.active = True
+        self.flusher = asyncio.create_task(self._flush_loop())
+        logger.info(f"⏺️ Recording market stream → {path}")
+
+    def record(self, kind: str, payload: str):
+        """হট পাথ: শুধু লাইন বাফারে (কলারের আগে `if stream_recorder.active` চেক)"""
+        now = _now_us()
+        if "\n" in payload:
+            # JSON স্ট্রিং এর ভেতরে কাঁচা newline বৈধ নয়, তাই বাইরের হোয়াইটস্পেস হিসেবে বদলানো নিরাপদ
+            payload = payload.replace("\n", " ")
+        line = f"{now - self.last_us} {kind} {payload}\n"
+        self.last_us = now
+        self.buffer.append(line)
+        self.records += 1
+        self.bytes += len(line)
+        self.kinds[kind] = self.kinds.get(kind, 0) + 1
+
+    def record_pairs(self, pairs: Dict[str, str]):
+        if self.active and pairs:
+            self.record(PAIRS, json_codec.dumps(pairs))
+
+    @staticmethod
+    def _write(f, chunk: List[str]):
+        f.write("".join(chunk).encode("utf-8"))
+        f.flush()  # gzip এ sync flush: প্রসেস মরলেও এ পর্যন্ত পড়া যায়
+
+    async def flush(self):
+        if not self.buffer or self.file is None:
+            return
+        chunk, self.buffer = self.buffer, []
+        async with self.write_lock:
+            await asyncio.to_thread(self._write, self.file, chunk)
+
+    async def _flush_loop(self):
+        errors = 0
+        while self.active:
+            await asyncio.sleep(settings.STREAM_RECORD_FLUSH_INTERVAL if not errors else min(30, 2 * errors))
+            try:
+                await self.flush()
+                errors = 0
+            except Exception as e:
+                errors += 1
+                logger.error(f"Recorder flush error ({self.path}): {e}")
+
+    async def stop(self):
+        if not self.active:
+            return
+        self.active = False
+        if self.flusher:
+            self.flusher.cancel()
+            try:
+                await self.flusher
+            except asyncio.CancelledError:
+                pass
+            self.flusher = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Recorder final flush error ({self.path}): {e}")
+        file, self.file = self.file, None
+        async with self.write_lock:
+            await asyncio.to_thread(file.close)
+        logger.info(f"⏹️ Recording stopped ({self.records} records → {self.path})")
+
+    def status(self):
+        return {
+            "active": self.active,
+            "path": self.path,
+            "started_at": self.started_at,
+            "records": self.records,
+            "bytes": self.bytes,
+            "kinds": dict(self.kinds),
+            "buffered": len(self.buffer),
+        }
+
+
+def read_records(path: str) -> Iterator[Tuple[int, str, str]]:
+    """
+    (epoch_us, kind, payload) — ফাইলের ক্রমে, সব সেগমেন্ট মিলিয়ে।
+    ক্র্যাশে কাটা শেষ লাইন/অসম্পূর্ণ gzip মেম্বারে পড়া থামে (আগের সব রেকর্ড পাওয়া যায়)।
+    """
+    with open(path, "rb") as probe:
+        compressed = probe.read(2) == b"\x1f\x8b"
+    f = gzip.open(path, "rb") if compressed else open(path, "rb")
+    ts = 0
+    try:
+        while True:
+            try:
+                raw = f.readline()
+            except (EOFError, gzip.BadGzipFile, OSError) as e:
+                logger.warning(f"Recording truncated ({path}): {e}")
+                return
+            if not raw:
+                return
+            if not raw.endswith(b"\n"):
+                return
+            line = raw[:-1].decode("utf-8")
+            if line.startswith(MAGIC):
+                ts = int(line.split(" ", 2)[1])
+                continue
+            dt, kind, payload = line.split(" ", 2)
+            ts += int(dt)
+            yield ts, kind, payload
+    finally:
+        f.close()
+
+
+def write_records(path: str, records: Iterable[Tuple[int, str, str]]):
+    """
+    (epoch_us, kind, payload) থেকে একটি সেগমেন্ট (অফলাইন টুল/ফিক্সচারের জন্য); ফাইল থাকলে শেষে যোগ হয়।
+    epoch_us বাড়তে থাকা ক্রমে হতে হবে।
+    """
+    count = 0
+    with _open(path, "ab") as f:
+        last_us = None
+        lines: List[str] = []
+        for ts_us, kind, payload in records:
+            if last_us is None:
+                lines.append(f"{MAGIC} {ts_us}\n")
+                last_us = ts_us
+            lines.append(f"{ts_us - last_us} {kind} {payload}\n")
+            last_us = ts_us
+            count += 1
+            if len(lines) >= 4096:
+                f.write("".join(lines).encode("utf-8"))
+                lines = []
+        f.write("".join(lines).encode("utf-8"))
+    return count
+
+
+stream_recorder = StreamRecorder()
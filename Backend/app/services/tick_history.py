@@ -0,0 +1,145 @@
+import logging
+import math
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# টিক হিস্ট্রি: প্রতি (exchange, pair) একটি ফিক্সড-ক্যাপাসিটির রিং বাফার
+# ------------------------------------------------------------
+# - আগে থেকে বরাদ্দ NumPy অ্যারে (ts, price, size, side); প্রতি টিকে শুধু স্কেলার লেখা, কোনো অবজেক্ট নয়
+# - প্রতিটি অ্যারে দ্বিগুণ লম্বা আর প্রতি টিক দুই জায়গায় লেখা (i ও i + capacity), তাই
+#   শেষ যেকোনো n টি (n ≤ capacity) সবসময় একটানা স্লাইস — উইন্ডো কপি ছাড়াই ভিউ
+# - ভিউ পরের append পর্যন্ত বৈধ (একই লুপে সাথে সাথে ব্যবহার/সিরিয়ালাইজ করার জন্য)
+# - ts = ট্রেডের সময় (epoch ms), size অজানা হলে 0, side: +1 buy, -1 sell, 0 অজানা
+# ============================================================
+
+FIELDS = ("ts", "price", "size", "side")
+
+
+class TickRing:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.ts = np.zeros(2 * capacity, dtype=np.int64)
+        self.price = np.zeros(2 * capacity, dtype=np.float64)
+        self.size = np.zeros(2 * capacity, dtype=np.float64)
+        self.side = np.zeros(2 * capacity, dtype=np.int8)
+        self.head = 0       # পরের লেখার জায়গা [0, capacity)
+        self.count = 0
+        self.total = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, ts: int, price: float, size: float = 0.0, side: int = 0):
+        i = self.head
+        j = i + self.capacity
+        self.ts[i] = self.ts[j] = ts
+        self.price[i] = self.price[j] = price
+        self.size[i] = self.size[j] = size
+        self.side[i] = self.side[j] = side
+        self.head = i + 1 if i + 1 < self.capacity else 0
+        if self.count < self.capacity:
+            self.count += 1
+        self.total += 1
+
+    def last(self, n: Optional[int] = None):
+        """শেষ n টি টিক (পুরনো থেকে নতুন) — প্রতি ফিল্ডের জিরো-কপি ভিউ"""
+        n = self.count if n is None else max(0, min(n, self.count))
+        end = self.head + self.capacity
+        start = end - n
+        return {"ts": self.ts[start:end], "price": self.price[start:end],
+                "size": self.size[start:end], "side": self.side[start:end]}
+
+    def since(self, ts: int):
+        """ts (ms) বা তার পরের টিকগুলো; ts বাড়তে থাকা ক্রমে ধরে searchsorted"""
+        window = self.last()
+        start = int(np.searchsorted(window["ts"], ts, "left"))
+        return {name: view[start:] for name, view in window.items()}
+
+    def latest_ts(self):
+        return int(self.ts[self.head + self.capacity - 1]) if self.count else None
+
+
+class TickHistory:
+    def __init__(self):
+        self.series: Dict[Tuple[str, str], TickRing] = {}
+        self.rejected = 0
+
+    def ring(self, exchange_id: str, pair: str, create: bool = False) -> Optional[TickRing]:
+        key = (exchange_id, pair)
+        ring = self.series.get(key)
+        if ring is None and create:
+            if len(self.series) >= settings.TICK_HISTORY_MAX_SERIES:
+                self.rejected += 1
+                return None
+            ring = self.series[key] = TickRing(settings.TICK_HISTORY_CAPACITY)
+        return ring
+
+    def append(self, exchange_id: str, pair: str, ts: int, price: float, size: float = 0.0, side: int = 0):
+        """হট পাথ: স্ট্রিমের প্রতি টিকে"""
+        ring = self.series.get((exchange_id, pair))
+        if ring is None:
+            ring = self.ring(exchange_id, pair, create=True)
+            if ring is None:
+                return
+        ring.append(ts, price, size, side)
+
+    def window(self, exchange_id: str, pair: str, seconds: Optional[float] = None, ticks: Optional[int] = None):
+        """
+        শেষ seconds সেকেন্ড (সবচেয়ে নতুন টিকের সময় থেকে) বা শেষ ticks টি — জিরো-কপি ভিউ।
+        দুটোই দিলে যেটা ছোট; কোনোটাই না দিলে পুরো বাফার। সিরিজ না থাকলে None।
+        """
+        ring = self.ring(exchange_id, pair)
+        if ring is None:
+            return None
+        if seconds is not None and ring.count:
+            view = ring.since(ring.latest_ts() - int(seconds * 1000))
+        else:
+            view = ring.last()
+        if ticks is not None:
+            view = {name: values[max(0, len(values) - ticks):] for name, values in view.items()}
+        return view
+
+    def query(self, exchange_id: str, pair: str, seconds: Optional[float] = None, ticks: Optional[int] = None):
+        """REST/ওয়েবসকেটের কলাম-ভিত্তিক উত্তর; TICK_HISTORY_MAX_POINTS এর বেশি হলে শেষগুলো"""
+        window = self.window(exchange_id, pair, seconds, ticks)
+        if window is None:
+            return None
+        available = len(window["ts"])
+        start = max(0, available - settings.TICK_HISTORY_MAX_POINTS)
+        view = {name: values[start:] for name, values in window.items()}
+        return {
+            "type": "TICK_HISTORY",
+            "exchange": exchange_id,
+            "pair": pair,
+            "count": len(view["ts"]),
+            "truncated": start > 0,
+            "latest_ts": self.series[(exchange_id, pair)].latest_ts(),
+            **{name: view[name].tolist() for name in FIELDS},
+        }
+
+    def status(self):
+        return [{"exchange": exchange_id, "pair": pair, "ticks": len(ring), "total": ring.total,
+                 "capacity": ring.capacity, "latest_ts": ring.latest_ts()}
+                for (exchange_id, pair), ring in self.series.items()]
+
+
+def parse_window(seconds, ticks):
+    """API ইনপুট যাচাই: ধনাত্মক ও সসীম; না হলে ValueError"""
+    if seconds is not None and (not isinstance(seconds, (int, float)) or not math.isfinite(seconds) or seconds <= 0):
+        raise ValueError("seconds must be a positive number")
+    if ticks is not None and (not isinstance(ticks, int) or ticks <= 0):
+        raise ValueError("ticks must be a positive integer")
+    return seconds, ticks
+
+
+tick_history = TickHistory()
+
+registry.gauge_callback("metron_tick_history_series", "Tick history ring buffers (exchange, pair)",
+                        lambda: len(tick_history.series))
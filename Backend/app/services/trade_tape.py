@@ -0,0 +1,96 @@
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Deque, List, Optional
+
+from app.core.config import settings
+from app.services.market_store import market_store, trade_id
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# ইনক্রিমেন্টাল ট্রেড টেপ
+# ------------------------------------------------------------
+# - since কার্সর (শেষ দেখা ট্রেডের ms) থেকে ফেচ; since ইনক্লুসিভ, তাই সীমানার ট্রেড id দিয়ে ডিডুপ
+# - শুধু নতুন ট্রেড ফেরত (টপিকে যায়), সাম্প্রতিক TRADE_TAPE_SIZE টি স্ন্যাপশটের জন্য রাখা
+# - কার্সর অনেক পুরনো হলে (কেউ না দেখায় লুপ থেমে ছিল) পুরো ইতিহাস না টেনে সাম্প্রতিক থেকে নতুন শুরু
+# ============================================================
+
+
+def format_trade(t: dict):
+    return {
+        "id": t["id"], "price": t["price"], "amount": t["amount"], "side": t["side"],
+        "timestamp": t["timestamp"], "time": t["datetime"].split("T")[1][:8],
+    }
+
+
+class TradeTape:
+    def __init__(self, exchange_id: str, symbol: str):
+        self.exchange_id = exchange_id
+        self.symbol = symbol
+        self.cursor: Optional[int] = None
+        self.seen: "OrderedDict[int, None]" = OrderedDict()
+        self.recent: Deque[dict] = deque(maxlen=settings.TRADE_TAPE_SIZE)
+        self.caught_up = True
+        self.fetches = 0
+        self.received = 0
+        self.duplicates = 0
+        self.resets = 0
+
+    @property
+    def topic(self):
+        return f"trades:{self.symbol}"
+
+    def _remember(self, tid: int):
+        self.seen[tid] = None
+        if len(self.seen) > settings.TRADE_TAPE_DEDUP:
+            self.seen.popitem(last=False)
+
+    async def poll(self, exchange) -> List[dict]:
+        """কার্সরের পরের নতুন ট্রেড (ফরম্যাট করা, পুরনো থেকে নতুন)"""
+        now_ms = int(time.time() * 1000)
+        if self.cursor is None or now_ms - self.cursor > settings.TRADE_TAPE_MAX_LAG_MS:
+            if self.cursor is not None:
+                self.resets += 1
+            trades = await exchange.fetch_trades(self.symbol, limit=settings.TRADE_TAPE_SIZE)
+            limit = None
+        else:
+            limit = settings.TRADE_TAPE_FETCH_LIMIT
+            trades = await exchange.fetch_trades(self.symbol, since=self.cursor, limit=limit)
+        self.fetches += 1
+
+        fresh = []
+        for t in trades:
+            tid = trade_id(t.get("id"))
+            if tid in self.seen:
+                self.duplicates += 1
+                continue
+            self._remember(tid)
+            fresh.append(t)
+            if self.cursor is None or t["timestamp"] > self.cursor:
+                self.cursor = t["timestamp"]
+        # পুরো পেজ এলে আরও বাকি আছে — কলার দেরি না করে আবার ডাকবে
+        self.caught_up = limit is None or len(trades) < limit
+        if not fresh:
+            return []
+
+        market_store.append_trades(self.exchange_id, self.symbol, fresh)
+        formatted = [format_trade(t) for t in fresh]
+        self.recent.extend(formatted)
+        self.received += len(formatted)
+        return formatted
+
+    def snapshot(self):
+        return {"type": "TRADES", "topic": self.topic, "snapshot": True, "payload": list(self.recent)}
+
+    def status(self):
+        return {
+            "exchange": self.exchange_id,
+            "symbol": self.symbol,
+            "cursor": self.cursor,
+            "caught_up": self.caught_up,
+            "fetches": self.fetches,
+            "received": self.received,
+            "duplicates": self.duplicates,
+            "resets": self.resets,
+        }
@@ -0,0 +1 @@
+"""অফলাইন পারফরম্যান্স বেঞ্চমার্ক (python -m benchmarks)। অ্যাপের অংশ নয়, শুধু ডেভেলপমেন্টে চলে।"""
@@ -0,0 +1,85 @@
+"""
+অফলাইন বেঞ্চমার্ক স্যুট — সব স্যুট চালিয়ে JSON রেজাল্ট, আগের রানের সাথে তুলনা।
+
+    cd Backend && python -m benchmarks [--suites signal,stream,fanout,e2e,serializers,replay,paper,startup]
+                                       [--out benchmarks/results/latest.json]
+                                       [--compare benchmarks/results/baseline.json] [--threshold 10] [--quick]
+
+- নেটওয়ার্ক লাগে না: ক্যান্ডেল/ট্রেড ফিক্সচার সিডেড, এক্সচেঞ্জ ও ক্লায়েন্ট লোকাল স্ট্যান্ড-ইন
+- --compare দিলে প্রতিটি মেট্রিকের পরিবর্তন (%) ছাপা হয়; threshold এর বেশি খারাপ হলে exit code 1
+  (CI তে রিগ্রেশন আটকাতে)
+- প্রতিটি স্যুট আলাদাও চলে: python -m benchmarks.bench_signal ইত্যাদি
+"""
+import argparse
+import logging
+import sys
+
+from benchmarks import (bench_e2e, bench_fanout, bench_paper, bench_replay, bench_serializers, bench_signal,
+                        bench_startup, bench_stream)
+from benchmarks.common import compare, load_results, print_rows, write_results
+
+DEFAULT_OUT = "benchmarks/results/latest.json"
+
+
+def run_suites(names, quick: bool, ohlcv_path=None, recording=None):
+    # quick: CI/লোকাল স্মোক রানের জন্য ছোট সাইজ
+    runners = {
+        "signal": lambda: bench_signal.run(repeat=5 if quick else 30, ohlcv_path=ohlcv_path),
+        "stream": lambda: bench_stream.run(seconds=0.2 if quick else 0.5),
+        "fanout": lambda: bench_fanout.run(clients=(10, 100) if quick else (10, 100, 1000),
+                                           rounds=10 if quick else 50),
+        "e2e": lambda: bench_e2e.run(clients=10 if quick else 100, ticks=500 if quick else 2000),
+        "serializers": lambda: bench_serializers.run(clients=100 if quick else 1000, seconds=0.1 if quick else 0.5),
+        "replay": lambda: bench_replay.run(recording=recording, ticks=4000 if quick else 20000,
+                                           clients=10 if quick else 100),
+        "paper": lambda: bench_paper.run(signals=500 if quick else 2000, rows=1000 if quick else 5000),
+        "startup": lambda: bench_startup.run(repeat=2 if quick else 5),
+    }
+    unknown = set(names) - set(runners)
+    if unknown:
+        raise SystemExit(f"Unknown suites: {sorted(unknown)} (available: {', '.join(runners)})")
+    rows = []
+    for name in names:
+        print(f"▶ {name}", file=sys.stderr)
+        suite_rows = runners[name]()
+        print_rows(suite_rows)
+        rows += suite_rows
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suites", default="signal,stream,fanout,e2e,serializers,replay,paper,startup")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="JSON রেজাল্ট ফাইল")
+    parser.add_argument("--compare", default=None, help="আগের রেজাল্ট JSON (বেসলাইন)")
+    parser.add_argument("--threshold", type=float, default=10.0, help="এর বেশি % খারাপ হলে রিগ্রেশন")
+    parser.add_argument("--quick", action="store_true", help="ছোট সাইজ (স্মোক রান)")
+    parser.add_argument("--ohlcv", default=None, help="signal স্যুটের জন্য রেকর্ড করা ক্যান্ডেল ফাইল")
+    parser.add_argument("--recording", default=None, help="replay স্যুটের জন্য stream_recorder ফাইল")
+    args = parser.parse_args()
+
+    # স্ট্রিম/ওয়েবসকেটের INFO লগ রেজাল্টের মাঝে না আসে
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    names = [name.strip() for name in args.suites.split(",") if name.strip()]
+    rows = run_suites(names, args.quick, args.ohlcv, args.recording)
+    write_results(args.out, rows, {"suites": names, "quick": args.quick, "ohlcv": args.ohlcv,
+                                    "recording": args.recording})
+    print(f"📄 {len(rows)} results → {args.out}", file=sys.stderr)
+
+    if args.compare:
+        changes = compare(load_results(args.compare)["results"], rows, args.threshold)
+        for change in changes:
+            mark = "❌" if change["regression"] else "  "
+            label = f"{change['case']} [{change['metric']}]"
+            print(f"{mark} {change['suite']:<11} {label:<52} {change['before']:>12,.3f} → "
+                  f"{change['after']:>12,.3f} {change['unit']:<6} {change['change_pct']:+7.1f}%")
+        regressions = [c for c in changes if c["regression"]]
+        if regressions:
+            print(f"{len(regressions)} regressions beyond {args.threshold:g}%", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
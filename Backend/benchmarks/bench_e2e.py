@@ -0,0 +1,178 @@
+"""
+এন্ড-টু-এন্ড: এক্সচেঞ্জের ফ্রেম সকেটে পাঠানো থেকে ক্লায়েন্টের সকেটে TICKER পৌঁছানো পর্যন্ত।
+
+    cd Backend && python -m benchmarks.bench_e2e [--clients 100] [--ticks 2000] [--rate 1000]
+
+- লোকাল Binance স্ট্যান্ড-ইন: আলাদা থ্রেডে websockets সার্ভার, combined-stream trade ফ্রেম পাঠায়
+- আসল পথ: BinanceCombinedConnection → LiveMarketStream → পাম্প (main.pump_ticker_stream এর মতো)
+  → hub.publish(ticker টপিক) → ক্লায়েন্ট রাইটার → send_text
+- টিকার টপিকের কনফ্লেশন এই বেঞ্চে 0; ফ্রেমের দামই সিকোয়েন্স নম্বর
+- পিছিয়ে থাকা ক্লায়েন্টের কিউতে টিকার latest-only (হাবের কনফ্লেশন), তাই delivered_ratio < 1
+  স্বাভাবিক — ল্যাটেন্সি শুধু পৌঁছানো টিকের উপর
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+
+import websockets
+
+from app.core.config import settings
+from app.services.broadcast_hub import BroadcastHub
+from app.services.stream_engine import BinanceMultiplexStrategy, LiveMarketStream
+from benchmarks import fixtures
+from benchmarks.common import latency_results, print_rows, result
+
+SUITE = "e2e"
+PRICE_BASE = 1000.0
+
+
+class BinanceStandIn:
+    """ticks টি trade ফ্রেম rate/s হারে; sent[seq] = পাঠানোর perf_counter"""
+
+    def __init__(self, ticks: int, rate: float, port: int = 0):
+        self.ticks = ticks
+        self.rate = rate
+        self.port = port
+        self.sent = {}
+        self.ready = threading.Event()
+        self.finished = threading.Event()
+        self.loop = None
+        self.thread = None
+        self.closing = None
+
+    async def _handler(self, ws):
+        batch = max(1, int(self.rate // 100))  # ~10ms ব্যাচ
+        delay = batch / self.rate
+        for start in range(0, self.ticks, batch):
+            for seq in range(start, min(start + batch, self.ticks)):
+                frame = fixtures.binance_trade("btcusdt", seq, PRICE_BASE + seq)
+                self.sent[seq] = time.perf_counter()
+                await ws.send(frame)
+            await asyncio.sleep(delay)
+        self.finished.set()
+        # কন্ট্রোল মেসেজের রিপ্লাই (SUBSCRIBE সিঙ্ক) ও কানেকশন খোলা রাখা
+        async for raw in ws:
+            message = json.loads(raw)
+            await ws.send(json.dumps({"result": None, "id": message.get("id")}))
+
+    async def _serve(self):
+        self.closing = asyncio.get_running_loop().create_future()
+        async with websockets.serve(self._handler, "127.0.0.1", self.port) as server:
+            self.port = server.sockets[0].getsockname()[1]
+            self.ready.set()
+            await self.closing
+
+    def start(self):
+        def runner():
+            self.loop = asyncio.new_event_loop()
+            self.loop.run_until_complete(self._serve())
+            self.loop.close()
+        self.thread = threading.Thread(target=runner, daemon=True)
+        self.thread.start()
+        self.ready.wait(10)
+        return f"ws://127.0.0.1:{self.port}"
+
+    def stop(self):
+        if self.loop is not None and self.closing is not None:
+            self.loop.call_soon_threadsafe(self.closing.set_result, None)
+            self.thread.join(10)
+
+
+class ClientSocket:
+    scope = {}
+    query_params = {}
+
+    def __init__(self, standin: BinanceStandIn, samples: list, received: dict):
+        self.standin = standin
+        self.samples = samples
+        self.received = received
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, text):
+        now = time.perf_counter()
+        seq = int(round(json.loads(text)["data"]["price"] - PRICE_BASE))
+        sent = self.standin.sent.get(seq)
+        if sent is not None:
+            self.samples.append((now - sent) * 1000)
+            self.received["count"] += 1
+        if seq == self.standin.ticks - 1:
+            self.received["complete"] += 1
+
+    async def send_bytes(self, data):
+        pass
+
+    async def close(self, code=1000):
+        pass
+
+
+async def _run(clients: int, ticks: int, rate: float):
+    standin = BinanceStandIn(ticks, rate)
+    url = standin.start()
+    conflation = dict(settings.WS_TOPIC_CONFLATION_MS)
+    settings.WS_TOPIC_CONFLATION_MS = dict(conflation, ticker=0)
+    hub = BroadcastHub(max_queue=4096, slow_client_seconds=3600)
+    stream = LiveMarketStream()
+    samples, received = [], {"count": 0, "complete": 0}
+    try:
+        topic = "ticker:binance:BTC/USDT"
+        for _ in range(clients):
+            client = await hub.connect(ClientSocket(standin, samples, received), "json")
+            hub.subscribe(client, [topic])
+
+        queue = await stream.subscribe()
+
+        async def pump():
+            while True:
+                tick = await queue.get()
+                if tick["type"] == "TICKER":
+                    data = tick["data"]
+                    await hub.publish(f"ticker:{data['exchange']}:{data['pair']}",
+                                      {"type": "TICKER", "topic": topic, "data": data})
+        pump_task = asyncio.create_task(pump())
+        stream.multiplex = BinanceMultiplexStrategy(stream.on_binance_event, base_url=url)
+        started = time.perf_counter()
+        await stream.watch(["BTC/USDT"], ["trade"])
+
+        expected = ticks * clients
+        deadline = time.monotonic() + ticks / rate + 10
+        # শেষ টিক সব ক্লায়েন্টে পৌঁছালে শেষ (কনফ্লেশনে মাঝেরগুলো বাদ পড়তে পারে, শেষটা নয়)
+        while received["complete"] < clients and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - started
+        pump_task.cancel()
+        await stream.stop_engine()
+    finally:
+        settings.WS_TOPIC_CONFLATION_MS = conflation
+        standin.stop()
+
+    rows = latency_results(SUITE, f"tick to {clients} clients @ {rate:g}/s", samples)
+    rows.append(result(SUITE, f"tick to {clients} clients @ {rate:g}/s", "delivered_ratio",
+                       received["count"] / expected, "ratio"))
+    rows.append(result(SUITE, f"tick to {clients} clients @ {rate:g}/s", "deliveries_per_second",
+                       received["count"] / elapsed, "msg/s"))
+    return rows
+
+
+def run(clients: int = 100, ticks: int = 2000, rate: float = 1000.0):
+    return asyncio.run(_run(clients, ticks, rate))
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--ticks", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=1000.0, help="স্ট্যান্ড-ইন থেকে টিক/সেকেন্ড")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    print_rows(run(args.clients, args.ticks, args.rate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+ফ্যান-আউট ল্যাটেন্সি — একটি মেসেজ N টি সিমুলেটেড ক্লায়েন্টের সকেটে পৌঁছাতে কত সময়।
+
+    cd Backend && python -m benchmarks.bench_fanout [--clients 10,100,1000] [--rounds 50] [--send-delay-ms 0]
+
+প্রতি রাউন্ডে hub.broadcast (পুরনো ফিড) বা hub.publish (টপিক) থেকে প্রতিটি ক্লায়েন্টের
+send_text পর্যন্ত সময় মাপা হয় — কিউ, রাইটার টাস্ক আর সিরিয়ালাইজ সহ, নেটওয়ার্ক ছাড়া।
+--send-delay-ms দিয়ে ধীর সকেট (প্রতি send এ await) সিমুলেট করা যায়।
+p50/p95/p99/max সব ক্লায়েন্ট × রাউন্ডের উপর।
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+from app.core.config import settings
+from app.services.broadcast_hub import BroadcastHub
+from benchmarks.common import latency_results, print_rows, result
+
+SUITE = "fanout"
+
+TICKER = {"type": "TICKER", "topic": "ticker:binance:BTC/USDT", "exchange": "binance", "symbol": "BTC/USDT",
+          "price": 65000.0, "bid": 64999.9, "ask": 65000.1, "volume": 18234.551, "timestamp": 0}
+
+
+class RecordingSocket:
+    """ওয়েবসকেট স্ট্যান্ড-ইন: প্রতিটি ফ্রেম পাওয়ার সময় রাখে"""
+    scope = {}
+    query_params = {}
+
+    def __init__(self, round_state: dict, send_delay: float = 0.0):
+        self.round = round_state
+        self.send_delay = send_delay
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def _receive(self):
+        if self.send_delay:
+            await asyncio.sleep(self.send_delay)
+        state = self.round
+        state["samples"].append((time.perf_counter() - state["started"]) * 1000)
+        if len(state["samples"]) >= state["expected"]:
+            state["done"].set()
+
+    async def send_text(self, text):
+        await self._receive()
+
+    async def send_bytes(self, data):
+        await self._receive()
+
+    async def close(self, code=1000):
+        pass
+
+
+async def _rounds(hub: BroadcastHub, state: dict, clients: int, rounds: int, send):
+    samples: List[float] = []
+    for i in range(rounds):
+        state.update(samples=[], expected=clients, done=asyncio.Event(), started=time.perf_counter())
+        await send(i)
+        await asyncio.wait_for(state["done"].wait(), timeout=30)
+        samples.extend(state["samples"])
+    return samples
+
+
+async def _run(clients: int, rounds: int, send_delay_ms: float):
+    hub = BroadcastHub(max_queue=1024, slow_client_seconds=3600)
+    state = {"samples": [], "expected": clients, "done": asyncio.Event(), "started": 0.0}
+    connections = [await hub.connect(RecordingSocket(state, send_delay_ms / 1000.0), "json")
+                   for _ in range(clients)]
+    rows = []
+
+    async def legacy(i):
+        await hub.broadcast(dict(TICKER, price=TICKER["price"] + i, timestamp=i))
+    started = time.perf_counter()
+    samples = await _rounds(hub, state, clients, rounds, legacy)
+    elapsed = time.perf_counter() - started
+    rows += latency_results(SUITE, f"broadcast {clients} clients", samples, send_delay_ms=send_delay_ms)
+    rows.append(result(SUITE, f"broadcast {clients} clients", "deliveries_per_second",
+                       clients * rounds / elapsed, "msg/s"))
+
+    topic = TICKER["topic"]
+    for client in connections:
+        hub.subscribe(client, [topic])
+    conflation = settings.WS_TOPIC_CONFLATION_MS.get("ticker", 0)
+
+    async def publish(i):
+        # কনফ্লেশন ইন্টারভাল পার করে পাঠানো, যাতে প্রতিটি রাউন্ড সাথে সাথে ফ্লাশ হয়
+        state_topic = hub.topics.get(topic)
+        if state_topic is not None:
+            state_topic.last_flush = 0.0
+        await hub.publish(topic, dict(TICKER, price=TICKER["price"] + i, timestamp=i))
+    samples = await _rounds(hub, state, clients, rounds, publish)
+    rows += latency_results(SUITE, f"topic publish {clients} clients", samples, send_delay_ms=send_delay_ms,
+                            conflation_ms=conflation)
+
+    for client in connections:
+        hub.disconnect(client)
+    return rows
+
+
+def run(clients=(10, 100, 1000), rounds: int = 50, send_delay_ms: float = 0.0):
+    rows = []
+    for count in clients:
+        rows += asyncio.run(_run(count, rounds, send_delay_ms))
+    return rows
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--clients", default="10,100,1000", help="কমা দিয়ে ক্লায়েন্ট সংখ্যা")
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--send-delay-ms", type=float, default=0.0, help="প্রতি send এ সিমুলেটেড দেরি")
+
+
+def parse_clients(value: str):
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    print_rows(run(parse_clients(args.clients), args.rounds, args.send_delay_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+পেপার ট্রেডিং — সিগন্যাল থেকে ফিল পর্যন্ত ডিসিশন লেটেন্সি ও ফিল পারসিস্টেন্স।
+
+    cd Backend && python -m benchmarks.bench_paper [--signals 2000] [--rows 5000]
+
+কেস:
+  1. signal → fill (book)   — on_signal এ ভারডিক্ট বদল → সাইজিং → লোকাল বুকে ম্যাচিং → পজিশন; p50/p99 (µs)
+  2. signal → fill (ticker) — বুক ছাড়া, শেষ টিকের দামে
+  3. fill persist           — একই রো: প্রতি ফিলে একটি কমিট বনাম PAPER_FLUSH_BATCH এর ব্যাচে (rows/s)
+ভারডিক্ট প্রতিবার উল্টায় (STRONG BUY ↔ SELL), তাই প্রতিটি সিগন্যালেই একটি অর্ডার হয়। compute/dispatch
+স্টেজ এখানে নেই (স্ট্যাম্প on_signal এর ঠিক আগে), তাই total = ইঞ্জিনের নিজের খরচ।
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from app.core.config import settings
+from app.database import FillRepository, fill_repo
+from app.services.order_book import LocalOrderBook, order_book_manager
+from app.services.paper_trading import PaperTrader
+from app.services.tick_history import tick_history
+from benchmarks.common import percentiles, print_rows, result
+
+SUITE = "paper"
+SYMBOL = "BTC/USDT"
+
+
+def _book(levels: int = 200, mid: float = 65000.0):
+    book = LocalOrderBook(SYMBOL, 0.01)
+    bids = [[mid - 0.05 - i * 0.5, 0.05 + (i % 7) * 0.01] for i in range(levels)]
+    asks = [[mid + 0.05 + i * 0.5, 0.05 + (i % 5) * 0.01] for i in range(levels)]
+    book.load_snapshot(bids, asks, 1)
+    book.synced = True
+    return book
+
+
+def _signal(verdict: str):
+    now = time.perf_counter()
+    return {"type": "SENTIMENT", "topic": f"sentiment:{SYMBOL}:{settings.PAPER_TIMEFRAME}",
+            "payload": {"verdict": verdict, "score": 0, "details": [], "symbol": SYMBOL,
+                        "timeframe": settings.PAPER_TIMEFRAME},
+            "stamps": {"signal": now}}
+
+
+async def _latency(trader: PaperTrader, signals: int):
+    verdicts = ("STRONG BUY 🚀", "SELL 🔻")
+    total, match = [], []
+    for i in range(signals):
+        if i % 100 == 0:
+            # ফি/স্প্রেডে জমা লস দৈনিক লিমিটে না ঠেকে (তাহলে এন্ট্রি বন্ধ হয়ে অর্ডারই হবে না)
+            trader._reset_state()
+        filled = trader.filled
+        await trader.on_signal(_signal(verdicts[i % 2]))
+        if trader.filled > filled:
+            latency = trader.orders[-1]["latency"]
+            total.append(latency["total"])
+            match.append(latency["match"])
+    return total, match
+
+
+def _fills(count: int):
+    return [{"order_id": i, "symbol": SYMBOL, "side": "buy" if i % 2 else "sell", "qty": 0.01, "price": 65000.0,
+             "fee": 0.65, "source": "book", "verdict": "BUY", "strategy": "aggressive", "filled_at": time.time(),
+             "latency": {"total": 50.0}} for i in range(count)]
+
+
+async def _persist(path: str, rows: int, batch: int):
+    repo = FillRepository(path)
+    await repo.start()
+    fills = _fills(rows)
+    started = time.perf_counter()
+    for i in range(0, rows, batch):
+        await repo.append(fills[i:i + batch])
+    elapsed = time.perf_counter() - started
+    await repo.close()
+    return rows / elapsed
+
+
+async def _run(signals: int, rows: int):
+    rows_out = []
+    previous_book = order_book_manager.books.get(SYMBOL)
+    with tempfile.TemporaryDirectory() as tmp:
+        fill_repo.path = os.path.join(tmp, "latency.db")
+        try:
+            for case, with_book in (("book", True), ("ticker", False)):
+                if with_book:
+                    order_book_manager.books[SYMBOL] = _book()
+                else:
+                    order_book_manager.books.pop(SYMBOL, None)
+                    tick_history.append("binance", SYMBOL, int(time.time() * 1000), 65000.0)
+                trader = PaperTrader()
+                await trader.start(symbols=[SYMBOL])
+                total, match = await _latency(trader, signals)
+                await trader.reset()
+                await trader.stop()
+                name = f"signal → fill ({case})"
+                stats = percentiles(total)
+                rows_out.append(result(SUITE, name, "p50", stats["p50"], "µs", higher_is_better=False,
+                                       orders=len(total)))
+                rows_out.append(result(SUITE, name, "p99", stats["p99"], "µs", higher_is_better=False))
+                rows_out.append(result(SUITE, name, "match_p50", percentiles(match)["p50"], "µs",
+                                       higher_is_better=False))
+
+            single = await _persist(os.path.join(tmp, "single.db"), min(rows, 1000), 1)
+            batched = await _persist(os.path.join(tmp, "batched.db"), rows, settings.PAPER_FLUSH_BATCH)
+            rows_out.append(result(SUITE, "fill persist (commit per fill)", "rows_per_second", single, "rows/s"))
+            rows_out.append(result(SUITE, f"fill persist (batch {settings.PAPER_FLUSH_BATCH})", "rows_per_second",
+                                   batched, "rows/s"))
+        finally:
+            fill_repo.path = FillRepository().path
+            if previous_book is not None:
+                order_book_manager.books[SYMBOL] = previous_book
+            else:
+                order_book_manager.books.pop(SYMBOL, None)
+    return rows_out
+
+
+def run(signals: int = 2000, rows: int = 5000):
+    return asyncio.run(_run(signals, rows))
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--signals", type=int, default=2000, help="প্রতি কেসে সিগন্যাল (প্রতিটিতে একটি অর্ডার)")
+    parser.add_argument("--rows", type=int, default=5000, help="পারসিস্ট কেসে ফিল")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    print_rows(run(args.signals, args.rows))
+
+
+if __name__ == "__main__":
+    main()
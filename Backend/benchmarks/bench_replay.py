@@ -0,0 +1,151 @@
+"""
+রেকর্ড-রিপ্লে — stream_recorder ফাইল ReplayStrategy দিয়ে, নেটওয়ার্ক ছাড়া আসল পথে।
+
+    cd Backend && python -m benchmarks.bench_replay [--recording app/recordings/x.mrec.gz]
+                                                    [--ticks 20000] [--clients 100] [--speed 20]
+
+- --recording না দিলে সিডেড ফিক্সচার: ৪ পেয়ারের trade ফ্রেম, মাঝখানে ১০ গুণ ভিড় (ভোলাটিলিটি স্পাইক)
+- পথ: ReplayStrategy → BinanceCombinedConnection._dispatch → LiveMarketStream → পাম্প
+  (main.pump_ticker_stream এর মতো) → hub.publish(ticker টপিক) → ক্লায়েন্ট রাইটার → send_text
+
+কেস:
+  1. max speed ingest   — যত দ্রুত সম্ভব: রেকর্ড/সেকেন্ড ও ক্লায়েন্টে পৌঁছানো ফ্রেম/সেকেন্ড
+  2. paced N×           — রেকর্ডের সময় মেনে N গুণ গতিতে: সময়সূচি থেকে সর্বোচ্চ কত পিছিয়ে পড়ল
+টিকার টপিকের কনফ্লেশন এই বেঞ্চে 0 (e2e এর মতো), তাই ফ্যান-আউটের পুরো চাপ মাপা হয়; পিছিয়ে থাকা
+ক্লায়েন্টের কিউতে টিকার latest-only, তাই max speed এ delivered_ratio < 1 স্বাভাবিক।
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from app.core.config import settings
+from app.services.broadcast_hub import BroadcastHub
+from app.services.stream_engine import LiveMarketStream
+from app.services.stream_recorder import FRAME, PAIRS, PRICE, read_records
+from benchmarks import fixtures
+from benchmarks.common import print_rows, result
+
+SUITE = "replay"
+
+
+class CountingSocket:
+    scope = {}
+    query_params = {}
+
+    def __init__(self, received: dict):
+        self.received = received
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, text):
+        self.received["count"] += 1
+
+    async def send_bytes(self, data):
+        self.received["count"] += 1
+
+    async def close(self, code=1000):
+        pass
+
+
+def _topics(path: str):
+    """রেকর্ডিংয়ে যত ticker টপিক আসবে (টাইমিংয়ের বাইরে একবার পড়ে)"""
+    pairs, stream_ids, topics = {}, set(), set()
+    for _, kind, payload in read_records(path):
+        if kind == FRAME:
+            stream_ids.add(json.loads(payload)["stream"].partition("@")[0])
+        elif kind == PAIRS:
+            pairs.update(json.loads(payload))
+        elif kind == PRICE:
+            tick = json.loads(payload)
+            topics.add(f"ticker:{tick['x']}:{tick['s']}")
+    topics.update(f"ticker:binance:{pairs.get(stream_id, stream_id.upper())}" for stream_id in stream_ids)
+    return sorted(topics)
+
+
+async def _replay(path: str, topics, clients: int, speed: float):
+    hub = BroadcastHub(max_queue=4096, slow_client_seconds=3600)
+    stream = LiveMarketStream()
+    received = {"count": 0, "published": 0}
+    connections = []
+    for _ in range(clients):
+        client = await hub.connect(CountingSocket(received), "json")
+        hub.subscribe(client, topics)
+        connections.append(client)
+    queue = await stream.subscribe()
+
+    async def pump():
+        while True:
+            tick = await queue.get()
+            if tick["type"] == "TICKER":
+                data = tick["data"]
+                topic = f"ticker:{data['exchange']}:{data['pair']}"
+                received["published"] += 1
+                await hub.publish(topic, {"type": "TICKER", "topic": topic, "data": data})
+    pump_task = asyncio.create_task(pump())
+    started = time.perf_counter()
+    await stream.start_replay(path, speed)
+    await stream.task_runner
+    # ক্লায়েন্ট কিউ খালি হওয়া পর্যন্ত
+    await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - started
+    status = stream.strategy.status()
+    pump_task.cancel()
+    await stream.stop_engine()
+    for client in connections:
+        hub.disconnect(client)
+    expected = received["published"] * clients
+    return status, received["count"] / expected if expected else 0.0, received["count"], elapsed
+
+
+async def _run(recording: str, ticks: int, clients: int, speed: float):
+    conflation = dict(settings.WS_TOPIC_CONFLATION_MS)
+    settings.WS_TOPIC_CONFLATION_MS = dict(conflation, ticker=0)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = recording
+        if path is None:
+            path = os.path.join(tmp, "fixture.mrec.gz")
+            fixtures.binance_recording(path, ticks)
+        topics = _topics(path)
+        try:
+            status, ratio, delivered, elapsed = await _replay(path, topics, clients, 0)
+            case = f"max speed ingest ({clients} clients)"
+            rows.append(result(SUITE, case, "records_per_second", status["played"] / elapsed, "rec/s",
+                               records=status["played"]))
+            rows.append(result(SUITE, case, "deliveries_per_second", delivered / elapsed, "msg/s"))
+            rows.append(result(SUITE, case, "delivered_ratio", ratio, "ratio"))
+
+            status, ratio, delivered, elapsed = await _replay(path, topics, clients, speed)
+            case = f"paced {speed:g}x ({clients} clients)"
+            rows.append(result(SUITE, case, "max_behind", status["behind_seconds"] * 1000, "ms",
+                               higher_is_better=False, records=status["played"]))
+            rows.append(result(SUITE, case, "delivered_ratio", ratio, "ratio"))
+        finally:
+            settings.WS_TOPIC_CONFLATION_MS = conflation
+    return rows
+
+
+def run(recording: str = None, ticks: int = 20000, clients: int = 100, speed: float = 20.0):
+    return asyncio.run(_run(recording, ticks, clients, speed))
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--recording", default=None, help="stream_recorder ফাইল (না দিলে সিডেড ফিক্সচার)")
+    parser.add_argument("--ticks", type=int, default=20000, help="ফিক্সচারের trade ফ্রেম")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--speed", type=float, default=20.0, help="paced কেসের গতি (রেকর্ডের N গুণ)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    print_rows(run(args.recording, args.ticks, args.clients, args.speed))
+
+
+if __name__ == "__main__":
+    main()
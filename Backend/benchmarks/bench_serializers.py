@@ -0,0 +1,146 @@
+"""
+সিরিয়ালাইজার মাইক্রোবেঞ্চমার্ক — প্রতিটি লেয়ারে মেসেজ/সেকেন্ড।
+
+    cd Backend && python -m benchmarks.bench_serializers [--clients 1000] [--seconds 0.5]
+
+লেয়ার:
+  1. inbound  — Binance trade / combined-stream মেসেজ পার্স (কোডেক অনুযায়ী)
+  2. outbound — TICKER / SENTIMENT / TRADES ফ্রেম এনকোড (json কোডেক + msgpack)
+  3. fan-out  — হাবের broadcast: এক মেসেজ N ক্লায়েন্টের কিউতে (সিরিয়ালাইজ সহ)
+ইন্সটল না থাকা কোডেক বাদ দেওয়া হয়।
+"""
+import argparse
+import asyncio
+import time
+
+from app.services import serializers
+from app.services.broadcast_hub import BroadcastHub
+from benchmarks.common import print_rows, rate, result
+
+SUITE = "serializers"
+
+TRADE_RAW = (
+    '{"e":"trade","E":1718000000123,"s":"BTCUSDT","t":3579246813,"p":"67321.45000000",'
+    '"q":"0.00150000","T":1718000000122,"m":true,"M":true}'
+)
+COMBINED_RAW = '{"stream":"btcusdt@bookTicker","data":{"u":400900217,"s":"BTCUSDT",' \
+               '"b":"67321.44000000","B":"1.23400000","a":"67321.45000000","A":"0.87600000"}}'
+
+TICKER = {
+    "type": "TICKER", "topic": "ticker:binance:BTC/USDT", "exchange": "binance", "symbol": "BTC/USDT",
+    "price": 67321.45, "bid": 67321.44, "ask": 67321.45, "volume": 18234.551, "timestamp": 1718000000123,
+}
+SENTIMENT = {
+    "type": "SENTIMENT", "topic": "sentiment:BTC/USDT:1h",
+    "payload": {
+        "symbol": "BTC/USDT", "timeframe": "1h", "verdict": "BUY", "score": 4,
+        "indicators": {name: {"value": 50.0 + i, "vote": (i % 3) - 1}
+                       for i, name in enumerate(["RSI", "MACD", "EMA", "BB", "STOCH", "ADX", "PSAR", "SUPERTREND"])},
+    },
+}
+TRADES = {
+    "type": "TRADES", "topic": "trades:BTC/USDT",
+    "payload": [{"id": str(3579246813 + i), "price": 67321.45 + i * 0.01, "amount": 0.0015,
+                 "side": "buy" if i % 2 else "sell", "timestamp": 1718000000123 + i} for i in range(50)],
+}
+
+
+def available_codecs():
+    codecs = {}
+    for name, cls in serializers.JSON_CODECS.items():
+        try:
+            codecs[name] = cls()
+        except ImportError:
+            continue
+    if serializers.binary_codec is not None:
+        codecs["msgpack"] = serializers.binary_codec
+    return codecs
+
+
+def bench_inbound(codecs, seconds):
+    rows = []
+    for name, codec in codecs.items():
+        if codec.binary:
+            continue
+        rows.append(("inbound", f"trade {name}", rate(lambda: codec.loads(TRADE_RAW), seconds)))
+        rows.append(("inbound", f"combined {name}", rate(lambda: codec.loads(COMBINED_RAW), seconds)))
+    return rows
+
+
+def bench_outbound(codecs, seconds):
+    rows = []
+    for label, message in (("ticker", TICKER), ("sentiment", SENTIMENT), ("trades x50", TRADES)):
+        for name, codec in codecs.items():
+            size = len(codec.dumps(message))
+            rows.append(("outbound", f"{label} {name} ({size} B)", rate(lambda: codec.dumps(message), seconds)))
+    return rows
+
+
+class _NullSocket:
+    """কিছু না পাঠানো ফেক সকেট — শুধু হাবের নিজের খরচ মাপার জন্য"""
+    scope = {}
+    query_params = {}
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, text):
+        pass
+
+    async def send_bytes(self, data):
+        pass
+
+    async def close(self, code=1000):
+        pass
+
+
+async def _bench_fan_out(clients: int, binary_share: float, seconds: float):
+    hub = BroadcastHub(max_queue=1_000_000, slow_client_seconds=3600)
+    binary = int(clients * binary_share) if "msgpack" in serializers.CLIENT_FORMATS else 0
+    for i in range(clients):
+        await hub.connect(_NullSocket(), "msgpack" if i < binary else "json")
+    count, started = 0, time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        # প্রতিবার নতুন মেসেজ অবজেক্ট, যেন ফ্রেম ক্যাশ কাজে না লাগে
+        await hub.broadcast(dict(TICKER, price=TICKER["price"] + count), key=("_bench", count))
+        count += 1
+        for client in hub.clients.values():
+            client.pending.clear()
+    elapsed = time.perf_counter() - started
+    for client in list(hub.clients.values()):
+        hub.disconnect(client)
+    return count / elapsed, binary
+
+
+def bench_fan_out(clients: int, seconds: float):
+    rows = []
+    for share in (0.0, 0.5):
+        per_second, binary = asyncio.run(_bench_fan_out(clients, share, seconds))
+        rows.append(("fan-out", f"{clients} clients, {binary} msgpack", per_second))
+    return rows
+
+
+def run(clients: int = 1000, seconds: float = 0.5):
+    codecs = available_codecs()
+    rows = bench_inbound(codecs, seconds) + bench_outbound(codecs, seconds)
+    rows += bench_fan_out(clients, seconds)
+    return [result(SUITE, f"{layer} {case}", "per_second", per_second, "msg/s",
+                   active_codec=serializers.json_codec.name)
+            for layer, case, per_second in rows]
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--seconds", type=float, default=0.5, help="প্রতি কেসে সময়")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    print(f"codecs: {', '.join(available_codecs())} (active: {serializers.json_codec.name})")
+    print_rows(run(args.clients, args.seconds))
+
+
+if __name__ == "__main__":
+    main()
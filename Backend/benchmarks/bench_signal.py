@@ -0,0 +1,109 @@
+"""
+সিগন্যাল ইঞ্জিন — প্রতি সিম্বলে ইন্ডিকেটর মূল্যায়নের খরচ।
+
+    cd Backend && python -m benchmarks.bench_signal [--candles 100] [--symbols 50] [--ohlcv FILE]
+
+কেস:
+  1. full        — analyze_market_sentiment (pandas_ta, প্রতি কলে পুরো উইন্ডো)
+  2. incremental — analyze_incremental: প্রতি কলে উইন্ডো এক ক্যান্ডেল সরে (স্ক্যানারের স্টেডি স্টেট;
+                   উইন্ডোর প্রথম ক্যান্ডেল থেকে স্টেট নতুন করে, pandas_ta এর সাথে মিল রাখতে)
+  3. forming     — analyze_incremental: একই উইন্ডো, শুধু ফর্মিং ক্যান্ডেল বদলায় (লাইভ টিক)
+                   দুইভাবে: দাম বদলায় / একই দামে ট্রেড (শুধু ভলিউম — ইন্ডিকেটর মেমোর সেরা কেস)
+  4. batch       — analyze_batch: N সিম্বল একসাথে, প্রতি সিম্বলের খরচ
+pandas_ta আপগ্রেডের পর full কেসের পরিবর্তন --compare দিয়ে ধরা যায়।
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.services.signal_engine import SignalEngine
+from benchmarks import fixtures
+from benchmarks.common import latency_results, print_rows, result
+
+SUITE = "signal"
+
+
+def bench_full(data, window: int, repeat: int):
+    engine = SignalEngine()
+    rows = data[-window:].tolist()
+    engine.analyze_market_sentiment(rows)  # ওয়ার্মআপ
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        engine.analyze_market_sentiment(rows)
+        samples.append((time.perf_counter() - started) * 1000)
+    return latency_results(SUITE, f"full pandas_ta ({window} candles)", samples)
+
+
+def bench_incremental(data, window: int, steps: int):
+    engine = SignalEngine()
+    steps = min(steps, len(data) - window)
+    engine.analyze_incremental(data[:window], "BENCH", "1h")
+    samples = []
+    for i in range(1, steps + 1):
+        chunk = data[i:i + window]
+        started = time.perf_counter()
+        engine.analyze_incremental(chunk, "BENCH", "1h")
+        samples.append((time.perf_counter() - started) * 1000)
+    return latency_results(SUITE, f"incremental new candle ({window} candles)", samples)
+
+
+def bench_forming(data, window: int, repeat: int, same_price: bool = False):
+    engine = SignalEngine()
+    chunk = np.array(data[-window:])
+    engine.analyze_incremental(chunk, "BENCH", "1h")
+    last_close = chunk[-1, 4]
+    samples = []
+    for i in range(repeat):
+        if same_price:
+            chunk[-1, 5] += 0.01
+        else:
+            chunk[-1, 4] = last_close * (1 + ((i % 21) - 10) * 1e-4)
+            chunk[-1, 2] = max(chunk[-1, 2], chunk[-1, 4])
+            chunk[-1, 3] = min(chunk[-1, 3], chunk[-1, 4])
+        started = time.perf_counter()
+        engine.analyze_incremental(chunk, "BENCH", "1h")
+        samples.append((time.perf_counter() - started) * 1000)
+    case = "same-price tick" if same_price else "tick"
+    return latency_results(SUITE, f"incremental forming {case} ({window} candles)", samples)
+
+
+def bench_batch(symbols: int, window: int, repeat: int):
+    engine = SignalEngine()
+    batch = fixtures.ohlcv_batch(symbols, window)
+    engine.analyze_batch(batch)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        engine.analyze_batch(batch)
+    per_symbol_ms = (time.perf_counter() - started) * 1000 / (repeat * symbols)
+    return [result(SUITE, f"batch {symbols} symbols ({window} candles)", "per_symbol", per_symbol_ms, "ms",
+                   higher_is_better=False)]
+
+
+def run(candles: int = 100, symbols: int = 50, repeat: int = 30, ohlcv_path: str = None):
+    data = fixtures.load_ohlcv(ohlcv_path) if ohlcv_path else fixtures.ohlcv(max(candles * 3, candles + 200))
+    rows = bench_full(data, candles, repeat)
+    rows += bench_incremental(data, candles, repeat * 10)
+    rows += bench_forming(data, candles, repeat * 10)
+    rows += bench_forming(data, candles, repeat * 10, same_price=True)
+    rows += bench_batch(symbols, candles, max(1, repeat // 10))
+    return rows
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--candles", type=int, default=100, help="উইন্ডো (SCANNER_CANDLES)")
+    parser.add_argument("--symbols", type=int, default=50, help="batch কেসে সিম্বল")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--ohlcv", dest="ohlcv_path", default=None, help="রেকর্ড করা ক্যান্ডেল (JSON বা .ohlcv)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    print_rows(run(args.candles, args.symbols, args.repeat, args.ohlcv_path))
+
+
+if __name__ == "__main__":
+    main()
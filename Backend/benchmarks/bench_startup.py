@@ -0,0 +1,96 @@
+"""
+কোল্ড স্টার্ট — app.main ইমপোর্ট থেকে কম্পিউট ওয়ার্কার ও ইন্ডিকেটর স্টেট পর্যন্ত।
+
+    cd Backend && python -m benchmarks.bench_startup [--repeat 5] [--series 4]
+
+প্রতিটি রান নতুন পাইথন প্রসেসে (মডিউল ক্যাশ ছাড়া), সবচেয়ে কম সময়টা নেওয়া হয়:
+  1. import app.main       — সার্ভার রিকোয়েস্ট নেওয়ার আগের খরচ; ভারী লাইব্রেরি (ccxt, pandas) লোড হলে কতগুলো
+  2. deferred import       — যা ইমপোর্ট থেকে সরানো হয়েছে (ওয়ার্মআপে থ্রেডে বা প্রথম ব্যবহারে), তুলনার জন্য
+  3. compute + indicators  — COMPUTE_MODE এর ওয়ার্কার চালু ও series টি সিরিজের ইন্ডিকেটর স্টেট প্রিলোড
+নেটওয়ার্ক লাগে না: মার্কেট লোড (এক্সচেঞ্জের উপর নির্ভর) এখানে নেই, /ready এর phases এ দেখা যায়।
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+from benchmarks.common import print_rows, result
+
+SUITE = "startup"
+HEAVY_MODULES = ("ccxt", "pandas", "pandas_ta")
+
+_IMPORT = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+print(json.dumps({"seconds": time.perf_counter() - started,
+                  "heavy": [m for m in %r if m in sys.modules]}))
+"""
+
+_DEFERRED = """
+import json, time
+import app.main
+started = time.perf_counter()
+import ccxt.async_support
+import app.services.signal_engine
+print(json.dumps({"seconds": time.perf_counter() - started}))
+"""
+
+_WARMUP = """
+import asyncio, json, time
+from app.main import compute_executor
+from benchmarks.fixtures import ohlcv
+
+async def main():
+    started = time.perf_counter()
+    await compute_executor.start()
+    computed = time.perf_counter()
+    candles = ohlcv(100)
+    await asyncio.gather(*(compute_executor.analyze(candles, f"S{i}/USDT", "1h") for i in range(%d)))
+    done = time.perf_counter()
+    await compute_executor.stop()
+    print(json.dumps({"compute": computed - started, "indicators": done - computed}))
+
+if __name__ == "__main__":
+    asyncio.run(main())
+"""
+
+
+def _fresh(code: str):
+    """নতুন প্রসেসে কোড চালিয়ে শেষ লাইনের JSON"""
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def run(repeat: int = 5, series: int = 4):
+    imports = [_fresh(_IMPORT % (HEAVY_MODULES,)) for _ in range(repeat)]
+    deferred = [_fresh(_DEFERRED) for _ in range(repeat)]
+    warmups = [_fresh(_WARMUP % series) for _ in range(max(1, repeat // 2))]
+    return [
+        result(SUITE, "import app.main", "seconds", min(r["seconds"] for r in imports), "s",
+               higher_is_better=False, heavy=imports[0]["heavy"]),
+        result(SUITE, "import app.main", "heavy_modules", len(imports[0]["heavy"]), "modules",
+               higher_is_better=False),
+        result(SUITE, "deferred import (ccxt, signal engine)", "seconds", min(r["seconds"] for r in deferred), "s",
+               higher_is_better=False),
+        result(SUITE, "compute workers", "seconds", min(r["compute"] for r in warmups), "s",
+               higher_is_better=False),
+        result(SUITE, f"indicator preload ({series} series)", "seconds", min(r["indicators"] for r in warmups), "s",
+               higher_is_better=False),
+    ]
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--repeat", type=int, default=5, help="প্রতি কেসে নতুন প্রসেস")
+    parser.add_argument("--series", type=int, default=4, help="প্রিলোড করা (symbol, timeframe) সিরিজ")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    print_rows(run(args.repeat, args.series))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+টিক ইনজেশন — LiveMarketStream এ প্রতি সেকেন্ডে কত টিক ঢোকে।
+
+    cd Backend && python -m benchmarks.bench_stream [--subscribers 4] [--seconds 0.5]
+
+কেস:
+  1. broadcast_price        — স্ট্র্যাটেজির কলব্যাক (টিকার পেলোড তৈরি + সব সাবস্ক্রাইবার কিউ)
+  2. on_binance_event trade — পার্স করা trade ইভেন্ট (হ্যান্ডলার + কিউ)
+  3. raw combined frame     — সকেটের raw টেক্সট থেকে: কোডেক পার্স → মাল্টিপ্লেক্স রাউটিং → কিউ
+সাবস্ক্রাইবার কিউ প্রতি ব্যাচে খালি করা হয় (পাম্প টাস্কের মতো), তাই QueueFull এ বাদ পড়ে না।
+"""
+import argparse
+import asyncio
+import time
+
+from app.services.stream_engine import BinanceCombinedConnection, BinanceMultiplexStrategy, LiveMarketStream
+from benchmarks import fixtures
+from benchmarks.common import print_rows, result
+
+SUITE = "stream"
+BATCH = 50  # সাবস্ক্রাইবার কিউ maxsize=100 এর নিচে
+
+
+async def _rate(step, queues, seconds: float):
+    """step(i) কে ব্যাচে চালিয়ে প্রতি সেকেন্ডে টিক"""
+    count, started = 0, time.perf_counter()
+    while True:
+        for _ in range(BATCH):
+            await step(count)
+            count += 1
+        for q in queues:
+            while not q.empty():
+                q.get_nowait()
+        elapsed = time.perf_counter() - started
+        if elapsed >= seconds:
+            return count / elapsed
+
+
+async def _run(subscribers: int, seconds: float):
+    stream = LiveMarketStream()
+    queues = [await stream.subscribe() for _ in range(subscribers)]
+    rows = []
+
+    async def price_step(i):
+        await stream.broadcast_price(65000.0 + i * 0.01)
+    per_second = await _rate(price_step, queues, seconds)
+    rows.append(result(SUITE, f"broadcast_price ({subscribers} subscribers)", "per_second", per_second, "tick/s"))
+
+    stream.add_handler("trade", lambda pair, data: None)
+    event = {"e": "trade", "s": "BTCUSDT", "t": 1, "p": "65000.10", "q": "0.0015", "T": 1, "m": True}
+
+    async def event_step(i):
+        await stream.on_binance_event("trade", "BTC/USDT", event)
+    per_second = await _rate(event_step, queues, seconds)
+    rows.append(result(SUITE, f"on_binance_event trade ({subscribers} subscribers)", "per_second", per_second,
+                       "tick/s"))
+
+    # সকেট ছাড়া: connection এর _dispatch সরাসরি raw ফ্রেম দিয়ে
+    multiplex = BinanceMultiplexStrategy(stream.on_binance_event, base_url="ws://bench.invalid")
+    multiplex.pairs.update({"btcusdt": "BTC/USDT", "ethusdt": "ETH/USDT"})
+    connection = BinanceCombinedConnection("ws://bench.invalid", multiplex._on_message, 1024)
+    frames = fixtures.binance_trades(4096, pairs=2)
+
+    async def raw_step(i):
+        await connection._dispatch(frames[i % len(frames)])
+    per_second = await _rate(raw_step, queues, seconds)
+    rows.append(result(SUITE, f"raw combined frame ({subscribers} subscribers)", "per_second", per_second, "tick/s"))
+    return rows
+
+
+def run(subscribers: int = 4, seconds: float = 0.5):
+    return asyncio.run(_run(subscribers, seconds))
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--subscribers", type=int, default=4, help="LiveMarketStream সাবস্ক্রাইবার কিউ")
+    parser.add_argument("--seconds", type=float, default=0.5, help="প্রতি কেসে সময়")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    print_rows(run(args.subscribers, args.seconds))
+
+
+if __name__ == "__main__":
+    main()
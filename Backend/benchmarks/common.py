@@ -0,0 +1,139 @@
+"""
+বেঞ্চমার্কের শেয়ার্ড হেল্পার: রেট/ল্যাটেন্সি মাপা, রেজাল্ট রো ও JSON ফাইল।
+
+প্রতিটি রেজাল্ট একটি dict:
+    {"suite": "signal", "case": "incremental", "metric": "per_second", "value": 12345.6, "unit": "op/s"}
+higher_is_better দিয়ে তুলনার দিক ঠিক হয় (ল্যাটেন্সিতে কম ভালো)।
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+# ফলাফল ফাইলের স্কিমা ভার্সন — ফিল্ড বদলালে বাড়াতে হবে
+SCHEMA_VERSION = 1
+
+
+def rate(fn: Callable[[], object], seconds: float, batch: int = 200):
+    """fn কে seconds সময় ধরে চালিয়ে প্রতি সেকেন্ডে কল সংখ্যা"""
+    count, started = 0, time.perf_counter()
+    deadline = started + seconds
+    while True:
+        for _ in range(batch):
+            fn()
+        count += batch
+        now = time.perf_counter()
+        if now >= deadline:
+            return count / (now - started)
+
+
+def timed(fn: Callable[[], object], repeat: int):
+    """প্রতি কলের সময় (ms) এর লিস্ট"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def percentiles(samples_ms, points=(50, 95, 99)):
+    values = np.asarray(samples_ms, dtype=np.float64)
+    if len(values) == 0:
+        return {}
+    stats = {f"p{p}": float(np.percentile(values, p)) for p in points}
+    stats["max"] = float(values.max())
+    stats["mean"] = float(values.mean())
+    return stats
+
+
+def result(suite: str, case: str, metric: str, value: float, unit: str, higher_is_better: bool = True, **extra):
+    row = {"suite": suite, "case": case, "metric": metric, "value": round(float(value), 4),
+           "unit": unit, "higher_is_better": higher_is_better}
+    row.update(extra)
+    return row
+
+
+def latency_results(suite: str, case: str, samples_ms, **extra):
+    """ল্যাটেন্সি স্যাম্পল থেকে p50/p95/p99/max/mean রো"""
+    return [result(suite, case, name, value, "ms", higher_is_better=False, samples=len(samples_ms), **extra)
+            for name, value in percentiles(samples_ms).items()]
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _version(module: str):
+    try:
+        return __import__(module).__version__
+    except Exception:
+        return None
+
+
+def environment():
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "commit": _git_commit(),
+        "packages": {name: _version(name) for name in ("numpy", "pandas", "pandas_ta", "orjson", "msgspec", "websockets")},
+    }
+
+
+def write_results(path: str, rows: List[dict], options: Optional[dict] = None):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    document = {
+        "schema": SCHEMA_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "environment": environment(),
+        "options": options or {},
+        "results": rows,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, ensure_ascii=False)
+    return document
+
+
+def load_results(path: str):
+    with open(path, encoding="utf-8") as f:
+        document = json.load(f)
+    if document.get("schema") != SCHEMA_VERSION:
+        raise ValueError(f"{path}: unsupported schema {document.get('schema')}")
+    return document
+
+
+def compare(baseline: List[dict], current: List[dict], threshold_pct: float = 10.0):
+    """
+    একই (suite, case, metric) এর পরিবর্তন। change_pct ধনাত্মক মানে ভালো হয়েছে
+    (ল্যাটেন্সিতে কমা, থ্রুপুটে বাড়া); threshold এর বেশি খারাপ হলে regression=True।
+    """
+    old: Dict[tuple, dict] = {(r["suite"], r["case"], r["metric"]): r for r in baseline}
+    rows = []
+    for row in current:
+        before = old.get((row["suite"], row["case"], row["metric"]))
+        if before is None or not before["value"]:
+            continue
+        change = (row["value"] - before["value"]) / abs(before["value"]) * 100
+        if not row.get("higher_is_better", True):
+            change = -change
+        rows.append({"suite": row["suite"], "case": row["case"], "metric": row["metric"],
+                     "before": before["value"], "after": row["value"], "unit": row["unit"],
+                     "change_pct": round(change, 2), "regression": change < -threshold_pct})
+    return rows
+
+
+def print_rows(rows: List[dict]):
+    for row in rows:
+        label = f"{row['case']} [{row['metric']}]"
+        print(f"{row['suite']:<11} {label:<52} {row['value']:>16,.3f} {row['unit']}")
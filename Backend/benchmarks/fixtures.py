@@ -0,0 +1,96 @@
+"""
+অফলাইন ফিক্সচার — নেটওয়ার্ক ছাড়া, প্রতিবার একই ডাটা (সিডেড)।
+
+- ohlcv: জিওমেট্রিক র‍্যান্ডম ওয়াক থেকে ক্যান্ডেল (ট্রেন্ড + ভোলাটিলিটি রেজিম বদলায়,
+  যাতে সব ইন্ডিকেটরের BUY/SELL/NEUTRAL শাখা চলে)
+- ohlcv_edge: একই ক্যান্ডেলে ফ্ল্যাট বার (high == low) ও শূন্য ভলিউম (দিনের প্রথম বারেও) — প্যারিটি টেস্টের জন্য
+- load_ohlcv: রেকর্ড করা ক্যান্ডেল ফাইল (JSON [[ts, o, h, l, c, v], ...] বা market_store এর
+  .ohlcv memmap) — আসল মার্কেটের ডাটায় মাপতে
+- binance_trades: Binance combined-stream এর trade মেসেজ (raw টেক্সট), স্ট্রিম/e2e বেঞ্চের জন্য
+- binance_recording: ওই trade ফ্রেমের stream_recorder ফাইল, মাঝখানে ভোলাটিলিটি স্পাইক (replay বেঞ্চ)
+"""
+import json
+from typing import List
+
+import numpy as np
+
+from app.services.stream_recorder import FRAME, PAIRS, write_records
+
+HOUR_MS = 3_600_000
+START_MS = 1_700_000_000_000
+
+
+def ohlcv(candles: int = 500, seed: int = 7, start_price: float = 65000.0, tf_ms: int = HOUR_MS):
+    rng = np.random.default_rng(seed)
+    # প্রতি ১০০ ক্যান্ডেলে ট্রেন্ড ও ভোলাটিলিটি রেজিম বদল
+    regimes = max(1, candles // 100 + 1)
+    drift = np.repeat(rng.normal(0, 0.002, regimes), 100)[:candles]
+    vol = np.repeat(rng.uniform(0.004, 0.015, regimes), 100)[:candles]
+    returns = drift + vol * rng.standard_normal(candles)
+    close = start_price * np.exp(np.cumsum(returns))
+    open_ = np.concatenate([[start_price], close[:-1]])
+    spread = np.abs(rng.normal(0, vol, candles)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.lognormal(3, 0.6, candles)
+    ts = START_MS + np.arange(candles, dtype=np.float64) * tf_ms
+    return np.column_stack([ts, open_, high, low, close, volume])
+
+
+def ohlcv_edge(candles: int = 200, seed: int = 7, start_price: float = 65000.0, flat: float = 0.15,
+               zero_volume: float = 0.2):
+    """ohlcv, তবে flat অংশ বার আগের ক্লোজে ফ্ল্যাট, zero_volume অংশ ও প্রতি UTC দিনের প্রথম বার শূন্য ভলিউম"""
+    data = ohlcv(candles, seed, start_price)
+    rng = np.random.default_rng(seed + 1000)
+    flat_rows = np.flatnonzero(rng.random(candles) < flat)
+    flat_rows = flat_rows[flat_rows > 0]
+    data[flat_rows, 1:5] = data[flat_rows - 1, 4][:, None]
+    day = data[:, 0] // 86_400_000
+    day_start = np.concatenate([[True], day[1:] != day[:-1]])
+    data[(rng.random(candles) < zero_volume) | day_start, 5] = 0.0
+    return data
+
+
+def ohlcv_batch(symbols: int, candles: int = 500, seed: int = 7):
+    """(symbols × candles × 6) — প্রতি সিম্বলে আলাদা সিড"""
+    return np.stack([ohlcv(candles, seed + i, start_price=100.0 * (i + 1)) for i in range(symbols)])
+
+
+def load_ohlcv(path: str):
+    if path.endswith(".ohlcv"):
+        return np.array(np.fromfile(path, dtype=np.float64).reshape(-1, 6))
+    with open(path, encoding="utf-8") as f:
+        return np.asarray(json.load(f), dtype=np.float64)[:, :6]
+
+
+def binance_trade(stream_id: str, trade_id: int, price: float, qty: float = 0.0015, ts: int = START_MS):
+    return (
+        f'{{"stream":"{stream_id}@trade","data":{{"e":"trade","E":{ts},"s":"{stream_id.upper()}",'
+        f'"t":{trade_id},"p":"{price:.8f}","q":"{qty:.8f}","T":{ts},"m":{"true" if trade_id % 2 else "false"},'
+        f'"M":true}}}}'
+    )
+
+
+def binance_trades(count: int, pairs: int = 1, seed: int = 11) -> List[str]:
+    """count টি raw combined-stream trade মেসেজ, pairs টি পেয়ারে রাউন্ড-রবিন"""
+    rng = np.random.default_rng(seed)
+    prices = 65000.0 * np.exp(np.cumsum(rng.normal(0, 0.0001, count)))
+    stream_ids = ["btcusdt", "ethusdt", "solusdt", "bnbusdt", "xrpusdt", "adausdt", "dogeusdt", "ltcusdt"]
+    stream_ids += [f"sym{i}usdt" for i in range(max(0, pairs - len(stream_ids)))]
+    return [binance_trade(stream_ids[i % pairs], 1000 + i, prices[i], ts=START_MS + i) for i in range(count)]
+
+
+def binance_recording(path: str, count: int, pairs: int = 4, rate: float = 200.0, spike: float = 10.0, seed: int = 11):
+    """
+    count টি trade ফ্রেম rate/s হারে; মাঝের এক-তৃতীয়াংশে হার spike গুণ (ভোলাটিলিটি স্পাইকের মতো ভিড়)।
+    রিপ্লেতে পেয়ারের নাম মেলাতে শুরুতে একটি পেয়ার-ম্যাপ রেকর্ড।
+    """
+    frames = binance_trades(count, pairs=pairs, seed=seed)
+    gaps = np.full(count, 1e6 / rate)
+    gaps[count // 3: 2 * count // 3] /= spike
+    ts = (START_MS * 1000 + np.cumsum(gaps)).astype(np.int64)
+    names = {json.loads(frame)["stream"].partition("@")[0] for frame in frames[:pairs]}
+    pair_map = {name: f"{name[:-4].upper()}/USDT" for name in names}
+    records = [(int(ts[0]), PAIRS, json.dumps(pair_map))]
+    records += [(int(t), FRAME, frame) for t, frame in zip(ts, frames)]
+    return write_records(path, records)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# `cd Backend && python -m pytest` ছাড়াও অন্য ডিরেক্টরি থেকে চালালে app/benchmarks ইমপোর্ট হয়
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
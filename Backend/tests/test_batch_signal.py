@@ -0,0 +1,44 @@
+"""
+batch_signal.compute_votes বনাম স্কেলার IncrementalSignalEngine — একই উইন্ডোতে প্রতিটি ইন্ডিকেটরের একই ভোট।
+pandas_ta লাগে না; স্কেলার পাথের pandas_ta প্যারিটি test_indicator_parity তে।
+"""
+import numpy as np
+import pytest
+
+from app.services.batch_signal import BUY, INDICATOR_NAMES, NEUTRAL, SELL, compute_votes
+from app.services.indicator_stream import IncrementalSignalEngine
+from benchmarks import fixtures
+
+WINDOW = 100
+LABELS = {BUY: "BUY", SELL: "SELL", NEUTRAL: "NEUTRAL"}
+
+
+def _scalar(window):
+    return [d["signal"] for d in IncrementalSignalEngine().sync(window.tolist())]
+
+
+def _batch(windows):
+    return [[LABELS[int(v)] for v in row] for row in compute_votes(np.stack(windows))[:, -1, :]]
+
+
+@pytest.mark.parametrize("candles", [
+    fixtures.ohlcv(200, seed=7),
+    fixtures.ohlcv(200, seed=11, start_price=0.5),
+    # শূন্য ভলিউমের দিনের শুরু: VWAP 0/0, আর ফ্ল্যাট বারে A/D এর epsilon
+    fixtures.ohlcv_edge(200, seed=3),
+    fixtures.ohlcv_edge(200, seed=4, start_price=0.00002, zero_volume=0.5),
+], ids=["trend", "low-price", "zero-volume", "zero-volume-low-price"])
+def test_batch_matches_scalar(candles):
+    windows = [candles[end - WINDOW:end] for end in range(WINDOW, len(candles) + 1)]
+    # সব উইন্ডো একসাথে এক ব্যাচে (প্রতিটি আলাদা "সিম্বল")
+    for window, votes in zip(windows, _batch(windows)):
+        assert votes == _scalar(window)
+
+
+def test_zero_volume_day_start_votes_sell():
+    candles = fixtures.ohlcv(WINDOW, seed=5)
+    day = candles[:, 0] // 86_400_000
+    start = np.flatnonzero(day != day[-1])[-1] + 1
+    candles[start:, 5] = 0.0  # শেষ দিনের সব বার শূন্য ভলিউম: VWAP NaN
+    vwap = INDICATOR_NAMES.index("VWAP")
+    assert _batch([candles])[0][vwap] == _scalar(candles)[vwap] == "SELL"
@@ -0,0 +1,175 @@
+"""
+Binance combined stream মাল্টিপ্লেক্স — একই লুপে চলা websockets স্ট্যান্ড-ইন সার্ভারের বিপরীতে।
+স্ট্যান্ড-ইন প্রতিটি কানেকশনের URL এর স্ট্রিম সেট ও কন্ট্রোল মেসেজ রেকর্ড করে, SUBSCRIBE/UNSUBSCRIBE
+এর রিপ্লাই দেয় এবং সাবস্ক্রাইব হওয়া প্রতিটি স্ট্রিমে একটি trade ফ্রেম পাঠায়।
+"""
+import asyncio
+import json
+import time
+
+import websockets
+
+from app.core.config import settings
+from app.services.stream_engine import BinanceMultiplexStrategy, LiveMarketStream
+from benchmarks import fixtures
+
+
+class BinanceStandIn:
+    def __init__(self):
+        self.connections = []   # প্রতিটি কানেকশনের {"streams": set, "ws": ...}
+        self.controls = []      # (কানেকশনের ইনডেক্স, method, params)
+        self.server = None
+
+    async def _handler(self, ws):
+        streams = ws.request.path.split("streams=", 1)[1].split("/")
+        index = len(self.connections)
+        self.connections.append({"streams": set(streams), "ws": ws})
+        for seq, stream in enumerate(streams):
+            await ws.send(fixtures.binance_trade(stream.partition("@")[0], seq, 100.0 + seq))
+        try:
+            async for raw in ws:
+                message = json.loads(raw)
+                self.controls.append((index, message["method"], message["params"]))
+                await ws.send(json.dumps({"result": None, "id": message["id"]}))
+                if message["method"] == "SUBSCRIBE":
+                    for stream in message["params"]:
+                        await ws.send(fixtures.binance_trade(stream.partition("@")[0], 1, 101.0))
+        except websockets.ConnectionClosed:
+            pass
+
+    async def start(self):
+        self.server = await websockets.serve(self._handler, "127.0.0.1", 0)
+        return f"ws://127.0.0.1:{self.server.sockets[0].getsockname()[1]}"
+
+    async def close_clients(self):
+        """সার্ভার-সাইড থেকে সব খোলা কানেকশন বন্ধ (Binance এর ২৪ ঘণ্টার ডিসকানেক্টের মতো)"""
+        for connection in self.connections:
+            await connection["ws"].close()
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def _until(check, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not check():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out waiting for the stand-in")
+        await asyncio.sleep(0.01)
+
+
+def _run(scenario, monkeypatch):
+    # কন্ট্রোল মেসেজের রেট-লিমিটের অপেক্ষা টেস্টে দরকার নেই
+    monkeypatch.setattr(settings, "BINANCE_WS_CONTROL_RATE", 1000.0)
+
+    async def main():
+        standin = BinanceStandIn()
+        url = await standin.start()
+        try:
+            await scenario(standin, url)
+        finally:
+            await standin.stop()
+
+    asyncio.run(main())
+
+
+def test_subscribe_and_unsubscribe_without_reconnect(monkeypatch):
+    async def scenario(standin, url):
+        events = []
+
+        async def callback(kind, pair, data):
+            events.append((kind, pair, data["t"]))
+
+        strategy = BinanceMultiplexStrategy(callback, base_url=url, max_streams=10)
+        await strategy.subscribe(["BTC/USDT"], ["trade"])
+        connection = strategy.connections[0]
+        await _until(lambda: connection.live == {"btcusdt@trade"})
+
+        await strategy.subscribe(["ETH/USDT"], ["trade"])
+        assert standin.controls == [(0, "SUBSCRIBE", ["ethusdt@trade"])]
+        assert connection.live == {"btcusdt@trade", "ethusdt@trade"}
+        await _until(lambda: ("trade", "ETH/USDT", 1) in events)
+
+        await strategy.unsubscribe(["BTC/USDT"], ["trade"])
+        assert standin.controls[-1] == (0, "UNSUBSCRIBE", ["btcusdt@trade"])
+        assert connection.live == {"ethusdt@trade"}
+        assert len(standin.connections) == 1
+        assert ("trade", "BTC/USDT", 0) in events
+        await strategy.stop()
+
+    _run(scenario, monkeypatch)
+
+
+def test_spill_over_to_second_connection(monkeypatch):
+    async def scenario(standin, url):
+        async def callback(kind, pair, data):
+            pass
+
+        strategy = BinanceMultiplexStrategy(callback, base_url=url, max_streams=2)
+        await strategy.subscribe(["BTC/USDT", "ETH/USDT", "SOL/USDT"], ["trade"])
+        assert len(strategy.connections) == 2
+        await _until(lambda: len(standin.connections) == 2)
+        assert sorted(len(c["streams"]) for c in standin.connections) == [1, 2]
+        assert set().union(*(c["streams"] for c in standin.connections)) == {
+            "btcusdt@trade", "ethusdt@trade", "solusdt@trade"}
+
+        # দ্বিতীয় কানেকশনে জায়গা আছে — নতুন স্ট্রিম সেখানে SUBSCRIBE, তৃতীয় কানেকশন নয়
+        second = strategy.connections[1]
+        await _until(lambda: len(second.live) == 1)
+        await strategy.subscribe(["BNB/USDT"], ["trade"])
+        assert len(strategy.connections) == 2
+        assert strategy.owner["bnbusdt@trade"] is second
+        assert standin.controls == [(1, "SUBSCRIBE", ["bnbusdt@trade"])]
+        await strategy.stop()
+
+    _run(scenario, monkeypatch)
+
+
+def test_switching_pairs_keeps_the_connection(monkeypatch):
+    monkeypatch.setattr(settings, "BINANCE_MULTIPLEX", True)
+
+    async def scenario(standin, url):
+        monkeypatch.setattr(settings, "BINANCE_WS_URL", url)
+        stream = LiveMarketStream()
+        await stream.change_stream("binance", "BTC/USDT")
+        connection = stream.multiplex.connections[0]
+        await _until(lambda: connection.live == {"btcusdt@trade"})
+
+        await stream.change_stream("binance", "ETH/USDT")
+        assert stream.current_pair == "ETH/USDT"
+        assert connection.live == {"ethusdt@trade"}
+        # নতুন পেয়ার আগে — পুরনোটা সরানোর সময় কানেকশন খালি হয়ে বন্ধ হয় না
+        assert standin.controls == [(0, "SUBSCRIBE", ["ethusdt@trade"]), (0, "UNSUBSCRIBE", ["btcusdt@trade"])]
+        assert len(standin.connections) == 1
+        assert stream.watched == {"ETH/USDT@trade": 1}
+        await stream.multiplex.stop()
+
+    _run(scenario, monkeypatch)
+
+
+def test_reconnects_with_current_streams_after_server_close(monkeypatch):
+    async def scenario(standin, url):
+        async def callback(kind, pair, data):
+            pass
+
+        strategy = BinanceMultiplexStrategy(callback, base_url=url, max_streams=10)
+        await strategy.subscribe(["BTC/USDT", "ETH/USDT"], ["trade", "bookTicker"])
+        connection = strategy.connections[0]
+        await _until(lambda: len(connection.live) == 4)
+        await strategy.unsubscribe(["ETH/USDT"], ["bookTicker"])
+        await strategy.subscribe(["SOL/USDT"], ["trade"])
+        expected = {"btcusdt@trade", "btcusdt@bookTicker", "ethusdt@trade", "solusdt@trade"}
+        assert connection.live == expected
+
+        await standin.close_clients()
+        await _until(lambda: len(standin.connections) == 2)
+        # নতুন URL এ বর্তমান সেট — আগের SUBSCRIBE/UNSUBSCRIBE গুলো সহ, আলাদা কন্ট্রোল মেসেজ ছাড়া
+        assert standin.connections[1]["streams"] == expected
+        controls = len(standin.controls)
+        await _until(lambda: connection.live == expected)
+        await asyncio.sleep(0.05)
+        assert len(standin.controls) == controls
+        await strategy.stop()
+
+    _run(scenario, monkeypatch)
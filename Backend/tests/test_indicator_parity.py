@@ -0,0 +1,72 @@
+"""
+analyze_incremental বনাম analyze_market_sentiment — একই seeded OHLCV এ একই ভোট, স্কোর ও ভারডিক্ট।
+লাইভ ফিডের মতো হিস্টোরি বাড়তে থাকে: প্রতি ধাপে একটি নতুন ক্লোজড ক্যান্ডেল, তারপর ফর্মিং ক্যান্ডেলের আপডেট।
+"""
+import pytest
+
+pytest.importorskip("pandas_ta")
+
+from app.services.signal_engine import SignalEngine
+from benchmarks import fixtures
+
+WINDOW = 100  # স্ক্যানারের sync_candles(limit=100)
+
+
+def _forming(history, change):
+    """শেষ ক্যান্ডেল একই টাইমস্ট্যাম্পে নতুন ক্লোজ সহ (টিক আসার মতো)"""
+    candle = list(history[-1])
+    candle[4] *= 1 + change
+    candle[2] = max(candle[2], candle[4])
+    candle[3] = min(candle[3], candle[4])
+    return history[:-1] + [candle]
+
+
+def _same(reference, incremental):
+    for field in ("details", "score", "verdict", "summary"):
+        assert incremental[field] == reference[field], field
+
+
+@pytest.mark.parametrize("seed", [7, 11, 23])
+def test_incremental_matches_full_recompute(seed):
+    candles = fixtures.ohlcv(240, seed=seed).tolist()
+    engine = SignalEngine()
+    for end in range(60, len(candles) + 1):
+        history = candles[:end]
+        for change in (0.0, 0.004, -0.006):
+            window = _forming(history, change)
+            incremental = engine.analyze_incremental(window, f"S{seed}/USDT", "1h")
+            # ইনক্রিমেন্টাল স্টেট প্রতিটি ক্যান্ডেল দেখে; ধীর pandas_ta রেফারেন্স প্রতি তৃতীয় ধাপে
+            if end % 3 == 0 or end == len(candles):
+                _same(engine.analyze_market_sentiment(window), incremental)
+
+
+@pytest.mark.parametrize("seed", [7, 11, 23])
+def test_incremental_matches_on_sliding_window(seed):
+    # স্ক্যানার ও ক্যান্ডেল অ্যাগ্রিগেটরের মতো: sync_candles(limit=100) এর সরে যাওয়া উইন্ডো, একই ইঞ্জিনে
+    candles = fixtures.ohlcv(240, seed=seed).tolist()
+    engine = SignalEngine()
+    for end in range(WINDOW, len(candles) + 1):
+        window = candles[end - WINDOW:end]
+        for change in ((0.0, 0.005) if end % 5 == 0 else (0.0,)):
+            window = _forming(window, change)
+            _same(engine.analyze_market_sentiment(window), engine.analyze_incremental(window, f"W{seed}/USDT", "1h"))
+
+
+@pytest.mark.parametrize("start_price", [65000.0, 0.00002])
+def test_flat_and_zero_volume_candles(start_price):
+    # high == low এ pandas_ta সব রেঞ্জে epsilon যোগ করে; শূন্য ভলিউমে A/D এর cumsum সমান থাকে
+    candles = fixtures.ohlcv_edge(200, seed=3, start_price=start_price).tolist()
+    engine = SignalEngine()
+    for end in range(WINDOW, len(candles) + 1):
+        window = candles[end - WINDOW:end]
+        _same(engine.analyze_market_sentiment(window), engine.analyze_incremental(window, f"E{start_price}", "1h"))
+
+
+def test_cold_start_and_loading_match():
+    candles = fixtures.ohlcv(200, seed=5).tolist()
+    engine = SignalEngine()
+    # স্টেট ছাড়া প্রথম কলেই পুরো হিস্টোরি
+    _same(engine.analyze_market_sentiment(candles), engine.analyze_incremental(candles, "COLD/USDT", "1h"))
+    short = candles[:40]
+    assert engine.analyze_incremental(short, "SHORT/USDT", "1h")["verdict"] == \
+        engine.analyze_market_sentiment(short)["verdict"] == "LOADING..."
@@ -0,0 +1,103 @@
+"""
+LocalOrderBook এর স্ন্যাপশট/ডিফ সিকোয়েন্সিং — সিন্থেটিক depthUpdate (U = প্রথম, u = শেষ update id)।
+"""
+from app.services.order_book import LocalOrderBook
+
+SNAPSHOT_BIDS = [["100.0", "1.0"], ["99.0", "2.0"]]
+SNAPSHOT_ASKS = [["101.0", "1.0"], ["102.0", "3.0"]]
+
+
+def _book():
+    return LocalOrderBook("BTC/USDT", tick_size=0.1)
+
+
+def _levels(book):
+    view = {"bids": book.bids.top(10), "asks": book.asks.top(10)}
+    return {side: [(book.price(tick), qty) for tick, qty in levels] for side, levels in view.items()}
+
+
+def test_buffered_diffs_bridge_the_snapshot():
+    book = _book()
+    # স্ন্যাপশটের আগে আসা ডিফ বাফারে
+    assert book.apply_diff(95, 100, [["100.0", "9.0"]], [])
+    assert book.apply_diff(101, 105, [["100.0", "1.5"]], [["101.0", "0"]])
+    assert book.apply_diff(106, 110, [], [["103.0", "4.0"]])
+    assert not book.synced and len(book.buffer) == 3
+
+    # lastUpdateId 103: u <= 103 বাদ, প্রথম প্রাসঙ্গিক ডিফে U <= 104 <= u
+    assert book.load_snapshot(SNAPSHOT_BIDS, SNAPSHOT_ASKS, 103)
+    assert book.synced and book.last_update_id == 110 and not book.buffer
+    assert _levels(book) == {
+        "bids": [(100.0, 1.5), (99.0, 2.0)],
+        "asks": [(102.0, 3.0), (103.0, 4.0)],
+    }
+
+    # পুরনো ইভেন্ট উপেক্ষা, পরেরটি U == আগের u + 1
+    assert book.apply_diff(108, 110, [["100.0", "7.0"]], [])
+    assert book.apply_diff(111, 111, [["99.0", "0"]], [])
+    assert _levels(book)["bids"] == [(100.0, 1.5)]
+    assert book.last_update_id == 111 and book.gaps == 0
+
+
+def test_gap_marks_the_book_for_resync():
+    book = _book()
+    assert book.load_snapshot(SNAPSHOT_BIDS, SNAPSHOT_ASKS, 100)
+    assert book.apply_diff(101, 102, [], [])
+
+    # 103 আসেনি — বুক আর নির্ভরযোগ্য নয়, গ্যাপের ডিফ থেকে আবার বাফার
+    assert not book.apply_diff(104, 106, [["100.0", "5.0"]], [])
+    assert not book.synced and book.gaps == 1
+    assert book.apply_diff(107, 109, [["98.0", "1.0"]], [])
+    assert [event[:2] for event in book.buffer] == [(104, 106), (107, 109)]
+
+    assert book.load_snapshot(SNAPSHOT_BIDS, SNAPSHOT_ASKS, 105)
+    assert book.synced and book.last_update_id == 109
+    assert _levels(book)["bids"] == [(100.0, 5.0), (99.0, 2.0), (98.0, 1.0)]
+
+
+def test_stale_snapshot_keeps_the_buffer_for_the_next_one():
+    book = _book()
+    book.apply_diff(101, 105, [["100.0", "1.5"]], [])
+    book.apply_diff(106, 110, [["100.0", "2.5"]], [])
+
+    # lastUpdateId 90: 91 প্রথম ডিফের [101, 105] এ নেই — স্ন্যাপশট খুব পুরনো
+    assert not book.load_snapshot(SNAPSHOT_BIDS, SNAPSHOT_ASKS, 90)
+    assert not book.synced
+    assert [event[:2] for event in book.buffer] == [(101, 105), (106, 110)]
+
+    # নতুন ডিফ আসতে থাকে; পরের স্ন্যাপশট রাখা বাফারের সাথে মেলে
+    book.apply_diff(111, 112, [["99.0", "0"]], [])
+    assert book.load_snapshot(SNAPSHOT_BIDS, SNAPSHOT_ASKS, 107)
+    assert book.synced and book.last_update_id == 112
+    assert _levels(book)["bids"] == [(100.0, 2.5)]
+
+
+def test_gap_inside_the_buffer_keeps_the_later_diffs():
+    book = _book()
+    book.apply_diff(101, 105, [], [])
+    book.apply_diff(108, 110, [["100.0", "3.0"]], [])  # 106-107 নেই
+    book.apply_diff(111, 115, [["100.0", "4.0"]], [])
+
+    assert not book.load_snapshot(SNAPSHOT_BIDS, SNAPSHOT_ASKS, 102)
+    assert not book.synced and book.gaps == 1
+    assert [event[:2] for event in book.buffer] == [(108, 110), (111, 115)]
+
+    assert book.load_snapshot(SNAPSHOT_BIDS, SNAPSHOT_ASKS, 109)
+    assert book.synced and book.last_update_id == 115
+    assert _levels(book)["bids"] == [(100.0, 4.0), (99.0, 2.0)]
+
+
+def test_snapshot_newer_than_the_buffer():
+    book = _book()
+    book.apply_diff(101, 105, [["100.0", "9.0"]], [])
+
+    # সব বাফার করা ডিফ স্ন্যাপশটে ঢুকে গেছে: বাদ, পরের লাইভ ডিফ থেকে সংযোগ
+    assert book.load_snapshot(SNAPSHOT_BIDS, SNAPSHOT_ASKS, 120)
+    assert book.synced and book.last_update_id == 120 and not book.buffer
+    assert _levels(book)["bids"] == [(100.0, 1.0), (99.0, 2.0)]
+
+    assert book.apply_diff(118, 120, [["100.0", "9.0"]], [])   # পুরনো
+    assert book.apply_diff(119, 123, [["100.0", "6.0"]], [])   # 121 কে ঢেকে রাখে
+    assert book.last_update_id == 123 and _levels(book)["bids"][0] == (100.0, 6.0)
+    assert not book.apply_diff(125, 126, [], [])
+    assert not book.synced
@@ -0,0 +1,91 @@
+"""
+TimeBars — সিন্থেটিক ট্রেড দিয়ে ফাইনাল বার, দেরির ট্রেডের গ্রেস, ফ্ল্যাট বার পূরণ ও REST সিডের সাথে মেলানো।
+বার: [ts, open, high, low, close, volume, প্রথম ট্রেড ts, শেষ ট্রেড ts]
+"""
+from app.services.candle_aggregator import TimeBars
+
+MINUTE = 60_000
+GRACE = 2_000
+START = 1_700_000_000_000 // MINUTE * MINUTE
+
+
+def _bars():
+    return TimeBars("1m", GRACE)
+
+
+def test_bar_closes_after_grace_and_later_trades_are_late():
+    bars = _bars()
+    assert bars.add(START + 1_000, 100.0, 1.0) == []
+    assert bars.add(START + 30_000, 105.0, 2.0) == []
+    assert bars.add(START + 59_000, 103.0, 1.0) == []
+    # পরের বাকেটের ট্রেড, কিন্তু আগের বার এখনো গ্রেসে
+    assert bars.add(START + MINUTE + 500, 104.0, 1.0) == []
+    assert bars.add(START + 59_500, 101.0, 1.0) == []  # দেরিতে আসা, গ্রেসের ভেতরে — বারে যোগ
+
+    finals = bars.add(START + MINUTE + GRACE + 500, 104.5, 1.0)
+    assert finals == [[START, 100.0, 105.0, 100.0, 101.0, 5.0, START + 1_000, START + 59_500]]
+    assert bars.last_final_ts == START and bars.last_close == 101.0
+
+    # গ্রেস পার হওয়ার পর আগের বাকেটের ট্রেড বাদ ও গোনা
+    assert bars.add(START + 59_900, 90.0, 1.0) == []
+    assert bars.late == 1
+    assert bars.open[0][:6] == [START + MINUTE, 104.0, 104.5, 104.0, 104.5, 2.0]
+
+
+def test_out_of_order_trades_fix_open_and_close():
+    bars = _bars()
+    bars.add(START + 30_000, 100.0, 1.0)
+    bars.add(START + 10_000, 95.0, 1.0)   # আগের ট্রেড পরে এল: open বদলায়, close নয়
+    bars.add(START + 20_000, 97.0, 1.0)   # মাঝের ট্রেড: শুধু high/low/volume
+    bars.add(START + 40_000, 99.0, 1.0)
+    assert bars.advance(START + MINUTE) == [
+        [START, 95.0, 100.0, 95.0, 99.0, 4.0, START + 10_000, START + 40_000]]
+
+
+def test_empty_buckets_become_flat_bars():
+    bars = _bars()
+    bars.add(START + 1_000, 100.0, 1.0)
+    finals = bars.add(START + 3 * MINUTE + 500, 110.0, 1.0)
+    assert [bar[0] for bar in finals] == [START, START + MINUTE]
+    # ট্রেডহীন বাকেট: আগের close এ ফ্ল্যাট, ভলিউম শূন্য, ট্রেড টাইম নেই
+    assert finals[1] == [START + MINUTE, 100.0, 100.0, 100.0, 100.0, 0.0, None, None]
+    assert bars.tick(START + 3 * MINUTE + GRACE) == [
+        [START + 2 * MINUTE, 100.0, 100.0, 100.0, 100.0, 0.0, None, None]]
+
+    # ট্রেড না এলেও টাইমার বাকেট খোলে ও ক্লোজ করে
+    finals = bars.tick(START + 5 * MINUTE + GRACE)
+    assert [bar[:6] for bar in finals] == [
+        [START + 3 * MINUTE, 110.0, 110.0, 110.0, 110.0, 1.0],
+        [START + 4 * MINUTE, 110.0, 110.0, 110.0, 110.0, 0.0],
+    ]
+    assert [bar[0] for bar in bars.open] == [START + 5 * MINUTE]
+    assert bars.late == 0 and bars.finalized == 5
+
+
+def test_seed_merges_trades_buffered_during_the_fetch():
+    bars = _bars()
+    fetched_at = START + MINUTE + 10_000
+    # সিড চলাকালীন আসা ট্রেড: fetched_at এর আগেরটি REST বারে আছে, পরেরটি যোগ হবে
+    bars.pending = [(START + MINUTE + 5_000, 109.0, 1.0), (START + MINUTE + 15_000, 106.0, 2.0)]
+    ohlcv = [[START, 100.0, 102.0, 99.0, 101.0, 5.0], [START + MINUTE, 101.0, 103.0, 100.0, 102.0, 3.0]]
+    assert bars.seed(ohlcv, fetched_at) == []
+    assert bars.ready and bars.pending == []
+    assert bars.last_final_ts == START and bars.last_close == 101.0
+    assert bars.open == [[START + MINUTE, 101.0, 106.0, 100.0, 106.0, 5.0, START + MINUTE, START + MINUTE + 15_000]]
+
+    # REST এর ফাইনাল বারের ট্রেড দেরিতে
+    assert bars.add(START + 30_000, 90.0, 1.0) == []
+    assert bars.late == 1
+
+    finals = bars.add(START + 2 * MINUTE + GRACE, 107.0, 1.0)
+    assert finals == [[START + MINUTE, 101.0, 106.0, 100.0, 106.0, 5.0, START + MINUTE, START + MINUTE + 15_000]]
+
+
+def test_seed_with_pending_trades_in_a_later_bucket():
+    bars = _bars()
+    fetched_at = START + MINUTE - 1_000
+    bars.pending = [(START + MINUTE + GRACE + 1_000, 105.0, 1.0)]
+    finals = bars.seed([[START, 100.0, 101.0, 99.0, 100.5, 4.0]], fetched_at)
+    # REST এর আংশিক বার গ্রেস পার হয়ে ফাইনাল, পরের বারে সিডের পরের ট্রেড
+    assert finals == [[START, 100.0, 101.0, 99.0, 100.5, 4.0, START, fetched_at]]
+    assert bars.open[0][:6] == [START + MINUTE, 105.0, 105.0, 105.0, 105.0, 1.0]